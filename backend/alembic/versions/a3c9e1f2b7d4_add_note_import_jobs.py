@@ -0,0 +1,61 @@
+"""add_note_import_jobs
+
+Revision ID: a3c9e1f2b7d4
+Revises: 80e02356b095
+Create Date: 2026-10-19 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f2b7d4'
+down_revision: Union[str, Sequence[str], None] = '80e02356b095'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('note_import_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('source_format', sa.String(), nullable=False),
+    sa.Column('source_name', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('total_rows', sa.Integer(), nullable=True),
+    sa.Column('inserted_rows', sa.Integer(), nullable=True),
+    sa.Column('skipped_rows', sa.Integer(), nullable=True),
+    sa.Column('invalid_rows', sa.Integer(), nullable=True),
+    sa.Column('enrichment_failed', sa.Integer(), nullable=True),
+    sa.Column('insert_seconds', sa.Float(), nullable=True),
+    sa.Column('error_summary', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_note_import_jobs_user_id_users')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_note_import_jobs'))
+    )
+    op.create_index(op.f('ix_note_import_jobs_id'), 'note_import_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_note_import_jobs_user_id'), 'note_import_jobs', ['user_id'], unique=False)
+    op.create_index(op.f('ix_note_import_jobs_status'), 'note_import_jobs', ['status'], unique=False)
+    op.create_index(op.f('ix_note_import_jobs_created_at'), 'note_import_jobs', ['created_at'], unique=False)
+
+    op.add_column('clinical_notes', sa.Column('import_job_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_clinical_notes_import_job_id'), 'clinical_notes', ['import_job_id'], unique=False)
+    op.create_foreign_key(op.f('fk_clinical_notes_import_job_id_note_import_jobs'), 'clinical_notes', 'note_import_jobs', ['import_job_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(op.f('fk_clinical_notes_import_job_id_note_import_jobs'), 'clinical_notes', type_='foreignkey')
+    op.drop_index(op.f('ix_clinical_notes_import_job_id'), table_name='clinical_notes')
+    op.drop_column('clinical_notes', 'import_job_id')
+
+    op.drop_index(op.f('ix_note_import_jobs_created_at'), table_name='note_import_jobs')
+    op.drop_index(op.f('ix_note_import_jobs_status'), table_name='note_import_jobs')
+    op.drop_index(op.f('ix_note_import_jobs_user_id'), table_name='note_import_jobs')
+    op.drop_index(op.f('ix_note_import_jobs_id'), table_name='note_import_jobs')
+    op.drop_table('note_import_jobs')
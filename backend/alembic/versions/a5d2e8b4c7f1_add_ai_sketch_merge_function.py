@@ -0,0 +1,49 @@
+"""add_ai_sketch_merge_function
+
+Revision ID: a5d2e8b4c7f1
+Revises: f1c7a3e9d5b2
+Create Date: 2026-10-19 22:41:09.306518
+
+Governance rollup rows are now written with INSERT ... ON CONFLICT DO UPDATE
+instead of SELECT ... FOR UPDATE and a Python read-modify-write. Counters are
+added in SQL; the quantile sketch columns are merged by ai_sketch_merge, the
+SQL form of QuantileSketch.merge (services/analytics/quantile_sketch.py):
+counts, zero counts and per-bucket counts are summed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d2e8b4c7f1'
+down_revision: Union[str, Sequence[str], None] = 'f1c7a3e9d5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ai_sketch_merge(a jsonb, b jsonb) RETURNS jsonb
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE
+                WHEN a IS NULL THEN b
+                WHEN b IS NULL THEN a
+                ELSE jsonb_build_object(
+                    'a', a -> 'a',
+                    'n', coalesce((a ->> 'n')::bigint, 0) + coalesce((b ->> 'n')::bigint, 0),
+                    'z', coalesce((a ->> 'z')::bigint, 0) + coalesce((b ->> 'z')::bigint, 0),
+                    'b', coalesce(a -> 'b', '{}'::jsonb) || coalesce((
+                        SELECT jsonb_object_agg(k, coalesce((a -> 'b' ->> k)::bigint, 0) + v::bigint)
+                        FROM jsonb_each_text(b -> 'b') AS e(k, v)
+                    ), '{}'::jsonb)
+                )
+            END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS ai_sketch_merge(jsonb, jsonb)")
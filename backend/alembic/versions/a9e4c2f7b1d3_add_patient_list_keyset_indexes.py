@@ -0,0 +1,50 @@
+"""add_patient_list_keyset_indexes
+
+Revision ID: a9e4c2f7b1d3
+Revises: f3d6b8a2c4e7
+Create Date: 2026-10-19 18:10:26.554019
+
+(patient_id, created_at, id) indexes behind the keyset-paginated patient
+sub-resource lists (admissions, history, medications, procedures,
+documents, tasks, billing, messages).
+
+Built CONCURRENTLY (outside a transaction) so these busy tables stay
+writable during the build; IF NOT EXISTS makes a re-run after an
+interrupted build safe, but an interrupted concurrent build leaves an
+INVALID index that must be dropped first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4c2f7b1d3'
+down_revision: Union[str, Sequence[str], None] = 'f3d6b8a2c4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    "admissions", "medical_history", "medications", "procedures",
+    "documents", "tasks", "billing_items", "secure_messages",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_patient_created_id', table, ['patient_id', 'created_at', 'id'],
+                unique=False, if_not_exists=True, postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.drop_index(
+                f'ix_{table}_patient_created_id', table_name=table,
+                if_exists=True, postgresql_concurrently=True,
+            )
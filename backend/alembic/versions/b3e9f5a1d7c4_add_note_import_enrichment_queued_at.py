@@ -0,0 +1,32 @@
+"""add_note_import_enrichment_queued_at
+
+Revision ID: b3e9f5a1d7c4
+Revises: a5d2e8b4c7f1
+Create Date: 2026-10-20 09:27:15.640382
+
+Resuming an import job that is still enriching queued every pending note a
+second time. The resume endpoint now refuses while the job shows recent
+progress, measured from when its enrichment was last queued and from its
+notes' updated_at.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9f5a1d7c4'
+down_revision: Union[str, Sequence[str], None] = 'a5d2e8b4c7f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('note_import_jobs', sa.Column('enrichment_queued_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('note_import_jobs', 'enrichment_queued_at')
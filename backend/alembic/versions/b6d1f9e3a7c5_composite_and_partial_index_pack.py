@@ -0,0 +1,63 @@
+"""composite_and_partial_index_pack
+
+Revision ID: b6d1f9e3a7c5
+Revises: a9e4c2f7b1d3
+Create Date: 2026-10-19 18:46:03.781254
+
+Composite / partial indexes for the hot multi-column filters found by
+index_advisor.py (see app/db/index_advisor.py for the workload):
+
+  clinical_notes  (patient_id, created_at) WHERE is_deleted = false
+                  patient chart notes, timeline, report, deterioration scan
+  patients        (user_id, created_at)    WHERE is_deleted = false
+                  patient list
+  tasks           (patient_id, status)
+                  workflow dashboard pending count / latest pending
+  ai_encounters   (patient_id, created_by_id, created_at)
+                  encounter list per patient and clinician
+
+Soft-deleted rows are excluded from the partial indexes, which keeps them
+small and lets the planner drop the is_deleted filter entirely.
+
+Indexes are built CONCURRENTLY (outside a transaction) so writes are not
+blocked; IF NOT EXISTS makes a re-run after an interrupted build safe, but
+an interrupted concurrent build leaves an INVALID index that must be
+dropped first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f9e3a7c5'
+down_revision: Union[str, Sequence[str], None] = 'a9e4c2f7b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text("is_deleted = false")
+
+INDEXES = (
+    ("ix_clinical_notes_patient_live_created", "clinical_notes", ["patient_id", "created_at"], LIVE),
+    ("ix_patients_user_live_created", "patients", ["user_id", "created_at"], LIVE),
+    ("ix_tasks_patient_status", "tasks", ["patient_id", "status"], None),
+    ("ix_ai_encounters_patient_creator_created", "ai_encounters", ["patient_id", "created_by_id", "created_at"], None),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, if_not_exists=True,
+                postgresql_concurrently=True, postgresql_where=where,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,57 @@
+"""add_ai_governance_rollups
+
+Revision ID: b7e4d2a9c1f3
+Revises: a3c9e1f2b7d4
+Create Date: 2026-10-19 11:40:02.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d2a9c1f3'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('model_version', sa.String(length=100), nullable=False),
+    sa.Column('risk_level', sa.String(length=20), nullable=False),
+    sa.Column('encounters', sa.Integer(), nullable=False),
+    sa.Column('confirmed', sa.Integer(), nullable=False),
+    sa.Column('tokens_sum', sa.Integer(), nullable=False),
+    sa.Column('latency_ms_sum', sa.Float(), nullable=False),
+    sa.Column('latency_count', sa.Integer(), nullable=False),
+    sa.Column('confidence_sum', sa.Float(), nullable=False),
+    sa.Column('compliance_sum', sa.Float(), nullable=False),
+    sa.Column('quality_count', sa.Integer(), nullable=False),
+    sa.Column('edit_distance_sum', sa.Float(), nullable=False),
+    sa.Column('edit_distance_count', sa.Integer(), nullable=False),
+    sa.Column('latency_sketch', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('confidence_sketch', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f(f'pk_{name}')),
+    sa.UniqueConstraint('bucket_start', 'model_version', 'risk_level', name=f'uq_{name}_bucket')
+    )
+    op.create_index(op.f(f'ix_{name}_bucket_start'), name, ['bucket_start'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_rollup_table('ai_governance_rollups_hourly')
+    _create_rollup_table('ai_governance_rollups_daily')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in ('ai_governance_rollups_daily', 'ai_governance_rollups_hourly'):
+        op.drop_index(op.f(f'ix_{name}_bucket_start'), table_name=name)
+        op.drop_table(name)
@@ -0,0 +1,120 @@
+"""partition_audit_and_ai_telemetry
+
+Revision ID: c4a8f3e6d2b1
+Revises: b7e4d2a9c1f3
+Create Date: 2026-10-19 14:05:37.902116
+
+Converts audit_logs (on timestamp), ai_usage_metrics and ai_quality_reports
+(on created_at) into monthly range-partitioned tables. Each table is rebuilt:
+the old table is renamed, a partitioned copy is created with the same columns,
+defaults, constraints and indexes, rows are copied across, and the old table
+is dropped. The primary key becomes (id, <partition column>) as PostgreSQL
+requires. Partitions cover the oldest existing row through PREMAKE_MONTHS
+ahead, plus a DEFAULT partition; app/db/partitions.py keeps them rolling.
+
+The copy holds an exclusive lock on each table, so run this in a maintenance window.
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f3e6d2b1'
+down_revision: Union[str, Sequence[str], None] = 'b7e4d2a9c1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONED = (
+    ("audit_logs", "timestamp"),
+    ("ai_usage_metrics", "created_at"),
+    ("ai_quality_reports", "created_at"),
+)
+PREMAKE_MONTHS = 3
+
+
+def _add_months(d: datetime.date, months: int) -> datetime.date:
+    index = d.year * 12 + (d.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _table_ddl(conn, table: str):
+    params = {"t": table}
+    indexes = conn.execute(sa.text(
+        "SELECT c.relname, pg_get_indexdef(c.oid) FROM pg_index x "
+        "JOIN pg_class c ON c.oid = x.indexrelid "
+        "WHERE x.indrelid = CAST(:t AS regclass) AND NOT x.indisprimary"
+    ), params).all()
+    constraints = conn.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = CAST(:t AS regclass) AND contype IN ('f', 'c')"
+    ), params).all()
+    pk = conn.execute(sa.text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:t AS regclass) AND contype = 'p'"
+    ), params).scalar()
+    sequence = conn.execute(sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), params).scalar()
+    return indexes, constraints, pk or f"pk_{table}", sequence
+
+
+def _create_partitions(conn, table: str, column: str, source: str) -> None:
+    oldest = conn.execute(sa.text(f'SELECT min("{column}") FROM "{source}"')).scalar()
+    today = datetime.datetime.utcnow().date()
+    month = datetime.date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(datetime.date(today.year, today.month, 1), PREMAKE_MONTHS)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f'CREATE TABLE "{table}_y{month.year:04d}m{month.month:02d}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+
+def _rebuild(table: str, column: str, partitioned: bool) -> None:
+    conn = op.get_bind()
+    indexes, constraints, pk, sequence = _table_ddl(conn, table)
+    old = f"{table}_old"
+
+    # Free the table, primary key and index names for the rebuilt table
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    op.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{pk}" TO "{pk}_old"')
+    for name, _ in indexes:
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_old"')
+
+    if partitioned:
+        op.execute(f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")')
+        # Partition keys are part of the primary key, so they cannot be NULL
+        op.execute(f'UPDATE "{old}" SET "{column}" = now() WHERE "{column}" IS NULL')
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET NOT NULL')
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{pk}" PRIMARY KEY (id, "{column}")')
+        _create_partitions(conn, table, column, old)
+    else:
+        op.execute(f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" DROP NOT NULL')
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{pk}" PRIMARY KEY (id)')
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    for name, definition in constraints:
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    for _, definition in indexes:
+        # Definitions were captured before the rename, so they target the new table
+        op.execute(definition)
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+    op.execute(f'DROP TABLE "{old}"')
+    op.execute(f'ANALYZE "{table}"')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in PARTITIONED:
+        _rebuild(table, column, partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(PARTITIONED):
+        _rebuild(table, column, partitioned=False)
@@ -0,0 +1,31 @@
+"""add_encounter_quality_risk_level
+
+Revision ID: d2f7a4c9e6b8
+Revises: b6d1f9e3a7c5
+Create Date: 2026-10-19 21:14:37.502918
+
+With AUDIT_WRITE_MODE=async the quality report is inserted after the encounter
+commits, so confirmations read the risk level from the encounter instead.
+Existing encounters keep NULL and fall back to their quality report.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a4c9e6b8'
+down_revision: Union[str, Sequence[str], None] = 'b6d1f9e3a7c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_encounters', sa.Column('quality_risk_level', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ai_encounters', 'quality_risk_level')
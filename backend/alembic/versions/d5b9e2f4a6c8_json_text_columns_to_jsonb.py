@@ -0,0 +1,81 @@
+"""json_text_columns_to_jsonb
+
+Revision ID: d5b9e2f4a6c8
+Revises: c4a8f3e6d2b1
+Create Date: 2026-10-19 15:48:12.664310
+
+Converts JSON-in-Text columns to JSONB. Values are cast safely:
+  - valid JSON text is stored as-is;
+  - Python reprs written by older code (str(list) with single quotes) are
+    converted by swapping the quotes when that yields valid JSON;
+  - anything else is kept verbatim as a JSON string, so no row is lost.
+Empty strings become NULL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b9e2f4a6c8'
+down_revision: Union[str, Sequence[str], None] = 'c4a8f3e6d2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = {
+    "ai_encounters": ("soap_note", "risk_flags", "legal_flags", "pipeline_statuses", "token_usage"),
+    "ai_generated_medications": ("fields_required",),
+    "clinical_notes": ("structured_content",),
+    "note_versions": ("structured_content",),
+    "clinical_ai_insights": ("red_flags", "suggestions", "missing_info"),
+    "shift_handovers": ("content",),
+    "readmission_risks": ("contributing_factors", "prevention_recommendations"),
+    "secure_messages": ("flagged_keywords",),
+}
+
+_CAST_FUNCTION = """
+CREATE OR REPLACE FUNCTION _migration_text_to_jsonb(value text) RETURNS jsonb
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    IF value IS NULL OR btrim(value) = '' THEN
+        RETURN NULL;
+    END IF;
+    BEGIN
+        RETURN value::jsonb;
+    EXCEPTION WHEN others THEN
+        NULL;
+    END;
+    IF left(btrim(value), 1) IN ('[', '{') THEN
+        BEGIN
+            RETURN replace(value, '''', '"')::jsonb;
+        EXCEPTION WHEN others THEN
+            NULL;
+        END;
+    END IF;
+    RETURN to_jsonb(value);
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(_CAST_FUNCTION)
+    for table, columns in COLUMNS.items():
+        alters = ", ".join(
+            f'ALTER COLUMN "{c}" TYPE JSONB USING _migration_text_to_jsonb("{c}")' for c in columns
+        )
+        op.execute(f'ALTER TABLE "{table}" {alters}')
+    op.execute("DROP FUNCTION _migration_text_to_jsonb(text)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in COLUMNS.items():
+        # JSON strings go back to their raw text; everything else to its JSON text
+        alters = ", ".join(
+            f'ALTER COLUMN "{c}" TYPE TEXT USING CASE WHEN jsonb_typeof("{c}") = \'string\' '
+            f'THEN "{c}" #>> \'{{}}\' ELSE "{c}"::text END'
+            for c in columns
+        )
+        op.execute(f'ALTER TABLE "{table}" {alters}')
@@ -0,0 +1,33 @@
+"""add_patient_risk_scan_watermark
+
+Revision ID: e4b8c1f6a3d9
+Revises: d2f7a4c9e6b8
+Create Date: 2026-10-19 21:38:52.114076
+
+The deterioration scan compared the latest note's created_at with the risk
+row's write time, so notes created while a scan was running were never
+rescanned. It now records the created_at of the note it scored. Existing rows
+are seeded with last_updated, which is what the scan compared against before.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8c1f6a3d9'
+down_revision: Union[str, Sequence[str], None] = 'd2f7a4c9e6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hospital_patient_risk', sa.Column('scanned_note_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE hospital_patient_risk SET scanned_note_at = last_updated")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('hospital_patient_risk', 'scanned_note_at')
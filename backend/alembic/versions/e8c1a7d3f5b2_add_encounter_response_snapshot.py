@@ -0,0 +1,32 @@
+"""add_encounter_response_snapshot
+
+Revision ID: e8c1a7d3f5b2
+Revises: d5b9e2f4a6c8
+Create Date: 2026-10-19 16:52:09.318842
+
+Existing encounters have no snapshot; read endpoints build and store one on
+first access.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c1a7d3f5b2'
+down_revision: Union[str, Sequence[str], None] = 'd5b9e2f4a6c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_encounters', sa.Column('response_snapshot', sa.Text(), nullable=True))
+    op.add_column('ai_encounters', sa.Column('snapshot_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ai_encounters', 'snapshot_version')
+    op.drop_column('ai_encounters', 'response_snapshot')
@@ -0,0 +1,52 @@
+"""add_dashboard_counter_indexes
+
+Revision ID: f1c7a3e9d5b2
+Revises: e4b8c1f6a3d9
+Create Date: 2026-10-19 22:14:37.520913
+
+Indexes for the hospital dashboard and HOS command-center counters, which
+now filter in WHERE so each count reads only the matching rows:
+
+  tasks                (status, category)     pending labs
+  secure_messages      (category, status)     unread emergency messages
+  admissions           (status)               active admissions
+  hospital_patient_risk (risk_level)          critical / high risk patients
+  readmission_risks    (risk_level, patient_id)
+                       distinct high-risk patients, index-only
+
+Patient.status and Task.status were already indexed.
+
+Built CONCURRENTLY (outside a transaction) so writes are not blocked.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a3e9d5b2'
+down_revision: Union[str, Sequence[str], None] = 'e4b8c1f6a3d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_tasks_status_category", "tasks", ["status", "category"]),
+    ("ix_secure_messages_category_status", "secure_messages", ["category", "status"]),
+    ("ix_admissions_status", "admissions", ["status"]),
+    ("ix_hospital_patient_risk_risk_level", "hospital_patient_risk", ["risk_level"]),
+    ("ix_readmission_risks_level_patient", "readmission_risks", ["risk_level", "patient_id"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""add_note_listing_keyset_index
+
+Revision ID: f3d6b8a2c4e7
+Revises: e8c1a7d3f5b2
+Create Date: 2026-10-19 17:34:51.207716
+
+Composite index behind keyset pagination of GET /notes/: the per-user
+listing seeks on (created_at, id) instead of sorting every note.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3d6b8a2c4e7'
+down_revision: Union[str, Sequence[str], None] = 'e8c1a7d3f5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_clinical_notes_user_created_id', 'clinical_notes', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_clinical_notes_user_created_id', table_name='clinical_notes')
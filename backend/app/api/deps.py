@@ -2,11 +2,11 @@ from fastapi import Depends, HTTPException, status, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from ..core.config import settings
-from ..db.session import get_db
+from ..db.session import get_db, get_read_db
 from .. import models
 from ..core.logging import user_id_contextvar
-import firebase_admin
-from firebase_admin import auth
+from ..core.auth_cache import Principal, token_cache
+from ..core import firebase
 from typing import Optional, List
 
 security = HTTPBearer()
@@ -14,7 +14,22 @@ security = HTTPBearer()
 # Canonical RBAC roles
 VALID_ROLES = {"DOCTOR", "NURSE", "BILLING_ADMIN", "READ_ONLY_AUDITOR", "SUPER_ADMIN"}
 
-def verify_token_and_get_user(db: Session, token_str: str) -> models.User:
+def _authenticated(db: Session, principal: Principal) -> Principal:
+    user_id_contextvar.set(principal.id)
+    # Read-replica routing keys read-your-writes on this (see db/routing.py)
+    db.info["user_id"] = principal.id
+    return principal
+
+def verify_token_and_get_user(db: Session, token_str: str) -> Principal:
+    """
+    Verifies a Firebase ID token and returns the caller as a Principal.
+    A token seen before (until its exp, capped at AUTH_CACHE_MAX_TTL) is a
+    single hash lookup: no signature check and no DB round-trip.
+    """
+    cached = token_cache.get(token_str)
+    if cached is not None:
+        return _authenticated(db, cached)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -23,7 +38,7 @@ def verify_token_and_get_user(db: Session, token_str: str) -> models.User:
     
     try:
         # Verify Firebase ID Token
-        decoded_token = auth.verify_id_token(token_str, clock_skew_seconds=60)
+        decoded_token = firebase.verify_id_token(token_str, clock_skew_seconds=60)
         email = decoded_token.get("email")
         firebase_uid = decoded_token.get("uid")
         
@@ -63,13 +78,8 @@ def verify_token_and_get_user(db: Session, token_str: str) -> models.User:
                 logger.error(f"Failed to sync user {email}: {e}")
                 raise HTTPException(status_code=500, detail="User account synchronization failed.")
     
-    # Ensure firebase_uid is linked if it wasn't already
-    if user and not user.firebase_uid:
-        user.firebase_uid = firebase_uid
-        db.add(user)
-        db.commit()
-    elif user and user.firebase_uid != firebase_uid:
-        # If UID changed for some reason, update it (or log a warning)
+    # Link / update firebase_uid only when it actually changed
+    if user.firebase_uid != firebase_uid:
         user.firebase_uid = firebase_uid
         db.add(user)
         db.commit()
@@ -77,25 +87,26 @@ def verify_token_and_get_user(db: Session, token_str: str) -> models.User:
     if not user.is_active:
         raise HTTPException(status_code=403, detail="User account is deactivated")
         
-    user_id_contextvar.set(user.id)
-    return user
+    principal = Principal.from_user(user)
+    token_cache.put(token_str, principal, decoded_token.get("exp"))
+    return _authenticated(db, principal)
 
 def get_current_user(
     db: Session = Depends(get_db), 
     token: HTTPAuthorizationCredentials = Depends(security)
-) -> models.User:
+) -> Principal:
     return verify_token_and_get_user(db, token.credentials)
 
 def get_current_user_from_token(
     db: Session = Depends(get_db),
     token: str = Query(...)
-) -> models.User:
+) -> Principal:
     """Special dependency for browser-opened files that can't send headers easily."""
     return verify_token_and_get_user(db, token)
 
 def check_role(roles: list[str]):
     """Legacy helper — prefer require_role() for new endpoints."""
-    def role_checker(current_user: models.User = Depends(get_current_user)):
+    def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -113,11 +124,8 @@ def require_role(allowed_roles: List[str]):
         async def endpoint(user = Depends(require_role(["SUPER_ADMIN"]))):
             ...
     """
-    def _dependency(
-        db: Session = Depends(get_db),
-        token: HTTPAuthorizationCredentials = Depends(security),
-    ) -> models.User:
-        user = verify_token_and_get_user(db, token.credentials)
+    def _dependency(user: Principal = Depends(get_current_user)) -> Principal:
+        # Shares the request's get_current_user result: the token is verified once
         # Normalise — support legacy lowercase roles
         user_role_upper = (user.role or "").upper()
         allowed_upper = [r.upper() for r in allowed_roles]
@@ -1,63 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, timedelta
+from typing import Optional
 
-from ...db.session import get_db
+from ...db.session import get_db, get_read_db
 from ...api.deps import require_role
-from ...models import AIEncounter, AIUsageMetrics, AIQualityReport, User
+from ...models import User, AIGovernanceRollupHourly, AIGovernanceRollupDaily
+from ...services.analytics import governance_rollups as rollups
+from ...core.write_behind import audit_writer
 
 router = APIRouter()
 
 @router.get("/ai-analytics")
 async def get_ai_analytics(
-    db: Session = Depends(get_db),
+    hours: Optional[int] = Query(None, ge=1, le=168, description="Short window from hourly rollups"),
+    days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_read_db),
     admin: User = Depends(require_role(["SUPER_ADMIN"]))
 ):
     """
     Returns aggregated AI performance metrics for administrators.
-    Optimised into a few efficient SQL queries.
+    Reads only the governance rollups (hourly for `hours`, daily otherwise),
+    so cost does not grow with encounter volume.
     """
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    if hours:
+        since = datetime.utcnow() - timedelta(hours=hours)
+        rows = rollups.load_rollups(db, AIGovernanceRollupHourly, since)
+        period = f"last_{hours}_hours"
+    else:
+        since = datetime.utcnow() - timedelta(days=days)
+        rows = rollups.load_rollups(db, AIGovernanceRollupDaily, since)
+        period = f"last_{days}_days"
 
-    # 1. Aggregate Usage & Latency
-    usage_stats = db.query(
-        func.avg(AIUsageMetrics.latency_ms).label("avg_latency"),
-        func.avg(AIUsageMetrics.tokens_used).label("avg_tokens"),
-        func.count(AIUsageMetrics.id).label("total_encounters"),
-        func.avg(AIUsageMetrics.edit_distance_score).label("avg_edit_distance")
-    ).filter(AIUsageMetrics.created_at >= thirty_days_ago).first()
-
-    # 2. Aggregate Quality Scores
-    quality_stats = db.query(
-        func.avg(AIQualityReport.confidence_score).label("avg_confidence"),
-        func.avg(AIQualityReport.compliance_score).label("avg_compliance")
-    ).filter(AIQualityReport.created_at >= thirty_days_ago).first()
-
-    # 3. Acceptance Rate
-    confirmed_count = db.query(func.count(AIEncounter.id)).filter(
-        AIEncounter.is_confirmed == True,
-        AIEncounter.created_at >= thirty_days_ago
-    ).scalar()
-
-    total_count = usage_stats.total_encounters or 1
-    acceptance_rate = (confirmed_count / total_count) if total_count > 0 else 0
+    summary = rollups.summarize(rows)
+    latency_pct = summary.pop("latency_ms_percentiles")
+    confidence_pct = summary.pop("confidence_percentiles")
 
     return {
-        "period": "last_30_days",
+        "period": period,
         "metrics": {
-            "avg_latency_ms": round(usage_stats.avg_latency or 0, 2),
-            "avg_tokens": round(usage_stats.avg_tokens or 0, 2),
-            "total_encounters": total_count,
-            "acceptance_rate": round(acceptance_rate, 2),
-            "avg_edit_distance": round(usage_stats.avg_edit_distance or 0, 2),
-            "avg_confidence_score": round(quality_stats.avg_confidence or 0, 2),
-            "avg_compliance_score": round(quality_stats.avg_compliance or 0, 2),
+            "avg_latency_ms": summary["avg_latency_ms"],
+            "p50_latency_ms": latency_pct["p50"],
+            "p95_latency_ms": latency_pct["p95"],
+            "p99_latency_ms": latency_pct["p99"],
+            "avg_tokens": summary["avg_tokens"],
+            "total_encounters": summary["total_encounters"],
+            "acceptance_rate": summary["acceptance_rate"],
+            "avg_edit_distance": summary["avg_edit_distance"],
+            "avg_confidence_score": summary["avg_confidence_score"],
+            "p50_confidence_score": confidence_pct["p50"],
+            "p95_confidence_score": confidence_pct["p95"],
+            "p99_confidence_score": confidence_pct["p99"],
+            "avg_compliance_score": summary["avg_compliance_score"],
         }
     }
 @router.get("/bias-report")
 async def get_bias_report(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     admin: User = Depends(require_role(["SUPER_ADMIN"]))
 ):
     """
@@ -67,3 +66,11 @@ async def get_bias_report(
     from ...services.clinical_expansion.bias_monitor import BiasMonitor
     monitor = BiasMonitor(db)
     return monitor.generate_bias_report()
+
+
+@router.get("/write-behind")
+async def get_write_behind_stats(
+    admin: User = Depends(require_role(["SUPER_ADMIN"]))
+):
+    """Backlog, flush latency and spool size of the audit / telemetry write-behind queue."""
+    return audit_writer.stats()
@@ -5,15 +5,14 @@ import json
 
 from ...schemas import ai as ai_schemas
 from ...services.ai.ai_service import AIService
+from ...services.ai.scribe_store import scribe_store
 from ... import models
 from ...api import deps
+from ...core import json_codec, metrics
+from ...core.ratelimit import limiter, budget
 
 router = APIRouter()
 
-# In-memory scribe buffer (patient_id:session_uuid -> {"text": "", "last_update": float})
-SCRIBE_BUFFER = {}
-# Simple rate limiting (user_id -> list of timestamps)
-SCRIBE_LIMITS = {}
 
 @router.post("/differential", response_model=ai_schemas.DifferentialDiagnosisOutput)
 async def generate_differential(
@@ -82,6 +81,8 @@ async def medico_legal_review(
     return await service.medical_legal_review(note_content)
 
 @router.post("/transcribe")
+@limiter.limit("10/minute")
+@budget("ai")
 async def transcribe_audio(
     request: Request,
     file: UploadFile = File(...),
@@ -96,17 +97,9 @@ async def transcribe_audio(
     import os
     import tempfile
     import groq
-    import time
     from ...core.config import settings
 
-    # 1. Rate Limiting (Simple)
-    now = time.time()
-    user_ts = SCRIBE_LIMITS.get(current_user.id, [])
-    user_ts = [ts for ts in user_ts if now - ts < 60]
-    if len(user_ts) >= 10:
-        raise HTTPException(status_code=429, detail="Scribe rate limit exceeded (10/min)")
-    user_ts.append(now)
-    SCRIBE_LIMITS[current_user.id] = user_ts
+    # 1. Rate limiting: per user and shared across workers (decorators above)
 
     if not settings.GROQ_API_KEY:
         raise HTTPException(status_code=500, detail="Groq API key not configured")
@@ -121,30 +114,22 @@ async def transcribe_audio(
         
     try:
         with open(temp_audio_path, "rb") as audio_file:
-            transcription = await client.audio.transcriptions.create(
-                file=(temp_audio_path, audio_file.read()),
-                model="whisper-large-v3",
-                response_format="verbose_json",
-            )
+            with metrics.llm_call("SCRIBE_TRANSCRIBE"):
+                transcription = await client.audio.transcriptions.create(
+                    file=(temp_audio_path, audio_file.read()),
+                    model="whisper-large-v3",
+                    response_format="verbose_json",
+                )
             
         transcript = transcription.text
         
-        # 2. Buffering
+        # 2. Buffering (shared store; sessions expire 30 min after the last chunk)
         if session_id and patient_id:
-            buffer_key = f"{patient_id}:{session_id}"
-            session_data = SCRIBE_BUFFER.get(buffer_key, {"text": "", "last_update": now})
-            session_data["text"] += " " + transcript
-            session_data["last_update"] = now
-            SCRIBE_BUFFER[buffer_key] = session_data
-            
-            # Cleanup old sessions (> 30 mins)
-            for k in list(SCRIBE_BUFFER.keys()):
-                if now - SCRIBE_BUFFER[k]["last_update"] > 1800:
-                    del SCRIBE_BUFFER[k]
-                    
+            buffer_key = f"{current_user.id}:{patient_id}:{session_id}"
+            accumulated = await scribe_store.append(buffer_key, transcript)
             return {
                 "transcript": transcript, 
-                "accumulated_text": session_data["text"].strip(),
+                "accumulated_text": accumulated,
                 "status": "success"
             }
             
@@ -188,11 +173,9 @@ async def get_portal_summary(token: str, db: Session = Depends(deps.get_db)):
     
     # If no specific patient summary found, fall back to SOAP plan
     if patient_summary == "Please contact your provider for details.":
-        try:
-            soap = json.loads(encounter.soap_note)
+        soap = json_codec.safe_loads(encounter.soap_note, {})
+        if isinstance(soap, dict):
             patient_summary = soap.get("plan", patient_summary)
-        except:
-            pass
 
     return {
         "patient_first_name": patient.name.split()[0] if patient.name else "Patient",
@@ -233,7 +216,7 @@ async def challenge_differential(
     prompt = f"""
 As an expert medical diagnostician, provide an evidence-based challenge for the following diagnosis:
 Diagnosis: {challenge.diagnosis_name} (ICD-10: {challenge.icd_code})
-Patient context: {encounter.soap_note}
+Patient context: {json_codec.dumps_str(encounter.soap_note)}
 
 You must return a strict JSON object with the following schema:
 {{
@@ -245,14 +228,16 @@ You must return a strict JSON object with the following schema:
 """
 
     try:
-        completion = await client.chat.completions.create(
-            model="llama-3-70b-8192",
-            messages=[
-                {"role": "system", "content": "You are an expert internal medicine diagnostician. Output only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
+        with metrics.llm_call("DIFFERENTIAL_CHALLENGE") as call:
+            completion = await client.chat.completions.create(
+                model="llama-3-70b-8192",
+                messages=[
+                    {"role": "system", "content": "You are an expert internal medicine diagnostician. Output only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+            call.record(completion)
         return json.loads(completion.choices[0].message.content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Challenge failed: {str(e)}")
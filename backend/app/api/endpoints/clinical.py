@@ -21,6 +21,7 @@ from ...schemas.clinical import (
     BillingItemResponse, BillingItemCreate, BillingItemUpdate
 )
 from ...services.clinical_service import ClinicalService
+from ...core.pagination import PageParams, list_response
 
 router = APIRouter()
 
@@ -28,10 +29,12 @@ router = APIRouter()
 @router.get("/{patient_id}/admissions", response_model=List[AdmissionResponse])
 def get_admissions(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_admissions(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_admissions(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, AdmissionResponse, fields)
 
 @router.post("/{patient_id}/admissions", response_model=AdmissionResponse)
 def create_admission(
@@ -62,10 +65,12 @@ def delete_admission(
 @router.get("/{patient_id}/history", response_model=List[MedicalHistoryResponse])
 def get_medical_history(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_history(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_history(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, MedicalHistoryResponse, fields)
 
 # --- History ---
 @router.post("/{patient_id}/history", response_model=MedicalHistoryResponse)
@@ -125,10 +130,12 @@ def delete_allergy(
 @router.get("/{patient_id}/medications", response_model=List[MedicationResponse])
 def get_medications(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_medications(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_medications(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, MedicationResponse, fields)
 
 @router.post("/{patient_id}/medications/check-safety")
 async def check_medication_safety(
@@ -183,10 +190,12 @@ def delete_medication(
 @router.get("/{patient_id}/procedures", response_model=List[ProcedureResponse])
 def get_procedures(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_procedures(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_procedures(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, ProcedureResponse, fields)
 
 @router.post("/{patient_id}/procedures", response_model=ProcedureResponse)
 def create_procedure(
@@ -218,10 +227,12 @@ def delete_procedure(
 @router.get("/{patient_id}/documents", response_model=List[DocumentResponse])
 def get_documents(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_documents(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_documents(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, DocumentResponse, fields)
 
 @router.post("/{patient_id}/documents/upload", response_model=DocumentResponse)
 async def upload_document(
@@ -328,10 +339,12 @@ def delete_document(
 @router.get("/{patient_id}/tasks", response_model=List[TaskResponse])
 def get_tasks(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_tasks(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_tasks(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, TaskResponse, fields)
 
 @router.post("/{patient_id}/tasks", response_model=TaskResponse)
 def create_task(
@@ -363,10 +376,12 @@ def delete_task(
 @router.get("/{patient_id}/billing", response_model=List[BillingItemResponse])
 def get_billing_items(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClinicalService.get_billing_items(db, patient_id, user_id=current_user.id)
+    rows, next_cursor, fields = ClinicalService.get_billing_items(db, patient_id, current_user.id, params)
+    return list_response(rows, next_cursor, BillingItemResponse, fields)
 
 @router.post("/{patient_id}/billing", response_model=BillingItemResponse)
 def create_billing_item(
@@ -4,6 +4,9 @@ from typing import List, Dict, Any
 from app.api.deps import get_db, get_current_user
 from app.models import User, Patient, SecureMessage, PatientCommunication
 from app.services.ai.ai_service import AIService
+from app.services.clinical_service import ClinicalService
+from app.schemas.hospital import SecureMessageResponse
+from app.core.pagination import PageParams, list_response
 from pydantic import BaseModel
 import datetime
 
@@ -87,7 +90,7 @@ async def send_message(
         content=msg_in.content,
         urgency_score=urgency_data.get("urgency_score", 0),
         category=urgency_data.get("category", "Routine"),
-        flagged_keywords=str(urgency_data.get("flagged_keywords", [])),
+        flagged_keywords=urgency_data.get("flagged_keywords", []),
         status="Unread"
     )
     
@@ -111,10 +114,14 @@ async def draft_response_task(db: Session, message_id: int, content: str):
         msg.draft_response = draft.get("draft_response", "")
         db.commit()
 
-@router.get("/patients/{patient_id}/messages")
+@router.get("/patients/{patient_id}/messages", response_model=List[SecureMessageResponse])
 async def get_messages(
     patient_id: int,
+    params: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return db.query(SecureMessage).filter(SecureMessage.patient_id == patient_id).order_by(SecureMessage.created_at.desc()).all()
+    rows, next_cursor, fields = ClinicalService.list_page(
+        db, SecureMessage, SecureMessageResponse, params, SecureMessage.patient_id == patient_id
+    )
+    return list_response(rows, next_cursor, SecureMessageResponse, fields)
@@ -1,49 +1,45 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 import json
 from ...services.ai.ai_service import AIService
+from ...services.ai.copilot import CopilotSession
 from ...core.logging import logger
 
 router = APIRouter()
+_ai_service = AIService()
 
 @router.websocket("/ws/copilot")
 async def copilot_endpoint(websocket: WebSocket):
     """
     Real-time AI Clinical Copilot WebSocket.
-    Streams suggestions as the doctor types.
+    Streams suggestions as the doctor types. Input is debounced and newer text
+    cancels the in-flight suggestion, so only the latest text is answered.
     """
     await websocket.accept()
-    service = AIService()
-    
+    session = CopilotSession(websocket.send_json, _ai_service)
+
     try:
         while True:
             data = await websocket.receive_text()
-            
-            partial_text = data
+
+            partial_text, field = data, None
             try:
                 # If frontend sends JSON with more context
                 json_data = json.loads(data)
                 if "text" in json_data:
                     partial_text = json_data["text"]
+                    field = json_data.get("field")
             except:
                 pass
-            
-            # meaningful length check
-            if len(partial_text) < 10:
-                continue
 
-            # Get AI suggestions
-            suggestions = await service.get_copilot_suggestion(partial_text)
-            
-            # Add mandatory safety disclaimer
-            suggestions["disclaimer"] = "AI-generated suggestion. Clinical validation required."
-            
-            await websocket.send_json(suggestions)
-            
+            session.submit(partial_text, field)
+
     except WebSocketDisconnect:
         logger.info("Copilot WebSocket disconnected")
     except Exception as e:
         logger.error(f"Copilot WebSocket error: {e}")
         try:
-            await websocket.close() 
+            await websocket.close()
         except:
             pass
+    finally:
+        await session.close()
@@ -9,14 +9,13 @@ WS   /api/v1/ai/encounter/ws/{encounter_id}  — stream progress updates
 """
 
 import asyncio
-import json
 import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks, Response
+from sqlalchemy.orm import Session, undefer
 
-from ...db.session import get_db
+from ...db.session import get_db, SessionLocal
 from ...api.deps import get_current_user
 from ...models import User, AIEncounter
 from ...schemas.encounter import (
@@ -25,10 +24,12 @@ from ...schemas.encounter import (
     EncounterConfirmResponse,
     EncounterSummary,
 )
-from ...services.clinical_intelligence import ClinicalIntelligenceOrchestrator
+from ...services.clinical_intelligence import ClinicalIntelligenceOrchestrator, encounter_snapshot, ENCOUNTER_SNAPSHOT_VERSION
 from ...services.ai.ai_service import AIService
 from ...core.logging import logger
-from ...core.ratelimit import limiter
+from ...core.ratelimit import limiter, budget
+from ...core import etag as etags
+from ...core.events import events, encounter_channel
 from fastapi import Request
 
 
@@ -41,35 +42,22 @@ def get_orchestrator(db: Session = Depends(get_db)) -> ClinicalIntelligenceOrche
 
 
 # ---------------------------------------------------------------------------
-# WebSocket connection manager (lightweight — single-encounter streaming)
+# WebSocket progress events (fanned out across workers by core/events.py)
 # ---------------------------------------------------------------------------
 
 class EncounterProgressManager:
-    """Tracks active WebSocket connections for encounter progress streaming."""
-
-    def __init__(self):
-        # encounter_id -> WebSocket
-        self._connections: dict[int, list[WebSocket]] = {}
+    """Encounter progress sockets, subscribed to the event backplane."""
 
     async def connect(self, encounter_id: int, ws: WebSocket):
         await ws.accept()
-        self._connections.setdefault(encounter_id, []).append(ws)
+        events.subscribe(encounter_channel(encounter_id), ws.send_json)
 
     def disconnect(self, encounter_id: int, ws: WebSocket):
-        conns = self._connections.get(encounter_id, [])
-        if ws in conns:
-            conns.remove(ws)
+        events.unsubscribe(encounter_channel(encounter_id), ws.send_json)
 
     async def broadcast(self, encounter_id: int, event: dict):
-        conns = self._connections.get(encounter_id, [])
-        dead = []
-        for ws in conns:
-            try:
-                await ws.send_json(event)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(encounter_id, ws)
+        # Reaches listeners on every worker, not just this one
+        await events.publish(encounter_channel(encounter_id), event)
 
 
 progress_manager = EncounterProgressManager()
@@ -86,6 +74,7 @@ progress_manager = EncounterProgressManager()
     status_code=201,
 )
 @limiter.limit("10/minute")
+@budget("encounter")
 async def generate_full_encounter(
     request: Request,
     encounter_req: EncounterRequest,
@@ -185,12 +174,22 @@ async def list_encounters(
 )
 async def get_encounter(
     encounter_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     orchestrator: ClinicalIntelligenceOrchestrator = Depends(get_orchestrator),
 ):
+    # Snapshot version is part of the scope so a format bump invalidates cached copies
+    etag = etags.compute(
+        db, f"encounter:{current_user.id}:{encounter_id}:{ENCOUNTER_SNAPSHOT_VERSION}",
+        etags.source(AIEncounter, AIEncounter.id == encounter_id, AIEncounter.created_by_id == current_user.id),
+    )
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+
     encounter = (
         db.query(AIEncounter)
+        .options(undefer(AIEncounter.response_snapshot))
         .filter(
             AIEncounter.id == encounter_id,
             AIEncounter.created_by_id == current_user.id,
@@ -200,85 +199,10 @@ async def get_encounter(
     if not encounter:
         raise HTTPException(status_code=404, detail="Encounter not found")
 
-    # Re-build from DB (merged is reconstructed from DB fields)
-    soap = {}
-    try:
-        soap = json.loads(encounter.soap_note or "{}")
-    except Exception:
-        pass
-
-    from ...services.clinical_intelligence import _safe_json_loads
-
-    return EncounterResponse(
-        encounter_id=encounter.id,
-        patient_id=encounter.patient_id,
-        status=encounter.status,
-        is_confirmed=encounter.is_confirmed,
-        encounter_date=encounter.encounter_date,
-        chief_complaint=encounter.chief_complaint or "",
-        soap=soap,
-        medications=[
-            {
-                "id": m.id, "name": m.name, "dosage": m.dosage,
-                "frequency": m.frequency, "route": m.route,
-                "duration": m.duration, "start_date_text": m.start_date_text,
-                "requires_confirmation": m.requires_confirmation,
-                "fields_required": _safe_json_loads(m.fields_required, []),
-                "confidence": m.confidence or "medium",
-            }
-            for m in encounter.medications
-        ],
-        diagnoses=[
-            {
-                "id": d.id, "condition_name": d.condition_name,
-                "icd10_code": d.icd10_code, "confidence_score": d.confidence_score or 0.5,
-                "reasoning": d.reasoning, "is_primary": d.is_primary,
-            }
-            for d in encounter.diagnoses
-        ],
-        procedures=[
-            {
-                "id": p.id, "name": p.name, "code": p.code,
-                "notes": p.notes, "confidence": p.confidence or "medium",
-            }
-            for p in encounter.procedures
-        ],
-        billing=[
-            {
-                "id": b.id, "cpt_code": b.cpt_code, "description": b.description,
-                "estimated_cost": b.estimated_cost, "complexity": b.complexity or "medium",
-                "confidence": b.confidence or 0.5,
-                "requires_review": b.requires_review, "review_reason": b.review_reason,
-            }
-            for b in encounter.billing_items
-        ],
-        timeline_events=[
-            {
-                "id": t.id, "event_type": t.event_type,
-                "event_description": t.event_description,
-                "event_date_text": t.event_date_text, "severity": t.severity or "info",
-            }
-            for t in encounter.timeline_events
-        ],
-        followups=[
-            {
-                "id": f.id, "recommendation": f.recommendation,
-                "follow_up_type": f.follow_up_type, "urgency": f.urgency,
-                "suggested_days": f.suggested_days,
-            }
-            for f in encounter.followups
-        ],
-        risk_score=encounter.risk_score or "Low",
-        risk_flags=_safe_json_loads(encounter.risk_flags, []),
-        legal_flags=_safe_json_loads(encounter.legal_flags, []),
-        admission_required=encounter.admission_required,
-        icu_required=encounter.icu_required,
-        follow_up_days=encounter.follow_up_days,
-        case_status=encounter.case_status,
-        billing_complexity=encounter.billing_complexity or "medium",
-        pipeline_statuses=_safe_json_loads(encounter.pipeline_statuses, []),
-        created_at=encounter.created_at,
-    )
+    # Served from the stored snapshot: no relationship loads or re-validation
+    response = Response(content=encounter_snapshot(db, encounter), media_type="application/json")
+    etags.attach(response, etag)
+    return response
 
 
 # ---------------------------------------------------------------------------
@@ -332,7 +256,6 @@ async def confirm_encounter(
 async def encounter_ws(
     encounter_id: int,
     websocket: WebSocket,
-    db: Session = Depends(get_db),
 ):
     """
     WebSocket endpoint for real-time encounter progress streaming.
@@ -342,8 +265,13 @@ async def encounter_ws(
     await progress_manager.connect(encounter_id, websocket)
     logger.info(f"WebSocket connected for encounter {encounter_id}")
     try:
-        # Send initial status
-        encounter = db.query(AIEncounter).filter(AIEncounter.id == encounter_id).first()
+        # Send initial status; the connection goes back to the pool before the socket idles
+        with SessionLocal() as db:
+            encounter = (
+                db.query(AIEncounter.status, AIEncounter.is_confirmed)
+                .filter(AIEncounter.id == encounter_id)
+                .first()
+            )
         if encounter:
             await websocket.send_json({
                 "event": "status",
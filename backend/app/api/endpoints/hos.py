@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import uuid
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db, get_current_user, verify_token_and_get_user
+from app.core.events import events, ALERTS_CHANNEL
+from app.core.logging import logger
 from app.models import User
 from app.services.ai.ai_service import AIService
 from app.services.hos.hos_service import HOSService
+from app.services.hos.deterioration_scan import ScanProgress, get_scan_progress
+from app.db.session import SessionLocal
 
 router = APIRouter()
 ai_service = AIService()
@@ -13,11 +21,15 @@ ai_service = AIService()
 def get_hos_service(db: Session = Depends(get_db)):
     return HOSService(db, ai_service)
 
+def get_hos_read_service(db: Session = Depends(get_read_db)):
+    """HOSService on a replica-routed session, for read-only dashboards."""
+    return HOSService(db, ai_service)
+
 # 1. COMMAND CENTER
 @router.get("/command-center/overview", response_model=Dict[str, Any])
 async def get_command_center(
     current_user: User = Depends(get_current_user),
-    hos: HOSService = Depends(get_hos_service)
+    hos: HOSService = Depends(get_hos_read_service)
 ):
     """
     Returns real-time HOS metrics: Critical count, ICU %, Staff Burnout.
@@ -25,17 +37,71 @@ async def get_command_center(
     return await hos.get_command_center_overview()
 
 # 2. DETERIORATION (Manual Trigger for Demo)
+async def _run_scan_in_background(progress: ScanProgress):
+    # The request-scoped session is gone once the response is sent
+    db = SessionLocal()
+    try:
+        await HOSService(db, ai_service).run_deterioration_scan(progress)
+    finally:
+        db.close()
+
 @router.post("/deterioration/scan")
 async def trigger_deterioration_scan(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    hos: HOSService = Depends(get_hos_service)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Manually triggers the deterioration scan background task.
+    Poll /deterioration/scan/status for throughput and completion percentage.
+    """
+    progress = ScanProgress(scan_id=uuid.uuid4().hex[:12])
+    background_tasks.add_task(_run_scan_in_background, progress)
+    return {"message": "Deterioration scan initiated.", "scan_id": progress.scan_id}
+
+@router.get("/deterioration/scan/status", response_model=Dict[str, Any])
+async def deterioration_scan_status(
+    scan_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Progress of a scan started by this worker (latest scan if no id is given).
+    """
+    progress = get_scan_progress(scan_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="No scan found")
+    return progress
+
+def _authenticate_ws(token: str) -> None:
+    # Short-lived session; nothing is held while the socket idles
+    with SessionLocal() as db:
+        verify_token_and_get_user(db, token)
+
+@router.websocket("/ws/alerts")
+async def deterioration_alerts_ws(websocket: WebSocket, token: str):
     """
-    background_tasks.add_task(hos.run_deterioration_scan)
-    return {"message": "Deterioration scan initiated."}
+    Pushes 'deterioration_alert' events (patients newly rated High / Critical)
+    from scans run on any worker. Browsers cannot set headers on WebSockets,
+    so the ID token comes as ?token=.
+    """
+    # Token verification and the user lookup are sync DB work: keep them off the loop
+    try:
+        await run_in_threadpool(_authenticate_ws, token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    events.subscribe(ALERTS_CHANNEL, websocket.send_json)
+    try:
+        while True:
+            await asyncio.sleep(30)
+            await websocket.send_json({"event": "ping"})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Alerts WebSocket error: {e}")
+    finally:
+        events.unsubscribe(ALERTS_CHANNEL, websocket.send_json)
 
 # 3. BED FLOW
 @router.get("/flow/optimize")
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, distinct
 from typing import List, Dict, Any
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db, get_current_user
 from app.models import User, Patient, ShiftHandover, ReadmissionRisk, Medication, ClinicalNote, SecureMessage, Task
 from app.services.ai.ai_service import AIService
+from app.services.hos.hos_service import command_center_cache
 from pydantic import BaseModel
 import datetime
 
@@ -27,38 +28,55 @@ class ReadmissionRiskResponse(BaseModel):
 
 @router.get("/command-center")
 async def get_command_center_dashboard(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Hospital Command Center Dashboard - Aggregated High-Level View
     """
-    # 1. Critical Patients (High acuteness based on recent notes or risk score)
-    # Mocking high risk patients query for now, ideally use ReadmissionRisk or similar
-    high_risk_patients = db.query(Patient).join(ReadmissionRisk).filter(ReadmissionRisk.risk_level == 'High').all()
-    
+    counts = command_center_cache.get_or_load("hospital_dashboard", lambda: _dashboard_counts(db))
+
     # 2. Discharge Readiness
     # Assuming DischargeReadiness model exists (viewed previously in workflow_service, but not imported here yet)
     # For now, return a placeholder count
     discharge_ready_count = 5 # Placeholder
     
-    # 3. Pending Labs (Tasks with category 'Lab')
-    pending_labs = db.query(Task).filter(Task.status == 'Pending', Task.category == 'Lab').count()
-    
-    # 4. AI Early Warning Alerts (from SecureMessages flagged as 'Emergency')
-    emergency_alerts = db.query(SecureMessage).filter(SecureMessage.category == 'Emergency', SecureMessage.status == 'Unread').count()
-    
     return {
-        "critical_patients_count": len(high_risk_patients),
+        "critical_patients_count": counts["critical_patients"] or 0,
         "discharge_ready_count": discharge_ready_count,
-        "pending_labs_count": pending_labs,
-        "emergency_alerts_count": emergency_alerts,
+        "pending_labs_count": counts["pending_labs"] or 0,
+        "emergency_alerts_count": counts["emergency_alerts"] or 0,
         "metrics": {
             "occupancy_rate": "85%", # Mock
             "average_length_of_stay": "4.2 days" # Mock
         }
     }
 
+def _dashboard_counts(db: Session) -> Dict[str, int]:
+    # Each counter is its own WHERE-filtered subquery so it reads only the
+    # matching rows through an index, instead of scanning the whole table.
+    # 1. Critical Patients — distinct patients with a High readmission risk
+    critical = (
+        select(func.count(distinct(ReadmissionRisk.patient_id)))
+        .where(ReadmissionRisk.risk_level == 'High').scalar_subquery()
+    )
+    # 3. Pending Labs (Tasks with category 'Lab')
+    pending_labs = (
+        select(func.count()).select_from(Task)
+        .where(Task.status == 'Pending', Task.category == 'Lab').scalar_subquery()
+    )
+    # 4. AI Early Warning Alerts (from SecureMessages flagged as 'Emergency')
+    emergency = (
+        select(func.count()).select_from(SecureMessage)
+        .where(SecureMessage.category == 'Emergency', SecureMessage.status == 'Unread').scalar_subquery()
+    )
+    row = db.execute(select(
+        critical.label("critical_patients"),
+        pending_labs.label("pending_labs"),
+        emergency.label("emergency_alerts"),
+    )).one()
+    return dict(row._mapping)
+
 # --- SHIFT HANDOVER ---
 
 @router.post("/patients/{patient_id}/handover", response_model=HandoverResponse)
@@ -88,7 +106,7 @@ async def generate_handover(
         patient_id=patient_id,
         generated_by_id=current_user.id,
         shift_type=shift_type,
-        content=str(handover_data)
+        content=handover_data
     )
     db.add(handover)
     db.commit()
@@ -129,8 +147,8 @@ async def calculate_readmission_risk(
         patient_id=patient_id,
         risk_score=risk_data.get("risk_score", 0),
         risk_level=risk_data.get("risk_level", "Unknown"),
-        contributing_factors=str(risk_data.get("contributing_factors", [])),
-        prevention_recommendations=str(risk_data.get("prevention_recommendations", []))
+        contributing_factors=risk_data.get("contributing_factors", []),
+        prevention_recommendations=risk_data.get("prevention_recommendations", [])
     )
     db.add(risk_entry)
     db.commit()
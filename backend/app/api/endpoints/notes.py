@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, File, UploadFile, Form, Response, Query
 from sqlalchemy.orm import Session
 from typing import List
-import json
 from ...db.session import get_db
 from ...api.deps import get_current_user
-from ...models import User
-from ...schemas.notes import NoteCreateRequest, NoteResponse, NoteUpdateRequest
+from ...models import User, NoteImportJob
+from ...schemas.notes import NoteCreateRequest, NoteResponse, NoteListItem, NoteUpdateRequest, NoteImportJobResponse
 from ...services.notes.note_service import NoteService
 from ...core.config import settings
+from ...core import etag as etags
+from ...core.pagination import NEXT_CURSOR_HEADER
 from fastapi import Request
 import markupsafe
+import os
+import shutil
+import uuid
 
-from ...core.ratelimit import limiter
+from ...core.ratelimit import limiter, budget
 
 router = APIRouter()
 
 @router.post("/structure", response_model=NoteResponse)
 @limiter.limit("5/minute")
+@budget("ai")
 async def structure_note(
     request: Request,
 
@@ -34,78 +39,136 @@ async def structure_note(
     # Trigger Async Risk Analysis
     background_tasks.add_task(NoteService.analyze_risks_task, db_note.id)
     
-    # Transform for response (JSON string to dict)
-    response_data = NoteResponse.from_orm(db_note)
-    if db_note.structured_content:
-        response_data.structured_content = json.loads(db_note.structured_content)
-    # AI insights async, so likely None immediately, but just in case
-    if db_note.ai_insights:
-        response_data.ai_insights = {
-            "risk_score": db_note.ai_insights.risk_score,
-            "red_flags": json.loads(db_note.ai_insights.red_flags or "[]"),
-            "suggestions": json.loads(db_note.ai_insights.suggestions or "[]"),
-            "missing_info": json.loads(db_note.ai_insights.missing_info or "[]")
-        }
-    return response_data
-
-@router.get("/", response_model=List[NoteResponse])
+    # structured_content / insight lists are JSONB, so the ORM object serialises as-is
+    return db_note
+
+@router.get("/", response_model=List[NoteListItem])
 @limiter.limit("20/minute")
+@budget("read")
 def get_notes(
     request: Request,
+    response: Response,
     search: str = None,
     mode: str = "keyword", 
+    cursor: str = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Compact note list, newest first, one keyset page at a time. When more notes
+    exist the cursor for the next page is returned in the X-Next-Cursor header.
+    """
     from ...core.logging import logger
     logger.info(f"Fetching notes for user {current_user.id} (search: {search}, mode: {mode})")
     if search and mode == "semantic":
-        notes = NoteService.semantic_search(db, current_user.id, search)
-    else:
-        notes = NoteService.get_user_notes(db, current_user.id, search)
-
-    # Transform list
-    result = []
-    for note in notes:
-        nr = NoteResponse.from_orm(note)
-        if note.structured_content:
-            nr.structured_content = json.loads(note.structured_content)
-        if note.ai_insights:
-            nr.ai_insights = {
-                "risk_score": note.ai_insights.risk_score,
-                "red_flags": json.loads(note.ai_insights.red_flags or "[]"),
-                "suggestions": json.loads(note.ai_insights.suggestions or "[]"),
-                "missing_info": json.loads(note.ai_insights.missing_info or "[]")
-            }
-        result.append(nr)
-    return result
+        return [NoteService.to_list_item(n) for n in NoteService.semantic_search(db, current_user.id, search)]
+
+    notes, next_cursor = NoteService.get_user_notes(db, current_user.id, search, cursor=cursor, limit=limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return notes
+
+# -----------------------------------------------------------------------
+# Bulk import — rows are inserted by a Celery worker, enrichment is deferred
+# -----------------------------------------------------------------------
+@router.post("/import", response_model=NoteImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/hour")
+@budget("ai")
+def import_notes(
+    request: Request,
+    file: UploadFile = File(...),
+    format: str = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    from ...services.notes.bulk_import import BulkNoteImporter, IMPORT_FORMATS, job_status
+    from ...tasks.note_import_tasks import import_notes_file
+
+    fmt = (format or os.path.splitext(file.filename or "")[1].lstrip(".")).lower()
+    if fmt == "jsonl":
+        fmt = "ndjson"
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+    # Spool to disk so the worker, not this request, does the inserting
+    UPLOAD_DIR = os.path.join("uploads", "imports")
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.abspath(os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.{fmt}"))
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+    job = BulkNoteImporter.create_job(db, current_user.id, fmt, source_name=(file.filename or "")[:255])
+    import_notes_file.delay(job.id, file_path)
+    return job_status(db, job)
+
+@router.get("/import/{job_id}", response_model=NoteImportJobResponse)
+@limiter.limit("60/minute")
+@budget("read")
+def get_import_job(
+    request: Request,
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    from ...services.notes.bulk_import import job_status
+
+    job = db.query(NoteImportJob).filter(
+        NoteImportJob.id == job_id, NoteImportJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job_status(db, job)
+
+@router.post("/import/{job_id}/resume", response_model=NoteImportJobResponse)
+@limiter.limit("10/minute")
+@budget("write")
+def resume_import_job(
+    request: Request,
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Re-queues enrichment for any notes of the job that are still unstructured / unembedded."""
+    from ...services.notes.bulk_import import enrichment_active, job_status
+    from ...tasks.note_import_tasks import enqueue_note_enrichment
+
+    job = db.query(NoteImportJob).filter(
+        NoteImportJob.id == job_id, NoteImportJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job.status in ("pending", "inserting"):
+        raise HTTPException(status_code=409, detail="Import is still inserting rows")
+    if enrichment_active(db, job):
+        raise HTTPException(status_code=409, detail="Enrichment is still in progress")
+    enqueue_note_enrichment.delay(job.id)
+    return job_status(db, job)
 
 @router.get("/{id}", response_model=NoteResponse)
 @limiter.limit("60/minute")
+@budget("read")
 def get_note(
     request: Request,
+    response: Response,
     id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    etag = NoteService.note_etag(db, id, current_user.id)
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    etags.attach(response, etag)
+
     note = NoteService.get_note_by_id(db, id, current_user.id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    nr = NoteResponse.from_orm(note)
-    if note.structured_content:
-        nr.structured_content = json.loads(note.structured_content)
-    if note.ai_insights:
-        nr.ai_insights = {
-            "risk_score": note.ai_insights.risk_score,
-            "red_flags": json.loads(note.ai_insights.red_flags or "[]"),
-            "suggestions": json.loads(note.ai_insights.suggestions or "[]"),
-            "missing_info": json.loads(note.ai_insights.missing_info or "[]")
-        }
-    return nr
+    return note
 
 @router.put("/{id}", response_model=NoteResponse)
 @limiter.limit("10/minute")
+@budget("write")
 def update_note(
     request: Request,
     id: int,
@@ -117,20 +180,11 @@ def update_note(
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
         
-    nr = NoteResponse.from_orm(note)
-    if note.structured_content:
-        nr.structured_content = json.loads(note.structured_content)
-    if note.ai_insights:
-        nr.ai_insights = {
-            "risk_score": note.ai_insights.risk_score,
-            "red_flags": json.loads(note.ai_insights.red_flags or "[]"),
-            "suggestions": json.loads(note.ai_insights.suggestions or "[]"),
-            "missing_info": json.loads(note.ai_insights.missing_info or "[]")
-        }
-    return nr
+    return note
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 @limiter.limit("10/minute")
+@budget("write")
 def delete_note(
     request: Request,
     id: int,
@@ -144,6 +198,7 @@ def delete_note(
 
 @router.get("/{id}/history")
 @limiter.limit("20/minute")
+@budget("read")
 def get_note_history(
     request: Request,
     id: int,
@@ -1,10 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import json
 
-from ...db.session import get_db
+from ...db.session import get_db, get_read_db, SessionLocal
 from ...api.deps import get_current_user
 from ...models import User, ClinicalNote
 from ...services.patient_service import PatientService
@@ -13,6 +12,8 @@ from ...schemas.patient import PatientCreate, PatientResponse, PatientUpdate, Pa
 from ...schemas.notes import NoteResponse
 from ...schemas.timeline import TimelineEvent
 from ...core.pdf_gen import generate_patient_pdf
+from ...core import etag as etags
+from ...services.export.chart_export import ChartExporter, EXPORT_FORMATS, gzip_stream
 
 router = APIRouter()
 
@@ -39,6 +40,44 @@ def list_patients_fast(
         result.append(p)
     return result
 
+# -----------------------------------------------------------------------
+# Bulk chart export — streamed, constant memory, resumable by patient id
+# -----------------------------------------------------------------------
+@router.get("/export")
+def export_patient_charts(
+    format: str = Query("ndjson"),
+    after_patient_id: Optional[int] = Query(None, description="Resume after this patient id"),
+    page_size: int = Query(200, ge=1, le=1000),
+    gzip: bool = Query(True),
+    current_user: User = Depends(get_current_user)
+):
+    """Streams every chart owned by the caller as NDJSON or FHIR R4 Bundles."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    user_id = current_user.id
+
+    def stream():
+        # The request-scoped session is released before the body is streamed,
+        # so the export owns its session for the lifetime of the cursor.
+        db = SessionLocal()
+        try:
+            exporter = ChartExporter(
+                db, user_id=user_id, fmt=format,
+                after_patient_id=after_patient_id, page_size=page_size,
+            )
+            yield from exporter.iter_lines()
+        finally:
+            db.close()
+
+    body = gzip_stream(stream()) if gzip else stream()
+    ext = "ndjson.gz" if gzip else "ndjson"
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=charts_{format}.{ext}"}
+    )
+
 @router.post("/", response_model=PatientResponse)
 def create_patient(
     patient_in: PatientCreate,
@@ -63,9 +102,16 @@ def read_patients(
 @router.get("/{patient_id}", response_model=PatientResponse)
 def read_patient(
     patient_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    etag = PatientService.chart_etag(db, patient_id, current_user.id)
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    etags.attach(response, etag)
+
     patient = PatientService.get_patient(db, patient_id, user_id=current_user.id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
@@ -95,9 +141,16 @@ def delete_patient(
 @router.get("/{patient_id}/timeline", response_model=List[TimelineEvent])
 def get_patient_timeline(
     patient_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
+    etag = PatientService.timeline_etag(db, patient_id, current_user.id)
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    etags.attach(response, etag)
+
     return PatientService.get_unified_timeline(db, patient_id, user_id=current_user.id)
 
 @router.get("/{patient_id}/notes", response_model=List[NoteResponse])
@@ -106,28 +159,12 @@ def get_patient_notes(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    notes = NoteService.get_patient_notes_by_patient_id(db, patient_id, current_user.id)
-    
-    # Transform to schema
-    result = []
-    for note in notes:
-        nr = NoteResponse.from_orm(note)
-        if note.structured_content:
-            nr.structured_content = json.loads(note.structured_content)
-        if note.ai_insights:
-           nr.ai_insights = {
-                "risk_score": note.ai_insights.risk_score,
-                "red_flags": json.loads(note.ai_insights.red_flags or "[]"),
-                "suggestions": json.loads(note.ai_insights.suggestions or "[]"),
-                "missing_info": json.loads(note.ai_insights.missing_info or "[]")
-            }
-        result.append(nr)
-    return result
+    return NoteService.get_patient_notes_by_patient_id(db, patient_id, current_user.id)
 
 @router.get("/{patient_id}/report", response_model=PatientReport)
 async def get_patient_report(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     return await PatientService.get_patient_report(db, patient_id, user_id=current_user.id)
@@ -135,7 +172,7 @@ async def get_patient_report(
 @router.get("/{patient_id}/report/pdf")
 async def get_patient_report_pdf(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     report_data = await PatientService.get_patient_report(db, patient_id, user_id=current_user.id)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db, get_current_user
 from app.models import User
+from app.core import etag as etags, metrics
 from app.services.ai.ai_service import AIService
 from app.services.clinical.workflow_service import WorkflowService
 
@@ -57,15 +58,22 @@ async def check_discharge(
 @router.get("/patients/{patient_id}/workflow-dashboard")
 async def get_dashboard(
     patient_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     wf: WorkflowService = Depends(get_workflow_service)
 ):
+    etag = wf.dashboard_etag(patient_id)
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    etags.attach(response, etag)
+
     return await wf.get_patient_workflow_dashboard(patient_id)
 
 @router.get("/shift-briefing")
 async def get_shift_briefing(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Automated shift-end intelligence briefing system.
@@ -120,11 +128,13 @@ async def get_shift_briefing(
         }}
         """
         
-        completion = await client.chat.completions.create(
-            model="llama-3-70b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
+        with metrics.llm_call("SHIFT_BRIEFING") as call:
+            completion = await client.chat.completions.create(
+                model="llama-3-70b-8192",
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"}
+            )
+            call.record(completion)
         ai_briefing = json.loads(completion.choices[0].message.content)
     except Exception as e:
         ai_briefing = {
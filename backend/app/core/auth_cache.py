@@ -0,0 +1,123 @@
+"""
+Verified-token cache for the auth dependency.
+
+Verifying a Firebase ID token and loading its User costs an RSA signature
+check plus a DB round-trip on every request. Once a token has been verified
+its result cannot change until the token expires, so:
+
+TokenCache          — bounded map of sha256(token) -> Principal. Entries
+                      expire at the token's `exp`, capped at AUTH_CACHE_MAX_TTL
+                      so role changes and deactivations take effect quickly.
+Principal           — immutable snapshot of the User columns endpoints read
+                      (id, email, role, ...). Not bound to any session.
+SigningKeyRefresher — daemon thread that fetches Google's token signing
+                      certificates ahead of time, so no request has to
+                      wait for that fetch.
+
+Both are per-process, like the other caches in core/cache.py.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .cache import TTLCache
+from .config import settings
+from .logging import logger
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    firebase_uid: Optional[str]
+    full_name: Optional[str]
+    role: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            firebase_uid=user.firebase_uid,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=bool(user.is_active),
+        )
+
+
+class TokenCache:
+    def __init__(self, max_ttl: float, maxsize: int):
+        self.max_ttl = max_ttl
+        self._cache = TTLCache(ttl=max_ttl, maxsize=maxsize)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        # Never keep raw bearer tokens in memory longer than the request
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Principal]:
+        return self._cache.get(self.key(token))
+
+    def put(self, token: str, principal: Principal, expires_at: Optional[float]) -> None:
+        ttl = self.max_ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl > 0:
+            self._cache.set(self.key(token), principal, ttl=ttl)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._cache), "hits": self._cache.hits, "misses": self._cache.misses}
+
+
+class SigningKeyRefresher:
+    """
+    Keeps firebase_admin's certificate cache warm. verify_id_token fetches the
+    certificates through a caching HTTP session that honours their max-age;
+    fetching through the same session every AUTH_CERT_REFRESH_SECONDS means
+    an expired entry is replaced off the request path.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        try:
+            from . import firebase
+            from firebase_admin import auth, _token_gen
+            from google.oauth2 import id_token
+
+            firebase.init_app()
+            request = auth._get_client(None)._token_verifier.request
+            id_token._fetch_certs(request, _token_gen.ID_TOKEN_CERT_URI)
+            return True
+        except Exception as e:
+            logger.warning(f"Signing key refresh failed: {e}")
+            return False
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="signing-key-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+token_cache = TokenCache(max_ttl=settings.AUTH_CACHE_MAX_TTL, maxsize=settings.AUTH_CACHE_SIZE)
+signing_keys = SigningKeyRefresher(interval=settings.AUTH_CERT_REFRESH_SECONDS)
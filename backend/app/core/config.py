@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator, RedisDsn, AnyHttpUrl
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 from enum import Enum
 import os
 
@@ -17,14 +17,26 @@ class Settings(BaseSettings):
     # PostgreSQL (Database)
     DATABASE_URL: str
     EXTERNAL_DATABASE_URL: Optional[str] = None
+
+    # Read replica (routes using get_read_db)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 2.0      # seconds between replay-lag probes
+    READ_YOUR_WRITES_SECONDS: float = 10.0       # a user's reads stay on the primary this long after a write
+    READ_YOUR_WRITES_STORE_URI: Optional[str] = None  # redis://...; falls back to REDIS_URL, then per-process memory
     
     # Firebase (Auth)
     FIREBASE_PROJECT_ID: str
     FIREBASE_CLIENT_EMAIL: str
     FIREBASE_PRIVATE_KEY: str
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_MAX_TTL: float = 300.0            # seconds; role / deactivation changes apply within this
+    AUTH_CERT_REFRESH_SECONDS: float = 600.0
     
     # Rate Limiting
     AI_RATE_LIMIT: str = "10/minute"
+    RATE_LIMIT_STORAGE_URI: Optional[str] = None     # e.g. redis://host:6379/1; falls back to REDIS_URL, then memory://
+    RATE_LIMIT_USER_BUDGET: str = "600/minute"       # shared cost units per user (core/ratelimit.py COSTS)
     GLOBAL_RATE_LIMIT: str = "100/minute"
 
     # Frontend
@@ -34,6 +46,80 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
     
+    # Bulk note import
+    NOTE_IMPORT_BATCH_SIZE: int = 1000
+    NOTE_IMPORT_MAX_UPLOAD_MB: int = 200
+    NOTE_IMPORT_STRUCTURE_RATE_LIMIT: str = "20/m"   # Celery rate limit, per worker
+    NOTE_IMPORT_EMBED_RATE_LIMIT: str = "120/m"
+    NOTE_IMPORT_RESUME_IDLE_SECONDS: int = 900     # resume refused while enrichment progressed more recently
+
+    # HOS population scans
+    DETERIORATION_SCAN_CONCURRENCY: int = 8
+    DETERIORATION_SCAN_COMMIT_CHUNK: int = 25
+    HOS_SCAN_BATCHING: bool = True             # Pack many patients into one prompt
+    HOS_BATCH_MAX_INPUT_TOKENS: int = 6000
+    HOS_BATCH_MAX_OUTPUT_TOKENS: int = 4096
+    HOS_BATCH_MAX_ITEMS: int = 40
+    COMMAND_CENTER_SNAPSHOT_TTL: float = 15.0    # seconds
+
+    # Audit / telemetry writes: "sync" (inside the request transaction, strict audit)
+    # or "async" (write-behind queue, flushed in batches after commit)
+    AUDIT_WRITE_MODE: str = "sync"
+    WRITE_BEHIND_QUEUE_SIZE: int = 10000
+    WRITE_BEHIND_BATCH_SIZE: int = 500
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 1.0     # seconds
+    WRITE_BEHIND_SPOOL_DIR: str = "spool/write_behind"
+    WRITE_BEHIND_FSYNC: bool = False             # fsync every spooled row (slower, survives power loss)
+
+    # Monthly partitions (audit_logs, ai_usage_metrics, ai_quality_reports)
+    PARTITION_PREMAKE_MONTHS: int = 3
+    PARTITION_RETENTION_MONTHS: int = 24         # older partitions are archived and dropped
+    PARTITION_ARCHIVE_DIR: str = "archive/partitions"
+
+    # Live scribe sessions (services/ai/scribe_store.py)
+    SCRIBE_STORE_URI: Optional[str] = None           # redis://...; falls back to REDIS_URL, then per-process memory
+    SCRIBE_SESSION_TTL: float = 1800.0           # seconds after the last chunk
+    SCRIBE_MAX_SESSIONS: int = 5000              # memory store only (LRU eviction)
+    SCRIBE_MAX_CHARS: int = 100_000
+
+    # Copilot WebSocket (services/ai/copilot.py)
+    COPILOT_DEBOUNCE_MS: int = 300               # quiet period before a suggestion is requested
+    COPILOT_MIN_CHARS: int = 10
+    COPILOT_CACHE_TTL: float = 600.0
+    COPILOT_CACHE_SIZE: int = 2000
+
+    # Event-loop lag monitor (core/loop_monitor.py)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 50.0
+    LOOP_SLOW_CALLBACK_MS: float = 100.0         # lag logged with stack + request id
+    LOOP_BLOCK_FAIL_MS: Optional[float] = None   # test mode: stalls this long fail the test (tests/conftest.py)
+
+    # Prometheus metrics (core/metrics.py)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None          # when set, /metrics requires "Authorization: Bearer <token>"
+    METRICS_SAMPLE_SECONDS: float = 5.0          # pool / queue-depth gauge refresh
+
+    # WebSocket event backplane (core/events.py)
+    EVENTS_BACKPLANE_URI: Optional[str] = None       # redis://...; falls back to REDIS_URL, then per-process memory
+
+    # Logging (core/logging.py) and access log sampling (core/middleware.py)
+    LOG_FILE: str = "backend_errors.log"
+    LOG_FILE_MAX_BYTES: int = 50 * 1024 * 1024
+    LOG_FILE_BACKUPS: int = 5
+    LOG_QUEUE_SIZE: int = 10000
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0          # share of ordinary requests logged
+    ACCESS_LOG_ROUTE_SAMPLE_RATES: Dict[str, float] = {
+        "/health": 0.01,
+        "/api/health": 0.01,
+        "/api/health/db": 0.01,
+        "/metrics": 0.01,
+    }
+    ACCESS_LOG_SLOW_MS: float = 1000.0           # slower requests (and 5xx) are always logged
+
+    # API worker boot budget (import_profile.py, tests/test_startup_budget.py)
+    STARTUP_IMPORT_BUDGET_SECONDS: float = 4.0
+    STARTUP_RSS_BUDGET_MB: int = 200
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
 
@@ -53,6 +139,13 @@ class Settings(BaseSettings):
             return v.replace("postgres://", "postgresql://", 1)
         return v
 
+    @field_validator("DATABASE_REPLICA_URL", mode="before")
+    @classmethod
+    def validate_replica_url(cls, v: Optional[str]) -> Optional[str]:
+        if v and v.startswith("postgres://"):
+            return v.replace("postgres://", "postgresql://", 1)
+        return v or None
+
     @field_validator("FRONTEND_URL", mode="before")
     @classmethod
     def validate_frontend_url(cls, v: Optional[str]) -> str:
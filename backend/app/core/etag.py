@@ -0,0 +1,90 @@
+"""
+Weak ETags and conditional GET for chart read endpoints.
+
+An ETag is a hash of a cheap fingerprint of the rows a response is built
+from: for each table, the count, latest change timestamp and highest id of the
+matching rows. All tables are fingerprinted in a single aggregate query, so
+a request carrying a current If-None-Match gets a 304 without loading or
+serialising the chart.
+
+    etag = etags.compute(db, f"note:{user.id}:{note_id}",
+                         etags.source(ClinicalNote, ClinicalNote.id == note_id, ...),
+                         etags.source(ClinicalAIInsight, ClinicalAIInsight.note_id == note_id))
+    if etags.matches(request, etag):
+        return etags.not_modified(etag)
+    etags.attach(response, etag)
+
+Counts catch deletes, timestamps catch edits and ids catch inserts. Tables
+without updated_at fall back to created_at (append-only rows). Bump
+ETAG_VERSION whenever a response shape changes so cached bodies are refetched.
+"""
+
+import hashlib
+from functools import reduce
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+ETAG_VERSION = 1
+
+# Chart data is PHI: browsers may keep it, shared caches may not, and every
+# reuse must be revalidated with the server.
+CACHE_CONTROL = "private, no-cache"
+
+
+def source(model, *criteria, changed=None):
+    """One-row aggregate (count, latest change, max id) over the matching rows."""
+    if changed is None:
+        changed = getattr(model, "updated_at", None)
+        if changed is None:
+            changed = model.created_at
+    return (
+        select(
+            func.count().label("n"),
+            func.max(changed).label("changed"),
+            func.max(model.id).label("last_id"),
+        )
+        .select_from(model)
+        .where(*criteria)
+        .subquery()
+    )
+
+
+def compute(db: Session, scope: str, primary, *related) -> Optional[str]:
+    """
+    Returns the weak ETag for `scope`, or None when the primary source matches
+    no rows (not found / not owned), so such requests always take the normal path.
+    """
+    sources = (primary,) + related
+    joined = reduce(lambda left, right: left.join(right, true()), sources)
+    columns = [column for s in sources for column in s.c]
+    row = db.execute(select(*columns).select_from(joined)).one()
+    if not row[0]:
+        return None
+    digest = hashlib.blake2b(f"{ETAG_VERSION}|{scope}|{tuple(row)!r}".encode("utf-8"), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def matches(request: Request, etag: Optional[str]) -> bool:
+    """Weak comparison against If-None-Match (RFC 9110 §13.1.2)."""
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def attach(response: Response, etag: Optional[str]) -> None:
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -0,0 +1,175 @@
+"""
+Cross-worker event backplane for WebSocket pushes.
+
+A WebSocket lives on whichever worker accepted it, but the event it waits for
+(an encounter finishing, a deterioration alert) is raised on any worker, or in
+a Celery task. Events are therefore published to a backplane and delivered to
+local sockets by the hub of every worker:
+
+    await events.publish(encounter_channel(encounter_id), {"event": "encounter_ready", ...})
+
+    events.subscribe(ALERTS_CHANNEL, websocket.send_json)
+    ...
+    events.unsubscribe(ALERTS_CHANNEL, websocket.send_json)
+
+MemoryBackplane — in-process stand-in: publish hands the event straight to the
+                  local hub. Correct for a single worker and for tests.
+RedisBackplane  — one pattern subscription (EVENTS_PREFIX*) per worker; each
+                  event crosses the network once per worker and is fanned out
+                  to that worker's sockets locally. Reconnects on failure;
+                  events published while disconnected are lost (pushes are
+                  hints, clients re-read state on connect).
+
+The backend is EVENTS_BACKPLANE_URI, falling back to REDIS_URL, then memory.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import json_codec
+from .config import settings
+from .logging import logger
+
+Subscriber = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+ALERTS_CHANNEL = "alerts"
+
+
+def encounter_channel(encounter_id: int) -> str:
+    return f"encounter:{encounter_id}"
+
+
+class EventHub:
+    """Local (per-worker) subscribers by channel."""
+
+    def __init__(self, send_timeout: float = 5.0):
+        self.send_timeout = send_timeout
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+
+    def subscribe(self, channel: str, send: Subscriber) -> None:
+        self._subscribers.setdefault(channel, []).append(send)
+
+    def unsubscribe(self, channel: str, send: Subscriber) -> None:
+        subscribers = self._subscribers.get(channel, [])
+        if send in subscribers:
+            subscribers.remove(send)
+        if not subscribers:
+            self._subscribers.pop(channel, None)
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self._subscribers.get(channel, []))
+
+    async def deliver(self, channel: str, event: Dict[str, Any]) -> int:
+        """Sends `event` to every local subscriber of `channel`; drops the ones that fail."""
+        subscribers = list(self._subscribers.get(channel, []))
+        if not subscribers:
+            return 0
+        results = await asyncio.gather(
+            *(asyncio.wait_for(send(event), self.send_timeout) for send in subscribers),
+            return_exceptions=True,
+        )
+        for send, result in zip(subscribers, results):
+            if isinstance(result, BaseException):
+                self.unsubscribe(channel, send)
+        return sum(1 for r in results if not isinstance(r, BaseException))
+
+
+class MemoryBackplane:
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        await self.hub.deliver(channel, event)
+
+
+class RedisBackplane:
+    def __init__(self, hub: EventHub, url: str, prefix: str = "events:", reconnect_delay: float = 1.0):
+        import redis.asyncio as redis
+
+        self.hub = hub
+        self.prefix = prefix
+        self.reconnect_delay = reconnect_delay
+        self._redis = redis.Redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            # Events published right after startup must not be missed by this worker
+            try:
+                await asyncio.wait_for(self._subscribed.wait(), 5.0)
+            except asyncio.TimeoutError:
+                logger.warning("Event backplane not subscribed yet; retrying in the background")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._redis.aclose()
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        await self._redis.publish(self.prefix + channel, json_codec.dumps(event))
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(self.prefix + "*")
+                self._subscribed.set()
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"].decode("utf-8")[len(self.prefix):]
+                    await self.hub.deliver(channel, json_codec.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event backplane connection lost ({e}); reconnecting")
+                self._subscribed.clear()
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                await pubsub.aclose()
+
+
+class EventBus:
+    """The hub plus its backplane; the `events` singleton is what endpoints use."""
+
+    def __init__(self, url: Optional[str] = None):
+        self.hub = EventHub()
+        if url and url.startswith(("redis://", "rediss://")):
+            self.backplane = RedisBackplane(self.hub, url)
+        else:
+            self.backplane = MemoryBackplane(self.hub)
+
+    def subscribe(self, channel: str, send: Subscriber) -> None:
+        self.hub.subscribe(channel, send)
+
+    def unsubscribe(self, channel: str, send: Subscriber) -> None:
+        self.hub.unsubscribe(channel, send)
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        try:
+            await self.backplane.publish(channel, event)
+        except Exception as e:
+            logger.error(f"Failed to publish event on {channel}: {e}")
+
+    async def start(self) -> None:
+        await self.backplane.start()
+
+    async def stop(self) -> None:
+        await self.backplane.stop()
+
+
+events = EventBus(settings.EVENTS_BACKPLANE_URI or os.getenv("REDIS_URL"))
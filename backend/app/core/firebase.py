@@ -0,0 +1,40 @@
+"""
+Firebase Admin, initialised on first use instead of at import time.
+
+firebase_admin pulls in google-auth and requests, and initialising the app
+parses the service account key. Neither is needed until the first token
+is verified. The signing-key refresher (core/auth_cache.py) also calls
+init_app, from its background thread at startup.
+"""
+
+import threading
+
+from .config import settings
+
+_lock = threading.Lock()
+
+
+def init_app():
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if firebase_admin._apps:
+        return firebase_admin.get_app()
+    with _lock:
+        if not firebase_admin._apps:
+            cert_dict = {
+                "type": "service_account",
+                "project_id": settings.FIREBASE_PROJECT_ID,
+                "client_email": settings.FIREBASE_CLIENT_EMAIL,
+                "private_key": settings.FIREBASE_PRIVATE_KEY,
+                "token_uri": "https://oauth2.googleapis.com/token",
+            }
+            firebase_admin.initialize_app(credentials.Certificate(cert_dict))
+    return firebase_admin.get_app()
+
+
+def verify_id_token(token: str, clock_skew_seconds: int = 0) -> dict:
+    init_app()
+    from firebase_admin import auth
+
+    return auth.verify_id_token(token, clock_skew_seconds=clock_skew_seconds)
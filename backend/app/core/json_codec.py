@@ -0,0 +1,85 @@
+"""
+One JSON codec for the backend.
+
+Everything that turns JSON into Python or back goes through here: the
+SQLAlchemy engine (JSONB columns), `_safe_json_loads`, API responses
+(FastJSONResponse) and the structured logger. orjson is used when installed
+(several times faster than the stdlib for both directions); the stdlib `json`
+module is the fallback so scripts still run in minimal environments.
+
+safe_loads() accepts both forms a JSON column can hold during and after the
+JSONB migration: already-decoded dicts / lists from JSONB, and legacy JSON text.
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def dumps_str(obj: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode("utf-8")
+
+    loads = orjson.loads
+    DecodeError = orjson.JSONDecodeError
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def dumps_str(obj: Any) -> str:
+        return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
+    DecodeError = json.JSONDecodeError
+
+
+def safe_loads(value: Any, fallback: Any = None) -> Any:
+    """
+    Decodes a JSON column value. Dicts / lists (JSONB) pass through; strings and
+    bytes are parsed; empty or undecodable values return `fallback`.
+    """
+    if value is None or value == "" or value == b"":
+        return fallback
+    if isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, (str, bytes, bytearray)):
+        try:
+            return loads(value)
+        except (DecodeError, ValueError, TypeError):
+            return fallback
+    return value
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: renders through the shared codec."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,41 @@
+"""
+Deferred imports for heavy optional-at-boot dependencies.
+
+    np = lazy_import("numpy")        # nothing imported yet
+    np.array(...)                    # imported here, once
+
+API workers import app.main on boot and when autoscaling; modules such as
+numpy, groq or sentence-transformers / torch are only needed by a few
+routes, so they are loaded on first attribute access instead.
+See import_profile.py and tests/test_startup_budget.py.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -1,25 +1,78 @@
+"""
+Structured JSON logging, written off the calling thread.
+
+Loggers hand records to a bounded in-memory queue (ContextQueueHandler);
+a QueueListener thread encodes them with the shared orjson codec and writes
+them to stdout and a size-rotated file. The calling thread only formats the
+message and captures request_id / user_id, which live in contextvars and
+would be lost on the listener thread. The event loop never waits on disk.
+
+If the queue is full (the writer cannot keep up) records are dropped and
+counted in `queue_handler.dropped` instead of blocking requests.
+"""
+
+import atexit
 import logging
+import queue
 import sys
-import json
 import contextvars
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from . import json_codec
+from .config import settings
 
 request_id_contextvar = contextvars.ContextVar("request_id", default=None)
 user_id_contextvar = contextvars.ContextVar("user_id", default=None)
 
+_UNSET = object()
+
+
 class StructuredFormatter(logging.Formatter):
     def format(self, record):
+        request_id = getattr(record, "request_id", _UNSET)
+        user_id = getattr(record, "user_id", _UNSET)
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "module": record.module,
             "message": record.getMessage(),
-            "request_id": request_id_contextvar.get(),
-            "user_id": user_id_contextvar.get()
+            "request_id": request_id_contextvar.get() if request_id is _UNSET else request_id,
+            "user_id": user_id_contextvar.get() if user_id is _UNSET else user_id,
         }
         if hasattr(record, "metadata"):
             log_data["metadata"] = record.metadata
-        return json.dumps(log_data)
+        return json_codec.dumps_str(log_data)
+
+
+class ContextQueueHandler(QueueHandler):
+    """QueueHandler that captures the request context and never blocks."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Encoding happens on the listener thread; only resolve what must be
+        # read here (message args, contextvars, exception text). An explicit
+        # extra={"request_id": ...} (e.g. from the loop monitor) wins.
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_contextvar.get()
+        if not hasattr(record, "user_id"):
+            record.user_id = user_id_contextvar.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def setup_logging():
     logger = logging.getLogger("clinical_assistant")
@@ -28,11 +81,22 @@ def setup_logging():
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(StructuredFormatter())
     
-    file_handler = logging.FileHandler("backend_errors.log", encoding="utf-8")
+    file_handler = RotatingFileHandler(
+        settings.LOG_FILE,
+        maxBytes=settings.LOG_FILE_MAX_BYTES,
+        backupCount=settings.LOG_FILE_BACKUPS,
+        encoding="utf-8",
+        delay=True,
+    )
     file_handler.setFormatter(StructuredFormatter())
 
-    logger.addHandler(handler)
-    logger.addHandler(file_handler)
-    return logger
+    records = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    listener = QueueListener(records, handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)   # flush what is queued on shutdown
+
+    queue_handler = ContextQueueHandler(records)
+    logger.addHandler(queue_handler)
+    return logger, queue_handler, listener
 
-logger = setup_logging()
+logger, queue_handler, log_listener = setup_logging()
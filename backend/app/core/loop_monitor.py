@@ -0,0 +1,183 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+Sync work inside `async def` handlers (the sync Groq client, sync SQLAlchemy,
+ReportLab, file I/O) stalls every request on the worker, not just its own.
+Two cooperating parts find it, on any loop implementation (asyncio or uvloop):
+
+  heartbeat  a task on the loop that sleeps LOOP_MONITOR_INTERVAL_MS and
+             records how late it woke up (the loop lag) in a histogram.
+  watchdog   a thread that notices when the heartbeat is overdue and, while
+             the loop is still blocked, snapshots the loop thread's stack and
+             the running task. RequestContextMiddleware tags each request's
+             task with its request id, so the stall is attributed to a request.
+
+A lag of LOOP_SLOW_CALLBACK_MS or more is logged once, with the stack and the
+request id. The lag histogram is served by /api/health/loop and exported
+as event_loop_lag_seconds on /metrics.
+
+Test mode: with LOOP_BLOCK_FAIL_MS set, stalls at least that long are kept in
+`violations`, and tests/conftest.py fails any test that produced one.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import metrics
+from .config import settings
+from .logging import logger
+
+
+class LagHistogram:
+    """Cumulative loop-lag histogram (Prometheus-style `le` buckets, in ms)."""
+
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * len(self.BUCKETS_MS)
+            self.count = 0
+            self.sum_ms = 0.0
+            self.max_ms = 0.0
+
+    def observe(self, lag_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum_ms += lag_ms
+            self.max_ms = max(self.max_ms, lag_ms)
+            for i, bound in enumerate(self.BUCKETS_MS):
+                if lag_ms <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, n in zip(self.BUCKETS_MS, self.counts):
+                cumulative += n
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self.count
+            return {
+                "buckets_ms": buckets,
+                "count": self.count,
+                "sum_ms": round(self.sum_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+            }
+
+
+class LoopMonitor:
+    def __init__(self, interval_ms: float, slow_ms: float, fail_ms: Optional[float] = None):
+        self.interval = interval_ms / 1000
+        self.slow_ms = slow_ms
+        self.fail_ms = fail_ms
+        self.histogram = LagHistogram()
+        self.slow_count = 0
+        self.violations: List[Dict[str, Any]] = []
+        self._requests: "weakref.WeakKeyDictionary[asyncio.Task, Tuple[str, str]]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._beat = 0.0
+        self._stall: Optional[Dict[str, Any]] = None
+
+    @property
+    def _report_ms(self) -> float:
+        return self.slow_ms if self.fail_ms is None else min(self.slow_ms, self.fail_ms)
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None
+
+    def tag(self, request_id: str, route: str = "") -> None:
+        """Attributes stalls in the current task to this request."""
+        if self._heartbeat is None:
+            return
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = (request_id, route)
+
+    async def start(self) -> None:
+        if self._heartbeat is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stall = None
+        self._stopping.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._heartbeat is None:
+            return
+        self._stopping.set()
+        self._heartbeat.cancel()
+        try:
+            await self._heartbeat
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat = None
+        self._watchdog.join(timeout=1.0)
+        self._watchdog = None
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._beat = time.perf_counter()
+            lag_ms = max(0.0, (self._beat - started - self.interval) * 1000)
+            self.histogram.observe(lag_ms)
+            metrics.LOOP_LAG.observe(lag_ms / 1000)
+            stall, self._stall = self._stall, None
+            if lag_ms >= self._report_ms:
+                self._report(lag_ms, stall or {})
+
+    def _run_watchdog(self) -> None:
+        # Sample often enough to catch the stack while the loop is still blocked
+        poll = min(self.interval, self._report_ms / 4000)
+        while not self._stopping.wait(poll):
+            overdue_ms = (time.perf_counter() - self._beat - self.interval) * 1000
+            if overdue_ms >= self._report_ms / 2 and self._stall is None:
+                self._stall = self._capture()
+
+    def _capture(self) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else None
+        task = asyncio.current_task(self._loop)
+        request_id, route = self._requests.get(task, (None, None)) if task is not None else (None, None)
+        return {
+            "stack": stack,
+            "task": task.get_name() if task is not None else None,
+            "request_id": request_id,
+            "route": route,
+        }
+
+    def _report(self, lag_ms: float, stall: Dict[str, Any]) -> None:
+        self.slow_count += 1
+        where = stall.get("route") or stall.get("task") or "unknown callback"
+        logger.warning(
+            f"Event loop blocked for {lag_ms:.0f} ms in {where}\n{stall.get('stack') or '(stack not captured)'}",
+            extra={"request_id": stall.get("request_id"),
+                   "metadata": {"loop_lag_ms": round(lag_ms, 1), "route": stall.get("route")}},
+        )
+        if self.fail_ms is not None and lag_ms >= self.fail_ms:
+            self.violations.append({"lag_ms": round(lag_ms, 1), **stall})
+
+
+loop_monitor = LoopMonitor(
+    interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+    slow_ms=settings.LOOP_SLOW_CALLBACK_MS,
+    fail_ms=settings.LOOP_BLOCK_FAIL_MS,
+)
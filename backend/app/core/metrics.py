@@ -0,0 +1,205 @@
+"""
+Prometheus metrics, exposed at GET /metrics.
+
+    http_request_duration_seconds{method,route}        RequestContextMiddleware
+    http_requests_total{method,route,status}
+    db_pool_connections{engine,state}                  checked_out / overflow / size
+    llm_request_duration_seconds{prompt_key}           llm_call() around every Groq call
+    llm_tokens_total{prompt_key,kind}                  prompt / completion
+    llm_errors_total{prompt_key,error}
+    llm_cancelled_total{prompt_key}                    superseded / debounced calls (not errors)
+    encounter_pipeline_runs_total{pipeline,status}     success / partial / failed
+    background_queue_depth{queue}                      audit write-behind, log queue
+    celery_queue_depth{queue}                          broker list length (Redis)
+    embedding_encode_duration_seconds
+    event_loop_lag_seconds                             core/loop_monitor.py heartbeat
+
+Routes are labelled by their template (/patients/{patient_id}), never the raw
+path; requests that match no route share route="unmatched".
+
+Under gunicorn every worker is a separate process. gunicorn.conf.py points
+PROMETHEUS_MULTIPROC_DIR at an emptied directory before the workers start;
+each worker then writes its samples to mmap'd files there and /metrics, on
+whichever worker answers, merges all of them. Gauges declare how workers
+combine (summed or max over live workers), and child_exit drops the files of
+a dead worker. Without the variable (uvicorn --reload, tests) metrics live in
+the default in-process registry.
+
+Gauges are set by a sampler thread every METRICS_SAMPLE_SECONDS, so sampling
+never runs on the event loop.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+from .logging import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP responses by route template and status", ["method", "route", "status"])
+
+DB_POOL = Gauge(
+    "db_pool_connections", "SQLAlchemy pool connections (checked_out, overflow, size)",
+    ["engine", "state"], multiprocess_mode="livesum",
+)
+
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "LLM call latency by prompt", ["prompt_key"], buckets=LLM_BUCKETS)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by prompt", ["prompt_key", "kind"])
+LLM_ERRORS = Counter("llm_errors_total", "Failed LLM calls by prompt and error type", ["prompt_key", "error"])
+LLM_CANCELLED = Counter("llm_cancelled_total", "LLM calls cancelled before they finished", ["prompt_key"])
+
+PIPELINE_RUNS = Counter("encounter_pipeline_runs_total", "Encounter pipeline outcomes", ["pipeline", "status"])
+
+QUEUE_DEPTH = Gauge("background_queue_depth", "Items waiting in in-process background queues", ["queue"],
+                    multiprocess_mode="livesum")
+CELERY_QUEUE_DEPTH = Gauge("celery_queue_depth", "Messages waiting in a Celery broker queue", ["queue"],
+                           multiprocess_mode="livemax")
+
+EMBEDDING_LATENCY = Histogram("embedding_encode_duration_seconds", "Sentence embedding encode latency",
+                              buckets=LATENCY_BUCKETS)
+LOOP_LAG = Histogram("event_loop_lag_seconds", "How late the event loop ran its heartbeat",
+                     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+
+def observe_request(method: str, route: Optional[str], status: int, seconds: float) -> None:
+    route = route or "unmatched"
+    HTTP_LATENCY.labels(method, route).observe(seconds)
+    HTTP_REQUESTS.labels(method, route, str(status)).inc()
+
+
+class _LLMCall:
+    def __init__(self, prompt_key: str):
+        self.prompt_key = prompt_key
+
+    def record(self, response) -> None:
+        """Counts the tokens reported in a completion's `usage`."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        LLM_TOKENS.labels(self.prompt_key, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+        LLM_TOKENS.labels(self.prompt_key, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
+@contextmanager
+def llm_call(prompt_key: str):
+    """
+    Times one LLM request and counts its failure, if any:
+
+        with metrics.llm_call("RISK_ANALYSIS") as call:
+            response = client.chat.completions.create(...)
+            call.record(response)
+
+    A cancelled call (a debounced or superseded copilot request) is counted
+    in llm_cancelled_total only: it is neither an error nor a full latency.
+    """
+    call = _LLMCall(prompt_key)
+    start = time.perf_counter()
+    try:
+        yield call
+    except asyncio.CancelledError:
+        LLM_CANCELLED.labels(prompt_key).inc()
+        raise
+    except BaseException as e:
+        LLM_ERRORS.labels(prompt_key, type(e).__name__).inc()
+        LLM_LATENCY.labels(prompt_key).observe(time.perf_counter() - start)
+        raise
+    else:
+        LLM_LATENCY.labels(prompt_key).observe(time.perf_counter() - start)
+
+
+def registry():
+    """The registry to expose: merged across workers in multiprocess mode."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return REGISTRY
+    merged = CollectorRegistry()
+    multiprocess.MultiProcessCollector(merged, path=path)
+    return merged
+
+
+def render() -> bytes:
+    return generate_latest(registry())
+
+
+class Sampler:
+    """Sets the pool and queue-depth gauges from a background thread."""
+
+    def __init__(
+        self,
+        interval: float,
+        engines: Dict[str, object],
+        queues: Dict[str, Callable[[], int]],
+        celery_broker_url: Optional[str] = None,
+        celery_queues=("celery",),
+    ):
+        self.interval = interval
+        self.engines = {name: e for name, e in engines.items() if e is not None}
+        self.queues = queues
+        self.celery_queues = celery_queues
+        self._broker = None
+        if celery_broker_url and celery_broker_url.startswith(("redis://", "rediss://")):
+            import redis
+
+            self._broker = redis.Redis.from_url(celery_broker_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            if not hasattr(pool, "checkedout"):
+                continue  # NullPool / StaticPool keep no counts
+            DB_POOL.labels(name, "checked_out").set(pool.checkedout())
+            DB_POOL.labels(name, "overflow").set(max(0, pool.overflow()))
+            DB_POOL.labels(name, "size").set(pool.size())
+        for name, depth in self.queues.items():
+            try:
+                QUEUE_DEPTH.labels(name).set(depth())
+            except Exception as e:
+                logger.debug(f"Queue depth for {name} unavailable: {e}")
+        if self._broker is not None:
+            for queue in self.celery_queues:
+                try:
+                    CELERY_QUEUE_DEPTH.labels(queue).set(self._broker.llen(queue))
+                except Exception as e:
+                    logger.debug(f"Celery queue depth unavailable: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self.sample()
+            if self._stopping.wait(self.interval):
+                return
@@ -0,0 +1,106 @@
+"""
+Keyset (cursor) pagination on (created_at, id), newest first.
+
+OFFSET pagination re-reads every skipped row and drifts when rows are
+inserted between requests; a keyset cursor seeks straight to the last row
+seen through the (…, created_at, id) index:
+
+    query = paginate(query, ClinicalNote.created_at, ClinicalNote.id, cursor, limit)
+    rows, next_cursor = page(query.all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+Cursors are opaque to clients: urlsafe base64 of "<isoformat>|<id>".
+
+List endpoints take PageParams (cursor, limit, fields). `fields` is a sparse
+fieldset: only the named columns are selected and returned, e.g.
+`?fields=name,dosage,status`.
+"""
+
+import base64
+import binascii
+import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+
+from .json_codec import FastJSONResponse
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints (use with Depends())."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return (sparse fieldset)"),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.fields = fields
+
+
+def encode_cursor(created_at: datetime.datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").rsplit("|", 1)
+        return datetime.datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(query, created_col, id_col, cursor: Optional[str], limit: int):
+    """Orders newest first and fetches one extra row to detect a further page."""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def page(rows: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    """Splits the limit + 1 rows from paginate() into (page, next cursor or None)."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Validates a comma-separated sparse fieldset; None means every field. `id` is always included."""
+    if not fields:
+        return None
+    allowed = list(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    return ["id"] + [f for f in allowed if f in requested and f != "id"]
+
+
+def list_response(rows: Sequence, next_cursor: Optional[str], schema, fields: Optional[List[str]]) -> FastJSONResponse:
+    """
+    Renders one page. Full rows go through `schema`; sparse rows are already
+    plain dicts holding only the requested fields.
+    """
+    if fields is None:
+        content = [schema.model_validate(r).model_dump(mode="json") for r in rows]
+    else:
+        content = list(rows)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return FastJSONResponse(content, headers=headers)
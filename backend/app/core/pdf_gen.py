@@ -1,11 +1,20 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from io import BytesIO
 from datetime import datetime
 
+def _as_text(value):
+    """JSON list columns (e.g. readmission factors) render as a comma separated line."""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return value
+
+
 def generate_patient_pdf(report_data, doctor=None):
+    # ReportLab is only needed here; keep it out of worker boot
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
     styles = getSampleStyleSheet()
@@ -238,7 +247,7 @@ def generate_patient_pdf(report_data, doctor=None):
         risk_data = [
             [Paragraph("READMISSION RISK LEVEL", label_style), Paragraph(r_level, ParagraphStyle('RiskValue', parent=value_style, textColor=risk_color, fontName='Helvetica-Bold'))],
             [Paragraph("RISK SCORE", label_style), Paragraph(f"{r.risk_score or 0}%", value_style)],
-            [Paragraph("CONTRIBUTING FACTORS", label_style), Paragraph(r.contributing_factors or 'Minimal clinical risk factors detected.', value_style)],
+            [Paragraph("CONTRIBUTING FACTORS", label_style), Paragraph(_as_text(r.contributing_factors) or 'Minimal clinical risk factors detected.', value_style)],
         ]
         t = Table(risk_data, colWidths=[150, 350])
         t.setStyle(TableStyle([('ALIGN', (0,0), (-1,-1), 'LEFT'), ('VALIGN', (0,0), (-1,-1), 'TOP'), ('BOTTOMPADDING', (0,0), (-1,-1), 8)]))
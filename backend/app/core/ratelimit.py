@@ -1,5 +1,108 @@
+"""
+Rate limiting shared by all workers.
+
+Limits are keyed on the authenticated user ("user:<id>"), falling back to the
+client IP ("ip:<addr>") for anonymous requests and for a token's first,
+not-yet-verified request. Behind the load balancer every user shares one IP,
+so IP keys alone would throttle everyone together.
+
+Counters live in RATE_LIMIT_STORAGE_URI (Redis, so gunicorn workers share
+them; memory:// in tests and single-process dev) and use the
+sliding-window-counter strategy, a single atomic Lua round-trip on Redis.
+If Redis is unreachable the limiter keeps working on per-worker memory.
+
+Besides per-route limits, expensive routes draw on one per-user budget
+(RATE_LIMIT_USER_BUDGET units) with a cost per call, so a full encounter
+counts far more than a note read:
+
+    @router.post("/encounter/generate")
+    @limiter.limit("10/minute")
+    @budget("encounter")
+    async def generate(request: Request, ...):
+"""
+
+import os
+
 from slowapi import Limiter
+from slowapi.middleware import SlowAPIASGIMiddleware, _ASGIMiddlewareResponder
 from slowapi.util import get_remote_address
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import Message, Receive, Scope, Send
+
+from .auth_cache import token_cache
+from .config import settings
+
+# Budget units per call (see RATE_LIMIT_USER_BUDGET)
+COSTS = {
+    "read": 1,
+    "write": 2,
+    "ai": 10,
+    "encounter": 25,
+}
+
+
+def rate_limit_key(request: Request) -> str:
+    """user:<id> once the bearer token has been verified (token cache hit), else ip:<addr>."""
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        principal = token_cache.get(authorization[7:].strip())
+        if principal is not None:
+            return f"user:{principal.id}"
+    return f"ip:{get_remote_address(request)}"
+
+
+def storage_uri() -> str:
+    return settings.RATE_LIMIT_STORAGE_URI or os.getenv("REDIS_URL") or "memory://"
+
+
+def build_limiter(uri: str) -> Limiter:
+    return Limiter(
+        key_func=rate_limit_key,
+        storage_uri=uri,
+        strategy="sliding-window-counter",
+        key_prefix="rl",
+        # Redis outage: fall back to per-worker memory counters, not 500s
+        in_memory_fallback_enabled=not uri.startswith("memory://"),
+    )
+
 
 # Global limiter instance
-limiter = Limiter(key_func=get_remote_address)
+limiter = build_limiter(storage_uri())
+
+
+def budget(kind: str):
+    """Charges COSTS[kind] against the caller's shared per-user budget."""
+    return limiter.shared_limit(settings.RATE_LIMIT_USER_BUDGET, scope="user_budget", cost=COSTS[kind])
+
+
+class _StreamingSafeResponder(_ASGIMiddlewareResponder):
+    """
+    slowapi's ASGI responder holds back http.response.start so it can edit the
+    headers, but then re-sends it before *every* body message, which breaks
+    streaming responses (PDFs). Send it once, ahead of the first body chunk.
+    """
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            return
+        if message["type"] == "http.response.body" and self.initial_message:
+            start, self.initial_message = self.initial_message, {}
+            if self.error_response:
+                start["status"] = self.error_response.status_code
+            if self.inject_headers:
+                self.limiter._inject_asgi_headers(
+                    MutableHeaders(raw=start["headers"]), self.request.state.view_rate_limit
+                )
+            await self.send(start)
+        await self.send(message)
+
+
+class RateLimitMiddleware(SlowAPIASGIMiddleware):
+    """Pure ASGI rate limiting: SlowAPIASGIMiddleware with streaming responses fixed."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        await _StreamingSafeResponder(self.app)(scope, receive, send)
@@ -0,0 +1,482 @@
+"""
+Write-behind queue for audit and telemetry rows.
+
+AuditLog / AIUsageMetrics / AIQualityReport rows do not need to be in the
+request transaction. In async mode (AUDIT_WRITE_MODE=async) `record()` stages
+the row on the session. When the session commits, the staged rows are appended
+to a local spool segment before the database COMMIT (before_commit) and put on
+a bounded in-process queue once it succeeds (after_commit). A daemon thread
+flushes the queue every WRITE_BEHIND_FLUSH_INTERVAL seconds (or as soon as a
+batch fills up) as multi-row INSERTs, then deletes the spool segments it has
+fully written. A rollback appends an abort marker for its rows, so they are
+never replayed.
+
+Durability: a committed row is in a spool segment before the commit returns.
+On startup, segments left behind by a dead process are replayed, so a crash
+loses nothing (delivery is at-least-once; a crash between INSERT and segment
+deletion can replay a batch, and a crash in the middle of COMMIT replays the
+rows of a transaction that may not have committed). Rows the database rejects
+(constraint errors) are written to dead_letter.jsonl instead of blocking the
+queue.
+
+Backpressure: when the queue is full the row is written synchronously on its
+own connection, so callers never block on the flusher. If that write fails the
+row goes to dead_letter.jsonl; rows are never dropped.
+
+In sync mode (the default, for strict-audit deployments) or when the queue
+is not running (Celery workers, scripts) `record()` simply adds the row to the
+session, exactly as before.
+"""
+
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "write_behind_rows"
+_PREPARED_KEY = "write_behind_prepared"
+DEAD_LETTER_FILE = "dead_letter.jsonl"
+
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$d": value.isoformat()}
+    raise TypeError(f"Cannot spool value of type {type(value).__name__}")
+
+
+def _json_hook(obj):
+    if len(obj) == 1:
+        if "$dt" in obj:
+            return datetime.datetime.fromisoformat(obj["$dt"])
+        if "$d" in obj:
+            return datetime.date.fromisoformat(obj["$d"])
+    return obj
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        # Our pid, but we have not written anything yet: a previous process reused it
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        spool_dir: str,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        fsync: bool = False,
+    ):
+        self.spool_dir = spool_dir
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._engine = None
+        self._metadata = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()          # guards pending + active segment
+        self._flush_lock = threading.Lock()    # one flush at a time
+        self._pending: Deque[Tuple[float, str, Dict[str, Any]]] = deque()
+        self._segment = None
+        self._segment_path: Optional[str] = None
+        self._segment_seq = 0
+        self._sealed: List[str] = []           # segments whose rows are all in _pending
+        self._inflight: Dict[str, int] = {}    # segment -> transactions spooled but not yet committed / aborted
+
+        self._counters = {
+            "enqueued": 0, "flushed_rows": 0, "flushes": 0, "failed_flushes": 0,
+            "dead_lettered": 0, "overflow_sync_writes": 0, "replayed": 0,
+        }
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._avg_flush_ms = 0.0
+        self._last_flush_at: Optional[datetime.datetime] = None
+
+    # -- lifecycle -----------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, engine, metadata):
+        """Replays orphaned spool segments and starts the flusher thread."""
+        if self.running:
+            return
+        self._engine = engine
+        self._metadata = metadata
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._stop.clear()
+        self._replay_orphans()
+        self._thread = threading.Thread(target=self._run, name="write-behind-flusher", daemon=True)
+        self._thread.start()
+        logger.info("Write-behind queue started (spool: %s)", self.spool_dir)
+
+    def stop(self, timeout: float = 10.0):
+        """Stops the flusher and drains the queue. Unflushed rows stay spooled."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+        with self._lock:
+            self._close_segment()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write-behind flush crashed")
+
+    # -- enqueue -------------------------------------------------------
+
+    def prepare(self, rows: List[Tuple[str, Dict[str, Any]]]) -> Optional[Tuple[str, str]]:
+        """
+        Spools the rows of a committing transaction. Returns a ticket for
+        commit() / abort(), or None when the queue is not running (the caller
+        must then write the rows itself).
+        """
+        txid = uuid.uuid4().hex
+        lines = "".join(
+            json.dumps({"t": table_name, "v": values, "x": txid}, default=_json_default) + "\n"
+            for table_name, values in rows
+        )
+        with self._lock:
+            if not self.running:
+                return None
+            path = self._append(lines)
+            self._inflight[path] = self._inflight.get(path, 0) + 1
+        return txid, path
+
+    def commit(self, ticket: Tuple[str, str], rows: List[Tuple[str, Dict[str, Any]]]):
+        """Queues the rows of a committed transaction; rows past a full queue are written synchronously."""
+        _, path = ticket
+        overflow = []
+        with self._lock:
+            for table_name, values in rows:
+                if len(self._pending) >= self.maxsize:
+                    overflow.append((table_name, values))
+                    continue
+                self._pending.append((time.monotonic(), table_name, values))
+                self._counters["enqueued"] += 1
+            self._release(path)
+            backlog = len(self._pending)
+        for table_name, values in overflow:
+            try:
+                self.write_now(table_name, values)
+            except Exception as e:
+                logger.exception("Write-behind overflow write failed for %s", table_name)
+                self._dead_letter(table_name, values, str(e))
+        if backlog >= self.batch_size:
+            self._wake.set()
+
+    def abort(self, ticket: Tuple[str, str]):
+        """Marks the rows of a rolled-back transaction so a replay skips them."""
+        txid, path = ticket
+        with self._lock:
+            self._append(json.dumps({"abort": txid}) + "\n")
+            self._release(path)
+
+    def write_now(self, table_name: str, values: Dict[str, Any]):
+        """Synchronous single-row insert on a dedicated connection (overflow path)."""
+        with self._engine.begin() as conn:
+            conn.execute(self._metadata.tables[table_name].insert(), [values])
+        with self._lock:
+            self._counters["overflow_sync_writes"] += 1
+
+    def _append(self, lines: str) -> str:
+        # Caller holds _lock
+        segment = self._active_segment()
+        segment.write(lines)
+        segment.flush()
+        if self.fsync:
+            os.fsync(segment.fileno())
+        return self._segment_path
+
+    def _release(self, path: str):
+        # Caller holds _lock
+        remaining = self._inflight.get(path, 0) - 1
+        if remaining > 0:
+            self._inflight[path] = remaining
+        else:
+            self._inflight.pop(path, None)
+
+    def _active_segment(self):
+        if self._segment is None:
+            self._segment_seq += 1
+            self._segment_path = os.path.join(self.spool_dir, f"{os.getpid()}-{self._segment_seq:06d}.jsonl")
+            self._segment = open(self._segment_path, "a", encoding="utf-8")
+        return self._segment
+
+    def _close_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._sealed.append(self._segment_path)
+            self._segment = None
+            self._segment_path = None
+
+    # -- flushing ------------------------------------------------------
+
+    def flush(self) -> int:
+        """Writes everything queued so far. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                self._close_segment()
+                # Segments with transactions still committing hold rows that are not queued yet
+                sealed = [p for p in self._sealed if p not in self._inflight]
+                items = list(self._pending)
+                self._pending.clear()
+            if not items:
+                self._remove_segments(sealed)
+                with self._lock:
+                    self._sealed = [p for p in self._sealed if p not in sealed]
+                return 0
+
+            started = time.perf_counter()
+            try:
+                self._write(items)
+            except Exception:
+                logger.exception("Write-behind flush of %d rows failed; will retry", len(items))
+                with self._lock:
+                    # Keep order: retried rows go back in front of anything queued meanwhile
+                    self._pending.extendleft(reversed(items))
+                    self._counters["failed_flushes"] += 1
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._remove_segments(sealed)
+            with self._lock:
+                self._sealed = [p for p in self._sealed if p not in sealed]
+                self._counters["flushes"] += 1
+                self._counters["flushed_rows"] += len(items)
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._avg_flush_ms = elapsed_ms if self._counters["flushes"] == 1 else (
+                    0.9 * self._avg_flush_ms + 0.1 * elapsed_ms
+                )
+                self._last_flush_at = datetime.datetime.utcnow()
+            return len(items)
+
+    def _write(self, items):
+        # executemany needs identical keys per statement, so group by (table, columns)
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for _, table_name, values in items:
+            groups.setdefault((table_name, tuple(sorted(values))), []).append(values)
+
+        for (table_name, _), rows in groups.items():
+            table = self._metadata.tables[table_name]
+            for i in range(0, len(rows), self.batch_size):
+                chunk = rows[i:i + self.batch_size]
+                try:
+                    with self._engine.begin() as conn:
+                        conn.execute(table.insert(), chunk)
+                except (IntegrityError, DataError):
+                    self._write_rows_individually(table, chunk)
+
+    def _write_rows_individually(self, table, rows):
+        """Isolates rows the database rejects so one bad row cannot wedge the queue."""
+        for row in rows:
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(table.insert(), [row])
+            except (IntegrityError, DataError) as e:
+                logger.error("Write-behind row rejected for %s: %s", table.name, e.orig)
+                self._dead_letter(table.name, row, str(e.orig))
+
+    def _dead_letter(self, table_name: str, values: Dict[str, Any], error: str):
+        path = os.path.join(self.spool_dir, DEAD_LETTER_FILE)
+        with self._lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"t": table_name, "v": values, "error": error}, default=_json_default) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._counters["dead_lettered"] += 1
+
+    def _remove_segments(self, paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # -- crash recovery --------------------------------------------------
+
+    def _replay_orphans(self):
+        """Claims spool segments of dead processes and queues their committed rows."""
+        claimed = []
+        for name in sorted(os.listdir(self.spool_dir)):
+            if not name.endswith(".jsonl") or name == DEAD_LETTER_FILE:
+                continue
+            try:
+                pid = int(name.split("-", 1)[0])
+            except ValueError:
+                continue
+            if _pid_alive(pid):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            with self._lock:
+                self._segment_seq += 1
+                target = os.path.join(self.spool_dir, f"{os.getpid()}-replay-{self._segment_seq:06d}.jsonl")
+            try:
+                os.rename(path, target)   # atomic: only one worker wins the segment
+            except FileNotFoundError:
+                continue
+            claimed.append((name, target))
+
+        # Abort markers can land in a later segment than the rows they cancel
+        entries, aborted = [], set()
+        for name, path in claimed:
+            rows = []
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line, object_hook=_json_hook)
+                    except ValueError:
+                        continue   # torn final line from the crash
+                    if "abort" in entry:
+                        aborted.add(entry["abort"])
+                    elif entry.get("t") in self._metadata.tables:
+                        rows.append(entry)
+            entries.append((name, path, rows))
+
+        for name, path, rows in entries:
+            replayed = 0
+            for entry in rows:
+                if entry.get("x") in aborted:
+                    continue
+                self._pending.append((time.monotonic(), entry["t"], entry["v"]))
+                replayed += 1
+            with self._lock:
+                self._sealed.append(path)
+                self._counters["replayed"] += replayed
+            if replayed:
+                logger.warning("Replaying %d spooled write-behind rows from %s", replayed, name)
+
+    # -- metrics -------------------------------------------------------
+
+    def _spool_bytes(self) -> int:
+        total = 0
+        try:
+            for name in os.listdir(self.spool_dir):
+                if name != DEAD_LETTER_FILE:
+                    total += os.path.getsize(os.path.join(self.spool_dir, name))
+        except OSError:
+            pass
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            oldest = self._pending[0][0] if self._pending else None
+            data = dict(self._counters)
+            data.update({
+                "running": self.running,
+                "backlog": len(self._pending),
+                "capacity": self.maxsize,
+                "oldest_pending_age_s": round(time.monotonic() - oldest, 3) if oldest else 0.0,
+                "last_flush_ms": round(self._last_flush_ms, 2),
+                "avg_flush_ms": round(self._avg_flush_ms, 2),
+                "max_flush_ms": round(self._max_flush_ms, 2),
+                "last_flush_at": self._last_flush_at.isoformat() if self._last_flush_at else None,
+            })
+        data["spool_bytes"] = self._spool_bytes()
+        return data
+
+
+audit_writer = WriteBehindQueue(
+    spool_dir=settings.WRITE_BEHIND_SPOOL_DIR,
+    maxsize=settings.WRITE_BEHIND_QUEUE_SIZE,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    fsync=settings.WRITE_BEHIND_FSYNC,
+)
+
+
+# ---------------------------------------------------------------------------
+# Session integration
+# ---------------------------------------------------------------------------
+
+def record(db: Session, model, writer: WriteBehindQueue = audit_writer, **values):
+    """
+    Writes an audit / telemetry row. Sync mode adds it to the session and
+    returns the instance; async mode stages it until the session commits and
+    returns None.
+    """
+    if not writer.running:
+        obj = model(**values)
+        db.add(obj)
+        return obj
+    if not db.in_transaction():
+        # Staged rows are tied to a transaction; make sure one exists to commit / roll back
+        db.begin()
+    db.info.setdefault(_SESSION_KEY, []).append((writer, model.__table__.name, values))
+    return None
+
+
+@event.listens_for(Session, "before_commit")
+def _spool_staged(session):
+    # before_commit / after_commit also fire when a savepoint is released
+    if session.in_nested_transaction():
+        return
+    staged = session.info.pop(_SESSION_KEY, None)
+    if not staged:
+        return
+    by_writer: Dict[WriteBehindQueue, List[Tuple[str, Dict[str, Any]]]] = {}
+    for writer, table_name, values in staged:
+        by_writer.setdefault(writer, []).append((table_name, values))
+    prepared = session.info.setdefault(_PREPARED_KEY, [])
+    for writer, rows in by_writer.items():
+        ticket = writer.prepare(rows)
+        if ticket is None:
+            # The queue stopped after record(): write the rows with the transaction
+            for table_name, values in rows:
+                session.execute(writer._metadata.tables[table_name].insert(), [values])
+            continue
+        prepared.append((writer, ticket, rows))
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session):
+    if session.in_nested_transaction():
+        return
+    for writer, ticket, rows in session.info.pop(_PREPARED_KEY, None) or ():
+        writer.commit(ticket, rows)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    # Root transaction ended without after_commit consuming the rows: it rolled back
+    if transaction.parent is None:
+        session.info.pop(_SESSION_KEY, None)
+        for writer, ticket, _ in session.info.pop(_PREPARED_KEY, None) or ():
+            writer.abort(ticket)
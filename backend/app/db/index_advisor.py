@@ -0,0 +1,368 @@
+"""
+Workload-driven index advisor.
+
+Replays a representative read workload (the hot paths behind the chart,
+note list, dashboard, encounter list and deterioration scan) against a
+PostgreSQL database, then:
+
+  - times every query (p50 / p95 / mean over N iterations with sampled ids);
+  - captures one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) plan per query;
+  - reads pg_stat_statements (when the extension is installed) for the
+    statements the replay produced;
+  - proposes composite / partial indexes from the plans: sequential scans and
+    index scans that discard most of their rows through a Filter, plus the
+    Sort keys above them, become `CREATE INDEX CONCURRENTLY` suggestions.
+    `is_deleted = false` filters become partial-index predicates. Proposals
+    already covered by an existing index prefix are dropped.
+
+Run it through `index_advisor.py` before and after applying an index
+migration and compare the two reports. Point it at a local copy of
+production-like data: the plans are only as representative as the row counts.
+PostgreSQL only.
+"""
+
+import json
+import re
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# A scan is worth indexing when its filter throws away this many rows per row kept
+FILTER_WASTE_RATIO = 10
+# ...and it discards at least this many rows in absolute terms
+MIN_ROWS_REMOVED = 1000
+
+
+@dataclass(frozen=True)
+class WorkloadQuery:
+    name: str
+    sql: str
+    sample: Optional[str] = None  # key into SAMPLERS, None for parameterless queries
+
+
+# Ids are sampled from the busiest users / patients: their plans are the ones that hurt
+SAMPLERS: Dict[str, str] = {
+    "user": (
+        "SELECT user_id FROM patients WHERE user_id IS NOT NULL "
+        "GROUP BY user_id ORDER BY count(*) DESC LIMIT :n"
+    ),
+    "patient": (
+        "SELECT patient_id FROM clinical_notes WHERE patient_id IS NOT NULL "
+        "GROUP BY patient_id ORDER BY count(*) DESC LIMIT :n"
+    ),
+    "patient_owner": (
+        "SELECT patient_id, created_by_id AS user_id FROM ai_encounters "
+        "GROUP BY patient_id, created_by_id ORDER BY count(*) DESC LIMIT :n"
+    ),
+}
+
+WORKLOAD: Tuple[WorkloadQuery, ...] = (
+    WorkloadQuery(
+        "notes.list_by_user",
+        "SELECT id, title, note_type, patient_id, status, created_at, substr(raw_content, 1, 200) "
+        "FROM clinical_notes WHERE user_id = :user_id AND is_deleted = false "
+        "ORDER BY created_at DESC, id DESC LIMIT 51",
+        "user",
+    ),
+    WorkloadQuery(
+        "notes.by_patient",
+        "SELECT id, title, status, created_at FROM clinical_notes "
+        "WHERE patient_id = :patient_id AND is_deleted = false ORDER BY created_at DESC LIMIT 100",
+        "patient",
+    ),
+    WorkloadQuery(
+        "patients.list_by_user",
+        "SELECT id, name, mrn, status, created_at FROM patients "
+        "WHERE is_deleted = false AND user_id = :user_id ORDER BY created_at DESC LIMIT 100",
+        "user",
+    ),
+    WorkloadQuery(
+        "tasks.pending_by_patient",
+        "SELECT count(*) FROM tasks WHERE patient_id = :patient_id AND status = 'Pending'",
+        "patient",
+    ),
+    WorkloadQuery(
+        "tasks.pending_latest",
+        "SELECT id, description, due_date, priority FROM tasks "
+        "WHERE patient_id = :patient_id AND status = 'Pending' ORDER BY created_at DESC LIMIT 3",
+        "patient",
+    ),
+    WorkloadQuery(
+        "encounters.list",
+        "SELECT id, encounter_date, chief_complaint, status, risk_score, created_at FROM ai_encounters "
+        "WHERE patient_id = :patient_id AND created_by_id = :user_id ORDER BY created_at DESC LIMIT 50",
+        "patient_owner",
+    ),
+    WorkloadQuery(
+        "encounters.report",
+        "SELECT id FROM ai_encounters WHERE patient_id = :patient_id ORDER BY created_at DESC LIMIT 5",
+        "patient",
+    ),
+    WorkloadQuery(
+        "documents.by_patient",
+        "SELECT id, title, created_at FROM documents "
+        "WHERE patient_id = :patient_id AND is_deleted = false ORDER BY created_at DESC, id DESC LIMIT 101",
+        "patient",
+    ),
+    WorkloadQuery(
+        "deterioration.latest_notes",
+        "SELECT DISTINCT ON (patient_id) patient_id, id, created_at FROM clinical_notes "
+        "WHERE patient_id IS NOT NULL AND is_deleted = false ORDER BY patient_id, created_at DESC",
+    ),
+    WorkloadQuery(
+        "encounters.shift_briefing",
+        "SELECT id, patient_id, risk_score, is_confirmed FROM ai_encounters "
+        "WHERE created_at >= now() - interval '12 hours'",
+    ),
+)
+
+
+@dataclass
+class IndexProposal:
+    table: str
+    columns: List[str]
+    where: Optional[str] = None
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        suffix = "_live" if self.where else ""
+        return f"ix_{self.table}_{'_'.join(self.columns)}{suffix}"[:63]
+
+    def ddl(self) -> str:
+        where = f" WHERE {self.where}" if self.where else ""
+        return (
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{self.name}" '
+            f'ON "{self.table}" ({", ".join(self.columns)}){where}'
+        )
+
+
+@dataclass
+class QueryReport:
+    name: str
+    samples: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    plan_root: str = ""
+    plan_ms: Optional[float] = None
+    shared_read_blocks: Optional[int] = None
+
+
+# ---------------------------------------------------------------------------
+# Plan analysis (pure — unit tested against canned EXPLAIN output)
+# ---------------------------------------------------------------------------
+
+# Matches "(user_id = 3)", "((status)::text = 'Pending'::text)", "(t.created_at >= ...)"
+_COLUMN = r"(?:\w+\.)?(\w+)\)?(?:::[\w ]+?)?"
+_EQ_RE = re.compile(r"(?<![\w.])" + _COLUMN + r" = (?!false\b|true\b)")
+_RANGE_RE = re.compile(r"(?<![\w.])" + _COLUMN + r" (?:>=|<=|>|<) ")
+_SOFT_DELETE_RE = re.compile(r"\bNOT (?:\w+\.)?is_deleted\b|\b(?:\w+\.)?is_deleted = false\b|\(NOT is_deleted\)")
+
+
+def _walk(node: dict, parent: Optional[dict] = None):
+    yield node, parent
+    for child in node.get("Plans", []):
+        yield from _walk(child, node)
+
+
+def _conditions(node: dict) -> str:
+    return " AND ".join(node.get(k, "") for k in ("Index Cond", "Recheck Cond", "Filter") if node.get(k))
+
+
+def _sort_columns(sort_node: Optional[dict], table: str) -> List[str]:
+    if not sort_node or sort_node.get("Node Type") not in ("Sort", "Incremental Sort"):
+        return []
+    columns = []
+    for key in sort_node.get("Sort Key", []):
+        column = key.split()[0].strip("()")
+        if "." in column:
+            prefix, column = column.rsplit(".", 1)
+            if prefix not in (table, ""):
+                continue
+        if re.fullmatch(r"\w+", column):
+            columns.append(column)
+    return columns
+
+
+def propose_from_plan(plan: dict, query_name: str = "") -> List[IndexProposal]:
+    """Turns one EXPLAIN (ANALYZE, FORMAT JSON) plan into index proposals."""
+    root = plan[0]["Plan"] if isinstance(plan, list) else plan.get("Plan", plan)
+    proposals = []
+    for node, parent in _walk(root):
+        table = node.get("Relation Name")
+        if not table or "Scan" not in node.get("Node Type", ""):
+            continue
+        loops = node.get("Actual Loops", 1) or 1
+        kept = node.get("Actual Rows", 0) * loops
+        removed = node.get("Rows Removed by Filter", 0) * loops
+        wasteful = removed >= MIN_ROWS_REMOVED and removed >= FILTER_WASTE_RATIO * max(kept, 1)
+        if not (wasteful or node["Node Type"] == "Seq Scan" and removed >= MIN_ROWS_REMOVED):
+            continue
+
+        conditions = _conditions(node)
+        where = "is_deleted = false" if _SOFT_DELETE_RE.search(conditions) else None
+        columns: List[str] = []
+        for column in _EQ_RE.findall(conditions):
+            if column != "is_deleted" and column not in columns:
+                columns.append(column)
+        for column in _sort_columns(parent, table) + _RANGE_RE.findall(conditions):
+            if column != "is_deleted" and column not in columns:
+                columns.append(column)
+        if not columns:
+            continue
+        reason = f"{query_name}: {node['Node Type']} kept {kept:g} rows, filtered out {removed:g}"
+        proposals.append(IndexProposal(table, columns, where, [reason]))
+    return proposals
+
+
+def _index_columns(indexdef: str) -> Tuple[List[str], Optional[str]]:
+    match = re.search(r"USING \w+ \((?P<cols>[^)]*)\)(?: WHERE (?P<where>.*))?$", indexdef)
+    if not match:
+        return [], None
+    columns = [c.strip().split()[0].strip('"') for c in match.group("cols").split(",")]
+    return columns, match.group("where")
+
+
+def merge_proposals(proposals: Iterable[IndexProposal], existing: Dict[str, List[str]]) -> List[IndexProposal]:
+    """
+    Deduplicates proposals and drops ones an existing index already serves:
+    an index whose leading columns equal the proposal's (and whose predicate,
+    if any, matches) makes the proposal redundant. `existing` maps table ->
+    pg_indexes.indexdef strings.
+    """
+    merged: Dict[Tuple[str, Tuple[str, ...], Optional[str]], IndexProposal] = {}
+    for p in proposals:
+        key = (p.table, tuple(p.columns), p.where)
+        if key in merged:
+            merged[key].reasons.extend(r for r in p.reasons if r not in merged[key].reasons)
+        else:
+            merged[key] = IndexProposal(p.table, list(p.columns), p.where, list(p.reasons))
+
+    result = []
+    for p in merged.values():
+        covered = False
+        for indexdef in existing.get(p.table, []):
+            columns, where = _index_columns(indexdef)
+            same_predicate = where is None or (p.where and p.where.replace(" ", "") in where.replace(" ", "").lower())
+            if columns[: len(p.columns)] == p.columns and same_predicate:
+                covered = True
+                break
+        if not covered:
+            result.append(p)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Replay against a live database
+# ---------------------------------------------------------------------------
+
+def _samples(conn: Connection, key: Optional[str], n: int) -> List[dict]:
+    if key is None:
+        return [{}]
+    rows = conn.execute(text(SAMPLERS[key]), {"n": n}).mappings().all()
+    return [dict(r) for r in rows] or []
+
+
+def existing_indexes(conn: Connection, tables: Sequence[str]) -> Dict[str, List[str]]:
+    rows = conn.execute(
+        text("SELECT tablename, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = ANY(:t)"),
+        {"t": list(tables)},
+    ).all()
+    result: Dict[str, List[str]] = {}
+    for table, indexdef in rows:
+        result.setdefault(table, []).append(indexdef)
+    return result
+
+
+def _reset_statements(conn: Connection) -> bool:
+    try:
+        with conn.begin_nested():
+            conn.execute(text("SELECT pg_stat_statements_reset()"))
+        return True
+    except Exception:
+        return False
+
+
+def collect_statements(conn: Connection, limit: int = 20) -> List[dict]:
+    """Top statements by total time from pg_stat_statements ([] if the extension is missing)."""
+    installed = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")).first()
+    if not installed:
+        return []
+    rows = conn.execute(text(
+        "SELECT query, calls, round(total_exec_time::numeric, 2) AS total_ms, "
+        "round(mean_exec_time::numeric, 3) AS mean_ms, rows, shared_blks_hit, shared_blks_read "
+        "FROM pg_stat_statements WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+        "ORDER BY total_exec_time DESC LIMIT :limit"
+    ), {"limit": limit}).mappings().all()
+    return [{k: (float(v) if hasattr(v, "as_tuple") else v) for k, v in r.items()} for r in rows]
+
+
+def replay(engine: Engine, iterations: int = 30, sample_size: int = 10,
+           workload: Sequence[WorkloadQuery] = WORKLOAD) -> dict:
+    """
+    Runs the workload and returns a JSON-serialisable report:
+    {"queries": [...], "proposals": [...], "statements": [...]}.
+    """
+    queries, proposals = [], []
+    tables = set()
+    with engine.connect() as conn:
+        statements_reset = _reset_statements(conn)
+        for q in workload:
+            params = _samples(conn, q.sample, sample_size)
+            if not params:
+                continue
+            timings = []
+            for i in range(iterations):
+                start = time.perf_counter()
+                conn.execute(text(q.sql), params[i % len(params)]).all()
+                timings.append((time.perf_counter() - start) * 1000)
+
+            plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {q.sql}"), params[0]).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            root = plan[0]["Plan"]
+            for node, _ in _walk(root):
+                if node.get("Relation Name"):
+                    tables.add(node["Relation Name"])
+            proposals.extend(propose_from_plan(plan, q.name))
+            ordered = sorted(timings)
+            queries.append(QueryReport(
+                name=q.name,
+                samples=len(timings),
+                p50_ms=round(statistics.median(timings), 3),
+                p95_ms=round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+                mean_ms=round(statistics.fmean(timings), 3),
+                plan_root=root.get("Node Type", ""),
+                plan_ms=plan[0].get("Execution Time"),
+                shared_read_blocks=root.get("Shared Read Blocks"),
+            ))
+        statements = collect_statements(conn) if statements_reset else []
+        merged = merge_proposals(proposals, existing_indexes(conn, sorted(tables)))
+
+    return {
+        "queries": [asdict(q) for q in queries],
+        "proposals": [dict(asdict(p), name=p.name, ddl=p.ddl()) for p in merged],
+        "statements": statements,
+    }
+
+
+def compare(before: dict, after: dict) -> List[dict]:
+    """Per-query before/after latency rows for two replay() reports."""
+    previous = {q["name"]: q for q in before.get("queries", [])}
+    rows = []
+    for q in after.get("queries", []):
+        old = previous.get(q["name"])
+        if not old:
+            continue
+        rows.append({
+            "name": q["name"],
+            "before_p50_ms": old["p50_ms"], "after_p50_ms": q["p50_ms"],
+            "before_p95_ms": old["p95_ms"], "after_p95_ms": q["p95_ms"],
+            "speedup_p50": round(old["p50_ms"] / q["p50_ms"], 2) if q["p50_ms"] else None,
+            "plan": f"{old['plan_root']} -> {q['plan_root']}",
+        })
+    return rows
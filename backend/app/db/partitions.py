@@ -0,0 +1,214 @@
+"""
+Monthly range partitions for append-heavy tables.
+
+audit_logs, ai_usage_metrics and ai_quality_reports are partitioned by month
+on their timestamp column (see migration c4a8f3e6d2b1), with a DEFAULT
+partition catching anything outside the pre-created range. This module keeps
+the partition set rolling:
+
+ensure_partitions  — creates partitions for the current month and the next
+                     PARTITION_PREMAKE_MONTHS, so inserts never land in DEFAULT.
+                     Rows DEFAULT already holds for a new month are moved into it.
+archive_partitions — for partitions entirely older than PARTITION_RETENTION_MONTHS,
+                     COPY the rows to a gzip'd CSV in PARTITION_ARCHIVE_DIR, verify
+                     the row count, then detach and drop the partition.
+
+Queries that filter on the partition column (`created_at` / `timestamp`) get
+partition pruning, so a 30-day window touches one or two partitions no matter
+how much history is kept.
+
+Run from the `maintain_partitions` Celery beat task or `manage_partitions.py`.
+PostgreSQL only.
+"""
+
+import datetime
+import gzip
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# table -> partition column
+PARTITIONED_TABLES: Dict[str, str] = {
+    "audit_logs": "timestamp",
+    "ai_usage_metrics": "created_at",
+    "ai_quality_reports": "created_at",
+}
+
+_PARTITION_RE = re.compile(r"^(?P<table>.+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+
+def month_start(d: datetime.date) -> datetime.date:
+    return datetime.date(d.year, d.month, 1)
+
+
+def add_months(d: datetime.date, months: int) -> datetime.date:
+    index = d.year * 12 + (d.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime.date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _bounds(month: datetime.date):
+    # '+00' pins timestamptz bounds to UTC; it is ignored for plain timestamp columns
+    return f"'{month.isoformat()} 00:00:00+00'", f"'{add_months(month, 1).isoformat()} 00:00:00+00'"
+
+
+def create_partition_sql(table: str, month: datetime.date) -> str:
+    lower, upper = _bounds(month)
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ({lower}) TO ({upper})"
+    )
+
+
+@dataclass
+class ArchivedPartition:
+    table: str
+    partition: str
+    rows: int
+    path: str
+
+
+def list_partitions(conn: Connection, table: str) -> List[str]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+    ), {"table": table})
+    return [r[0] for r in rows]
+
+
+def create_partition(conn: Connection, table: str, month: datetime.date) -> int:
+    """
+    Creates one monthly partition. PostgreSQL refuses to create a partition
+    for a range the DEFAULT partition already holds rows for, so those rows
+    are moved: DEFAULT is detached, the partition created, the month's rows
+    moved into it and DEFAULT reattached, all in the caller's transaction.
+    Returns the number of rows moved out of DEFAULT.
+    """
+    column = PARTITIONED_TABLES[table]
+    default = default_partition_name(table)
+    lower, upper = _bounds(month)
+    in_month = f'"{column}" >= {lower} AND "{column}" < {upper}'
+    stranded = conn.execute(text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_month})')).scalar()
+    if not stranded:
+        conn.execute(text(create_partition_sql(table, month)))
+        return 0
+
+    conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+    conn.execute(text(create_partition_sql(table, month)))
+    moved = conn.execute(text(
+        f'WITH moved AS (DELETE FROM "{default}" WHERE {in_month} RETURNING *) '
+        f'INSERT INTO "{partition_name(table, month)}" SELECT * FROM moved'
+    )).rowcount
+    conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.warning("Moved %d rows from %s into %s", moved, default, partition_name(table, month))
+    return moved
+
+
+def ensure_partitions(engine: Engine, months_ahead: Optional[int] = None,
+                      today: Optional[datetime.date] = None) -> List[str]:
+    """
+    Creates any missing monthly partitions up to `months_ahead`. Returns the
+    names created. Each table commits on its own, so a failure on one table
+    is logged and does not stop the others.
+    """
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(today or datetime.datetime.utcnow().date())
+    created = []
+    for table in PARTITIONED_TABLES:
+        made = []
+        try:
+            with engine.begin() as conn:
+                existing = set(list_partitions(conn, table))
+                for offset in range(months_ahead + 1):
+                    month = add_months(current, offset)
+                    name = partition_name(table, month)
+                    if name in existing:
+                        continue
+                    create_partition(conn, table, month)
+                    made.append(name)
+        except Exception:
+            logger.exception("Creating partitions for %s failed", table)
+            continue
+        created.extend(made)
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+def cold_partitions(conn: Connection, retention_months: int,
+                    today: Optional[datetime.date] = None) -> Dict[str, List[str]]:
+    """Partitions whose whole month ended before the retention cutoff."""
+    cutoff = add_months(month_start(today or datetime.datetime.utcnow().date()), -retention_months)
+    cold: Dict[str, List[str]] = {}
+    for table in PARTITIONED_TABLES:
+        for name in list_partitions(conn, table):
+            m = _PARTITION_RE.match(name)
+            if not m or m.group("table") != table:
+                continue   # DEFAULT partition or foreign naming
+            if add_months(datetime.date(int(m.group("year")), int(m.group("month")), 1), 1) <= cutoff:
+                cold.setdefault(table, []).append(name)
+    return cold
+
+
+def _copy_to_archive(conn: Connection, partition: str, path: str) -> int:
+    tmp_path = path + ".part"
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(tmp_path, "wb") as f:
+            cursor.copy_expert(f'COPY "{partition}" TO STDOUT WITH (FORMAT csv, HEADER)', f)
+        rows = cursor.rowcount
+    finally:
+        cursor.close()
+    os.replace(tmp_path, path)
+    return rows
+
+
+def archive_partitions(engine: Engine, retention_months: Optional[int] = None,
+                       archive_dir: Optional[str] = None, dry_run: bool = False,
+                       today: Optional[datetime.date] = None) -> List[ArchivedPartition]:
+    """
+    Moves cold partitions to `<archive_dir>/<table>/<partition>.csv.gz` and drops them.
+    Each partition is handled in its own transaction; a failed copy leaves it attached.
+    """
+    retention_months = settings.PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+    archive_dir = archive_dir or settings.PARTITION_ARCHIVE_DIR
+    with engine.connect() as conn:
+        cold = cold_partitions(conn, retention_months, today)
+
+    archived = []
+    for table, partitions in cold.items():
+        os.makedirs(os.path.join(archive_dir, table), exist_ok=True)
+        for partition in partitions:
+            path = os.path.join(archive_dir, table, f"{partition}.csv.gz")
+            if dry_run:
+                archived.append(ArchivedPartition(table, partition, -1, path))
+                continue
+            with engine.begin() as conn:
+                # Block writers for the copy so the archive and the drop see the same rows
+                conn.execute(text(f'LOCK TABLE "{partition}" IN SHARE MODE'))
+                expected = conn.execute(text(f'SELECT count(*) FROM "{partition}"')).scalar()
+                rows = _copy_to_archive(conn, partition, path)
+                if rows != expected:
+                    raise RuntimeError(f"Archive of {partition} wrote {rows} rows, expected {expected}")
+                conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"'))
+                conn.execute(text(f'DROP TABLE "{partition}"'))
+            logger.info("Archived %s (%d rows) to %s", partition, rows, path)
+            archived.append(ArchivedPartition(table, partition, rows, path))
+    return archived
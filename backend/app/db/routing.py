@@ -0,0 +1,191 @@
+"""
+Primary / read-replica routing.
+
+Routes opt in explicitly by depending on get_read_db instead of get_db. The
+session they get is a RoutingSession: it picks its engine lazily, on the first
+query, once the request's user is known, and keeps that engine for the rest
+of the request.
+
+The replica is used only when all of the following hold:
+
+  * a replica is configured (DATABASE_REPLICA_URL),
+  * its replay lag, checked at most every REPLICA_LAG_CHECK_INTERVAL seconds,
+    is within REPLICA_MAX_LAG_SECONDS (an unreachable replica, or one whose
+    WAL receiver is not connected to the primary, counts as infinitely behind),
+  * the user has not committed a write within READ_YOUR_WRITES_SECONDS (or the
+    current lag, if that is longer), so users always read what they just wrote.
+
+Flushes on a RoutingSession always go to the primary. Write markers live in
+Redis (READ_YOUR_WRITES_STORE_URI, else REDIS_URL), so a write on one worker
+keeps the user's reads on the primary on every worker; if Redis cannot be
+reached the read goes to the primary. Without Redis the markers are per
+process, which is only correct with a single worker.
+
+The lag probe reads pg_stat_wal_receiver. Its status and last-message time are
+only visible to roles with pg_read_all_stats; without it the probe still sees
+whether a receiver is running.
+"""
+
+import math
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..core.cache import TTLCache
+from ..core.logging import logger
+
+LAG_SQL = text(
+    "SELECT r.pid AS receiver_pid, r.status AS receiver_status, "
+    "pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AS caught_up, "
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS replay_age, "
+    "EXTRACT(EPOCH FROM now() - r.last_msg_receipt_time) AS receipt_age "
+    "FROM (SELECT 1) AS one LEFT JOIN pg_stat_wal_receiver r ON true"
+)
+
+# The primary sends a keepalive at least every wal_sender_timeout / 2 (30 s by
+# default); a receiver silent for longer than this is not really streaming.
+MAX_RECEIVER_SILENCE = 60.0
+
+
+def replica_lag(row: Any) -> float:
+    """
+    Seconds the replica is behind, from one LAG_SQL row. A replica that has
+    replayed everything it received is current only while its WAL receiver is
+    connected; otherwise the age of the last replayed transaction is the lag.
+    """
+    if row.receiver_pid is None or row.receiver_status not in (None, "streaming"):
+        return math.inf   # not receiving WAL: there is no telling how far behind it is
+    if row.receipt_age is not None and row.receipt_age > MAX_RECEIVER_SILENCE:
+        return math.inf
+    if row.caught_up:
+        return 0.0   # an idle primary would otherwise look like a growing lag
+    return float(row.replay_age) if row.replay_age is not None else math.inf
+
+
+class MemoryWriteMarkers:
+    """Per-process write markers (single worker, tests)."""
+
+    def __init__(self, ttl: float):
+        self._writes = TTLCache(ttl=ttl, maxsize=100_000)
+
+    def mark(self, user_id: int) -> None:
+        self._writes.set(user_id, time.time())
+
+    def last_write(self, user_id: int) -> Optional[float]:
+        return self._writes.get(user_id)
+
+
+class RedisWriteMarkers:
+    """Write markers shared by every worker; keys expire after the longest window."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "ryw:"):
+        import redis
+
+        self.ttl = max(1, math.ceil(ttl))
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def mark(self, user_id: int) -> None:
+        self._redis.set(f"{self.prefix}{user_id}", repr(time.time()), ex=self.ttl)
+
+    def last_write(self, user_id: int) -> Optional[float]:
+        value = self._redis.get(f"{self.prefix}{user_id}")
+        return float(value) if value is not None else None
+
+
+def build_write_markers(url: Optional[str], ttl: float):
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisWriteMarkers(url, ttl)
+    return MemoryWriteMarkers(ttl)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: Engine,
+        replica: Optional[Engine],
+        max_lag: float = 5.0,
+        lag_check_interval: float = 2.0,
+        read_your_writes: float = 10.0,
+        writes=None,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.read_your_writes = read_your_writes
+        self._lag = TTLCache(ttl=lag_check_interval, maxsize=1)
+        self._writes = writes or MemoryWriteMarkers(max(read_your_writes, max_lag))
+
+    def note_write(self, user_id: int) -> None:
+        try:
+            self._writes.mark(user_id)
+        except Exception as e:
+            logger.warning(f"Read-your-writes marker not recorded: {type(e).__name__}")
+
+    def _measure_lag(self) -> float:
+        try:
+            with self.replica.connect() as conn:
+                return replica_lag(conn.execute(LAG_SQL).one())
+        except Exception:
+            return math.inf
+
+    def lag(self) -> float:
+        return self._lag.get_or_load("lag", self._measure_lag)
+
+    def engine_for(self, user_id: Optional[int]) -> Engine:
+        if self.replica is None or user_id is None:
+            return self.primary
+        lag = self.lag()
+        if lag > self.max_lag:
+            return self.primary
+        try:
+            last_write = self._writes.last_write(user_id)
+        except Exception:
+            return self.primary   # cannot tell whether the user just wrote
+        if last_write is not None and time.time() - last_write < max(self.read_your_writes, lag):
+            return self.primary
+        return self.replica
+
+
+class RoutingSession(Session):
+    """
+    Session for read-heavy routes. `info["router"]` is the ReplicaRouter and
+    `info["auth"]` the primary session's info dict, where authentication
+    records the user id.
+    """
+
+    _routed: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router: ReplicaRouter = self.info["router"]
+        if self._flushing:
+            return router.primary
+        if self._routed is None:
+            self._routed = router.engine_for(self.info.get("auth", {}).get("user_id"))
+        return self._routed
+
+    @property
+    def on_replica(self) -> bool:
+        return self._routed is not None and self._routed is self.info["router"].replica
+
+
+def track_writes(session_factory, router: ReplicaRouter) -> None:
+    """Records a write for the session's user whenever a commit flushed changes."""
+
+    @event.listens_for(session_factory, "after_flush")
+    def _flushed(session, flush_context):
+        session.info["wrote"] = True
+
+    @event.listens_for(session_factory, "after_commit")
+    def _committed(session):
+        if session.info.pop("wrote", False):
+            user_id = session.info.get("user_id") or session.info.get("auth", {}).get("user_id")
+            if user_id is not None:
+                router.note_write(user_id)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _rolled_back(session):
+        session.info.pop("wrote", None)
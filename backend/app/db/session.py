@@ -1,6 +1,11 @@
+import os
+
+from fastapi import Depends
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from ..core.config import settings
+from ..core import json_codec
+from .routing import ReplicaRouter, RoutingSession, build_write_markers, track_writes
 
 # ---------------------------------------------------------------------------
 # Engine — optimised for Render cloud PostgreSQL
@@ -10,17 +15,43 @@ _connect_args = {
     "options": "-c statement_timeout=30000",   # 30s hard limit per statement
 }
 
-engine = create_engine(
-    settings.DATABASE_URL,
+_engine_options = dict(
     pool_size=10,
     max_overflow=20,
     pool_timeout=30,
     pool_recycle=1800,          # Recycle connections before PG idle timeout
     pool_pre_ping=True,         # Drop stale connections automatically
     connect_args=_connect_args,
+    # JSONB columns are encoded / decoded by the shared orjson codec
+    json_serializer=json_codec.dumps_str,
+    json_deserializer=json_codec.loads,
+)
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options)
+
+# Optional streaming replica for read-heavy routes (see db/routing.py)
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, **_engine_options)
+    if settings.DATABASE_REPLICA_URL else None
+)
+
+router = ReplicaRouter(
+    engine,
+    replica_engine,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    read_your_writes=settings.READ_YOUR_WRITES_SECONDS,
+    writes=build_write_markers(
+        settings.READ_YOUR_WRITES_STORE_URI or os.getenv("REDIS_URL"),
+        max(settings.READ_YOUR_WRITES_SECONDS, settings.REPLICA_MAX_LAG_SECONDS),
+    ),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, info={"router": router})
+
+track_writes(SessionLocal, router)
+track_writes(ReadSessionLocal, router)
 
 
 def get_db():
@@ -30,3 +61,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(primary: Session = Depends(get_db)):
+    """
+    FastAPI dependency for read-heavy routes: a session served from the read
+    replica when it is current enough for this user, otherwise the primary.
+    Authentication still runs on the primary session, which records the user id.
+    """
+    db = ReadSessionLocal()
+    db.info["auth"] = primary.info
+    try:
+        yield db
+    finally:
+        db.close()
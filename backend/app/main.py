@@ -1,40 +1,44 @@
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 import logging
 
 logger = logging.getLogger(__name__)
+import os
 import sys
 from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from .core.exceptions import AppError, app_error_handler, general_exception_handler
-from .db.session import engine, SessionLocal
+from .db.session import engine, replica_engine, SessionLocal
 from .api.endpoints import auth, notes, patients, clinical, tasks, ai, copilot, hos, workflow, communication, hospital, encounter, admin, prescriptions, twilio
 from .models import Base
-from .core.ratelimit import limiter
+from .core.ratelimit import limiter, RateLimitMiddleware
+from .core.write_behind import audit_writer
+from .core.auth_cache import signing_keys
+from .core.events import events
+from .core.loop_monitor import loop_monitor
+from .core import metrics
+from .core.json_codec import FastJSONResponse
 from .core.config import Environment
 
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 from slowapi import _rate_limit_exceeded_handler
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from .core.logging import logger, request_id_contextvar
-import uuid
-import firebase_admin
-from firebase_admin import credentials
-
-# Initialize Firebase
-if not firebase_admin._apps:
-    cert_dict = {
-        "type": "service_account",
-        "project_id": settings.FIREBASE_PROJECT_ID,
-        "client_email": settings.FIREBASE_CLIENT_EMAIL,
-        "private_key": settings.FIREBASE_PRIVATE_KEY,
-        "token_uri": "https://oauth2.googleapis.com/token",
-    }
-    cred = credentials.Certificate(cert_dict)
-    firebase_admin.initialize_app(cred)
+from .core.middleware import RequestContextMiddleware
+from .core.logging import logger, queue_handler
+
+metrics_sampler = metrics.Sampler(
+    settings.METRICS_SAMPLE_SECONDS,
+    engines={"primary": engine, "replica": replica_engine},
+    queues={
+        "audit_write_behind": lambda: audit_writer.stats()["backlog"],
+        "log_records": queue_handler.queue.qsize,
+    },
+    celery_broker_url=os.getenv("REDIS_URL"),
+)
+
+# Firebase is initialised on first use (core/firebase.py); the signing-key
+# refresher started below does that off the request path.
 
 # Tables are managed by Alembic migrations
 # Base.metadata.create_all(bind=engine)
@@ -45,6 +49,9 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.ENV != Environment.production else None,
     docs_url=f"{settings.API_V1_STR}/docs" if settings.ENV != Environment.production else None,
     redoc_url=f"{settings.API_V1_STR}/redoc" if settings.ENV != Environment.production else None,
+    # Routes with a response_model are serialised by Pydantic directly; everything
+    # else (plain dicts / lists) renders through the shared orjson codec.
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -58,49 +65,11 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-app.add_middleware(SlowAPIMiddleware)
-
-# Security Headers Middleware
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        return response
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        request_id_contextvar.set(request_id)
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
-
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-
-@app.middleware("http")
-async def log_requests(request, call_next):
-    from .core.logging import logger
-    logger.info(f"Incoming Request: {request.method} {request.url}")
-    try:
-        response = await call_next(request)
-        logger.info(f"Response Status: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"Request Failed: {e}")
-        raise e
-
-# Limit payload size to 10MB
-class LimitUploadSize(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        if request.method == "POST":
-            if "content-length" in request.headers:
-                if int(request.headers["content-length"]) > 10 * 1024 * 1024:
-                    return JSONResponse(status_code=413, content={"detail": "Request too large"})
-        return await call_next(request)
+app.add_middleware(RateLimitMiddleware)
 
-app.add_middleware(LimitUploadSize)
+# Upload size limit (10MB; larger for note import), request id, security
+# headers and request logging — one pure ASGI layer (see core/middleware.py)
+app.add_middleware(RequestContextMiddleware)
 
 # CORS - MUST be the LAST middleware added (Starlette executes in reverse order,
 # so last-added = outermost wrapper = CORS headers on ALL responses including errors)
@@ -110,6 +79,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Exception Handlers
@@ -152,6 +122,25 @@ def health_check_db():
             content={"db": "disconnected", "error": str(e)}
         )
 
+@app.get("/api/health/loop")
+def health_check_loop():
+    """Event-loop lag histogram for this worker (see core/loop_monitor.py)."""
+    return {
+        "monitoring": loop_monitor.running,
+        "slow_threshold_ms": loop_monitor.slow_ms,
+        "slow_stalls": loop_monitor.slow_count,
+        "lag": loop_monitor.histogram.snapshot(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    """Prometheus exposition, merged across gunicorn workers (see core/metrics.py)."""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    if settings.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return Response(status_code=401)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
 # Legacy health check redirection or removal (optional, but keeping for compatibility if needed, 
 # though prompt asked for /api/health)
 @app.get("/health")
@@ -183,6 +172,32 @@ async def startup_event():
         if "https://clinical-sense.vercel.app" not in settings.BACKEND_CORS_ORIGINS:
              logger.warning("Production CORS origin missing: https://clinical-sense.vercel.app")
 
+    # Fetch token signing keys now and keep them fresh off the request path
+    signing_keys.start()
+
+    # Subscribe this worker to the WebSocket event backplane
+    await events.start()
+
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+
+    if settings.METRICS_ENABLED:
+        metrics_sampler.start()
+
+    if settings.AUDIT_WRITE_MODE == "async":
+        audit_writer.start(engine, Base.metadata)
+    else:
+        logger.info("Audit writes are synchronous (AUDIT_WRITE_MODE=sync)")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    signing_keys.stop()
+    await events.stop()
+    await loop_monitor.stop()
+    metrics_sampler.stop()
+    # Drain queued audit / telemetry rows; anything left stays in the spool for replay
+    audit_writer.stop()
+
 @app.get("/")
 def read_root():
     return {
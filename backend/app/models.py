@@ -1,8 +1,9 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, MetaData, UniqueConstraint, CheckConstraint, Index
+from sqlalchemy import JSON
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 import datetime
 import uuid
 
@@ -16,6 +17,10 @@ naming_convention = {
 metadata = MetaData(naming_convention=naming_convention)
 Base = declarative_base(metadata=metadata)
 
+# JSON documents stored as JSONB. Python None stays SQL NULL (so `IS NULL`
+# filters keep working); the plain JSON variant lets sqlite unit tests create the tables.
+JSONDocument = JSONB(none_as_null=True).with_variant(JSON(none_as_null=True), "sqlite")
+
 class User(Base):
     __tablename__ = "users"
     
@@ -67,7 +72,10 @@ class Patient(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
-    __table_args__ = (UniqueConstraint('user_id', 'mrn', name='uq_patient_user_mrn'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'mrn', name='uq_patient_user_mrn'),
+        Index('ix_patients_user_live_created', 'user_id', 'created_at', postgresql_where=text('is_deleted = false')),
+    )
     
     # Relationships
     creator = relationship("User", back_populates="patients")
@@ -84,6 +92,11 @@ class Patient(Base):
 
 class Admission(Base):
     __tablename__ = "admissions"
+    # Keyset pagination of patient sub-resource lists (see core/pagination.py)
+    __table_args__ = (
+        Index('ix_admissions_patient_created_id', 'patient_id', 'created_at', 'id'),
+        Index('ix_admissions_status', 'status'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False, index=True)
@@ -111,7 +124,7 @@ class ClinicalNote(Base):
     
     title = Column(String, index=True)
     raw_content = Column(Text, nullable=False)
-    structured_content = Column(Text)  # JSON or Structured SOAP
+    structured_content = Column(JSONDocument)  # Structured SOAP
     
     note_type = Column(String, default="SOAP", index=True) # 'SOAP', 'PROGRESS', 'DISCHARGE'
     status = Column(String, default="draft") # 'draft', 'finalized'
@@ -119,16 +132,24 @@ class ClinicalNote(Base):
     encounter_date = Column(DateTime, nullable=True, index=True)
     
     patient_summary = Column(Text, nullable=True) # Patient-friendly summary
-    embedding = Column(Text, nullable=True) # JSON string for vector search
+    embedding = deferred(Column(Text, nullable=True)) # JSON string for vector search (~8 KB, loaded on demand)
     
     is_deleted = Column(Boolean, default=False, index=True)
     deleted_at = Column(DateTime, nullable=True)
     
     idempotency_key = Column(String, unique=True, index=True, nullable=True)
+    import_job_id = Column(Integer, ForeignKey("note_import_jobs.id"), nullable=True, index=True)
 
     created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
+    __table_args__ = (
+        # Keyset pagination for note listings (see core/pagination.py)
+        Index('ix_clinical_notes_user_created_id', 'user_id', 'created_at', 'id'),
+        Index('ix_clinical_notes_patient_live_created', 'patient_id', 'created_at',
+              postgresql_where=text('is_deleted = false')),
+    )
+
     owner = relationship("User", back_populates="notes")
     patient = relationship("Patient", back_populates="notes")
     admission = relationship("Admission", back_populates="clinical_notes")
@@ -136,6 +157,28 @@ class ClinicalNote(Base):
     versions = relationship("NoteVersion", back_populates="note")
     ai_insights = relationship("ClinicalAIInsight", back_populates="note", uselist=False)
 
+class NoteImportJob(Base):
+    """Bulk historical note import. Enrichment (structuring + embeddings) runs afterwards in Celery."""
+    __tablename__ = "note_import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    source_format = Column(String, nullable=False)  # csv / ndjson
+    source_name = Column(String, nullable=True)
+    status = Column(String, default="pending", index=True)  # pending / inserting / enriching / completed / completed_with_errors / failed
+
+    total_rows = Column(Integer, default=0)
+    inserted_rows = Column(Integer, default=0)
+    skipped_rows = Column(Integer, default=0)   # duplicate idempotency keys
+    invalid_rows = Column(Integer, default=0)
+    enrichment_failed = Column(Integer, default=0)
+    enrichment_queued_at = Column(DateTime, nullable=True)  # last time enqueue_note_enrichment queued work
+    insert_seconds = Column(Float, nullable=True)
+    error_summary = Column(Text, nullable=True)  # First N row errors, newline separated
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
 class NoteVersion(Base):
     __tablename__ = "note_versions"
     
@@ -143,7 +186,7 @@ class NoteVersion(Base):
     note_id = Column(Integer, ForeignKey("clinical_notes.id"), index=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     
-    structured_content = Column(Text)
+    structured_content = Column(JSONDocument)
     raw_content = Column(Text)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
@@ -151,6 +194,7 @@ class NoteVersion(Base):
 
 class MedicalHistory(Base):
     __tablename__ = "medical_history"
+    __table_args__ = (Index('ix_medical_history_patient_created_id', 'patient_id', 'created_at', 'id'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -182,6 +226,7 @@ class Allergy(Base):
 
 class Medication(Base):
     __tablename__ = "medications"
+    __table_args__ = (Index('ix_medications_patient_created_id', 'patient_id', 'created_at', 'id'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -202,6 +247,7 @@ class Medication(Base):
 
 class Procedure(Base):
     __tablename__ = "procedures"
+    __table_args__ = (Index('ix_procedures_patient_created_id', 'patient_id', 'created_at', 'id'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -222,6 +268,7 @@ class Procedure(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (Index('ix_documents_patient_created_id', 'patient_id', 'created_at', 'id'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -276,6 +323,11 @@ class DischargeReadiness(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index('ix_tasks_patient_created_id', 'patient_id', 'created_at', 'id'),
+        Index('ix_tasks_patient_status', 'patient_id', 'status'),
+        Index('ix_tasks_status_category', 'status', 'category'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=True)
@@ -299,6 +351,7 @@ class Task(Base):
 
 class BillingItem(Base):
     __tablename__ = "billing_items"
+    __table_args__ = (Index('ix_billing_items_patient_created_id', 'patient_id', 'created_at', 'id'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -323,7 +376,9 @@ class AuditLog(Base):
     action = Column(String, nullable=False)
     entity_type = Column(String, nullable=True) # 'Patient', 'Medication', etc.
     entity_id = Column(Integer, nullable=True)
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    # Partition key: the table is range-partitioned by month on `timestamp`
+    # (app/db/partitions.py); the database primary key is (id, timestamp).
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     details = Column(Text, nullable=True)
     
     user = relationship("User", back_populates="audit_logs")
@@ -336,9 +391,9 @@ class ClinicalAIInsight(Base):
     note_id = Column(Integer, ForeignKey("clinical_notes.id"), nullable=False, index=True)
     
     risk_score = Column(String, nullable=True) # High/Medium/Low
-    red_flags = Column(Text, nullable=True) # JSON list
-    suggestions = Column(Text, nullable=True) # JSON list
-    missing_info = Column(Text, nullable=True) # JSON list
+    red_flags = Column(JSONDocument, nullable=True) # JSON list
+    suggestions = Column(JSONDocument, nullable=True) # JSON list
+    missing_info = Column(JSONDocument, nullable=True) # JSON list
     news2_score = Column(Integer, nullable=True)
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -361,6 +416,7 @@ class DifferentialDiagnosis(Base):
 
 class HospitalPatientRisk(Base):
     __tablename__ = "hospital_patient_risk"
+    __table_args__ = (Index('ix_hospital_patient_risk_risk_level', 'risk_level'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False, unique=True, index=True)
@@ -370,6 +426,7 @@ class HospitalPatientRisk(Base):
     suggested_actions = Column(Text, nullable=True) # JSON list of actions
     
     last_updated = Column(DateTime, default=datetime.datetime.utcnow)
+    scanned_note_at = Column(DateTime, nullable=True) # created_at of the latest note the last scan scored
     
     patient = relationship("Patient", back_populates="risk_profile")
 
@@ -412,6 +469,10 @@ class PatientCommunication(Base):
 
 class SecureMessage(Base):
     __tablename__ = "secure_messages"
+    __table_args__ = (
+        Index('ix_secure_messages_patient_created_id', 'patient_id', 'created_at', 'id'),
+        Index('ix_secure_messages_category_status', 'category', 'status'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False, index=True)
@@ -422,7 +483,7 @@ class SecureMessage(Base):
     
     urgency_score = Column(Integer, default=0) # 0-10
     category = Column(String, default="Routine") # Routine, Urgent, Emergency
-    flagged_keywords = Column(Text, nullable=True) # JSON list
+    flagged_keywords = Column(JSONDocument, nullable=True) # JSON list
     
     draft_response = Column(Text, nullable=True) # AI Draft
     status = Column(String, default="Unread") # Unread, Replied, Archived
@@ -440,7 +501,7 @@ class ShiftHandover(Base):
     generated_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     shift_type = Column(String) # "Day", "Night"
-    content = Column(Text) # JSON summary
+    content = Column(JSONDocument) # JSON summary
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
@@ -449,14 +510,15 @@ class ShiftHandover(Base):
 
 class ReadmissionRisk(Base):
     __tablename__ = "readmission_risks"
+    __table_args__ = (Index('ix_readmission_risks_level_patient', 'risk_level', 'patient_id'),)
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False, index=True)
     
     risk_score = Column(Integer) # 0-100
     risk_level = Column(String) # Low, Medium, High
-    contributing_factors = Column(Text) # JSON
-    prevention_recommendations = Column(Text) # JSON
+    contributing_factors = Column(JSONDocument) # JSON list
+    prevention_recommendations = Column(JSONDocument) # JSON list
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
@@ -496,8 +558,8 @@ class AIEncounter(Base):
     encounter_date = Column(DateTime, nullable=False)
     raw_note = Column(Text, nullable=False)
 
-    # SOAP output (JSON string)
-    soap_note = Column(Text, nullable=True)
+    # SOAP output
+    soap_note = Column(JSONDocument, nullable=True)
 
     # Summary outputs
     chief_complaint = Column(String, nullable=True)
@@ -509,13 +571,13 @@ class AIEncounter(Base):
 
     # Risk
     risk_score = Column(String, nullable=True)               # High / Medium / Low
-    risk_flags = Column(Text, nullable=True)                 # JSON list
+    risk_flags = Column(JSONDocument, nullable=True)         # JSON list
 
     # Medico-legal
-    legal_flags = Column(Text, nullable=True)                # JSON list
+    legal_flags = Column(JSONDocument, nullable=True)        # JSON list
 
     # Pipeline statuses (JSON list of {pipeline_name, status, error, latency_ms})
-    pipeline_statuses = Column(Text, nullable=True)
+    pipeline_statuses = Column(JSONDocument, nullable=True)
 
     # Status flags
     status = Column(String, default="pending")               # pending / ready / confirmed / rejected
@@ -524,15 +586,27 @@ class AIEncounter(Base):
     confirmed_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
     # Token usage telemetry (JSON)
-    token_usage = Column(Text, nullable=True)
+    token_usage = Column(JSONDocument, nullable=True)
 
     # Observability — added safely as nullable
     model_version = Column(String(100), nullable=True)
     processing_latency_ms = Column(Integer, nullable=True)
+    # Quality-report risk level, stored with the encounter because the report
+    # itself may still be in the write-behind queue when the encounter is confirmed
+    quality_risk_level = Column(String(20), nullable=True)
+
+    # Pre-serialised EncounterResponse JSON, written on generate / confirm and
+    # returned verbatim by read endpoints. Deferred so list queries skip it.
+    response_snapshot = deferred(Column(Text, nullable=True))
+    snapshot_version = Column(Integer, nullable=True)
 
     created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_ai_encounters_patient_creator_created', 'patient_id', 'created_by_id', 'created_at'),
+    )
+
     # Relationships
     patient = relationship("Patient", backref="ai_encounters")
     note = relationship("ClinicalNote")
@@ -565,7 +639,7 @@ class AIGeneratedMedication(Base):
 
     # If structured date is missing, doctor must confirm
     requires_confirmation = Column(Boolean, default=False)
-    fields_required = Column(Text, nullable=True)         # JSON list of missing fields
+    fields_required = Column(JSONDocument, nullable=True)  # JSON list of missing fields
 
     # Doctor confirmation
     is_confirmed = Column(Boolean, default=False)
@@ -746,7 +820,8 @@ class AIQualityReport(Base):
     # Feature Toggles
     evidence_mode_enabled = Column(Boolean, default=False)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Monthly partition key (app/db/partitions.py)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     __table_args__ = (
         CheckConstraint("risk_level IN ('LOW','MEDIUM','HIGH')", name="ck_quality_risk_level"),
@@ -768,7 +843,8 @@ class AIUsageMetrics(Base):
     accepted_without_edit = Column(Boolean, default=False)
     edit_distance_score = Column(Float, nullable=True)   # 0.0 = no edits, 1.0 = fully rewritten
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Monthly partition key (app/db/partitions.py)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     __table_args__ = (
         Index('ix_ai_usage_metrics_user_created', 'user_id', 'created_at'),
@@ -778,6 +854,48 @@ class AIUsageMetrics(Base):
     user = relationship("User")
 
 
+class _AIGovernanceRollupColumns:
+    """
+    Shared shape of the hourly / daily governance rollups. One row per
+    (bucket_start, model_version, risk_level); maintained incrementally as
+    encounters are persisted and confirmed.
+    """
+    id = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)   # UTC, truncated to hour / day
+    model_version = Column(String(100), nullable=False, default="unknown")
+    risk_level = Column(String(20), nullable=False, default="UNKNOWN")
+
+    encounters = Column(Integer, nullable=False, default=0)
+    confirmed = Column(Integer, nullable=False, default=0)
+    tokens_sum = Column(Integer, nullable=False, default=0)
+    latency_ms_sum = Column(Float, nullable=False, default=0.0)
+    latency_count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    compliance_sum = Column(Float, nullable=False, default=0.0)
+    quality_count = Column(Integer, nullable=False, default=0)
+    edit_distance_sum = Column(Float, nullable=False, default=0.0)
+    edit_distance_count = Column(Integer, nullable=False, default=0)
+
+    # Mergeable quantile sketches (see services/analytics/quantile_sketch.py)
+    latency_sketch = Column(JSONB, nullable=True)
+    confidence_sketch = Column(JSONB, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+class AIGovernanceRollupHourly(_AIGovernanceRollupColumns, Base):
+    __tablename__ = "ai_governance_rollups_hourly"
+    __table_args__ = (
+        UniqueConstraint('bucket_start', 'model_version', 'risk_level', name='uq_ai_governance_rollups_hourly_bucket'),
+    )
+
+
+class AIGovernanceRollupDaily(_AIGovernanceRollupColumns, Base):
+    __tablename__ = "ai_governance_rollups_daily"
+    __table_args__ = (
+        UniqueConstraint('bucket_start', 'model_version', 'risk_level', name='uq_ai_governance_rollups_daily_bucket'),
+    )
+
 class Prescription(Base):
     """Printable digital prescriptions for patients."""
     __tablename__ = "prescriptions"
@@ -21,7 +21,7 @@ class SecureMessageResponse(BaseModel):
     content: str
     urgency_score: int = 0
     category: str = "Routine"
-    flagged_keywords: Optional[str] = None
+    flagged_keywords: Optional[Any] = None
     draft_response: Optional[str] = None
     status: str
     created_at: datetime
@@ -32,7 +32,7 @@ class SecureMessageResponse(BaseModel):
 class ShiftHandoverResponse(BaseModel):
     id: int
     shift_type: str
-    content: Optional[str] = None
+    content: Optional[Any] = None
     created_at: datetime
     
     class Config:
@@ -42,8 +42,8 @@ class ReadmissionRiskResponse(BaseModel):
     id: int
     risk_score: int
     risk_level: str
-    contributing_factors: Optional[str] = None
-    prevention_recommendations: Optional[str] = None
+    contributing_factors: Optional[Any] = None
+    prevention_recommendations: Optional[Any] = None
     created_at: datetime
     
     class Config:
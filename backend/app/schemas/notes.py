@@ -58,9 +58,44 @@ class NoteResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
+class NoteListItem(BaseModel):
+    """Compact row for note listings; full content comes from GET /notes/{id}."""
+    id: int
+    title: Optional[str]
+    note_type: str
+    patient_id: Optional[int]
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    encounter_date: Optional[datetime] = None
+    preview: str = ""
+    is_structured: bool = False
+
+    model_config = {"from_attributes": True}
+
 class NoteUpdateRequest(BaseModel):
     title: Optional[str] = None
     structured_content: Optional[Any] = None
     status: Optional[str] = None # 'draft', 'finalized'
     patient_id: Optional[int] = None
     encounter_date: Optional[datetime] = None
+
+# --- Bulk Import Schemas ---
+class NoteImportJobResponse(BaseModel):
+    id: int
+    status: str
+    source_format: str
+    source_name: Optional[str] = None
+    total_rows: int = 0
+    inserted_rows: int = 0
+    skipped_rows: int = 0
+    invalid_rows: int = 0
+    enriched_rows: int = 0
+    enrichment_failed: int = 0
+    pending_structuring: int = 0
+    pending_embeddings: int = 0
+    insert_seconds: Optional[float] = None
+    rows_per_second: Optional[float] = None
+    errors: List[str] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
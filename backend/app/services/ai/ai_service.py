@@ -1,4 +1,3 @@
-import groq
 import json
 import time
 import asyncio
@@ -7,14 +6,48 @@ from fastapi import HTTPException
 from ...core.config import settings
 from ...core.logging import logger, request_id_contextvar
 from .prompts import PROMPTS
+from ...core.lazy import lazy_import
+from ...core import metrics
+from .batching import BatchStats, OUTPUT_TOKENS_PER_ITEM, VALIDATORS, estimate_tokens, pack_batches, split_results
+
+groq = lazy_import("groq")
+
 
 class AIService:
+    _shared_client = None
+    _shared_async_client = None
+
     def __init__(self):
+        self._client = None
+        self._async_client = None
         if not settings.GROQ_API_KEY:
             logger.critical("GROQ_API_KEY is missing. AI structured note generation will fail.")
-            self.client = None
-        else:
-            self.client = groq.Groq(api_key=settings.GROQ_API_KEY)
+
+    @property
+    def client(self):
+        """Groq client, created on first use and shared by all instances."""
+        if self._client is None and settings.GROQ_API_KEY:
+            if AIService._shared_client is None:
+                AIService._shared_client = groq.Groq(api_key=settings.GROQ_API_KEY)
+            self._client = AIService._shared_client
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    @property
+    def async_client(self):
+        """AsyncGroq client for calls that may be cancelled mid-request (the copilot)."""
+        if self._async_client is None and settings.GROQ_API_KEY:
+            if AIService._shared_async_client is None:
+                AIService._shared_async_client = groq.AsyncGroq(api_key=settings.GROQ_API_KEY)
+            self._async_client = AIService._shared_async_client
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, value):
+        self._async_client = value
 
     async def transcribe_audio(self, audio_content: bytes, filename: str = "audio.webm") -> Dict[str, Any]:
         """
@@ -29,11 +62,12 @@ class AIService:
             audio_file = BytesIO(audio_content)
             audio_file.name = filename
             
-            transcription = self.client.audio.transcriptions.create(
-                file=audio_file,
-                model="whisper-large-v3",
-                response_format="verbose_json",
-            )
+            with metrics.llm_call("TRANSCRIBE"):
+                transcription = self.client.audio.transcriptions.create(
+                    file=audio_file,
+                    model="whisper-large-v3",
+                    response_format="verbose_json",
+                )
             return {
                 "transcript": transcription.text,
                 "confidence": getattr(transcription, "avg_logprob", 0.0) # approx
@@ -92,15 +126,17 @@ class AIService:
             try:
                 start_time = time.time()
                 # Strict timeout to prevent hanging requests
-                response = self.client.chat.completions.create(
-                    model=settings.GROQ_MODEL,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_content}
-                    ],
-                    response_format={"type": "json_object"},
-                    timeout=20.0 
-                )
+                with metrics.llm_call(note_type) as call:
+                    response = self.client.chat.completions.create(
+                        model=settings.GROQ_MODEL,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_content}
+                        ],
+                        response_format={"type": "json_object"},
+                        timeout=20.0 
+                    )
+                    call.record(response)
                 latency = time.time() - start_time
                 
                 content = response.choices[0].message.content
@@ -137,14 +173,16 @@ class AIService:
         system_prompt = "You are a senior clinical documentation assistant. Summarize the patient clinical history into a professional, concise summary. Stick to facts entered. No advice."
         
         try:
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": history_text}
-                ],
-                timeout=25.0
-            )
+            with metrics.llm_call("SUMMARY") as call:
+                response = self.client.chat.completions.create(
+                    model=settings.GROQ_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": history_text}
+                    ],
+                    timeout=25.0
+                )
+                call.record(response)
             return response.choices[0].message.content
         except Exception as e:
             logger.error(f"Summarization error: {str(e)}")
@@ -170,15 +208,17 @@ class AIService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": PROMPTS["RISK_ANALYSIS"]},
-                    {"role": "user", "content": context_str}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3
-            )
+            with metrics.llm_call("RISK_ANALYSIS") as call:
+                response = self.client.chat.completions.create(
+                    model=settings.GROQ_MODEL,
+                    messages=[
+                        {"role": "system", "content": PROMPTS["RISK_ANALYSIS"]},
+                        {"role": "user", "content": context_str}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.3
+                )
+                call.record(response)
             return json.loads(response.choices[0].message.content)
         except Exception as e:
             logger.error(f"Risk analysis failed: {e}")
@@ -190,16 +230,18 @@ class AIService:
 
         input_text = f"Patient: {age} {gender}. Symptoms: {', '.join(symptoms)}. Vitals: {vitals}"
         try:
-             response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": PROMPTS["DIFFERENTIAL"]},
-                    {"role": "user", "content": input_text}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.4
-            )
-             return json.loads(response.choices[0].message.content)
+            with metrics.llm_call("DIFFERENTIAL") as call:
+                response = self.client.chat.completions.create(
+                    model=settings.GROQ_MODEL,
+                    messages=[
+                        {"role": "system", "content": PROMPTS["DIFFERENTIAL"]},
+                        {"role": "user", "content": input_text}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.4
+                )
+                call.record(response)
+            return json.loads(response.choices[0].message.content)
         except Exception as e:
             logger.error(f"Differential diagnosis failed: {e}")
             return {"differentials": []}
@@ -209,33 +251,41 @@ class AIService:
             return {"suggestions": [], "missing_info": []}
 
         try:
-             response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": PROMPTS["MEDICO_LEGAL"]},
-                    {"role": "user", "content": note_text}
-                ],
-                response_format={"type": "json_object"}
-            )
-             return json.loads(response.choices[0].message.content)
+            with metrics.llm_call("MEDICO_LEGAL") as call:
+                response = self.client.chat.completions.create(
+                    model=settings.GROQ_MODEL,
+                    messages=[
+                        {"role": "system", "content": PROMPTS["MEDICO_LEGAL"]},
+                        {"role": "user", "content": note_text}
+                    ],
+                    response_format={"type": "json_object"}
+                )
+                call.record(response)
+            return json.loads(response.choices[0].message.content)
         except Exception as e:
             logger.error(f"Medico-legal review failed: {e}")
             return {"suggestions": [], "missing_info": []}
             
     async def get_copilot_suggestion(self, partial_text: str) -> Dict[str, Any]:
-        if not self.client:
+        """
+        Async client, so cancelling the awaiting task (newer text arrived)
+        aborts the HTTP request instead of leaving a thread to finish it.
+        """
+        if not self.async_client:
             return {"suggestions": [], "warnings": []}
 
         try:
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": PROMPTS["COPILOT"]},
-                    {"role": "user", "content": partial_text}
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=150
-            )
+            with metrics.llm_call("COPILOT") as call:
+                response = await self.async_client.chat.completions.create(
+                    model=settings.GROQ_MODEL,
+                    messages=[
+                        {"role": "system", "content": PROMPTS["COPILOT"]},
+                        {"role": "user", "content": partial_text}
+                    ],
+                    response_format={"type": "json_object"},
+                    max_tokens=150
+                )
+                call.record(response)
             return json.loads(response.choices[0].message.content)
         except Exception as e:
             logger.error(f"Copilot suggestion failed: {e}")
@@ -330,18 +380,115 @@ class AIService:
                 {"role": "user", "content": json.dumps(context, default=str)}
             ]
 
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=messages,
-                temperature=0.1, # Low temp for analytical tasks
-                response_format={"type": "json_object"}
-            )
+            # Sync client: run off the event loop so concurrent scans actually overlap
+            with metrics.llm_call(agent_type) as call:
+                response = await asyncio.to_thread(
+                    self.client.chat.completions.create,
+                    model=settings.GROQ_MODEL,
+                    messages=messages,
+                    temperature=0.1, # Low temp for analytical tasks
+                    response_format={"type": "json_object"}
+                )
+                call.record(response)
             
             content = response.choices[0].message.content
             return json.loads(content)
         except Exception as e:
             return {"error": str(e)}
 
+    async def _chat_json(self, system_prompt: str, payload: Any, max_tokens: Optional[int] = None,
+                         prompt_key: str = "JSON"):
+        """Single JSON-mode completion. Returns (parsed_json, usage_dict)."""
+        kwargs = {}
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        with metrics.llm_call(prompt_key) as call:
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
+                model=settings.GROQ_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": json.dumps(payload, default=str)}
+                ],
+                temperature=0.1,
+                response_format={"type": "json_object"},
+                **kwargs
+            )
+            call.record(response)
+        usage = getattr(response, "usage", None)
+        usage_dict = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        }
+        return json.loads(response.choices[0].message.content), usage_dict
+
+    async def run_hospital_agent_batch(
+        self,
+        agent_type: str,
+        items: List[Dict[str, Any]],
+        stats: Optional[BatchStats] = None,
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Multi-item variant of run_hospital_agent for population scans (DETERIORATION, STAFF).
+        Every item must carry an "id". Items are packed into BATCH_<agent_type> prompts
+        sized to the token limits; entries that come back missing or invalid are
+        retried one at a time with the single-item prompt.
+        Returns {id: result} for items that produced a valid result.
+        """
+        stats = stats if stats is not None else BatchStats()
+        batch_prompt = PROMPTS.get(f"BATCH_{agent_type}")
+        single_prompt = PROMPTS.get(agent_type)
+        if not batch_prompt or not single_prompt:
+            logger.error(f"No batch prompt for agent type: {agent_type}")
+            return {}
+        if not self.client or not items:
+            return {}
+
+        per_item_out = OUTPUT_TOKENS_PER_ITEM.get(agent_type, 150)
+        max_items = max(1, min(settings.HOS_BATCH_MAX_ITEMS, settings.HOS_BATCH_MAX_OUTPUT_TOKENS // per_item_out))
+        input_budget = max(1, settings.HOS_BATCH_MAX_INPUT_TOKENS - estimate_tokens(batch_prompt))
+        validator = VALIDATORS.get(agent_type, lambda e: True)
+
+        results: Dict[Any, Dict[str, Any]] = {}
+        singles: List[Dict[str, Any]] = []
+        retry: List[Dict[str, Any]] = []
+        stats.items += len(items)
+
+        for batch in pack_batches(items, input_budget, max_items):
+            if len(batch) == 1:
+                singles.extend(batch)
+                continue
+            stats.batches += 1
+            stats.batch_sizes.append(len(batch))
+            try:
+                response, usage = await self._chat_json(
+                    batch_prompt, {"items": batch}, max_tokens=per_item_out * len(batch) + 256,
+                    prompt_key=f"BATCH_{agent_type}",
+                )
+                stats.add_usage(usage)
+            except Exception as e:
+                stats.batch_calls_failed += 1
+                logger.warning(f"{agent_type} batch of {len(batch)} failed: {type(e).__name__}")
+                response = None
+            valid, invalid = split_results(agent_type, batch, response)
+            results.update(valid)
+            retry.extend(invalid)
+
+        stats.individual_retries += len(retry)
+        for item in singles + retry:
+            context = {k: v for k, v in item.items() if k != "id"}
+            try:
+                result, usage = await self._chat_json(single_prompt, context, prompt_key=agent_type)
+                stats.add_usage(usage)
+            except Exception:
+                result = None
+            if isinstance(result, dict) and validator(result):
+                results[item["id"]] = result
+            else:
+                stats.failed_items += 1
+
+        return results
+
     async def generate_patient_communication(self, note_text: str, language: str = "en") -> Dict[str, Any]:
         context = {"note_text": note_text, "language": language}
         return await self.run_hospital_agent("PATIENT_SUMMARY", context)
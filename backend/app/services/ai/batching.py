@@ -0,0 +1,148 @@
+"""
+Multi-item prompt batching for population scans.
+
+Packs many compact contexts (each carrying an "id") into one BATCH_* prompt,
+sized so that both the request and the expected response fit the model's
+token limits. Output entries are validated one by one; only items whose entry
+is missing or invalid need a follow-up call.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Rough but stable: ~4 characters per token for English/JSON payloads
+CHARS_PER_TOKEN = 4
+
+# Expected response size per item, used to cap items per batch
+OUTPUT_TOKENS_PER_ITEM = {
+    "DETERIORATION": 110,
+    "STAFF": 60,
+}
+
+RISK_LEVELS = {"Critical", "High", "Medium", "Low"}
+
+
+def estimate_tokens(payload: Any) -> int:
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str, separators=(",", ":"))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def pack_batches(
+    items: List[Dict[str, Any]],
+    input_budget: int,
+    max_items: int,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Greedy, order-preserving packing. A batch closes when adding the next item
+    would exceed `input_budget` tokens or `max_items` entries. An item larger
+    than the whole budget still gets a batch of its own.
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for item in items:
+        cost = estimate_tokens(item)
+        if current and (used + cost > input_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ---------------------------------------------------------------------------
+# Per-entry validation
+# ---------------------------------------------------------------------------
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_deterioration(entry: Dict[str, Any]) -> bool:
+    score = entry.get("risk_score")
+    return (
+        _is_number(score) and 0 <= score <= 100
+        and entry.get("risk_level") in RISK_LEVELS
+        and isinstance(entry.get("suggested_actions", []), list)
+    )
+
+
+def validate_staff(entry: Dict[str, Any]) -> bool:
+    workload = entry.get("workload_score")
+    burnout = entry.get("burnout_risk")
+    return (
+        _is_number(workload) and 0 <= workload <= 100
+        and _is_number(burnout) and 0.0 <= burnout <= 1.0
+    )
+
+
+VALIDATORS: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    "DETERIORATION": validate_deterioration,
+    "STAFF": validate_staff,
+}
+
+
+def split_results(
+    agent_type: str,
+    batch: List[Dict[str, Any]],
+    response: Any,
+) -> Tuple[Dict[Any, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Matches response entries to input items by id.
+    Returns ({id: valid_entry}, [items needing an individual retry]).
+    """
+    validator = VALIDATORS.get(agent_type, lambda e: True)
+    entries = response.get("results") if isinstance(response, dict) else None
+    by_id: Dict[str, Dict[str, Any]] = {}
+    if isinstance(entries, list):
+        for entry in entries:
+            if isinstance(entry, dict) and "id" in entry:
+                # Models sometimes echo ids as strings
+                by_id[str(entry["id"])] = entry
+
+    valid: Dict[Any, Dict[str, Any]] = {}
+    retry: List[Dict[str, Any]] = []
+    for item in batch:
+        entry = by_id.get(str(item["id"]))
+        if entry is not None and validator(entry):
+            valid[item["id"]] = entry
+        else:
+            retry.append(item)
+    return valid, retry
+
+
+@dataclass
+class BatchStats:
+    items: int = 0
+    batches: int = 0
+    batch_calls_failed: int = 0
+    individual_retries: int = 0
+    failed_items: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    batch_sizes: List[int] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add_usage(self, usage: Optional[Dict[str, int]]):
+        if usage:
+            self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+            self.completion_tokens += usage.get("completion_tokens", 0) or 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "batch_calls_failed": self.batch_calls_failed,
+            "individual_retries": self.individual_retries,
+            "failed_items": self.failed_items,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "avg_batch_size": round(sum(self.batch_sizes) / len(self.batch_sizes), 1) if self.batch_sizes else 0,
+        }
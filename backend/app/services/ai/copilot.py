@@ -0,0 +1,100 @@
+"""
+Real-time copilot suggestions for the /ws/copilot loop.
+
+The editor sends the whole note on every pause in typing. Per connection,
+CopilotSession keeps at most one suggestion in flight:
+
+  - newer text cancels the pending task, whether it is still in its debounce
+    window or already waiting on the LLM (the async Groq request is aborted),
+    so only the latest text is ever answered;
+  - suggestions are cached by normalised prefix (case and whitespace folded,
+    trailing half-typed word dropped), shared by every connection on the
+    worker; a hit is answered immediately, without the debounce;
+  - every reply carries latency_ms, measured from the moment its text arrived
+    to the moment the reply was sent, and is logged.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ...core.cache import TTLCache
+from ...core.config import settings
+from ...core.logging import logger
+
+DISCLAIMER = "AI-generated suggestion. Clinical validation required."
+
+_WHITESPACE = re.compile(r"\s+")
+_PARTIAL_WORD = re.compile(r"\w+$")
+
+suggestion_cache = TTLCache(ttl=settings.COPILOT_CACHE_TTL, maxsize=settings.COPILOT_CACHE_SIZE)
+
+
+def prefix_key(text: str, field: Optional[str] = None) -> str:
+    """Cache key for `text`: equal for texts that differ only in case, spacing or a half-typed last word."""
+    normalised = _WHITESPACE.sub(" ", text.lower()).strip()
+    if not text[-1:].isspace():
+        normalised = _PARTIAL_WORD.sub("", normalised).rstrip()
+    return hashlib.blake2b(f"{field or ''}|{normalised}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CopilotSession:
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[Any]],
+        ai_service,
+        cache: TTLCache = suggestion_cache,
+        debounce: float = settings.COPILOT_DEBOUNCE_MS / 1000,
+        min_chars: int = settings.COPILOT_MIN_CHARS,
+    ):
+        self.send = send
+        self.ai = ai_service
+        self.cache = cache
+        self.debounce = debounce
+        self.min_chars = min_chars
+        self.cancelled = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, text: str, field: Optional[str] = None) -> None:
+        """Supersedes whatever is pending with a suggestion for `text`."""
+        received_at = time.perf_counter()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.cancelled += 1
+        self._task = None
+        if len(text.strip()) < self.min_chars:
+            return
+        self._task = asyncio.create_task(self._suggest(text, field, received_at))
+
+    async def _suggest(self, text: str, field: Optional[str], received_at: float):
+        key = prefix_key(text, field)
+        suggestion = self.cache.get(key)
+        cached = suggestion is not None
+        if not cached:
+            await asyncio.sleep(self.debounce)
+            suggestion = await self.ai.get_copilot_suggestion(text)
+            # Empty results are also what a failed call returns; don't pin those
+            if suggestion.get("suggestions") or suggestion.get("warnings"):
+                self.cache.set(key, suggestion)
+
+        latency_ms = round((time.perf_counter() - received_at) * 1000, 1)
+        try:
+            await self.send({**suggestion, "disclaimer": DISCLAIMER, "latency_ms": latency_ms, "cached": cached})
+        except Exception as e:
+            logger.warning(f"Copilot reply not delivered: {e}")
+            return
+        logger.info(
+            f"Copilot suggestion in {latency_ms} ms",
+            extra={"metadata": {"latency_ms": latency_ms, "cached": cached, "superseded": self.cancelled}},
+        )
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -574,3 +574,49 @@ PROMPTS["CLINICAL_EXPLAINER"] = CLINICAL_EXPLAINER_PROMPT
 PROMPTS["DIFFERENTIAL_ASSISTANT"] = DIFFERENTIAL_ASSISTANT_PROMPT
 PROMPTS["SBAR_HANDOFF"] = SBAR_HANDOFF_PROMPT
 
+
+# =========================================================
+# POPULATION SCANS — MULTI-ITEM BATCH PROMPTS
+# One request scores many patients / staff members; every
+# output entry must echo the input "id" so it can be matched.
+# =========================================================
+
+BATCH_DETERIORATION_PROMPT = """
+You are an AI Deterioration Predictor. You receive a list of patients, each with an "id",
+age, gender and an excerpt of their most recent clinical note.
+Assess EACH patient independently. Assign a risk score (0-100) and risk level.
+
+OUTPUT JSON FORMAT (one entry per input patient, same "id", no omissions):
+{
+    "results": [
+        {
+            "id": <input id>,
+            "risk_score": 0-100,
+            "risk_level": "Critical" | "High" | "Medium" | "Low",
+            "reasoning": "Brief explanation",
+            "suggested_actions": ["Action 1", "Action 2"]
+        }
+    ]
+}
+"""
+
+BATCH_STAFF_PROMPT = """
+You are a Staff Well-being Analyst. You receive a list of doctors, each with an "id",
+active patient count and notes written in the last week.
+Assess EACH doctor independently and compute burnout risk.
+
+OUTPUT JSON FORMAT (one entry per input doctor, same "id", no omissions):
+{
+    "results": [
+        {
+            "id": <input id>,
+            "workload_score": 0-100,
+            "burnout_risk": 0.0-1.0,
+            "recommendations": ["Reduce on-call", "Schedule break"]
+        }
+    ]
+}
+"""
+
+PROMPTS["BATCH_DETERIORATION"] = BATCH_DETERIORATION_PROMPT
+PROMPTS["BATCH_STAFF"] = BATCH_STAFF_PROMPT
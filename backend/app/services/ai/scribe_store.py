@@ -0,0 +1,95 @@
+"""
+Accumulated transcripts for live scribe sessions.
+
+The frontend uploads ~5.5 s audio chunks to /ai/transcribe; each transcript
+is appended to its session and the whole accumulated text is returned.
+
+MemoryScribeStore — per-process TTLCache: O(1) sliding expiry on access,
+                    LRU eviction beyond SCRIBE_MAX_SESSIONS.
+RedisScribeStore  — shared by all workers, so consecutive chunks may land
+                    anywhere. Append, trim and expiry run as one optimistic
+                    transaction (WATCH / MULTI), retried if another chunk for
+                    the same session lands in between. Trimming happens in
+                    Python, so it counts characters (never splitting a UTF-8
+                    sequence) exactly like the memory store.
+
+Sessions expire SCRIBE_SESSION_TTL seconds after their last chunk. A
+session longer than SCRIBE_MAX_CHARS keeps only its most recent text.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from ...core.cache import TTLCache
+from ...core.config import settings
+from ...core.logging import logger
+
+
+def _trim(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    logger.warning(f"Scribe session exceeded {max_chars} chars; keeping the most recent text")
+    return text[-max_chars:]
+
+
+class MemoryScribeStore:
+    def __init__(self, ttl: float, max_sessions: int, max_chars: int):
+        self.max_chars = max_chars
+        self._sessions = TTLCache(ttl=ttl, maxsize=max_sessions)
+        self._lock = asyncio.Lock()
+
+    async def append(self, key: str, text: str) -> str:
+        async with self._lock:
+            accumulated = _trim(self._sessions.get(key, "") + " " + text, self.max_chars)
+            self._sessions.set(key, accumulated)
+        return accumulated.strip()
+
+    async def get(self, key: str) -> Optional[str]:
+        text = self._sessions.get(key)
+        return text.strip() if text is not None else None
+
+    async def clear(self, key: str) -> None:
+        self._sessions.pop(key)
+
+
+class RedisScribeStore:
+    def __init__(self, url: str, ttl: float, max_chars: int, prefix: str = "scribe:"):
+        import redis.asyncio as redis
+
+        self.ttl = int(ttl)
+        self.max_chars = max_chars
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    async def append(self, key: str, text: str) -> str:
+        from redis.exceptions import WatchError
+
+        name = self.prefix + key
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(name)
+                    accumulated = _trim((await pipe.get(name) or "") + " " + text, self.max_chars)
+                    pipe.multi()
+                    pipe.set(name, accumulated, ex=self.ttl)
+                    await pipe.execute()
+                    return accumulated.strip()
+                except WatchError:
+                    continue  # another chunk for this session was appended first
+
+    async def get(self, key: str) -> Optional[str]:
+        text = await self._redis.get(self.prefix + key)
+        return text.strip() if text is not None else None
+
+    async def clear(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+
+def build_scribe_store(url: Optional[str]):
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisScribeStore(url, settings.SCRIBE_SESSION_TTL, settings.SCRIBE_MAX_CHARS)
+    return MemoryScribeStore(settings.SCRIBE_SESSION_TTL, settings.SCRIBE_MAX_SESSIONS, settings.SCRIBE_MAX_CHARS)
+
+
+scribe_store = build_scribe_store(settings.SCRIBE_STORE_URI or os.getenv("REDIS_URL"))
@@ -0,0 +1,191 @@
+"""
+AI Governance Rollups
+=====================
+Hourly and daily rollups of encounter usage / quality, maintained in the same
+transaction that persists (or confirms) an encounter. Admin analytics and the
+bias report read only these rows, never the raw ai_usage_metrics /
+ai_quality_reports / ai_encounters tables.
+
+Each row is keyed by (bucket_start, model_version, risk_level) and holds counts,
+sums and mergeable quantile sketches for latency and confidence, so any window
+(last 24h, last 30 days, all time) is a merge of a handful of rows.
+
+Writes are a single INSERT ... ON CONFLICT DO UPDATE per row that adds the
+encounter's counts to the stored ones (and merges its one-value sketches with
+the ai_sketch_merge SQL function), so there is no read-modify-write and no
+SELECT ... FOR UPDATE. Callers issue it just before they commit, which keeps
+the row lock on the hot bucket as short as the commit itself.
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ...models import AIGovernanceRollupHourly, AIGovernanceRollupDaily
+from .quantile_sketch import QuantileSketch
+
+ROLLUP_MODELS = (AIGovernanceRollupHourly, AIGovernanceRollupDaily)
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def bucket_for(model, ts: datetime.datetime) -> datetime.datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    if model is AIGovernanceRollupDaily:
+        ts = ts.replace(hour=0)
+    return ts
+
+
+def _key(model_version: Optional[str], risk_level: Optional[str]) -> Tuple[str, str]:
+    return (model_version or "unknown")[:100], (risk_level or "UNKNOWN").upper()[:20]
+
+
+def _sketch_of(value: float) -> Dict[str, Any]:
+    sketch = QuantileSketch()
+    sketch.add(value)
+    return sketch.to_dict()
+
+
+def _upsert(db: Session, model, bucket_start, model_version, risk_level, **deltas):
+    """Adds `deltas` to the rollup row in one statement, creating the row if needed."""
+    stmt = insert(model).values(
+        bucket_start=bucket_start, model_version=model_version, risk_level=risk_level,
+        updated_at=datetime.datetime.utcnow(), **deltas,
+    )
+    table = model.__table__
+    update = {"updated_at": stmt.excluded.updated_at}
+    for column in deltas:
+        if column.endswith("_sketch"):
+            update[column] = func.ai_sketch_merge(table.c[column], stmt.excluded[column])
+        else:
+            update[column] = table.c[column] + stmt.excluded[column]
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["bucket_start", "model_version", "risk_level"], set_=update,
+    ))
+
+
+def record_encounter(
+    db: Session,
+    *,
+    created_at: datetime.datetime,
+    model_version: Optional[str],
+    risk_level: Optional[str],
+    latency_ms: Optional[float],
+    tokens: Optional[int],
+    confidence: Optional[float],
+    compliance: Optional[float],
+):
+    """Adds one persisted encounter to its hourly and daily rollups. Caller commits."""
+    mv, rl = _key(model_version, risk_level)
+    deltas: Dict[str, Any] = {"encounters": 1, "tokens_sum": tokens or 0}
+    if latency_ms is not None:
+        deltas.update(latency_ms_sum=latency_ms, latency_count=1, latency_sketch=_sketch_of(latency_ms))
+    if confidence is not None:
+        deltas.update(
+            confidence_sum=confidence, compliance_sum=compliance or 0.0, quality_count=1,
+            confidence_sketch=_sketch_of(confidence),
+        )
+    for model in ROLLUP_MODELS:
+        _upsert(db, model, bucket_for(model, created_at), mv, rl, **deltas)
+
+
+def record_confirmation(
+    db: Session,
+    *,
+    created_at: datetime.datetime,
+    model_version: Optional[str],
+    risk_level: Optional[str],
+    edit_distance: Optional[float] = None,
+):
+    """
+    Counts a confirmation against the bucket the encounter was created in,
+    so acceptance rate = confirmed / encounters for any window.
+    """
+    mv, rl = _key(model_version, risk_level)
+    deltas: Dict[str, Any] = {"confirmed": 1}
+    if edit_distance is not None:
+        deltas.update(edit_distance_sum=edit_distance, edit_distance_count=1)
+    for model in ROLLUP_MODELS:
+        _upsert(db, model, bucket_for(model, created_at), mv, rl, **deltas)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+class RollupAccumulator:
+    """Merges rollup rows (or other accumulators) into one summary."""
+
+    def __init__(self):
+        self.encounters = 0
+        self.confirmed = 0
+        self.tokens_sum = 0
+        self.latency_ms_sum = 0.0
+        self.latency_count = 0
+        self.confidence_sum = 0.0
+        self.compliance_sum = 0.0
+        self.quality_count = 0
+        self.edit_distance_sum = 0.0
+        self.edit_distance_count = 0
+        self.latency = QuantileSketch()
+        self.confidence = QuantileSketch()
+
+    def add_row(self, row):
+        self.encounters += row.encounters or 0
+        self.confirmed += row.confirmed or 0
+        self.tokens_sum += row.tokens_sum or 0
+        self.latency_ms_sum += row.latency_ms_sum or 0.0
+        self.latency_count += row.latency_count or 0
+        self.confidence_sum += row.confidence_sum or 0.0
+        self.compliance_sum += row.compliance_sum or 0.0
+        self.quality_count += row.quality_count or 0
+        self.edit_distance_sum += row.edit_distance_sum or 0.0
+        self.edit_distance_count += row.edit_distance_count or 0
+        self.latency.merge(QuantileSketch.from_dict(row.latency_sketch))
+        self.confidence.merge(QuantileSketch.from_dict(row.confidence_sketch))
+
+    @staticmethod
+    def _avg(total, n, digits=2):
+        return round(total / n, digits) if n else 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_encounters": self.encounters,
+            "confirmed": self.confirmed,
+            "acceptance_rate": self._avg(self.confirmed, self.encounters),
+            "avg_latency_ms": self._avg(self.latency_ms_sum, self.latency_count),
+            "avg_tokens": self._avg(self.tokens_sum, self.encounters),
+            "avg_edit_distance": self._avg(self.edit_distance_sum, self.edit_distance_count),
+            "avg_confidence_score": self._avg(self.confidence_sum, self.quality_count),
+            "avg_compliance_score": self._avg(self.compliance_sum, self.quality_count),
+            "latency_ms_percentiles": self.latency.percentiles(PERCENTILES, digits=1),
+            "confidence_percentiles": self.confidence.percentiles(PERCENTILES, digits=3),
+        }
+
+
+def load_rollups(db: Session, model, since: Optional[datetime.datetime] = None) -> List[Any]:
+    query = db.query(model)
+    if since is not None:
+        query = query.filter(model.bucket_start >= bucket_for(model, since))
+    return query.all()
+
+
+def summarize(rows: Iterable[Any], group_by: Optional[str] = None) -> Any:
+    """
+    Merges rollup rows. With `group_by` ("model_version" / "risk_level") returns
+    {group: summary}; otherwise a single summary dict.
+    """
+    if group_by is None:
+        acc = RollupAccumulator()
+        for row in rows:
+            acc.add_row(row)
+        return acc.summary()
+
+    groups: Dict[str, RollupAccumulator] = {}
+    for row in rows:
+        groups.setdefault(getattr(row, group_by), RollupAccumulator()).add_row(row)
+    return {k: acc.summary() for k, acc in sorted(groups.items())}
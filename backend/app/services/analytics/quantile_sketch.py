@@ -0,0 +1,109 @@
+"""
+Mergeable quantile sketch (log-bucketed, DDSketch-style).
+
+Values are mapped to buckets whose width grows geometrically, which bounds the
+relative error of any quantile estimate by `relative_accuracy`. Two sketches
+with the same accuracy merge by adding bucket counts. That is what lets hourly
+and daily rollup rows be combined into any reporting window without touching
+raw rows.
+
+Serialised form (stored in JSONB):
+    {"a": 0.01, "n": 120, "z": 3, "b": {"412": 7, "413": 11, ...}}
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Values at or below this are counted in the zero bucket (e.g. confidence 0.0)
+MIN_INDEXABLE = 1e-9
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    # -- building ------------------------------------------------------
+
+    def _index(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: Optional[float], weight: int = 1):
+        if value is None:
+            return
+        value = float(value)
+        if value < 0 or math.isnan(value):
+            return
+        if value <= MIN_INDEXABLE:
+            self.zero_count += weight
+        else:
+            idx = self._index(value)
+            self.bins[idx] = self.bins.get(idx, 0) + weight
+        self.count += weight
+
+    def extend(self, values: Iterable[float]):
+        for v in values:
+            self.add(v)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if abs(other.relative_accuracy - self.relative_accuracy) > 1e-12:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for idx, c in other.bins.items():
+            self.bins[idx] = self.bins.get(idx, 0) + c
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    # -- querying ------------------------------------------------------
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        q = min(max(q, 0.0), 1.0)
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for idx in sorted(self.bins):
+            seen += self.bins[idx]
+            if seen > rank:
+                return self._value(idx)
+        return self._value(max(self.bins))
+
+    def percentiles(self, qs=(0.5, 0.95, 0.99), digits: int = 3) -> Dict[str, Optional[float]]:
+        out = {}
+        for q in qs:
+            v = self.quantile(q)
+            out[f"p{int(round(q * 100))}"] = round(v, digits) if v is not None else None
+        return out
+
+    # -- (de)serialisation ---------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "a": self.relative_accuracy,
+            "n": self.count,
+            "z": self.zero_count,
+            "b": {str(k): v for k, v in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "QuantileSketch":
+        if not data:
+            return cls()
+        sketch = cls(data.get("a", DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(k): int(v) for k, v in (data.get("b") or {}).items()}
+        sketch.zero_count = int(data.get("z", 0))
+        sketch.count = int(data.get("n", 0))
+        return sketch
@@ -6,6 +6,7 @@ from app.models import (
 )
 from app.services.ai.ai_service import AIService
 from app.core.logging import logger
+from app.core import etag as etags
 import datetime
 import json
 
@@ -179,6 +180,16 @@ class WorkflowService:
 
         return readiness
 
+    def dashboard_etag(self, patient_id: int):
+        """Weak ETag for the workflow dashboard; the frontend polls it every 15 s."""
+        return etags.compute(
+            self.db, f"workflow-dashboard:{patient_id}",
+            etags.source(Patient, Patient.id == patient_id),
+            etags.source(ClinicalTrajectory, ClinicalTrajectory.patient_id == patient_id),
+            etags.source(DischargeReadiness, DischargeReadiness.patient_id == patient_id),
+            etags.source(Task, Task.patient_id == patient_id, Task.status == "Pending"),
+        )
+
     async def get_patient_workflow_dashboard(self, patient_id: int) -> Dict[str, Any]:
         """
         Returns aggregated workflow data: Trajectory, Tasks, Discharge.
@@ -27,6 +27,7 @@ from sqlalchemy.orm import Session
 
 from ..core.logging import logger
 from ..core.config import settings
+from ..core import json_codec, metrics, write_behind
 from ..models import (
     Patient,
     ClinicalNote,
@@ -48,6 +49,7 @@ from ..models import (
     AIUsageMetrics,
 )
 from ..services.ai.ai_service import AIService
+from ..services.analytics import governance_rollups as rollups
 from ..services.clinical_rules import evaluate_clinical_rules
 from .clinical_expansion.explainability import ExplainabilityEngine
 from .clinical_expansion.drug_safety import evaluate_drug_safety
@@ -73,13 +75,9 @@ from ..schemas.encounter import (
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _safe_json_loads(text: Optional[str], fallback: Any = None) -> Any:
-    if not text:
-        return fallback
-    try:
-        return json.loads(text)
-    except Exception:
-        return fallback
+def _safe_json_loads(value: Any, fallback: Any = None) -> Any:
+    """JSONB values pass through; legacy JSON text is decoded (see core/json_codec)."""
+    return json_codec.safe_loads(value, fallback)
 
 
 def _clamp_float(val: Any, lo: float = 0.0, hi: float = 1.0) -> float:
@@ -89,6 +87,133 @@ def _clamp_float(val: Any, lo: float = 0.0, hi: float = 1.0) -> float:
         return 0.5
 
 
+# ---------------------------------------------------------------------------
+# Encounter response snapshots
+# ---------------------------------------------------------------------------
+
+# Bump whenever EncounterResponse or build_encounter_response changes shape;
+# stored snapshots with another version are rebuilt on their next read.
+ENCOUNTER_SNAPSHOT_VERSION = 1
+
+
+def build_encounter_response(encounter: AIEncounter) -> EncounterResponse:
+    """Builds the API response from an encounter row and its child relationships."""
+    return EncounterResponse(
+        encounter_id=encounter.id,
+        patient_id=encounter.patient_id,
+        status=encounter.status,
+        is_confirmed=encounter.is_confirmed,
+        encounter_date=encounter.encounter_date,
+        chief_complaint=encounter.chief_complaint or "",
+        soap=_safe_json_loads(encounter.soap_note, {}),
+        medications=[
+            AIMedicationOut(
+                id=m.id,
+                name=m.name,
+                dosage=m.dosage,
+                frequency=m.frequency,
+                route=m.route,
+                duration=m.duration,
+                start_date_text=m.start_date_text,
+                requires_confirmation=m.requires_confirmation,
+                fields_required=_safe_json_loads(m.fields_required, []),
+                confidence=m.confidence or "medium",
+            )
+            for m in encounter.medications
+        ],
+        diagnoses=[
+            AIDiagnosisOut(
+                id=d.id,
+                condition_name=d.condition_name,
+                icd10_code=d.icd10_code,
+                confidence_score=d.confidence_score or 0.5,
+                reasoning=d.reasoning,
+                is_primary=d.is_primary,
+            )
+            for d in encounter.diagnoses
+        ],
+        procedures=[
+            AIProcedureOut(
+                id=p.id,
+                name=p.name,
+                code=p.code,
+                notes=p.notes,
+                confidence=p.confidence or "medium",
+            )
+            for p in encounter.procedures
+        ],
+        billing=[
+            AIBillingOut(
+                id=b.id,
+                cpt_code=b.cpt_code,
+                description=b.description,
+                estimated_cost=b.estimated_cost,
+                complexity=b.complexity or "medium",
+                confidence=b.confidence or 0.5,
+                requires_review=b.requires_review,
+                review_reason=b.review_reason,
+            )
+            for b in encounter.billing_items
+        ],
+        timeline_events=[
+            AITimelineEventOut(
+                id=t.id,
+                event_type=t.event_type,
+                event_description=t.event_description,
+                event_date_text=t.event_date_text,
+                severity=t.severity or "info",
+            )
+            for t in encounter.timeline_events
+        ],
+        followups=[
+            AIFollowupOut(
+                id=f.id,
+                recommendation=f.recommendation,
+                follow_up_type=f.follow_up_type,
+                urgency=f.urgency,
+                suggested_days=f.suggested_days,
+            )
+            for f in encounter.followups
+        ],
+        risk_score=encounter.risk_score or "Low",
+        risk_flags=_safe_json_loads(encounter.risk_flags, []),
+        legal_flags=_safe_json_loads(encounter.legal_flags, []),
+        admission_required=encounter.admission_required,
+        icu_required=encounter.icu_required,
+        follow_up_days=encounter.follow_up_days,
+        case_status=encounter.case_status,
+        billing_complexity=encounter.billing_complexity or "medium",
+        ai_watermark="AI-GENERATED DRAFT ⚠️ — Requires licensed clinician review and confirmation before any clinical action.",
+        pipeline_statuses=_safe_json_loads(encounter.pipeline_statuses, []),
+        created_at=encounter.created_at,
+    )
+
+
+def store_encounter_snapshot(encounter: AIEncounter) -> str:
+    """Serialises the current response onto the encounter; the caller commits."""
+    snapshot = build_encounter_response(encounter).model_dump_json()
+    encounter.response_snapshot = snapshot
+    encounter.snapshot_version = ENCOUNTER_SNAPSHOT_VERSION
+    return snapshot
+
+
+def encounter_snapshot(db: Session, encounter: AIEncounter) -> str:
+    """
+    Returns the encounter's response JSON. Reads are a single column fetch; a
+    missing or stale snapshot is rebuilt from the relationships and saved back.
+    """
+    if encounter.snapshot_version == ENCOUNTER_SNAPSHOT_VERSION and encounter.response_snapshot:
+        return encounter.response_snapshot
+
+    snapshot = store_encounter_snapshot(encounter)
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Encounter snapshot refresh not saved: {type(e).__name__}")
+    return snapshot
+
+
 class PipelineResult(TypedDict):
     """Typed result from a single AI pipeline execution."""
     pipeline_name: str
@@ -195,6 +320,7 @@ class ClinicalIntelligenceOrchestrator:
         _pipeline_data = {}
         for cfg, result in zip(pipeline_configs, pipeline_results):
             name, label, _ = cfg
+            metrics.PIPELINE_RUNS.labels(result["pipeline_name"], result["status"]).inc()
             pipeline_statuses.append({
                 "pipeline_name": result["pipeline_name"],
                 "status": result["status"],
@@ -336,7 +462,7 @@ class ClinicalIntelligenceOrchestrator:
             }},
         )
 
-        return self._build_response(encounter, prelim_merged, pipeline_statuses)
+        return EncounterResponse.model_validate_json(encounter.response_snapshot)
 
     # ------------------------------------------------------------------
     # Encounter confirmation (doctor clicks "Confirm & Save")
@@ -501,8 +627,20 @@ class ClinicalIntelligenceOrchestrator:
             # Example: background_tasks.add_task(initiate_twilio_call, followup_call_id=followup_call.id)
             logger.info(f"Follow-up call scheduled for encounter {encounter_id} at {followup_call.scheduled_at}")
 
+        store_encounter_snapshot(encounter)
+
         # Audit log
         self._log_audit(user_id, "confirm_encounter", "AIEncounter", encounter_id)
+
+        # Last before commit: the upsert holds the hot rollup row's lock until then
+        self._update_rollups(
+            rollups.record_confirmation,
+            created_at=encounter.created_at or datetime.datetime.utcnow(),
+            model_version=encounter.model_version,
+            risk_level=encounter.quality_risk_level or (
+                encounter.quality_report.risk_level if encounter.quality_report else None
+            ),
+        )
         self.db.commit()
 
         return {
@@ -704,7 +842,7 @@ class ClinicalIntelligenceOrchestrator:
                 created_by_id=user_id,
                 encounter_date=request.encounter_date or datetime.datetime.utcnow(),
                 raw_note=request.raw_note,
-                soap_note=json.dumps(merged.get("soap", {})),
+                soap_note=merged.get("soap", {}),
                 chief_complaint=merged.get("chief_complaint", "")[:500],
                 case_status=merged.get("case_status", "active"),
                 billing_complexity=merged.get("billing_complexity", "medium"),
@@ -712,19 +850,22 @@ class ClinicalIntelligenceOrchestrator:
                 icu_required=merged.get("icu_required", False),
                 follow_up_days=merged.get("follow_up_days"),
                 risk_score=merged.get("risk_score", "Low"),
-                risk_flags=json.dumps(merged.get("risk_flags", [])),
-                legal_flags=json.dumps(merged.get("legal_flags", [])),
-                pipeline_statuses=json.dumps(pipeline_statuses or []),
+                risk_flags=merged.get("risk_flags", []),
+                legal_flags=merged.get("legal_flags", []),
+                pipeline_statuses=pipeline_statuses or [],
                 status="ready",
-                token_usage=json.dumps(self._token_log),
+                token_usage=self._token_log,
                 model_version=model_version,
                 processing_latency_ms=latency_ms,
+                quality_risk_level=quality_data.get("risk_level", "HIGH"),
             )
             self.db.add(encounter)
             self.db.flush()  # Get encounter.id
 
             # Governance: Quality Report
-            quality_report = AIQualityReport(
+            # Governance / observability rows go through the write-behind queue
+            # when AUDIT_WRITE_MODE=async (inserted after this transaction commits).
+            quality_values = dict(
                 encounter_id=encounter.id,
                 confidence_score=_clamp_float(quality_data.get("confidence_score", 0.0)),
                 compliance_score=_clamp_float(quality_data.get("compliance_score", 0.0)),
@@ -745,10 +886,11 @@ class ClinicalIntelligenceOrchestrator:
                 lab_interpretation=expansion_data.get("lab_interpretation") if expansion_data else None,
                 handoff_sbar=expansion_data.get("handoff_sbar") if expansion_data else None,
             )
-            self.db.add(quality_report)
+            write_behind.record(self.db, AIQualityReport, **quality_values)
 
             # Observability: Usage Metrics
-            usage = AIUsageMetrics(
+            write_behind.record(
+                self.db, AIUsageMetrics,
                 encounter_id=encounter.id,
                 user_id=user_id,
                 tokens_used=token_usage_total,
@@ -756,7 +898,6 @@ class ClinicalIntelligenceOrchestrator:
                 accepted_without_edit=False, # Default until confirmed
                 edit_distance_score=None
             )
-            self.db.add(usage)
 
             # Medications
             for med in merged.get("medications", []):
@@ -770,7 +911,7 @@ class ClinicalIntelligenceOrchestrator:
                     duration=med.get("duration"),
                     start_date_text=med.get("start_date_text"),
                     requires_confirmation=bool(med.get("requires_confirmation", False)),
-                    fields_required=json.dumps(med.get("fields_required", [])),
+                    fields_required=med.get("fields_required", []),
                     confidence=med.get("confidence", "medium"),
                 ))
 
@@ -834,9 +975,25 @@ class ClinicalIntelligenceOrchestrator:
                     suggested_days=fu.get("suggested_days"),
                 ))
 
+            # Children are flushed so the snapshot carries their ids
+            self.db.flush()
+            store_encounter_snapshot(encounter)
+
             self._log_audit(user_id, "generate_encounter", "AIEncounter", encounter.id)
+
+            # Governance rollups (hourly / daily) — same transaction as the encounter,
+            # issued last so the upsert's lock on the hot bucket row is held only until commit
+            self._update_rollups(
+                rollups.record_encounter,
+                created_at=encounter.created_at or datetime.datetime.utcnow(),
+                model_version=model_version,
+                risk_level=quality_values["risk_level"],
+                latency_ms=latency_ms,
+                tokens=token_usage_total,
+                confidence=quality_values["confidence_score"],
+                compliance=quality_values["compliance_score"],
+            )
             self.db.commit()
-            self.db.refresh(encounter)
             return encounter
 
         except Exception as e:
@@ -844,101 +1001,16 @@ class ClinicalIntelligenceOrchestrator:
             logger.error(f"Encounter persistence failed: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to save encounter data.")
 
-    # ------------------------------------------------------------------
-    # Internal — Response builder
-    # ------------------------------------------------------------------
-
-    def _build_response(self, encounter: AIEncounter, merged: Dict, pipeline_statuses: Optional[List[Dict]] = None) -> EncounterResponse:
-        """Converts DB encounter object + merged pipeline dict into a response schema."""
-        return EncounterResponse(
-            encounter_id=encounter.id,
-            patient_id=encounter.patient_id,
-            status=encounter.status,
-            is_confirmed=encounter.is_confirmed,
-            encounter_date=encounter.encounter_date,
-            chief_complaint=encounter.chief_complaint or "",
-            soap=merged.get("soap", {}),
-            medications=[
-                AIMedicationOut(
-                    id=m.id,
-                    name=m.name,
-                    dosage=m.dosage,
-                    frequency=m.frequency,
-                    route=m.route,
-                    duration=m.duration,
-                    start_date_text=m.start_date_text,
-                    requires_confirmation=m.requires_confirmation,
-                    fields_required=_safe_json_loads(m.fields_required, []),
-                    confidence=m.confidence or "medium",
-                )
-                for m in encounter.medications
-            ],
-            diagnoses=[
-                AIDiagnosisOut(
-                    id=d.id,
-                    condition_name=d.condition_name,
-                    icd10_code=d.icd10_code,
-                    confidence_score=d.confidence_score or 0.5,
-                    reasoning=d.reasoning,
-                    is_primary=d.is_primary,
-                )
-                for d in encounter.diagnoses
-            ],
-            procedures=[
-                AIProcedureOut(
-                    id=p.id,
-                    name=p.name,
-                    code=p.code,
-                    notes=p.notes,
-                    confidence=p.confidence or "medium",
-                )
-                for p in encounter.procedures
-            ],
-            billing=[
-                AIBillingOut(
-                    id=b.id,
-                    cpt_code=b.cpt_code,
-                    description=b.description,
-                    estimated_cost=b.estimated_cost,
-                    complexity=b.complexity or "medium",
-                    confidence=b.confidence or 0.5,
-                    requires_review=b.requires_review,
-                    review_reason=b.review_reason,
-                )
-                for b in encounter.billing_items
-            ],
-            timeline_events=[
-                AITimelineEventOut(
-                    id=t.id,
-                    event_type=t.event_type,
-                    event_description=t.event_description,
-                    event_date_text=t.event_date_text,
-                    severity=t.severity or "info",
-                )
-                for t in encounter.timeline_events
-            ],
-            followups=[
-                AIFollowupOut(
-                    id=f.id,
-                    recommendation=f.recommendation,
-                    follow_up_type=f.follow_up_type,
-                    urgency=f.urgency,
-                    suggested_days=f.suggested_days,
-                )
-                for f in encounter.followups
-            ],
-            risk_score=encounter.risk_score or "Low",
-            risk_flags=_safe_json_loads(encounter.risk_flags, []),
-            legal_flags=_safe_json_loads(encounter.legal_flags, []),
-            admission_required=encounter.admission_required,
-            icu_required=encounter.icu_required,
-            follow_up_days=encounter.follow_up_days,
-            case_status=encounter.case_status,
-            billing_complexity=encounter.billing_complexity or "medium",
-            ai_watermark="AI-GENERATED DRAFT ⚠️ — Requires licensed clinician review and confirmation before any clinical action.",
-            pipeline_statuses=pipeline_statuses or _safe_json_loads(encounter.pipeline_statuses, []),
-            created_at=encounter.created_at,
-        )
+    def _update_rollups(self, recorder, **kwargs) -> None:
+        """
+        Applies a governance rollup update inside a savepoint. A rollup failure
+        must never fail the clinical write; backfill_governance_rollups.py repairs drift.
+        """
+        try:
+            with self.db.begin_nested():
+                recorder(self.db, **kwargs)
+        except Exception as e:
+            logger.warning(f"Governance rollup update skipped: {type(e).__name__}")
 
     # ------------------------------------------------------------------
     # Internal — Helpers
@@ -1005,7 +1077,8 @@ class ClinicalIntelligenceOrchestrator:
 
     def _log_audit(self, user_id: int, action: str, entity_type: str, entity_id: int):
         try:
-            log = AuditLog(
+            write_behind.record(
+                self.db, AuditLog,
                 user_id=user_id,
                 action=action,
                 entity_type=entity_type,
@@ -1013,6 +1086,5 @@ class ClinicalIntelligenceOrchestrator:
                 timestamp=datetime.datetime.utcnow(),
                 details="Clinical Intelligence Orchestrator",
             )
-            self.db.add(log)
         except Exception:
             pass  # Audit failure must never block clinical workflow
@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
 from ..models import Admission, MedicalHistory, Allergy, Medication, Patient, Procedure, Document, Task, BillingItem, AuditLog
+from ..core import write_behind
+from ..core.pagination import PageParams, paginate, page, parse_fields
 from ..schemas.clinical import (
     AdmissionCreate, MedicalHistoryCreate, AllergyCreate, MedicationCreate,
-    ProcedureCreate, DocumentCreate, TaskCreate, BillingItemCreate
+    ProcedureCreate, DocumentCreate, TaskCreate, BillingItemCreate,
+    AdmissionResponse, MedicalHistoryResponse, MedicationResponse, ProcedureResponse,
+    DocumentResponse, TaskResponse, BillingItemResponse,
 )
 from fastapi import HTTPException
 import datetime
@@ -10,7 +14,8 @@ import datetime
 class ClinicalService:
     @staticmethod
     def log_audit(db: Session, user_id: int, action: str, entity_type: str, entity_id: int, details: str = None):
-        audit = AuditLog(
+        write_behind.record(
+            db, AuditLog,
             user_id=user_id,
             action=action,
             entity_type=entity_type,
@@ -18,7 +23,6 @@ class ClinicalService:
             details=details,
             timestamp=datetime.datetime.utcnow()
         )
-        db.add(audit)
 
     @staticmethod
     def _get_patient(db: Session, patient_id: int, user_id: int = None):
@@ -28,6 +32,26 @@ class ClinicalService:
             raise HTTPException(status_code=404, detail="Patient not found or access denied")
         return patient
 
+    @staticmethod
+    def list_page(db: Session, model, schema, params: PageParams, *criteria):
+        """
+        One bounded keyset page (newest first) of `model` rows matching `criteria`.
+        With a sparse fieldset only those columns are selected and rows come back
+        as dicts. Returns (rows, next_cursor, fields); see core/pagination.list_response.
+        """
+        columns = model.__table__.columns.keys()
+        fields = parse_fields(params.fields, [f for f in schema.model_fields if f in columns])
+        if fields is None:
+            query = db.query(model)
+        else:
+            keys = fields + [c for c in ("created_at",) if c not in fields]
+            query = db.query(*[getattr(model, c) for c in keys])
+        query = paginate(query.filter(*criteria), model.created_at, model.id, params.cursor, params.limit)
+        rows, next_cursor = page(query.all(), params.limit)
+        if fields is not None:
+            rows = [{f: getattr(r, f) for f in fields} for r in rows]
+        return rows, next_cursor, fields
+
     # --- Admissions ---
     @staticmethod
     def create_admission(db: Session, patient_id: int, admission_in: AdmissionCreate, user_id: int):
@@ -45,14 +69,14 @@ class ClinicalService:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     @staticmethod
-    def get_admissions(db: Session, patient_id: int, user_id: int):
+    def get_admissions(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(Admission).filter(Admission.patient_id == patient_id).all()
+        return ClinicalService.list_page(db, Admission, AdmissionResponse, params, Admission.patient_id == patient_id)
 
     @staticmethod
-    def get_history(db: Session, patient_id: int, user_id: int):
+    def get_history(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(MedicalHistory).filter(MedicalHistory.patient_id == patient_id).all()
+        return ClinicalService.list_page(db, MedicalHistory, MedicalHistoryResponse, params, MedicalHistory.patient_id == patient_id)
 
     # --- History ---
     @staticmethod
@@ -103,9 +127,9 @@ class ClinicalService:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     @staticmethod
-    def get_medications(db: Session, patient_id: int, user_id: int):
+    def get_medications(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(Medication).filter(Medication.patient_id == patient_id).all()
+        return ClinicalService.list_page(db, Medication, MedicationResponse, params, Medication.patient_id == patient_id)
 
     # --- Procedures ---
     @staticmethod
@@ -124,9 +148,9 @@ class ClinicalService:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     @staticmethod
-    def get_procedures(db: Session, patient_id: int, user_id: int):
+    def get_procedures(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(Procedure).filter(Procedure.patient_id == patient_id).all()
+        return ClinicalService.list_page(db, Procedure, ProcedureResponse, params, Procedure.patient_id == patient_id)
 
     # --- Documents ---
     @staticmethod
@@ -145,9 +169,9 @@ class ClinicalService:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
     @staticmethod
-    def get_documents(db: Session, patient_id: int, user_id: int):
+    def get_documents(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(Document).filter(Document.patient_id == patient_id, Document.is_deleted == False).all()
+        return ClinicalService.list_page(db, Document, DocumentResponse, params, Document.patient_id == patient_id, Document.is_deleted == False)
 
     # --- Tasks ---
     @staticmethod
@@ -167,9 +191,9 @@ class ClinicalService:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     @staticmethod
-    def get_tasks(db: Session, patient_id: int, user_id: int):
+    def get_tasks(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(Task).filter(Task.patient_id == patient_id).all()
+        return ClinicalService.list_page(db, Task, TaskResponse, params, Task.patient_id == patient_id)
         
     @staticmethod
     def approve_task(db: Session, task_id: int, user_id: int):
@@ -203,9 +227,9 @@ class ClinicalService:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     @staticmethod
-    def get_billing_items(db: Session, patient_id: int, user_id: int):
+    def get_billing_items(db: Session, patient_id: int, user_id: int, params: PageParams):
         ClinicalService._get_patient(db, patient_id, user_id)
-        return db.query(BillingItem).filter(BillingItem.patient_id == patient_id).all()
+        return ClinicalService.list_page(db, BillingItem, BillingItemResponse, params, BillingItem.patient_id == patient_id)
 
     # --- Update/Delete Helpers ---
     @staticmethod
@@ -1,7 +1,10 @@
 import logging
 import json
-import numpy as np
-from sentence_transformers import SentenceTransformer
+from ..core.lazy import lazy_import
+from ..core import metrics
+
+# sentence-transformers pulls in torch: import it only when the model loads
+np = lazy_import("numpy")
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,7 @@ class EmbeddingService:
     def load_model(self):
         if not self.model:
             logger.info("Loading embedding model...")
+            from sentence_transformers import SentenceTransformer
             # Use 'all-MiniLM-L6-v2' - it's small (80MB) and fast
             self.model = SentenceTransformer('all-MiniLM-L6-v2')
             logger.info("Embedding model loaded.")
@@ -30,7 +34,8 @@ class EmbeddingService:
             
         try:
             # Encode returns a numpy array
-            vector = self.model.encode(text)
+            with metrics.EMBEDDING_LATENCY.time():
+                vector = self.model.encode(text)
             # Convert to list and then JSON string for storage
             return json.dumps(vector.tolist())
         except Exception as e:
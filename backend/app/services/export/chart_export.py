@@ -0,0 +1,404 @@
+"""
+Bulk Chart Export
+=================
+Streams full patient charts (patient, notes, medications, allergies,
+AI encounters, prescriptions) to downstream systems.
+
+Design:
+  1. Patients are read through a server-side cursor (yield_per) ordered by id.
+  2. Child rows are fetched once per page of patients (one IN query per table).
+  3. Rows are read as plain Core rows — nothing accumulates in the ORM identity
+     map, so memory stays flat regardless of how many charts are exported.
+  4. Output is NDJSON (one chart per line) or FHIR R4 Bundles (one Bundle per
+     line), optionally gzip-compressed on the fly.
+  5. Every chart carries its patient id, so an interrupted export resumes with
+     `after_patient_id=<last id written>`. iter_pages() hands the writer one
+     page at a time, so the writer decides when a page is durable and
+     checkpoints it (see export_charts.py).
+
+PHI Safety: nothing in this module logs chart content.
+"""
+
+import base64
+import datetime
+import struct
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...core import json_codec
+from ...models import (
+    Patient,
+    ClinicalNote,
+    Medication,
+    Allergy,
+    AIEncounter,
+    Prescription,
+)
+
+EXPORT_FORMATS = ("ndjson", "fhir")
+DEFAULT_PAGE_SIZE = 200
+
+# Columns never exported (large / internal only)
+_EXCLUDED_COLUMNS = {"embedding"}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    return {k: _jsonable(v) for k, v in row._mapping.items()}
+
+
+def _export_columns(model) -> list:
+    return [c for c in model.__table__.c if c.name not in _EXCLUDED_COLUMNS]
+
+
+class GzipWriter:
+    """
+    Writes one gzip member incrementally.
+
+    `sync()` ends the output on a byte boundary (Z_SYNC_FLUSH): everything
+    passed to `compress()` so far can be decoded from the bytes returned up to
+    that point. A writer created with the `crc` / `size` recorded at a sync
+    point, and `header=False`, continues the same member after a restart: the
+    fresh deflate stream only back-references its own output, so its blocks
+    follow the flushed ones directly and the trailer covers all of the data.
+    """
+
+    HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"  # deflate, no name / mtime, OS unknown
+
+    def __init__(self, level: int = 6, crc: int = 0, size: int = 0, header: bool = True):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -15)  # raw deflate; container written here
+        self._pending_header = header
+        self.crc = crc
+        self.size = size
+
+    def _with_header(self, data: bytes) -> bytes:
+        if self._pending_header:
+            self._pending_header = False
+            return self.HEADER + data
+        return data
+
+    def compress(self, data: bytes) -> bytes:
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        return self._with_header(self._compressor.compress(data))
+
+    def sync(self) -> bytes:
+        return self._with_header(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def finish(self) -> bytes:
+        tail = self._compressor.flush(zlib.Z_FINISH)
+        return self._with_header(tail) + struct.pack("<II", self.crc, self.size & 0xFFFFFFFF)
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6, min_flush_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Compresses a byte stream into a single gzip member without buffering it."""
+    writer = GzipWriter(level)
+    pending = 0
+    for chunk in chunks:
+        out = writer.compress(chunk)
+        pending += len(chunk)
+        if out:
+            yield out
+        if pending >= min_flush_bytes:
+            flushed = writer.sync()
+            if flushed:
+                yield flushed
+            pending = 0
+    yield writer.finish()
+
+
+# ---------------------------------------------------------------------------
+# FHIR R4 mapping
+# ---------------------------------------------------------------------------
+
+_FHIR_GENDERS = {"male": "male", "female": "female", "other": "other"}
+
+
+def _ref(resource_type: str, local_id: Any) -> Dict[str, str]:
+    return {"reference": f"{resource_type}/{local_id}"}
+
+
+def fhir_patient(p: Dict[str, Any]) -> Dict[str, Any]:
+    resource = {
+        "resourceType": "Patient",
+        "id": str(p["id"]),
+        "identifier": [{"type": {"text": "MRN"}, "value": p.get("mrn")}],
+        "name": [{"text": p.get("name")}],
+        "gender": _FHIR_GENDERS.get((p.get("gender") or "").lower(), "unknown"),
+        "active": p.get("status") == "Active",
+    }
+    if p.get("date_of_birth"):
+        resource["birthDate"] = p["date_of_birth"][:10]
+    if p.get("phone_number"):
+        resource["telecom"] = [{"system": "phone", "value": p["phone_number"]}]
+    if p.get("address"):
+        resource["address"] = [{"text": p["address"]}]
+    if p.get("emergency_contact_name"):
+        resource["contact"] = [{
+            "relationship": [{"text": p.get("emergency_contact_relation")}],
+            "name": {"text": p["emergency_contact_name"]},
+            "telecom": [{"system": "phone", "value": p.get("emergency_contact_phone")}],
+        }]
+    return resource
+
+
+def fhir_document_reference(n: Dict[str, Any]) -> Dict[str, Any]:
+    content = [{
+        "attachment": {
+            "contentType": "text/plain",
+            "data": base64.b64encode((n.get("raw_content") or "").encode("utf-8")).decode("ascii"),
+            "title": n.get("title"),
+        }
+    }]
+    if n.get("structured_content"):
+        structured = n["structured_content"]
+        if not isinstance(structured, str):
+            structured = json_codec.dumps_str(structured)
+        content.append({
+            "attachment": {
+                "contentType": "application/json",
+                "data": base64.b64encode(structured.encode("utf-8")).decode("ascii"),
+            }
+        })
+    return {
+        "resourceType": "DocumentReference",
+        "id": f"note-{n['id']}",
+        "status": "current",
+        "docStatus": "final" if n.get("status") == "finalized" else "preliminary",
+        "type": {"text": n.get("note_type")},
+        "subject": _ref("Patient", n["patient_id"]),
+        "date": n.get("encounter_date") or n.get("created_at"),
+        "content": content,
+    }
+
+
+def fhir_medication_statement(m: Dict[str, Any]) -> Dict[str, Any]:
+    dosage_text = " ".join(x for x in (m.get("dosage"), m.get("frequency")) if x)
+    resource = {
+        "resourceType": "MedicationStatement",
+        "id": f"med-{m['id']}",
+        "status": "active" if m.get("status") == "Active" else "stopped",
+        "medicationCodeableConcept": {"text": m.get("name")},
+        "subject": _ref("Patient", m["patient_id"]),
+        "effectivePeriod": {"start": m.get("start_date"), "end": m.get("end_date")},
+    }
+    if dosage_text:
+        resource["dosage"] = [{"text": dosage_text}]
+    return resource
+
+
+def fhir_allergy_intolerance(a: Dict[str, Any]) -> Dict[str, Any]:
+    resource = {
+        "resourceType": "AllergyIntolerance",
+        "id": f"allergy-{a['id']}",
+        "code": {"text": a.get("allergen")},
+        "patient": _ref("Patient", a["patient_id"]),
+        "recordedDate": a.get("created_at"),
+    }
+    if a.get("reaction") or a.get("severity"):
+        resource["reaction"] = [{
+            "manifestation": [{"text": a.get("reaction") or "Unspecified"}],
+            "severity": (a.get("severity") or "").lower() or None,
+        }]
+    return resource
+
+
+def fhir_encounter(e: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "resourceType": "Encounter",
+        "id": f"encounter-{e['id']}",
+        "status": "finished" if e.get("is_confirmed") else "in-progress",
+        "class": {"system": "http://terminology.hl7.org/CodeSystem/v3-ActCode", "code": "AMB"},
+        "subject": _ref("Patient", e["patient_id"]),
+        "period": {"start": e.get("encounter_date")},
+        "reasonCode": [{"text": e.get("chief_complaint")}] if e.get("chief_complaint") else [],
+    }
+
+
+def fhir_medication_requests(rx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    resources = []
+    for idx, item in enumerate(rx.get("prescription_items") or []):
+        dosage = " ".join(
+            str(item.get(k)) for k in ("dosage", "frequency", "duration") if item.get(k)
+        )
+        resource = {
+            "resourceType": "MedicationRequest",
+            "id": f"rx-{rx['id']}-{idx}",
+            "status": "active",
+            "intent": "order",
+            "medicationCodeableConcept": {"text": item.get("medicine_name")},
+            "subject": _ref("Patient", rx["patient_id"]),
+            "authoredOn": rx.get("created_at"),
+            "requester": _ref("Practitioner", rx.get("doctor_id")),
+        }
+        if dosage or item.get("special_instruction"):
+            resource["dosageInstruction"] = [{
+                "text": dosage or None,
+                "patientInstruction": item.get("special_instruction"),
+            }]
+        if rx.get("encounter_id"):
+            resource["encounter"] = _ref("Encounter", f"encounter-{rx['encounter_id']}")
+        resources.append(resource)
+    return resources
+
+
+def chart_to_fhir_bundle(chart: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps one exported chart to a FHIR R4 `collection` Bundle."""
+    resources = [fhir_patient(chart["patient"])]
+    resources += [fhir_document_reference(n) for n in chart["notes"]]
+    resources += [fhir_medication_statement(m) for m in chart["medications"]]
+    resources += [fhir_allergy_intolerance(a) for a in chart["allergies"]]
+    resources += [fhir_encounter(e) for e in chart["encounters"]]
+    for rx in chart["prescriptions"]:
+        resources += fhir_medication_requests(rx)
+
+    return {
+        "resourceType": "Bundle",
+        "id": f"patient-{chart['patient']['id']}",
+        "type": "collection",
+        "timestamp": _jsonable(datetime.datetime.utcnow()) + "Z",
+        "entry": [
+            {"fullUrl": f"urn:clinical-sense:{r['resourceType']}/{r['id']}", "resource": r}
+            for r in resources
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Exporter
+# ---------------------------------------------------------------------------
+
+class ChartExporter:
+    """
+    Streams patient charts page by page.
+
+    Usage:
+        exporter = ChartExporter(db, user_id=42, fmt="fhir")
+        for line in exporter.iter_lines():
+            out.write(line)
+
+        for page in exporter.iter_pages():   # checkpointing writers
+            out.write(page)
+            exporter.last_patient_id, exporter.exported  # cover `page` once it is written
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        user_id: Optional[int] = None,
+        fmt: str = "ndjson",
+        after_patient_id: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.db = db
+        self.user_id = user_id
+        self.fmt = fmt
+        self.after_patient_id = after_patient_id
+        self.page_size = max(1, page_size)
+        self.last_patient_id: Optional[int] = after_patient_id
+        self.exported = 0
+
+    # -- public --------------------------------------------------------
+
+    def iter_charts(self) -> Iterator[Dict[str, Any]]:
+        for charts in self._iter_chart_pages():
+            yield from charts
+
+    def iter_pages(self) -> Iterator[bytes]:
+        """Yields the encoded lines of each page of patients, as one chunk per page."""
+        for charts in self._iter_chart_pages():
+            yield b"".join(self._encode(chart) for chart in charts)
+
+    def iter_lines(self) -> Iterator[bytes]:
+        for page in self.iter_pages():
+            yield page
+        trailer = self.trailer()
+        if trailer:
+            yield trailer
+
+    def trailer(self) -> bytes:
+        if self.fmt != "ndjson":
+            return b""
+        # Trailing checkpoint so consumers can tell a complete export from a cut-off stream
+        return json_codec.dumps({
+            "type": "checkpoint",
+            "last_patient_id": self.last_patient_id,
+            "exported": self.exported,
+            "complete": True,
+        }) + b"\n"
+
+    # -- internal --------------------------------------------------------
+
+    def _encode(self, chart: Dict[str, Any]) -> bytes:
+        record = chart_to_fhir_bundle(chart) if self.fmt == "fhir" else chart
+        return json_codec.dumps(record) + b"\n"
+
+    def _iter_chart_pages(self) -> Iterator[List[Dict[str, Any]]]:
+        page: List[Dict[str, Any]] = []
+        for row in self._patient_rows():
+            page.append(_row_to_dict(row))
+            if len(page) >= self.page_size:
+                yield list(self._charts_for_page(page))
+                page = []
+        if page:
+            yield list(self._charts_for_page(page))
+
+    def _patient_rows(self):
+        stmt = select(*_export_columns(Patient)).where(Patient.is_deleted == False)
+        if self.user_id is not None:
+            stmt = stmt.where(Patient.user_id == self.user_id)
+        if self.after_patient_id is not None:
+            stmt = stmt.where(Patient.id > self.after_patient_id)
+        stmt = stmt.order_by(Patient.id).execution_options(yield_per=self.page_size)
+        return self.db.execute(stmt)
+
+    def _children(self, model, patient_ids: List[int], *criteria) -> Dict[int, List[Dict[str, Any]]]:
+        stmt = (
+            select(*_export_columns(model))
+            .where(model.patient_id.in_(patient_ids), *criteria)
+            .order_by(model.patient_id, model.created_at)
+        )
+        grouped: Dict[int, List[Dict[str, Any]]] = {}
+        for row in self.db.execute(stmt):
+            item = _row_to_dict(row)
+            grouped.setdefault(item["patient_id"], []).append(item)
+        return grouped
+
+    def _charts_for_page(self, patients: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        ids = [p["id"] for p in patients]
+        notes = self._children(ClinicalNote, ids, ClinicalNote.is_deleted == False)
+        meds = self._children(Medication, ids)
+        allergies = self._children(Allergy, ids)
+        encounters = self._children(AIEncounter, ids)
+        prescriptions = self._children(Prescription, ids)
+
+        for p in patients:
+            pid = p["id"]
+            yield {
+                "type": "patient_chart",
+                "patient": p,
+                "notes": notes.get(pid, []),
+                "medications": meds.get(pid, []),
+                "allergies": allergies.get(pid, []),
+                "encounters": encounters.get(pid, []),
+                "prescriptions": prescriptions.get(pid, []),
+            }
+            self.last_patient_id = pid
+            self.exported += 1
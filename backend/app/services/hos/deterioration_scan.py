@@ -0,0 +1,272 @@
+"""
+Deterioration Scan Engine
+=========================
+Incremental, concurrent replacement for the per-patient scan loop.
+
+  1. One window-function query returns the latest note for every active patient,
+     alongside that patient's HospitalPatientRisk.scanned_note_at (the created_at
+     of the note the last scan scored).
+  2. Patients whose latest note is not newer than the note last scored are
+     skipped — nothing has changed since the last scan. Comparing note times with
+     note times (not with the write time) means a note added while a scan is
+     running is picked up by the next one.
+  3. DETERIORATION agent calls fan out with bounded concurrency (asyncio.Semaphore).
+     With batching enabled, each call scores a group of patients through the
+     BATCH_DETERIORATION prompt (see AIService.run_hospital_agent_batch).
+  4. Results are upserted and committed in chunks, so a crash mid-scan only loses
+     the current chunk; the next scan picks up whatever was not yet written.
+
+The scan runs on a worker's event loop (a BackgroundTask), so the sync DB steps
+— the window query and each chunk's upsert and commit — run in a worker thread
+via asyncio.to_thread. They are awaited one at a time, so the session is never
+used by two threads at once.
+
+Progress is kept in-process (per worker) and exposed via get_scan_progress().
+Patients newly rated High / Critical are pushed to /hos/ws/alerts listeners on
+every worker through the event backplane (core/events.py).
+"""
+
+import asyncio
+import datetime
+import json
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select, case
+from sqlalchemy.orm import Session
+
+from app.models import Patient, ClinicalNote, HospitalPatientRisk
+from app.services.ai.batching import BatchStats
+from app.core.events import events, ALERTS_CHANNEL
+from app.core.logging import logger
+
+NOTE_CONTEXT_CHARS = 1000  # Truncate for token limits
+ALERT_LEVELS = ("High", "Critical")
+
+
+@dataclass
+class ScanProgress:
+    scan_id: str
+    status: str = "running"          # running / completed / failed
+    active_patients: int = 0         # active patients with at least one note
+    candidates: int = 0              # patients with new notes since their last risk update
+    skipped_unchanged: int = 0
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    committed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def percent_complete(self) -> float:
+        if self.candidates == 0:
+            return 100.0 if self.status != "running" else 0.0
+        return round(100.0 * self.processed / self.candidates, 1)
+
+    @property
+    def patients_per_second(self) -> float:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return round(self.processed / elapsed, 2) if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["percent_complete"] = self.percent_complete
+        data["patients_per_second"] = self.patients_per_second
+        data["elapsed_seconds"] = round((self.finished_at or time.time()) - self.started_at, 2)
+        return data
+
+
+# Most recent scans in this process (scan_id -> progress)
+_SCANS: Dict[str, ScanProgress] = {}
+_MAX_TRACKED_SCANS = 20
+
+
+def get_scan_progress(scan_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    if scan_id:
+        progress = _SCANS.get(scan_id)
+    else:
+        progress = next(reversed(_SCANS.values()), None)
+    return progress.to_dict() if progress else None
+
+
+def _track(progress: ScanProgress):
+    _SCANS[progress.scan_id] = progress
+    while len(_SCANS) > _MAX_TRACKED_SCANS:
+        _SCANS.pop(next(iter(_SCANS)))
+
+
+def _age_years(dob: Optional[datetime.datetime]) -> Optional[int]:
+    if not dob:
+        return None
+    return (datetime.datetime.utcnow() - dob).days // 365
+
+
+class DeteriorationScanEngine:
+    def __init__(self, db: Session, ai_service, concurrency: int = 8, chunk_size: int = 25, batch_size: int = 1):
+        self.db = db
+        self.ai = ai_service
+        self.concurrency = max(1, concurrency)
+        self.chunk_size = max(1, chunk_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_stats = BatchStats()
+
+    def fetch_latest_notes(self) -> List[Dict[str, Any]]:
+        """
+        Latest note per active patient in a single query.
+        Rows carry `needs_scan`; note text is only selected for patients that need one.
+        """
+        ranked = (
+            select(
+                ClinicalNote.patient_id.label("patient_id"),
+                ClinicalNote.raw_content.label("raw_content"),
+                ClinicalNote.created_at.label("note_created_at"),
+                func.row_number().over(
+                    partition_by=ClinicalNote.patient_id,
+                    order_by=(ClinicalNote.created_at.desc(), ClinicalNote.id.desc()),
+                ).label("rn"),
+            )
+            .where(ClinicalNote.patient_id.isnot(None), ClinicalNote.is_deleted == False)
+            .subquery()
+        )
+
+        needs_scan = (HospitalPatientRisk.scanned_note_at.is_(None)) | (
+            ranked.c.note_created_at > HospitalPatientRisk.scanned_note_at
+        )
+        stmt = (
+            select(
+                Patient.id,
+                Patient.date_of_birth,
+                Patient.gender,
+                ranked.c.note_created_at,
+                needs_scan.label("needs_scan"),
+                case((needs_scan, func.substr(ranked.c.raw_content, 1, NOTE_CONTEXT_CHARS)), else_=None).label("recent_note"),
+            )
+            .join(ranked, ranked.c.patient_id == Patient.id)
+            .outerjoin(HospitalPatientRisk, HospitalPatientRisk.patient_id == Patient.id)
+            .where(ranked.c.rn == 1, Patient.status == "Active", Patient.is_deleted == False)
+            .order_by(Patient.id)
+        )
+        return [dict(r._mapping) for r in self.db.execute(stmt)]
+
+    @staticmethod
+    def _context(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "age": _age_years(row["date_of_birth"]),
+            "gender": row["gender"],
+            "recent_note": row["recent_note"],
+        }
+
+    async def _analyze(self, sem: asyncio.Semaphore, row: Dict[str, Any]) -> List[tuple]:
+        async with sem:
+            try:
+                result = await self.ai.run_hospital_agent("DETERIORATION", self._context(row))
+            except Exception as e:
+                result = {"error": str(e)}
+        return [(row["id"], result)]
+
+    async def _analyze_batch(self, sem: asyncio.Semaphore, rows: List[Dict[str, Any]]) -> List[tuple]:
+        items = [{"id": r["id"], **self._context(r)} for r in rows]
+        async with sem:
+            try:
+                results = await self.ai.run_hospital_agent_batch("DETERIORATION", items, stats=self.batch_stats)
+            except Exception as e:
+                logger.error(f"Deterioration batch failed: {e}")
+                results = {}
+        return [(r["id"], results.get(r["id"], {"error": "No valid result"})) for r in rows]
+
+    def _write_chunk(self, results: List[tuple], note_at: Dict[int, datetime.datetime]) -> List[Dict[str, Any]]:
+        """
+        Upserts one chunk and returns alert events for patients whose level escalated.
+        `note_at` maps each patient to the created_at of the note that was scored.
+        """
+        patient_ids = [pid for pid, _ in results]
+        existing = {
+            r.patient_id: r
+            for r in self.db.query(HospitalPatientRisk).filter(HospitalPatientRisk.patient_id.in_(patient_ids))
+        }
+        now = datetime.datetime.utcnow()
+        alerts = []
+        for patient_id, result in results:
+            risk_entry = existing.get(patient_id)
+            if not risk_entry:
+                risk_entry = HospitalPatientRisk(patient_id=patient_id)
+                self.db.add(risk_entry)
+            previous_level = risk_entry.risk_level
+            risk_entry.risk_score = result.get("risk_score", 0)
+            risk_entry.risk_level = result.get("risk_level", "Low")
+            risk_entry.suggested_actions = json.dumps(result.get("suggested_actions", []))
+            risk_entry.last_updated = now
+            risk_entry.scanned_note_at = note_at.get(patient_id)
+            if risk_entry.risk_level in ALERT_LEVELS and risk_entry.risk_level != previous_level:
+                alerts.append({
+                    "event": "deterioration_alert",
+                    "patient_id": patient_id,
+                    "risk_level": risk_entry.risk_level,
+                    "risk_score": risk_entry.risk_score,
+                    "timestamp": now.isoformat(),
+                })
+        self.db.commit()
+        return alerts
+
+    async def _flush(self, pending: List[tuple], progress: ScanProgress, note_at: Dict[int, datetime.datetime]):
+        for alert in await asyncio.to_thread(self._write_chunk, pending, note_at):
+            await events.publish(ALERTS_CHANNEL, alert)
+        progress.committed += len(pending)
+
+    async def run(self, progress: Optional[ScanProgress] = None) -> ScanProgress:
+        progress = progress or ScanProgress(scan_id=uuid.uuid4().hex[:12])
+        _track(progress)
+
+        try:
+            rows = await asyncio.to_thread(self.fetch_latest_notes)
+            candidates = [r for r in rows if r["needs_scan"]]
+            progress.active_patients = len(rows)
+            progress.candidates = len(candidates)
+            progress.skipped_unchanged = len(rows) - len(candidates)
+            note_at = {r["id"]: r["note_created_at"] for r in candidates}
+
+            sem = asyncio.Semaphore(self.concurrency)
+            if self.batch_size > 1:
+                jobs = [
+                    self._analyze_batch(sem, candidates[i:i + self.batch_size])
+                    for i in range(0, len(candidates), self.batch_size)
+                ]
+            else:
+                jobs = [self._analyze(sem, r) for r in candidates]
+
+            pending: List[tuple] = []
+            for fut in asyncio.as_completed(jobs):
+                for patient_id, result in await fut:
+                    progress.processed += 1
+                    if not isinstance(result, dict) or "error" in result:
+                        progress.failed += 1
+                        continue
+                    progress.succeeded += 1
+                    pending.append((patient_id, result))
+                if len(pending) >= self.chunk_size:
+                    await self._flush(pending, progress, note_at)
+                    pending = []
+                progress.prompt_tokens = self.batch_stats.prompt_tokens
+                progress.completion_tokens = self.batch_stats.completion_tokens
+
+            if pending:
+                await self._flush(pending, progress, note_at)
+            progress.status = "completed"
+        except Exception as e:
+            await asyncio.to_thread(self.db.rollback)
+            progress.status = "failed"
+            logger.error(f"Deterioration scan {progress.scan_id} failed: {e}")
+        finally:
+            progress.finished_at = time.time()
+
+        logger.info(
+            f"Deterioration scan {progress.scan_id}: {progress.succeeded}/{progress.candidates} scored, "
+            f"{progress.skipped_unchanged} unchanged, {progress.failed} failed, "
+            f"{progress.patients_per_second} patients/s"
+        )
+        return progress
@@ -1,47 +1,65 @@
 import datetime
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app.models import (
     Patient, ClinicalNote, Admission, User, 
     HospitalPatientRisk, DoctorAIMetrics, 
     Task, BillingItem, AuditLog
 )
 from app.services.ai.ai_service import AIService
+from app.services.hos.deterioration_scan import DeteriorationScanEngine, ScanProgress
+from app.core.config import settings
+from app.core.cache import TTLCache
 from app.core.logging import logger
 
+# Command-center counters are hospital-wide; every page load reads this snapshot
+command_center_cache = TTLCache(ttl=settings.COMMAND_CENTER_SNAPSHOT_TTL, maxsize=16)
+
 class HOSService:
     def __init__(self, db: Session, ai_service: AIService):
         self.db = db
         self.ai = ai_service
 
     # 1. COMMAND CENTER
+    def _command_center_counts(self) -> Dict[str, Any]:
+        """
+        All command-center counters in one round trip. Each counter is a
+        WHERE-filtered subquery, so it is served by an index on its predicate
+        rather than a full scan of the table.
+        """
+        patients = select(func.count()).select_from(Patient).where(Patient.status == "Active").scalar_subquery()
+        high_risk = (
+            select(func.count()).select_from(HospitalPatientRisk)
+            .where(HospitalPatientRisk.risk_level.in_(["Critical", "High"])).scalar_subquery()
+        )
+        pending_tasks = select(func.count()).select_from(Task).where(Task.status == "Pending").scalar_subquery()
+        admissions = select(func.count()).select_from(Admission).where(Admission.status == "Active").scalar_subquery()
+        burnout = select(func.avg(DoctorAIMetrics.burnout_probability)).scalar_subquery()
+
+        row = self.db.execute(select(
+            patients.label("active_patients"),
+            high_risk.label("high_risk"),
+            pending_tasks.label("pending_tasks"),
+            admissions.label("active_admissions"),
+            burnout.label("avg_burnout"),
+        )).one()
+        return dict(row._mapping)
+
     async def get_command_center_overview(self) -> Dict[str, Any]:
         """
         Aggregates real-time hospital metrics.
+        Served from a short-TTL snapshot shared by all callers in this worker.
         """
         try:
-            total_active_patients = self.db.query(Patient).filter(Patient.status == "Active").count()
-            
-            # Critical / High Risk
-            high_risk = self.db.query(HospitalPatientRisk).filter(
-                HospitalPatientRisk.risk_level.in_(["Critical", "High"])
-            ).count()
-            
-            # Pending Labs/Tasks
-            pending_tasks = self.db.query(Task).filter(Task.status == "Pending").count()
-            
-            # ICU/Bed - Mock data for now as we don't have detailed bed model yet
-            # But we can infer from Admissions
-            active_admissions = self.db.query(Admission).filter(Admission.status == "Active").count()
-            
-            # Staff Burnout
-            avg_burnout = self.db.query(func.avg(DoctorAIMetrics.burnout_probability)).scalar() or 0.0
+            counts = command_center_cache.get_or_load("hos_overview", self._command_center_counts)
+            active_admissions = counts["active_admissions"] or 0
+            avg_burnout = float(counts["avg_burnout"] or 0.0)
 
             return {
-                "critical_patient_count": high_risk,
-                "active_patients": total_active_patients,
-                "pending_urgent_tasks": pending_tasks,
+                "critical_patient_count": counts["high_risk"] or 0,
+                "active_patients": counts["active_patients"] or 0,
+                "pending_urgent_tasks": counts["pending_tasks"] or 0,
                 "icu_occupancy_percent": min(100, int((active_admissions / 50) * 100)), # Mock 50 beds
                 "staff_burnout_risk_avg": round(avg_burnout, 2),
                 "system_status": "Operational"
@@ -51,50 +69,20 @@ class HOSService:
             return {"error": "Failed to load command center"}
 
     # 2. DETERIORATION PREDICTOR
-    async def run_deterioration_scan(self):
+    async def run_deterioration_scan(self, progress: Optional[ScanProgress] = None) -> Dict[str, Any]:
         """
-        Scans all active patients for risk.
-        Designed to run in background.
+        Scans active patients with new notes since their last risk update.
+        Designed to run in background; see DeteriorationScanEngine.
         """
-        active_patients = self.db.query(Patient).filter(Patient.status == "Active").all()
-        
-        for patient in active_patients:
-            # Gather context
-            # Get latest vitals from notes (heuristic)
-            latest_note = self.db.query(ClinicalNote).filter(
-                ClinicalNote.patient_id == patient.id
-            ).order_by(ClinicalNote.created_at.desc()).first()
-            
-            if not latest_note:
-                continue
-
-            context = {
-                "age": (datetime.datetime.utcnow() - patient.date_of_birth).days // 365,
-                "gender": patient.gender,
-                "recent_note": latest_note.raw_content[:1000] # Truncate for token limits
-            }
-
-            # AI Analysis
-            result = await self.ai.run_hospital_agent("DETERIORATION", context)
-            
-            if "error" in result:
-                continue
-
-            # Update DB
-            risk_entry = self.db.query(HospitalPatientRisk).filter(
-                HospitalPatientRisk.patient_id == patient.id
-            ).first()
-            
-            if not risk_entry:
-                risk_entry = HospitalPatientRisk(patient_id=patient.id)
-                self.db.add(risk_entry)
-            
-            risk_entry.risk_score = result.get("risk_score", 0)
-            risk_entry.risk_level = result.get("risk_level", "Low")
-            risk_entry.suggested_actions = str(result.get("suggested_actions", []))
-            risk_entry.last_updated = datetime.datetime.utcnow()
-            
-        self.db.commit()
+        engine = DeteriorationScanEngine(
+            self.db,
+            self.ai,
+            concurrency=settings.DETERIORATION_SCAN_CONCURRENCY,
+            chunk_size=settings.DETERIORATION_SCAN_COMMIT_CHUNK,
+            batch_size=settings.HOS_BATCH_MAX_ITEMS if settings.HOS_SCAN_BATCHING else 1,
+        )
+        result = await engine.run(progress)
+        return result.to_dict()
 
     # 3. BED & FLOW
     async def optimize_bed_flow(self) -> Dict[str, Any]:
@@ -111,36 +99,65 @@ class HOSService:
         return await self.ai.run_hospital_agent("FLOW", context)
 
     # 4. STAFF INTELLIGENCE
+    def _staff_workload(self) -> Dict[int, Dict[str, int]]:
+        """Active patients and 7-day note counts for every doctor in one grouped query."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        patient_counts = (
+            select(Patient.user_id, func.count().filter(Patient.status == "Active").label("active_patients"))
+            .group_by(Patient.user_id)
+            .subquery()
+        )
+        note_counts = (
+            select(ClinicalNote.user_id, func.count().label("notes_last_week"))
+            .where(ClinicalNote.created_at >= cutoff)
+            .group_by(ClinicalNote.user_id)
+            .subquery()
+        )
+        stmt = (
+            select(
+                User.id,
+                func.coalesce(patient_counts.c.active_patients, 0),
+                func.coalesce(note_counts.c.notes_last_week, 0),
+            )
+            .outerjoin(patient_counts, patient_counts.c.user_id == User.id)
+            .outerjoin(note_counts, note_counts.c.user_id == User.id)
+            # Roles are stored uppercase ("DOCTOR"); compare case-insensitively for legacy rows
+            .where(func.upper(User.role) == "DOCTOR", User.is_active == True)
+        )
+        return {
+            user_id: {"active_patients": active, "notes_last_week": notes}
+            for user_id, active, notes in self.db.execute(stmt)
+        }
+
     async def update_staff_metrics(self):
-        doctors = self.db.query(User).filter(User.role == "doctor").all()
-        
-        for doc in doctors:
-            # Calc metrics
-            active_patients = self.db.query(Patient).filter(Patient.user_id == doc.id, Patient.status == "Active").count()
-            notes_7d = self.db.query(ClinicalNote).filter(
-                ClinicalNote.user_id == doc.id,
-                ClinicalNote.created_at >= datetime.datetime.utcnow() - datetime.timedelta(days=7)
-            ).count()
-            
-            context = {
-                "active_patients": active_patients,
-                "notes_last_week": notes_7d
-            }
-            
-            result = await self.ai.run_hospital_agent("STAFF", context)
-            
-            if "error" in result:
-                continue
+        contexts = self._staff_workload()
+
+        if settings.HOS_SCAN_BATCHING and len(contexts) > 1:
+            results = await self.ai.run_hospital_agent_batch(
+                "STAFF", [{"id": doc_id, **ctx} for doc_id, ctx in contexts.items()]
+            )
+        else:
+            results = {}
+            for doc_id, ctx in contexts.items():
+                result = await self.ai.run_hospital_agent("STAFF", ctx)
+                if "error" not in result:
+                    results[doc_id] = result
+
+        existing = {
+            m.user_id: m
+            for m in self.db.query(DoctorAIMetrics).filter(DoctorAIMetrics.user_id.in_(list(results)))
+        } if results else {}
 
-            metric = self.db.query(DoctorAIMetrics).filter(DoctorAIMetrics.user_id == doc.id).first()
+        for doc_id, result in results.items():
+            metric = existing.get(doc_id)
             if not metric:
-                metric = DoctorAIMetrics(user_id=doc.id)
+                metric = DoctorAIMetrics(user_id=doc_id)
                 self.db.add(metric)
             
             metric.workload_score = result.get("workload_score", 0)
             metric.burnout_probability = result.get("burnout_risk", 0.0)
-            metric.active_patients_count = active_patients
-            metric.notes_last_7d = notes_7d
+            metric.active_patients_count = contexts[doc_id]["active_patients"]
+            metric.notes_last_7d = contexts[doc_id]["notes_last_week"]
             metric.last_updated = datetime.datetime.utcnow()
             
         self.db.commit()
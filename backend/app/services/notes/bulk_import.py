@@ -0,0 +1,295 @@
+"""
+Bulk Historical Note Import
+===========================
+Loads years of notes for a newly onboarded clinic without touching the LLM
+on the write path.
+
+Flow:
+  1. Rows are streamed from CSV or NDJSON (never fully materialised).
+  2. Valid rows are inserted in batches with a single multi-row
+     INSERT ... ON CONFLICT DO NOTHING per batch (duplicate idempotency keys are skipped).
+  3. Imported notes are left with structured_content / embedding NULL — that is
+     the "pending enrichment" marker. Celery workers fill them in at a throttled
+     rate (see app/tasks/note_import_tasks.py), so re-queuing a job is always safe.
+
+Throughput (rows/sec) is recorded on the NoteImportJob row.
+"""
+
+import csv
+import datetime
+import io
+import json
+import logging
+import time
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ...core.config import settings
+from ...models import ClinicalNote, NoteImportJob, Patient, AuditLog
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+NOTE_TYPES = {"SOAP", "PROGRESS", "DISCHARGE"}
+MAX_RAW_CONTENT = 50000
+MAX_ERRORS_KEPT = 50
+
+
+class RowError(ValueError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yields one dict per source row. `stream` is a binary file object."""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield {"__error__": f"line {line_no}: invalid JSON"}
+
+
+def _parse_date(value: Any) -> Optional[datetime.datetime]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime.datetime):
+        return value
+    try:
+        return datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise RowError(f"invalid encounter_date '{value}'")
+
+
+def normalize_row(
+    row: Dict[str, Any],
+    user_id: int,
+    job_id: int,
+    patient_ids: Dict[str, int],
+) -> Dict[str, Any]:
+    """
+    Validates a source row and maps it to clinical_notes column values.
+    `patient_ids` maps both str(patient.id) and MRN to patient.id for the importing user.
+    """
+    if "__error__" in row:
+        raise RowError(row["__error__"])
+
+    raw = (row.get("raw_content") or row.get("content") or "").strip()
+    if len(raw) < 10:
+        raise RowError("raw_content must be at least 10 characters")
+    if len(raw) > MAX_RAW_CONTENT:
+        raise RowError(f"raw_content exceeds {MAX_RAW_CONTENT} characters")
+
+    note_type = (row.get("note_type") or "SOAP").upper()
+    if note_type not in NOTE_TYPES:
+        raise RowError(f"invalid note_type '{note_type}'")
+
+    patient_id = None
+    patient_ref = row.get("patient_id") or row.get("mrn")
+    if patient_ref not in (None, ""):
+        patient_id = patient_ids.get(str(patient_ref).strip())
+        if patient_id is None:
+            raise RowError(f"unknown patient '{patient_ref}'")
+
+    now = datetime.datetime.utcnow()
+    return {
+        "user_id": user_id,
+        "patient_id": patient_id,
+        "title": (row.get("title") or "Imported Note")[:150],
+        "raw_content": raw,
+        "note_type": note_type,
+        "status": row.get("status") if row.get("status") in ("draft", "finalized") else "finalized",
+        "encounter_date": _parse_date(row.get("encounter_date")),
+        "idempotency_key": row.get("idempotency_key") or None,
+        "import_job_id": job_id,
+        "is_deleted": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Importer
+# ---------------------------------------------------------------------------
+
+class BulkNoteImporter:
+    """Batch-inserts notes for one NoteImportJob."""
+
+    def __init__(self, db: Session, job: NoteImportJob, batch_size: int = 1000):
+        self.db = db
+        self.job = job
+        self.batch_size = max(1, batch_size)
+        self._errors: List[str] = []
+        self._patient_ids = self._load_patient_index()
+
+    @staticmethod
+    def create_job(db: Session, user_id: int, fmt: str, source_name: Optional[str] = None) -> NoteImportJob:
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        job = NoteImportJob(user_id=user_id, source_format=fmt, source_name=source_name, status="pending")
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def _load_patient_index(self) -> Dict[str, int]:
+        index: Dict[str, int] = {}
+        rows = self.db.query(Patient.id, Patient.mrn).filter(
+            Patient.user_id == self.job.user_id,
+            Patient.is_deleted == False,
+        )
+        for pid, mrn in rows:
+            index[str(pid)] = pid
+            if mrn:
+                index[mrn] = pid
+        return index
+
+    def _insert_batch(self, batch: List[Dict[str, Any]]) -> int:
+        stmt = (
+            pg_insert(ClinicalNote.__table__)
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+            .returning(ClinicalNote.__table__.c.id)
+        )
+        # executemany + RETURNING is batched into multi-row VALUES by SQLAlchemy's insertmanyvalues
+        inserted = len(self.db.execute(stmt, batch).all())
+        self.db.commit()
+        return inserted
+
+    def _record_error(self, line_no: int, message: str):
+        self.job.invalid_rows += 1
+        if len(self._errors) < MAX_ERRORS_KEPT:
+            self._errors.append(f"row {line_no}: {message}")
+
+    def run(self, rows: Iterable[Dict[str, Any]]) -> NoteImportJob:
+        job = self.job
+        job.status = "inserting"
+        job.total_rows = job.inserted_rows = job.skipped_rows = job.invalid_rows = 0
+        self.db.commit()
+
+        started = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+        try:
+            for line_no, row in enumerate(rows, start=1):
+                job.total_rows += 1
+                try:
+                    batch.append(normalize_row(row, job.user_id, job.id, self._patient_ids))
+                except RowError as e:
+                    self._record_error(line_no, str(e))
+                    continue
+
+                if len(batch) >= self.batch_size:
+                    inserted = self._insert_batch(batch)
+                    job.inserted_rows += inserted
+                    job.skipped_rows += len(batch) - inserted
+                    batch = []
+
+            if batch:
+                inserted = self._insert_batch(batch)
+                job.inserted_rows += inserted
+                job.skipped_rows += len(batch) - inserted
+
+            job.insert_seconds = round(time.perf_counter() - started, 3)
+            job.error_summary = "\n".join(self._errors) or None
+            job.status = "enriching" if job.inserted_rows else "completed"
+            if job.status == "completed":
+                job.finished_at = datetime.datetime.utcnow()
+
+            self.db.add(AuditLog(
+                user_id=job.user_id,
+                action="bulk_import",
+                details=f"Imported {job.inserted_rows} notes (job {job.id})"
+            ))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            job.status = "failed"
+            job.insert_seconds = round(time.perf_counter() - started, 3)
+            job.error_summary = "\n".join(self._errors + [f"fatal: {type(e).__name__}"])
+            self.db.commit()
+            logger.error(f"Note import job {job.id} failed after {job.inserted_rows} rows: {type(e).__name__}")
+            raise
+
+        logger.info(
+            f"Note import job {job.id}: {job.inserted_rows} inserted, {job.skipped_rows} skipped, "
+            f"{job.invalid_rows} invalid in {job.insert_seconds}s ({rows_per_second(job)} rows/s)"
+        )
+        return job
+
+
+# ---------------------------------------------------------------------------
+# Progress
+# ---------------------------------------------------------------------------
+
+def rows_per_second(job: NoteImportJob) -> Optional[float]:
+    if not job.insert_seconds:
+        return None
+    return round((job.total_rows or 0) / job.insert_seconds, 1)
+
+
+def enrichment_counts(db: Session, job_id: int) -> Tuple[int, int, int]:
+    """Returns (fully enriched, awaiting structuring, awaiting embeddings) for a job."""
+    enriched, unstructured, unembedded = db.query(
+        func.count(ClinicalNote.id).filter(
+            ClinicalNote.structured_content.isnot(None), ClinicalNote.embedding.isnot(None)
+        ),
+        func.count(ClinicalNote.id).filter(ClinicalNote.structured_content.is_(None)),
+        func.count(ClinicalNote.id).filter(ClinicalNote.embedding.is_(None)),
+    ).filter(ClinicalNote.import_job_id == job_id).one()
+    return enriched or 0, unstructured or 0, unembedded or 0
+
+
+def enrichment_active(db: Session, job: NoteImportJob, now: Optional[datetime.datetime] = None) -> bool:
+    """
+    True while an enriching job's queued tasks are still making progress: it was
+    queued, or one of its notes was written, within NOTE_IMPORT_RESUME_IDLE_SECONDS.
+    Re-queuing such a job would only duplicate the rate-limited LLM work.
+    """
+    if job.status != "enriching":
+        return False
+    last_note_write = (
+        db.query(func.max(ClinicalNote.updated_at)).filter(ClinicalNote.import_job_id == job.id).scalar()
+    )
+    activity = [t for t in (job.enrichment_queued_at, last_note_write) if t is not None]
+    if not activity:
+        return False
+    idle = datetime.timedelta(seconds=settings.NOTE_IMPORT_RESUME_IDLE_SECONDS)
+    return max(activity) > (now or datetime.datetime.utcnow()) - idle
+
+
+def job_status(db: Session, job: NoteImportJob) -> Dict[str, Any]:
+    enriched, unstructured, unembedded = enrichment_counts(db, job.id)
+    return {
+        "id": job.id,
+        "status": job.status,
+        "source_format": job.source_format,
+        "source_name": job.source_name,
+        "total_rows": job.total_rows or 0,
+        "inserted_rows": job.inserted_rows or 0,
+        "skipped_rows": job.skipped_rows or 0,
+        "invalid_rows": job.invalid_rows or 0,
+        "enriched_rows": enriched,
+        "enrichment_failed": job.enrichment_failed or 0,
+        "pending_structuring": unstructured,
+        "pending_embeddings": unembedded,
+        "insert_seconds": job.insert_seconds,
+        "rows_per_second": rows_per_second(job),
+        "errors": job.error_summary.splitlines() if job.error_summary else [],
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
@@ -1,16 +1,23 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, undefer
 from ...db import session as db_session
-from ...models import ClinicalNote, AuditLog, User, NoteVersion
+from ...core import json_codec, etag as etags
+from ...core.pagination import paginate, page
+from ...models import ClinicalNote, AuditLog, User, NoteVersion, ClinicalAIInsight
 from ...schemas.notes import NoteCreateRequest, NoteUpdateRequest
 from ...services.ai.ai_service import AIService
 from ...services.embedding_service import embedding_service
 from ...services.safety_service import safety_service
 import json
-import numpy as np
+from ...core.lazy import lazy_import
+
+np = lazy_import("numpy")
 
 ai_service = AIService()
 
+NOTE_PREVIEW_CHARS = 200
+
 class NoteService:
     @staticmethod
     async def create_and_structure_note(db: Session, user_id: int, note_in: NoteCreateRequest):
@@ -47,7 +54,7 @@ class NoteService:
             # 4. Store in DB
             db_note = ClinicalNote(
                 raw_content=note_in.raw_content,
-                structured_content=json.dumps(structured_data),
+                structured_content=structured_data,
                 title=note_in.title,
                 user_id=user_id,
                 status="draft",
@@ -78,15 +85,36 @@ class NoteService:
     # ... (skipping retrieve methods which are fine) ...
 
     @staticmethod
-    def get_user_notes(db: Session, user_id: int, search: str = None):
+    def get_user_notes(db: Session, user_id: int, search: str = None, cursor: str = None, limit: int = 50):
+        """
+        One keyset page of the user's notes as list rows: only the listed columns
+        and a short SQL-side preview, never the full text, SOAP or embedding.
+        Returns (rows, next_cursor).
+        """
         # Per-account isolation: users see only notes they created.
-        query = db.query(ClinicalNote).filter(
+        query = db.query(
+            ClinicalNote.id, ClinicalNote.title, ClinicalNote.note_type, ClinicalNote.patient_id,
+            ClinicalNote.status, ClinicalNote.created_at, ClinicalNote.updated_at, ClinicalNote.encounter_date,
+            func.substr(ClinicalNote.raw_content, 1, NOTE_PREVIEW_CHARS).label("preview"),
+            ClinicalNote.structured_content.isnot(None).label("is_structured"),
+        ).filter(
             ClinicalNote.user_id == user_id,
             ClinicalNote.is_deleted == False
         )
         if search:
             query = query.filter(ClinicalNote.title.ilike(f"%{search}%"))
-        return query.order_by(ClinicalNote.created_at.desc()).all()
+        query = paginate(query, ClinicalNote.created_at, ClinicalNote.id, cursor, limit)
+        return page(query.all(), limit)
+
+    @staticmethod
+    def to_list_item(note: ClinicalNote) -> dict:
+        """List row for an already-loaded note (semantic search results)."""
+        return {
+            "id": note.id, "title": note.title, "note_type": note.note_type, "patient_id": note.patient_id,
+            "status": note.status, "created_at": note.created_at, "updated_at": note.updated_at,
+            "encounter_date": note.encounter_date, "preview": (note.raw_content or "")[:NOTE_PREVIEW_CHARS],
+            "is_structured": note.structured_content is not None,
+        }
 
     @staticmethod
     def get_note_by_id(db: Session, note_id: int, user_id: int = None):
@@ -99,6 +127,15 @@ class NoteService:
             query = query.filter(ClinicalNote.user_id == user_id)
         return query.first()
 
+    @staticmethod
+    def note_etag(db: Session, note_id: int, user_id: int):
+        """Weak ETag for GET /notes/{id}: the note row and its AI insights."""
+        return etags.compute(
+            db, f"note:{user_id}:{note_id}",
+            etags.source(ClinicalNote, ClinicalNote.id == note_id, ClinicalNote.user_id == user_id, ClinicalNote.is_deleted == False),
+            etags.source(ClinicalAIInsight, ClinicalAIInsight.note_id == note_id),
+        )
+
     @staticmethod
     def soft_delete_note(db: Session, note_id: int, user_id: int):
         import datetime
@@ -139,7 +176,7 @@ class NoteService:
                 raise ValueError(f"Safety Violation: {'; '.join(violations)}")
         
         if "structured_content" in update_data:
-            content_str = json.dumps(update_data["structured_content"])
+            content_str = json_codec.dumps_str(update_data["structured_content"])
             is_safe, violations = safety_service.validate_content(content_str)
             if not is_safe:
                  raise ValueError(f"Safety Violation in structured content: {'; '.join(violations)}")
@@ -156,8 +193,11 @@ class NoteService:
                 db.add(version)
             
             if "structured_content" in update_data:
-                if not isinstance(update_data["structured_content"], str):
-                     update_data["structured_content"] = json.dumps(update_data["structured_content"])
+                if isinstance(update_data["structured_content"], str):
+                    # Older clients send the SOAP object as a JSON string
+                    update_data["structured_content"] = json_codec.safe_loads(
+                        update_data["structured_content"], update_data["structured_content"]
+                    )
                 
                 # Audit manual edit
                 audit = AuditLog(user_id=user_id, note_id=db_note.id, action="edit", details="User modified structured content")
@@ -186,7 +226,7 @@ class NoteService:
         params_vec = np.array(json.loads(query_embedding_json))
         
         # Fetch all clinical notes that have embeddings for search
-        notes = db.query(ClinicalNote).filter(
+        notes = db.query(ClinicalNote).options(undefer(ClinicalNote.embedding)).filter(
             ClinicalNote.is_deleted == False,
             ClinicalNote.embedding.isnot(None)
         ).all()
@@ -257,7 +297,7 @@ class NoteService:
 
             # Parse note content
             try:
-                content = json.loads(note.structured_content) if note.structured_content else {"text": note.raw_content}
+                content = json_codec.safe_loads(note.structured_content) or {"text": note.raw_content}
                 raw_text = note.raw_content
             except:
                 content = {"text": note.raw_content}
@@ -304,9 +344,9 @@ class NoteService:
                 db.add(insight)
             
             insight.risk_score = analysis.get("risk_score", "Low")
-            insight.red_flags = json.dumps(analysis.get("red_flags", []))
-            insight.suggestions = json.dumps(analysis.get("suggestions", []))
-            insight.missing_info = json.dumps(analysis.get("missing_info", []))
+            insight.red_flags = analysis.get("red_flags", [])
+            insight.suggestions = analysis.get("suggestions", [])
+            insight.missing_info = analysis.get("missing_info", [])
             insight.news2_score = current_news2
             
             db.commit()
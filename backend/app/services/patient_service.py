@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from ..models import Patient, AuditLog
+from ..core import write_behind, etag as etags
 from ..schemas.patient import PatientCreate, PatientUpdate
 from fastapi import HTTPException
 import datetime
@@ -8,7 +9,8 @@ class PatientService:
     @staticmethod
     def log_audit(db: Session, user_id: int, action: str, entity_type: str, entity_id: int, details: str = None):
         if not user_id: return
-        audit = AuditLog(
+        write_behind.record(
+            db, AuditLog,
             user_id=user_id,
             action=action,
             entity_type=entity_type,
@@ -16,7 +18,6 @@ class PatientService:
             details=details,
             timestamp=datetime.datetime.utcnow()
         )
-        db.add(audit)
 
     @staticmethod
     def create_patient(db: Session, patient_in: PatientCreate, creator_id: int = None):
@@ -88,6 +89,37 @@ class PatientService:
 
         return patient
 
+    @staticmethod
+    def _owned(patient_id: int, user_id: int):
+        return etags.source(Patient, Patient.id == patient_id, Patient.user_id == user_id, Patient.is_deleted == False)
+
+    @staticmethod
+    def chart_etag(db: Session, patient_id: int, user_id: int):
+        """Weak ETag for GET /patients/{id}: the patient row plus every embedded list."""
+        from ..models import Admission, MedicalHistory, Allergy, Medication, Procedure, Document, Task, BillingItem
+        related = [
+            etags.source(m, m.patient_id == patient_id)
+            for m in (Admission, MedicalHistory, Allergy, Medication, Procedure, Document, Task, BillingItem)
+        ]
+        return etags.compute(db, f"patient:{user_id}:{patient_id}", PatientService._owned(patient_id, user_id), *related)
+
+    @staticmethod
+    def timeline_etag(db: Session, patient_id: int, user_id: int):
+        """Weak ETag for GET /patients/{id}/timeline over every table the timeline reads."""
+        from ..models import (
+            ClinicalNote, Admission, Medication, Procedure, Document, Task, MedicalHistory,
+            PatientCommunication, SecureMessage, ShiftHandover, ReadmissionRisk,
+        )
+        related = [
+            etags.source(ClinicalNote, ClinicalNote.patient_id == patient_id, ClinicalNote.is_deleted == False),
+            etags.source(Document, Document.patient_id == patient_id, Document.is_deleted == False),
+        ] + [
+            etags.source(m, m.patient_id == patient_id)
+            for m in (Admission, Medication, Procedure, Task, MedicalHistory,
+                      PatientCommunication, SecureMessage, ShiftHandover, ReadmissionRisk)
+        ]
+        return etags.compute(db, f"timeline:{user_id}:{patient_id}", PatientService._owned(patient_id, user_id), *related)
+
     @staticmethod
     def delete_patient(db: Session, patient_id: int, user_id: int):
         import datetime
@@ -137,55 +169,20 @@ class PatientService:
             print(f"AI summary failed: {e}")
             summary = "AI summary temporarily unavailable. Please review clinical notes manually."
         
-        # Fetch AI encounters
+        # Fetch AI encounters (stored response snapshots, no per-item mapping)
         from ..models import AIEncounter
-        from ..services.clinical_intelligence import _safe_json_loads
-        db_encounters = db.query(AIEncounter).filter(AIEncounter.patient_id == patient_id).order_by(AIEncounter.created_at.desc()).limit(5).all()
-        
-        # Simple mapping to EncounterResponse structure for the report
-        encounters = []
-        for e in db_encounters:
-            soap = _safe_json_loads(e.soap_note, {})
-            
-            # Map child objects to Ensure JSON fields are parsed
-            meds_out = []
-            for m in e.medications:
-                meds_out.append({
-                    "id": m.id,
-                    "name": m.name,
-                    "dosage": m.dosage,
-                    "frequency": m.frequency,
-                    "route": m.route,
-                    "duration": m.duration,
-                    "start_date_text": m.start_date_text,
-                    "requires_confirmation": m.requires_confirmation,
-                    "fields_required": _safe_json_loads(m.fields_required, []),
-                    "confidence": m.confidence or "medium"
-                })
-
-            encounters.append({
-                "encounter_id": e.id,
-                "patient_id": e.patient_id,
-                "status": e.status,
-                "is_confirmed": e.is_confirmed,
-                "encounter_date": e.encounter_date,
-                "chief_complaint": e.chief_complaint or "",
-                "soap": soap,
-                "medications": meds_out,
-                "diagnoses": e.diagnoses,
-                "billing": e.billing_items,
-                "timeline_events": e.timeline_events,
-                "followups": e.followups,
-                "risk_score": e.risk_score or "Low",
-                "risk_flags": _safe_json_loads(e.risk_flags, []),
-                "legal_flags": _safe_json_loads(e.legal_flags, []),
-                "admission_required": e.admission_required,
-                "icu_required": e.icu_required,
-                "follow_up_days": e.follow_up_days,
-                "case_status": e.case_status,
-                "billing_complexity": e.billing_complexity or "medium",
-                "created_at": e.created_at,
-            })
+        from ..services.clinical_intelligence import encounter_snapshot
+        from ..core import json_codec
+        from sqlalchemy.orm import undefer
+        db_encounters = (
+            db.query(AIEncounter)
+            .options(undefer(AIEncounter.response_snapshot))
+            .filter(AIEncounter.patient_id == patient_id)
+            .order_by(AIEncounter.created_at.desc())
+            .limit(5)
+            .all()
+        )
+        encounters = [json_codec.loads(encounter_snapshot(db, e)) for e in db_encounters]
 
         return {
             "patient": patient,
@@ -6,11 +6,6 @@ import datetime
 import json
 from io import BytesIO
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-
 from ..models import Prescription, Patient, User, AIEncounter, AIGeneratedMedication, AuditLog, AIGeneratedDiagnosis
 from ..schemas.prescription import PrescriptionCreate, PrescriptionResponse, PrescriptionItem
 
@@ -99,6 +94,11 @@ class PrescriptionService:
         }
 
     def generate_prescription_pdf(self, prescription_id: UUID) -> BytesIO:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+
         data = self.get_prescription(prescription_id)
         prescription = data["prescription"]
         patient = data["patient"]
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 import os
 from ..core.config import settings
 
@@ -9,7 +10,7 @@ celery_app = Celery(
     "clinical_sense_tasks",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks.follow_up_tasks"]
+    include=["app.tasks.follow_up_tasks", "app.tasks.note_import_tasks", "app.tasks.maintenance_tasks"]
 )
 
 celery_app.conf.update(
@@ -18,4 +19,10 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    beat_schedule={
+        "maintain-partitions": {
+            "task": "tasks.maintain_partitions",
+            "schedule": crontab(hour=2, minute=15),
+        },
+    },
 )
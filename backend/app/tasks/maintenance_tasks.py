@@ -0,0 +1,21 @@
+import logging
+
+from .celery_app import celery_app
+from ..db.session import engine
+from ..db import partitions
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="tasks.maintain_partitions")
+def maintain_partitions():
+    """
+    Daily: pre-creates upcoming monthly partitions and archives partitions
+    older than PARTITION_RETENTION_MONTHS to compressed CSV files.
+    """
+    created = partitions.ensure_partitions(engine)
+    archived = partitions.archive_partitions(engine)
+    return {
+        "created": created,
+        "archived": [{"partition": a.partition, "rows": a.rows, "path": a.path} for a in archived],
+    }
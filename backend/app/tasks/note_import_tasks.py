@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import logging
+import os
+
+from sqlalchemy import func, update
+
+from .celery_app import celery_app
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models import ClinicalNote, NoteImportJob
+
+logger = logging.getLogger(__name__)
+
+# Celery rate limits are enforced per worker process — size the enrichment
+# worker pool with that in mind (e.g. 2 workers x 20/m = 40 LLM calls/minute).
+
+
+@celery_app.task(name="tasks.import_notes_file")
+def import_notes_file(job_id: int, path: str):
+    """Inserts an uploaded CSV/NDJSON file for a job, then queues enrichment."""
+    from ..services.notes.bulk_import import BulkNoteImporter, iter_rows
+
+    db = SessionLocal()
+    try:
+        job = db.query(NoteImportJob).filter(NoteImportJob.id == job_id).first()
+        if not job:
+            return {"status": "missing"}
+        with open(path, "rb") as f:
+            BulkNoteImporter(db, job, batch_size=settings.NOTE_IMPORT_BATCH_SIZE).run(
+                iter_rows(f, job.source_format)
+            )
+        status = job.status
+    finally:
+        db.close()
+
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+    if status == "enriching":
+        enqueue_note_enrichment.delay(job_id)
+    return {"status": status}
+
+
+@celery_app.task(name="tasks.enqueue_note_enrichment")
+def enqueue_note_enrichment(job_id: int):
+    """
+    Queues structuring / embedding for every imported note still missing them.
+    Safe to call repeatedly — this is also how an interrupted job is resumed.
+    Failures from an earlier run are forgotten: their notes are queued again.
+    """
+    db = SessionLocal()
+    queued = 0
+    try:
+        rows = (
+            db.query(ClinicalNote.id, ClinicalNote.structured_content.is_(None), ClinicalNote.embedding.is_(None))
+            .filter(ClinicalNote.import_job_id == job_id, ClinicalNote.is_deleted == False)
+            .filter((ClinicalNote.structured_content.is_(None)) | (ClinicalNote.embedding.is_(None)))
+            .order_by(ClinicalNote.id)
+        )
+        if rows.first() is None:
+            _complete_if_done(db, job_id)
+            return {"queued": 0}
+
+        # Reset before queuing, so a task that fails straight away is still counted
+        db.query(NoteImportJob).filter(NoteImportJob.id == job_id).update(
+            {"status": "enriching", "finished_at": None, "enrichment_failed": 0,
+             "enrichment_queued_at": datetime.datetime.utcnow()}
+        )
+        db.commit()
+        for note_id, needs_structure, needs_embedding in rows.yield_per(1000):
+            if needs_structure:
+                structure_imported_note.delay(note_id)
+            if needs_embedding:
+                embed_imported_note.delay(note_id)
+            queued += 1
+    finally:
+        db.close()
+    return {"queued": queued}
+
+
+def _complete_if_done(db, job_id: int):
+    """
+    Finishes an enriching job once every field still missing is accounted for
+    by a task that gave up: "completed" if nothing is missing, otherwise
+    "completed_with_errors" (resume re-queues the failed notes).
+    """
+    unstructured, unembedded = db.query(
+        func.count(ClinicalNote.id).filter(ClinicalNote.structured_content.is_(None)),
+        func.count(ClinicalNote.id).filter(ClinicalNote.embedding.is_(None)),
+    ).filter(ClinicalNote.import_job_id == job_id, ClinicalNote.is_deleted == False).one()
+    missing = (unstructured or 0) + (unembedded or 0)
+    failed = db.query(NoteImportJob.enrichment_failed).filter(NoteImportJob.id == job_id).scalar() or 0
+    if missing > failed:
+        return
+    db.execute(
+        update(NoteImportJob)
+        .where(NoteImportJob.id == job_id, NoteImportJob.status == "enriching")
+        .values(status="completed" if missing == 0 else "completed_with_errors",
+                finished_at=datetime.datetime.utcnow())
+    )
+    db.commit()
+
+
+def _record_failure(job_id: int):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(NoteImportJob)
+            .where(NoteImportJob.id == job_id)
+            .values(enrichment_failed=NoteImportJob.enrichment_failed + 1)
+        )
+        db.commit()
+        # The failed field will stay empty, so this may have been the last one outstanding
+        _complete_if_done(db, job_id)
+    finally:
+        db.close()
+
+
+@celery_app.task(
+    name="tasks.structure_imported_note",
+    bind=True,
+    rate_limit=settings.NOTE_IMPORT_STRUCTURE_RATE_LIMIT,
+    max_retries=3,
+    default_retry_delay=60,
+)
+def structure_imported_note(self, note_id: int):
+    from ..services.ai.ai_service import AIService
+
+    db = SessionLocal()
+    try:
+        note = db.query(ClinicalNote).filter(ClinicalNote.id == note_id).first()
+        if not note or note.structured_content is not None:
+            return {"status": "skipped"}
+        job_id = note.import_job_id
+        try:
+            structured = asyncio.run(AIService().structure_clinical_note(
+                note.raw_content,
+                note.note_type,
+                encounter_date=note.encounter_date.isoformat() if note.encounter_date else None
+            ))
+        except Exception as e:
+            if self.request.retries >= self.max_retries:
+                _record_failure(job_id)
+                return {"status": "failed"}
+            raise self.retry(exc=e)
+
+        note.structured_content = structured
+        db.commit()
+        _complete_if_done(db, job_id)
+        return {"status": "structured"}
+    finally:
+        db.close()
+
+
+@celery_app.task(
+    name="tasks.embed_imported_note",
+    bind=True,
+    rate_limit=settings.NOTE_IMPORT_EMBED_RATE_LIMIT,
+    max_retries=3,
+    default_retry_delay=30,
+)
+def embed_imported_note(self, note_id: int):
+    from ..services.embedding_service import embedding_service
+
+    db = SessionLocal()
+    try:
+        note = db.query(ClinicalNote).filter(ClinicalNote.id == note_id).first()
+        if not note or note.embedding is not None:
+            return {"status": "skipped"}
+        job_id = note.import_job_id
+        embedding = embedding_service.generate_embedding(f"{note.title} {note.raw_content}")
+        if not embedding:
+            if self.request.retries >= self.max_retries:
+                _record_failure(job_id)
+                return {"status": "failed"}
+            raise self.retry()
+
+        note.embedding = embedding
+        db.commit()
+        _complete_if_done(db, job_id)
+        return {"status": "embedded"}
+    finally:
+        db.close()
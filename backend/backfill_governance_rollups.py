@@ -0,0 +1,103 @@
+"""
+Rebuilds the hourly / daily AI governance rollups from raw encounter data.
+
+    python backfill_governance_rollups.py            # full rebuild
+    python backfill_governance_rollups.py --days 7   # rebuild only the last 7 days
+
+Run once after the rollup migration, or any time rollups are suspected to have
+drifted (rollup updates are best-effort on the encounter write path).
+"""
+import argparse
+import datetime
+
+from app.db.session import SessionLocal
+from app.models import (
+    AIEncounter, AIQualityReport, AIUsageMetrics,
+    AIGovernanceRollupHourly, AIGovernanceRollupDaily,
+)
+from app.services.analytics.governance_rollups import ROLLUP_MODELS, bucket_for, _key
+from app.services.analytics.quantile_sketch import QuantileSketch
+
+
+def _empty():
+    return {
+        "encounters": 0, "confirmed": 0, "tokens_sum": 0,
+        "latency_ms_sum": 0.0, "latency_count": 0,
+        "confidence_sum": 0.0, "compliance_sum": 0.0, "quality_count": 0,
+        "edit_distance_sum": 0.0, "edit_distance_count": 0,
+        "latency": QuantileSketch(), "confidence": QuantileSketch(),
+    }
+
+
+def backfill(days=None):
+    db = SessionLocal()
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days) if days else None
+    acc = {model: {} for model in ROLLUP_MODELS}
+    try:
+        query = (
+            db.query(
+                AIEncounter.created_at, AIEncounter.model_version, AIEncounter.is_confirmed,
+                AIEncounter.processing_latency_ms,
+                AIQualityReport.risk_level, AIQualityReport.confidence_score, AIQualityReport.compliance_score,
+                AIUsageMetrics.tokens_used, AIUsageMetrics.latency_ms, AIUsageMetrics.edit_distance_score,
+            )
+            .outerjoin(AIQualityReport, AIQualityReport.encounter_id == AIEncounter.id)
+            .outerjoin(AIUsageMetrics, AIUsageMetrics.encounter_id == AIEncounter.id)
+        )
+        if since:
+            # Align to a day boundary so partially covered daily buckets are rebuilt whole
+            since = bucket_for(AIGovernanceRollupDaily, since)
+            query = query.filter(AIEncounter.created_at >= since)
+
+        seen = 0
+        for r in query.yield_per(2000):
+            if r.created_at is None:
+                continue
+            mv, rl = _key(r.model_version, r.risk_level)
+            latency = r.latency_ms if r.latency_ms is not None else r.processing_latency_ms
+            for model in ROLLUP_MODELS:
+                b = acc[model].setdefault((bucket_for(model, r.created_at), mv, rl), _empty())
+                b["encounters"] += 1
+                b["tokens_sum"] += r.tokens_used or 0
+                if latency is not None:
+                    b["latency_ms_sum"] += latency
+                    b["latency_count"] += 1
+                    b["latency"].add(latency)
+                if r.confidence_score is not None:
+                    b["confidence_sum"] += r.confidence_score
+                    b["compliance_sum"] += r.compliance_score or 0.0
+                    b["quality_count"] += 1
+                    b["confidence"].add(r.confidence_score)
+                if r.is_confirmed:
+                    b["confirmed"] += 1
+                    if r.edit_distance_score is not None:
+                        b["edit_distance_sum"] += r.edit_distance_score
+                        b["edit_distance_count"] += 1
+            seen += 1
+
+        for model in ROLLUP_MODELS:
+            delete = db.query(model)
+            if since:
+                delete = delete.filter(model.bucket_start >= since)
+            delete.delete(synchronize_session=False)
+            for (bucket_start, mv, rl), b in acc[model].items():
+                latency, confidence = b.pop("latency"), b.pop("confidence")
+                db.add(model(
+                    bucket_start=bucket_start, model_version=mv, risk_level=rl,
+                    latency_sketch=latency.to_dict(), confidence_sketch=confidence.to_dict(),
+                    **b
+                ))
+        db.commit()
+        print(f"Rolled up {seen} encounters into "
+              f"{len(acc[AIGovernanceRollupHourly])} hourly / {len(acc[AIGovernanceRollupDaily])} daily rows")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild AI governance rollups")
+    parser.add_argument("--days", type=int, default=None, help="Only rebuild the last N days")
+    backfill(parser.parse_args().days)
@@ -0,0 +1,135 @@
+"""
+Benchmark: per-patient vs batched DETERIORATION prompts.
+
+Reports total tokens and wall-clock time per 1,000 patients for both modes.
+
+    python benchmarks/hos_batch_benchmark.py                 # simulated LLM (no network)
+    python benchmarks/hos_batch_benchmark.py --live -n 100   # real Groq calls, scaled to 1,000
+
+The simulated client charges tokens with the same chars/4 estimate used for
+packing, plus a fixed per-request latency and a per-output-token latency, so
+it shows the effect of removing per-request overhead and repeated system prompts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ai.ai_service import AIService  # noqa: E402
+from app.services.ai.batching import BatchStats, estimate_tokens  # noqa: E402
+
+NOTE_SNIPPETS = [
+    "Pt c/o worsening SOB overnight, RR 24, SpO2 91% on RA, HR 112. Started on O2 2L.",
+    "Post-op day 2, afebrile, ambulating, pain controlled on oral analgesia. Plan discharge tomorrow.",
+    "Confusion noted by nursing, BP 88/54, lactate 3.1, blood cultures sent, IV fluids started.",
+    "Stable. Tolerating diet. Vitals within normal limits. Continue current management.",
+]
+
+
+class SimulatedCompletions:
+    def __init__(self, request_overhead_ms: float, ms_per_output_token: float):
+        self.request_overhead = request_overhead_ms / 1000
+        self.per_token = ms_per_output_token / 1000
+
+    def create(self, model, messages, max_tokens=None, **kwargs):
+        payload = json.loads(messages[1]["content"])
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+
+        def score(ctx):
+            level = random.choice(["Low", "Medium", "High", "Critical"])
+            return {"risk_score": random.randint(0, 100), "risk_level": level,
+                    "reasoning": "Simulated", "suggested_actions": ["Reassess vitals"]}
+
+        if "items" in payload:
+            body = {"results": [{"id": item["id"], **score(item)} for item in payload["items"]]}
+        else:
+            body = score(payload)
+        content = json.dumps(body)
+        completion_tokens = estimate_tokens(content)
+        time.sleep(self.request_overhead + completion_tokens * self.per_token)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        )
+
+
+def make_patients(n):
+    return [
+        {"id": i, "age": random.randint(20, 90), "gender": random.choice(["Male", "Female"]),
+         "recent_note": random.choice(NOTE_SNIPPETS) * random.randint(1, 4)}
+        for i in range(1, n + 1)
+    ]
+
+
+async def run_single(ai, patients, concurrency):
+    stats = BatchStats(items=len(patients))
+    sem = asyncio.Semaphore(concurrency)
+    from app.services.ai.prompts import PROMPTS
+
+    async def one(p):
+        ctx = {k: v for k, v in p.items() if k != "id"}
+        async with sem:
+            _, usage = await ai._chat_json(PROMPTS["DETERIORATION"], ctx)
+        stats.add_usage(usage)
+
+    await asyncio.gather(*(one(p) for p in patients))
+    stats.batches = len(patients)
+    return stats
+
+
+async def run_batched(ai, patients, concurrency, group):
+    stats = BatchStats()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(chunk):
+        async with sem:
+            await ai.run_hospital_agent_batch("DETERIORATION", chunk, stats=stats)
+
+    await asyncio.gather(*(one(patients[i:i + group]) for i in range(0, len(patients), group)))
+    return stats
+
+
+def report(label, stats, elapsed, n):
+    scale = 1000 / n
+    print(f"{label:<10} calls={stats.batches + stats.individual_retries:<6} "
+          f"tokens/1k={int(stats.total_tokens * scale):<9} "
+          f"prompt/1k={int(stats.prompt_tokens * scale):<9} "
+          f"wall/1k={elapsed * scale:7.2f}s  failed={stats.failed_items}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1000, help="Patients to score")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--group", type=int, default=40, help="Patients handed to each batch call")
+    parser.add_argument("--live", action="store_true", help="Use the real Groq API")
+    parser.add_argument("--overhead-ms", type=float, default=250.0)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    args = parser.parse_args()
+
+    random.seed(7)
+    ai = AIService()
+    if not args.live:
+        ai.client = SimpleNamespace(chat=SimpleNamespace(
+            completions=SimpleNamespace(create=SimulatedCompletions(args.overhead_ms, args.ms_per_token).create)
+        ))
+    patients = make_patients(args.n)
+
+    t0 = time.perf_counter()
+    single = asyncio.run(run_single(ai, patients, args.concurrency))
+    report("single", single, time.perf_counter() - t0, args.n)
+
+    t0 = time.perf_counter()
+    batched = asyncio.run(run_batched(ai, patients, args.concurrency, args.group))
+    report("batched", batched, time.perf_counter() - t0, args.n)
+    print(f"avg batch size: {batched.to_dict()['avg_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark: JSON-in-Text + stdlib json vs JSONB + shared orjson codec.
+
+Measures the two read paths the JSONB migration changes, with synthetic rows
+shaped like real data (no database needed):
+
+  notes list   GET /notes/        200 notes, SOAP + AI insight lists per note
+  encounter    GET /encounter/id  one encounter: SOAP, flags, pipeline statuses,
+                                  token usage and 12 medications
+
+"legacy" decodes every Text column with stdlib json.loads in the endpoint and
+renders with starlette's JSONResponse. "jsonb" decodes once in the driver with
+the orjson codec (what psycopg2 does for JSONB columns with the engine's
+json_deserializer) and hands the objects straight to the response.
+
+    python benchmarks/json_codec_benchmark.py
+    python benchmarks/json_codec_benchmark.py --notes 1000 --rounds 50
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+import warnings
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core import json_codec  # noqa: E402
+from app.schemas.encounter import EncounterResponse  # noqa: E402
+from app.schemas.notes import NoteResponse  # noqa: E402
+
+NOW = datetime.datetime(2026, 10, 19, 8, 30)
+SOAP = {
+    "subjective": "58M with 3 days of productive cough, fevers to 38.9C and pleuritic chest pain. " * 3,
+    "objective": "T 38.6, HR 108, BP 128/76, RR 22, SpO2 93% RA. Crackles right base. WBC 14.2, CRP 88.",
+    "assessment": "Right lower lobe community acquired pneumonia, CURB-65 score 1.",
+    "plan": "Amoxicillin 1g TDS 5 days, oral fluids, safety-net advice, review in 48h or sooner if worse.",
+}
+INSIGHT = {
+    "red_flags": ["SpO2 below 94%", "Tachycardia > 100"],
+    "suggestions": ["Repeat observations in 4 hours", "Consider chest X-ray"],
+    "missing_info": ["Smoking history", "Allergy status"],
+}
+PIPELINES = [
+    {"pipeline_name": name, "status": "success", "error": None, "latency_ms": 800 + i * 37}
+    for i, name in enumerate(["SOAP", "MEDICATIONS", "DIAGNOSES", "BILLING", "RISK", "LEGAL", "TIMELINE"])
+]
+MEDICATION = {
+    "name": "Amoxicillin", "dosage": "1g", "frequency": "TDS", "route": "oral", "duration": "5 days",
+    "start_date_text": None, "requires_confirmation": False, "confidence": "high",
+}
+
+
+class Row:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+def _note_rows(n: int, encoded: bool) -> List[Row]:
+    enc = json.dumps if encoded else (lambda v: v)
+    rows = []
+    for i in range(n):
+        insight = Row(id=i, note_id=i, risk_score="Medium", created_at=NOW,
+                      red_flags=enc(INSIGHT["red_flags"]), suggestions=enc(INSIGHT["suggestions"]),
+                      missing_info=enc(INSIGHT["missing_info"]))
+        rows.append(Row(
+            id=i, title=f"Progress note {i}", note_type="SOAP", patient_id=i % 40,
+            raw_content="Raw dictation " * 40, structured_content=enc(SOAP), status="finalized",
+            created_at=NOW, updated_at=NOW, encounter_date=NOW, ai_insights=insight,
+        ))
+    return rows
+
+
+def _driver_decode(rows: List[Row]) -> List[Row]:
+    """What the DB driver does for JSONB columns: one orjson.loads per value."""
+    for r in rows:
+        r.structured_content = json_codec.loads(r.structured_content)
+        for key in ("red_flags", "suggestions", "missing_info"):
+            setattr(r.ai_insights, key, json_codec.loads(getattr(r.ai_insights, key)))
+    return rows
+
+
+NOTES_ADAPTER = TypeAdapter(List[NoteResponse])
+ENCOUNTER_ADAPTER = TypeAdapter(EncounterResponse)
+
+
+def notes_legacy(rows: List[Row]) -> bytes:
+    out = []
+    for note in rows:
+        nr = NoteResponse.model_validate(note)
+        nr.structured_content = json.loads(note.structured_content)
+        nr.ai_insights = {
+            "risk_score": note.ai_insights.risk_score,
+            "red_flags": json.loads(note.ai_insights.red_flags or "[]"),
+            "suggestions": json.loads(note.ai_insights.suggestions or "[]"),
+            "missing_info": json.loads(note.ai_insights.missing_info or "[]"),
+        }
+        out.append(nr.model_dump(mode="json"))
+    return JSONResponse(out).body
+
+
+def notes_jsonb(raw_rows: List[Row]) -> bytes:
+    rows = _driver_decode(raw_rows)
+    return NOTES_ADAPTER.dump_json(NOTES_ADAPTER.validate_python(rows, from_attributes=True))
+
+
+def _encounter_payload(encoded: bool):
+    enc = json.dumps if encoded else (lambda v: v)
+    return {
+        "soap_note": enc(SOAP),
+        "risk_flags": enc(["qSOFA 1", "Hypoxia"]),
+        "legal_flags": enc(["Consent not documented"]),
+        "pipeline_statuses": enc(PIPELINES),
+        "token_usage": enc([{"pipeline": p["pipeline_name"], "tokens": 1200} for p in PIPELINES]),
+        "medications": [dict(MEDICATION, id=i, fields_required=enc(["start_date"])) for i in range(12)],
+    }
+
+
+def encounter_legacy(row) -> bytes:
+    body = {
+        "encounter_id": 1, "patient_id": 1, "status": "ready", "encounter_date": NOW, "created_at": NOW,
+        "soap": json.loads(row["soap_note"]),
+        "risk_flags": json.loads(row["risk_flags"]),
+        "legal_flags": json.loads(row["legal_flags"]),
+        "pipeline_statuses": json.loads(row["pipeline_statuses"]),
+        "medications": [dict(m, fields_required=json.loads(m["fields_required"])) for m in row["medications"]],
+    }
+    json.loads(row["token_usage"])
+    return JSONResponse(EncounterResponse(**body).model_dump(mode="json")).body
+
+
+def encounter_jsonb(raw) -> bytes:
+    row = {k: (json_codec.loads(v) if isinstance(v, str) else v) for k, v in raw.items()}
+    row["medications"] = [dict(m, fields_required=json_codec.loads(m["fields_required"])) for m in raw["medications"]]
+    body = {
+        "encounter_id": 1, "patient_id": 1, "status": "ready", "encounter_date": NOW, "created_at": NOW,
+        "soap": row["soap_note"], "risk_flags": row["risk_flags"], "legal_flags": row["legal_flags"],
+        "pipeline_statuses": row["pipeline_statuses"], "medications": row["medications"],
+    }
+    return ENCOUNTER_ADAPTER.dump_json(EncounterResponse(**body))
+
+
+def _time(fn, make_input, rounds: int) -> List[float]:
+    samples = []
+    for _ in range(rounds):
+        data = make_input()
+        start = time.perf_counter()
+        fn(data)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name: str, legacy: List[float], jsonb: List[float]):
+    l50, j50 = statistics.median(legacy), statistics.median(jsonb)
+    l95 = sorted(legacy)[int(0.95 * (len(legacy) - 1))]
+    j95 = sorted(jsonb)[int(0.95 * (len(jsonb) - 1))]
+    print(f"{name:<14} legacy p50 {l50:8.3f} ms  p95 {l95:8.3f} ms | "
+          f"jsonb p50 {j50:8.3f} ms  p95 {j95:8.3f} ms | speedup {l50 / j50:4.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON decode / render paths")
+    parser.add_argument("--notes", type=int, default=200, help="Notes per list response")
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+    # The legacy path assigns a plain dict to NoteResponse.ai_insights, exactly as the old endpoints did
+    warnings.filterwarnings("ignore", message="Pydantic serializer warnings")
+
+    print(f"codec: {'orjson' if json_codec.orjson else 'stdlib json (orjson not installed)'}")
+    # Encoded text is what both paths read off the wire; only where/how it is decoded differs
+    _report(f"notes x{args.notes}",
+            _time(notes_legacy, lambda: _note_rows(args.notes, True), args.rounds),
+            _time(notes_jsonb, lambda: _note_rows(args.notes, True), args.rounds))
+    _report("encounter",
+            _time(encounter_legacy, lambda: _encounter_payload(True), args.rounds * 20),
+            _time(encounter_jsonb, lambda: _encounter_payload(True), args.rounds * 20))
+
+
+if __name__ == "__main__":
+    main()
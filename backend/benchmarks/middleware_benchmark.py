@@ -0,0 +1,147 @@
+"""
+Benchmark: BaseHTTPMiddleware stack vs the pure ASGI RequestContextMiddleware.
+
+Builds three copies of a small app, with no network or database, and
+drives them in-process through httpx's ASGI transport:
+
+  bare      no middleware (baseline)
+  legacy    the old stack: SecurityHeaders, RequestID, log_requests and
+            LimitUploadSize as BaseHTTPMiddleware + SlowAPIMiddleware
+  asgi      RequestContextMiddleware + RateLimitMiddleware
+
+Routes:
+
+  /api/health   tiny JSON body; reports per-request overhead over bare
+  /report/pdf   StreamingResponse of 64 x 16 KB chunks (a patient PDF)
+
+    python benchmarks/middleware_benchmark.py
+    python benchmarks/middleware_benchmark.py --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+from slowapi import Limiter  # noqa: E402
+from slowapi.middleware import SlowAPIMiddleware  # noqa: E402
+from slowapi.util import get_remote_address  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.logging import logger, request_id_contextvar  # noqa: E402
+from app.core.middleware import RequestContextMiddleware  # noqa: E402
+from app.core.ratelimit import RateLimitMiddleware  # noqa: E402
+
+CHUNK = b"%PDF" + b"x" * (16 * 1024 - 4)
+
+
+def _routes(app: FastAPI) -> FastAPI:
+    app.state.limiter = Limiter(key_func=get_remote_address, default_limits=["1000000/minute"])
+
+    @app.get("/api/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/report/pdf")
+    def pdf():
+        return StreamingResponse((CHUNK for _ in range(64)), media_type="application/pdf")
+
+    return app
+
+
+def bare_app() -> FastAPI:
+    return _routes(FastAPI())
+
+
+def legacy_app() -> FastAPI:
+    app = _routes(FastAPI())
+    app.add_middleware(SlowAPIMiddleware)
+
+    class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            response = await call_next(request)
+            response.headers["X-Content-Type-Options"] = "nosniff"
+            response.headers["X-Frame-Options"] = "DENY"
+            return response
+
+    class RequestIDMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+            request_id_contextvar.set(request_id)
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+    app.add_middleware(RequestIDMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+
+    @app.middleware("http")
+    async def log_requests(request, call_next):
+        logger.info(f"Incoming Request: {request.method} {request.url}")
+        response = await call_next(request)
+        logger.info(f"Response Status: {response.status_code}")
+        return response
+
+    class LimitUploadSize(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            if request.method == "POST" and "content-length" in request.headers:
+                if int(request.headers["content-length"]) > 10 * 1024 * 1024:
+                    return JSONResponse(status_code=413, content={"detail": "Request too large"})
+            return await call_next(request)
+
+    app.add_middleware(LimitUploadSize)
+    return app
+
+
+def asgi_app() -> FastAPI:
+    app = _routes(FastAPI())
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def _measure(app: FastAPI, path: str, n: int):
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(20):
+            await client.get(path)
+        for _ in range(n):
+            start = time.perf_counter()
+            r = await client.get(path)
+            samples.append((time.perf_counter() - start) * 1e6)
+            assert r.status_code == 200
+    return statistics.median(samples), sorted(samples)[int(0.95 * (len(samples) - 1))]
+
+
+async def main_async(n: int):
+    apps = {"bare": bare_app(), "legacy": legacy_app(), "asgi": asgi_app()}
+    for path, count in (("/api/health", n), ("/report/pdf", max(n // 10, 50))):
+        print(f"\n{path}  ({count} requests)")
+        base = None
+        for name, app in apps.items():
+            p50, p95 = await _measure(app, path, count)
+            base = p50 if base is None else base
+            print(f"  {name:<7} p50 {p50:8.1f} us   p95 {p95:8.1f} us   overhead p50 {p50 - base:7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark middleware overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    # Keep the log records (they are part of the cost) but drop the output
+    for handler in logger.handlers:
+        handler.setLevel(logging.CRITICAL)
+    asyncio.run(main_async(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: full note listing vs deferred-column keyset pages.
+
+Seeds one account with 5,000 notes shaped like real data (~2 KB dictation,
+SOAP JSON, 384-dim embedding as JSON text, an AI insight row for every other
+note) into a SQLite file, then compares:
+
+  legacy      the old GET /notes/: every note as a full NoteResponse
+              (all columns, lazy-loaded ai_insights)
+  page        GET /notes/?limit=50: NoteService.get_user_notes + NoteListItem
+  walk        every page of 50 followed through X-Next-Cursor
+
+Reports response bytes and p50 / p95 latency (query + serialisation).
+
+    python benchmarks/note_list_benchmark.py
+    python benchmarks/note_list_benchmark.py --notes 20000 --rounds 10
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models import Base, User, ClinicalNote, ClinicalAIInsight  # noqa: E402
+from app.schemas.notes import NoteResponse, NoteListItem  # noqa: E402
+from app.services.notes.note_service import NoteService  # noqa: E402
+
+FULL_ADAPTER = TypeAdapter(List[NoteResponse])
+LIST_ADAPTER = TypeAdapter(List[NoteListItem])
+DICTATION = (
+    "58M presenting with three days of productive cough, fevers and right-sided pleuritic chest pain. "
+    "Denies haemoptysis. PMH T2DM on metformin, HTN on ramipril. Ex-smoker 20 pack years. "
+)
+
+
+def _seed(session, n: int):
+    rng = random.Random(7)
+    session.add(User(id=1, email="dr@example.org"))
+    start = datetime.datetime(2024, 1, 1)
+    soap = {k: DICTATION[:240] for k in ("subjective", "objective", "assessment", "plan")}
+    for i in range(1, n + 1):
+        session.add(ClinicalNote(
+            id=i, user_id=1, patient_id=i % 300 + 1, title=f"Progress note {i}",
+            raw_content=DICTATION * 10, structured_content=soap, status="finalized",
+            embedding=json.dumps([round(rng.uniform(-1, 1), 6) for _ in range(384)]),
+            created_at=start + datetime.timedelta(minutes=17 * i),
+        ))
+        if i % 2 == 0:
+            session.add(ClinicalAIInsight(note_id=i, risk_score="Medium", red_flags=["SpO2 < 94%"],
+                                          suggestions=["Repeat obs"], missing_info=[]))
+    session.commit()
+
+
+def legacy(session) -> bytes:
+    notes = (
+        session.query(ClinicalNote)
+        .filter(ClinicalNote.user_id == 1, ClinicalNote.is_deleted == False)  # noqa: E712
+        .order_by(ClinicalNote.created_at.desc())
+        .all()
+    )
+    # The old query loaded the embedding too; undefer it to reproduce that cost
+    for note in notes:
+        note.embedding
+    return FULL_ADAPTER.dump_json(FULL_ADAPTER.validate_python(notes, from_attributes=True))
+
+
+def first_page(session, limit: int) -> bytes:
+    rows, _ = NoteService.get_user_notes(session, 1, limit=limit)
+    return LIST_ADAPTER.dump_json(LIST_ADAPTER.validate_python(rows, from_attributes=True))
+
+
+def walk(session, limit: int) -> bytes:
+    body, cursor = b"", None
+    while True:
+        rows, cursor = NoteService.get_user_notes(session, 1, cursor=cursor, limit=limit)
+        body += LIST_ADAPTER.dump_json(LIST_ADAPTER.validate_python(rows, from_attributes=True))
+        if cursor is None:
+            return body
+
+
+def _measure(name: str, Session, fn, rounds: int):
+    samples, size = [], 0
+    for _ in range(rounds):
+        session = Session()
+        start = time.perf_counter()
+        size = len(fn(session))
+        samples.append((time.perf_counter() - start) * 1000)
+        session.close()
+    p95 = sorted(samples)[int(0.95 * (len(samples) - 1))]
+    print(f"{name:<10} {size / 1024:10.1f} KB   p50 {statistics.median(samples):9.2f} ms   p95 {p95:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark note listing payloads and latency")
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'notes.db')}")
+        Base.metadata.create_all(engine, tables=[User.__table__, ClinicalNote.__table__, ClinicalAIInsight.__table__])
+        Session = sessionmaker(bind=engine)
+        seed = Session()
+        _seed(seed, args.notes)
+        seed.close()
+
+        print(f"{args.notes} notes, page size {args.limit}")
+        _measure("legacy", Session, legacy, args.rounds)
+        _measure("page", Session, lambda s: first_page(s, args.limit), args.rounds)
+        _measure("walk", Session, lambda s: walk(s, args.limit), args.rounds)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Bulk chart export CLI.
+
+    python export_charts.py --out charts.ndjson.gz
+    python export_charts.py --format fhir --user-id 3 --out bundles.ndjson.gz
+    python export_charts.py --out charts.ndjson.gz --resume   # continue after an interruption
+
+After every page is written (and, for .gz output, sync-flushed out of the
+compressor) and fsync'd, a checkpoint file (<out>.checkpoint) records the last
+patient id and the output's byte offset. --resume truncates the output back to
+that offset, dropping whatever a crash left half-written, and continues from
+the next patient. A .gz output stays one gzip member: the checkpoint also
+carries the running CRC and length needed to finish it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from app.db.session import SessionLocal
+from app.services.export.chart_export import ChartExporter, EXPORT_FORMATS, GzipWriter
+
+
+def _read_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if "offset" not in state:
+        sys.exit(f"{path} has no byte offset (written by an older version); re-run the export without --resume")
+    return state
+
+
+def _write_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(state, ts=time.time()), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def export_charts(args):
+    checkpoint_path = args.out + ".checkpoint"
+    state = _read_checkpoint(checkpoint_path) if args.resume else None
+    gzip = args.out.endswith(".gz")
+
+    db = SessionLocal()
+    started = time.time()
+    try:
+        with open(args.out, "r+b" if state else "wb") as out:
+            if state:
+                out.truncate(state["offset"])
+                out.seek(state["offset"])
+            writer = None
+            if gzip:
+                writer = GzipWriter(crc=state["crc"], size=state["size"], header=False) if state else GzipWriter()
+
+            exporter = ChartExporter(
+                db,
+                user_id=args.user_id,
+                fmt=args.format,
+                after_patient_id=state["last_patient_id"] if state else None,
+                page_size=args.page_size,
+            )
+            exporter.exported = state["exported"] if state else 0
+
+            for page in exporter.iter_pages():
+                out.write(writer.compress(page) + writer.sync() if writer else page)
+                # Only checkpoint once the page is on disk
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint = {
+                    "last_patient_id": exporter.last_patient_id,
+                    "exported": exporter.exported,
+                    "offset": out.tell(),
+                }
+                if writer:
+                    checkpoint.update(crc=writer.crc, size=writer.size)
+                _write_checkpoint(checkpoint_path, checkpoint)
+                print(f"  ... {exporter.exported} charts (last patient id {exporter.last_patient_id})", file=sys.stderr)
+
+            trailer = exporter.trailer()
+            out.write(writer.compress(trailer) + writer.finish() if writer else trailer)
+    finally:
+        db.close()
+
+    elapsed = time.time() - started
+    print(f"Exported {exporter.exported} charts in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream patient charts to NDJSON / FHIR bundles")
+    parser.add_argument("--out", required=True, help="Output path (.gz suffix enables compression)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--user-id", type=int, default=None, help="Only export this doctor's patients")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--resume", action="store_true", help="Continue from <out>.checkpoint")
+    export_charts(parser.parse_args())
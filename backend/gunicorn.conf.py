@@ -0,0 +1,27 @@
+"""
+gunicorn settings picked up automatically from the working directory
+(entrypoint.sh runs gunicorn from backend/).
+
+Prometheus multiprocess mode (app/core/metrics.py): every worker writes its
+samples under PROMETHEUS_MULTIPROC_DIR and /metrics merges them. The
+directory must be set before the workers import prometheus_client, emptied
+on each start so a previous run's samples are not merged in, and told when a
+worker exits so its live gauges stop counting.
+"""
+
+import os
+import shutil
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/clinical-sense-metrics")
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,74 @@
+"""
+Bulk historical note import CLI.
+
+    python import_notes.py --user-email dr@clinic.org --file notes.csv
+    python import_notes.py --user-email dr@clinic.org --file notes.ndjson --no-enrich
+    python import_notes.py --resume-job 12          # re-queue pending enrichment
+
+Expected columns / keys: raw_content (required), title, note_type, patient_id or mrn,
+encounter_date (ISO 8601), status, idempotency_key.
+"""
+import argparse
+import os
+import sys
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import User
+from app.services.notes.bulk_import import BulkNoteImporter, iter_rows, job_status
+
+
+def import_notes(args):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == args.user_email).first()
+        if not user:
+            print(f"User {args.user_email} not found")
+            sys.exit(1)
+
+        fmt = args.format or os.path.splitext(args.file)[1].lstrip(".").lower()
+        if fmt == "jsonl":
+            fmt = "ndjson"
+        job = BulkNoteImporter.create_job(db, user.id, fmt, source_name=os.path.basename(args.file))
+        print(f"Import job {job.id} started ({fmt})")
+
+        with open(args.file, "rb") as f:
+            BulkNoteImporter(db, job, batch_size=args.batch_size).run(iter_rows(f, fmt))
+
+        status = job_status(db, job)
+        print(
+            f"Inserted {status['inserted_rows']} / {status['total_rows']} rows "
+            f"({status['skipped_rows']} duplicates, {status['invalid_rows']} invalid) "
+            f"in {status['insert_seconds']}s — {status['rows_per_second']} rows/s"
+        )
+        for err in status["errors"][:10]:
+            print(f"  {err}")
+
+        if job.status == "enriching" and not args.no_enrich:
+            _enqueue(job.id)
+    finally:
+        db.close()
+
+
+def _enqueue(job_id):
+    from app.tasks.note_import_tasks import enqueue_note_enrichment
+    enqueue_note_enrichment.delay(job_id)
+    print(f"Enrichment queued for job {job_id} (track with GET /api/v1/notes/import/{job_id})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import historical clinical notes")
+    parser.add_argument("--user-email", help="Owner of the imported notes")
+    parser.add_argument("--file", help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--batch-size", type=int, default=settings.NOTE_IMPORT_BATCH_SIZE)
+    parser.add_argument("--no-enrich", action="store_true", help="Insert only; queue enrichment later with --resume-job")
+    parser.add_argument("--resume-job", type=int, default=None, help="Re-queue pending enrichment for a job")
+    args = parser.parse_args()
+
+    if args.resume_job:
+        _enqueue(args.resume_job)
+    elif args.user_email and args.file:
+        import_notes(args)
+    else:
+        parser.error("--user-email and --file are required (or use --resume-job)")
@@ -0,0 +1,84 @@
+"""
+Import-time profile of the API worker (what `python -X importtime` reports).
+
+    python import_profile.py                    # top 25 modules by cumulative time
+    python import_profile.py --top 50 --self    # sort by self time instead
+    python import_profile.py --check            # exit 1 if over the startup budget
+
+Runs `import app.main` in a fresh interpreter, prints wall time, peak RSS,
+the slowest modules and which known-heavy dependencies were loaded (none
+should be: they are imported lazily, see app/core/lazy.py). The budget
+comes from STARTUP_IMPORT_BUDGET_SECONDS / STARTUP_RSS_BUDGET_MB.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from app.core.config import settings
+
+HEAVY_MODULES = (
+    "sentence_transformers", "torch", "numpy", "reportlab", "groq",
+    "firebase_admin", "celery", "twilio",
+)
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({"seconds": elapsed, "rss_mb": rss_kb / 1024,
+                  "heavy": sorted(m for m in %r if m in sys.modules)}))
+""" % (HEAVY_MODULES,)
+
+
+def measure(importtime: bool = False):
+    """Imports app.main in a child interpreter; returns (summary, importtime rows)."""
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return json.loads(proc.stdout.strip().splitlines()[-1]), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--self", dest="by_self", action="store_true", help="Sort by self time")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when over the startup budget")
+    args = parser.parse_args()
+
+    # Wall time / RSS from a clean run; -X importtime itself adds overhead
+    summary, _ = measure()
+    _, rows = measure(importtime=True)
+    rows.sort(key=lambda r: r[0] if args.by_self else r[1], reverse=True)
+
+    print(f"import app.main: {summary['seconds']:.2f} s "
+          f"(budget {settings.STARTUP_IMPORT_BUDGET_SECONDS:.2f} s), "
+          f"peak RSS {summary['rss_mb']:.0f} MB (budget {settings.STARTUP_RSS_BUDGET_MB} MB)")
+    print(f"heavy modules loaded: {', '.join(summary['heavy']) or 'none'}\n")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for self_us, cumulative_us, name in rows[: args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    if args.check:
+        over = (
+            summary["seconds"] > settings.STARTUP_IMPORT_BUDGET_SECONDS
+            or summary["rss_mb"] > settings.STARTUP_RSS_BUDGET_MB
+            or summary["heavy"]
+        )
+        sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
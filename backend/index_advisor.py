@@ -0,0 +1,69 @@
+"""
+Replay the hot read workload against PostgreSQL and propose indexes.
+
+    python index_advisor.py replay --out reports/before.json        # time, EXPLAIN, propose
+    alembic upgrade head                                            # apply the index pack
+    python index_advisor.py replay --out reports/after.json
+    python index_advisor.py compare reports/before.json reports/after.json
+
+`replay` prints per-query p50 / p95, the top pg_stat_statements entries (if
+the extension is installed) and `CREATE INDEX CONCURRENTLY` proposals for
+scans that filter out most of their rows. Proposals are never applied; copy
+the useful ones into a migration. See app/db/index_advisor.py.
+"""
+import argparse
+import json
+import os
+
+from app.db.session import engine
+from app.db import index_advisor
+
+
+def _replay(args):
+    report = index_advisor.replay(engine, iterations=args.iterations, sample_size=args.samples)
+    print(f"{'query':<30} {'p50 ms':>9} {'p95 ms':>9}  plan")
+    for q in report["queries"]:
+        print(f"{q['name']:<30} {q['p50_ms']:9.3f} {q['p95_ms']:9.3f}  {q['plan_root']}")
+    if report["statements"]:
+        print("\nTop statements (pg_stat_statements):")
+        for s in report["statements"][:10]:
+            print(f"  {s['total_ms']:>10} ms  {s['calls']:>6} calls  {' '.join(s['query'].split())[:90]}")
+    print("\nProposed indexes:" if report["proposals"] else "\nNo index proposals.")
+    for p in report["proposals"]:
+        print(f"  {p['ddl']};")
+        for reason in p["reasons"]:
+            print(f"      -- {reason}")
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nReport written to {args.out}")
+
+
+def _compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"{'query':<30} {'p50 before':>11} {'p50 after':>10} {'p95 before':>11} {'p95 after':>10} {'x':>6}  plan")
+    for r in index_advisor.compare(before, after):
+        print(f"{r['name']:<30} {r['before_p50_ms']:11.3f} {r['after_p50_ms']:10.3f} "
+              f"{r['before_p95_ms']:11.3f} {r['after_p95_ms']:10.3f} {r['speedup_p50'] or 0:6.1f}  {r['plan']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Workload-driven index advisor (PostgreSQL)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay = sub.add_parser("replay", help="Run the workload, capture plans and propose indexes")
+    replay.add_argument("--iterations", type=int, default=30, help="Executions per query")
+    replay.add_argument("--samples", type=int, default=10, help="Distinct ids sampled per query")
+    replay.add_argument("--out", default=None, help="Write the JSON report here")
+    compare = sub.add_parser("compare", help="Before/after latency table for two reports")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    args = parser.parse_args()
+    _replay(args) if args.command == "replay" else _compare(args)
+
+
+if __name__ == "__main__":
+    main()
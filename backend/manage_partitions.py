@@ -0,0 +1,46 @@
+"""
+Monthly partition maintenance for audit_logs, ai_usage_metrics and ai_quality_reports.
+
+    python manage_partitions.py                      # create upcoming partitions + archive cold ones
+    python manage_partitions.py --ensure-only        # only create upcoming partitions
+    python manage_partitions.py --archive --dry-run  # list partitions that would be archived
+    python manage_partitions.py --archive --retention-months 12 --archive-dir /mnt/cold
+
+The same work runs daily from the `tasks.maintain_partitions` Celery beat task.
+Archives are gzip'd CSV (with header) and can be restored with
+`\\copy <table> FROM PROGRAM 'gunzip -c <file>' WITH (FORMAT csv, HEADER)`.
+"""
+import argparse
+
+from app.db.session import engine
+from app.db import partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly table partitions")
+    parser.add_argument("--ensure-only", action="store_true", help="Only create upcoming partitions")
+    parser.add_argument("--archive", action="store_true", help="Only archive cold partitions")
+    parser.add_argument("--months-ahead", type=int, default=None)
+    parser.add_argument("--retention-months", type=int, default=None)
+    parser.add_argument("--archive-dir", default=None)
+    parser.add_argument("--dry-run", action="store_true", help="With --archive: list, do not move")
+    args = parser.parse_args()
+
+    if not args.archive:
+        created = partitions.ensure_partitions(engine, args.months_ahead)
+        print(f"Created {len(created)} partition(s)" + (f": {', '.join(created)}" if created else ""))
+    if args.ensure_only:
+        return
+
+    archived = partitions.archive_partitions(
+        engine, args.retention_months, args.archive_dir, dry_run=args.dry_run,
+    )
+    verb = "Would archive" if args.dry_run else "Archived"
+    for a in archived:
+        print(f"{verb} {a.partition} -> {a.path}" + ("" if args.dry_run else f" ({a.rows} rows)"))
+    if not archived:
+        print("No partitions past retention")
+
+
+if __name__ == "__main__":
+    main()
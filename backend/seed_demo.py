@@ -55,7 +55,7 @@ def seed_data_for_user(email):
         patient_id=alice.id,
         title="Initial Consultation",
         raw_content="Patient presents with recurring migraines. Reported sensitivity to light and sound. Duration 4-6 hours per episode. No aura reported.",
-        structured_content='{"subjective": "Recurring migraines with light/sound sensitivity", "objective": "BP 120/80", "assessment": "Migraine without aura", "plan": "Keep headache diary"}',
+        structured_content={"subjective": "Recurring migraines with light/sound sensitivity", "objective": "BP 120/80", "assessment": "Migraine without aura", "plan": "Keep headache diary"},
         note_type="SOAP",
         status="finalized",
         encounter_date=datetime.datetime.utcnow()
@@ -0,0 +1,71 @@
+"""
+Shared pytest hooks.
+
+LOOP_BLOCK_FAIL_MS=<ms> switches the event-loop monitor into test mode: a
+test fails when an app handler it exercised (through TestClient, which runs
+the startup hooks) blocked the event loop for at least that long.
+
+    LOOP_BLOCK_FAIL_MS=100 python -m pytest tests -q
+
+Database fixtures: a test module lists the models it needs in DB_MODELS and
+gets a fresh in-memory SQLite database holding just those tables.
+
+    session_factory  sessionmaker over that database (StaticPool, so every
+                     session and thread sees the same data)
+    db               one session from it; db.statements records the SQL of
+                     every statement executed, for query-count assertions
+    make_engine      make_engine(*models) for tests that need more than one
+                     database (e.g. a primary and a replica)
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.loop_monitor import loop_monitor
+from app.models import Base
+
+
+@pytest.fixture(autouse=True)
+def fail_on_blocked_event_loop():
+    if loop_monitor.fail_ms is None:
+        yield
+        return
+    loop_monitor.violations.clear()
+    yield
+    if loop_monitor.violations:
+        details = "\n\n".join(
+            f"{v['lag_ms']} ms in {v.get('route') or v.get('task')}\n{v.get('stack') or ''}"
+            for v in loop_monitor.violations
+        )
+        pytest.fail(f"Event loop blocked for >= {loop_monitor.fail_ms} ms:\n{details}", pytrace=False)
+
+
+@pytest.fixture
+def make_engine():
+    engines = []
+
+    def make(*models):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[m.__table__ for m in models])
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def session_factory(request, make_engine):
+    return sessionmaker(bind=make_engine(*request.module.DB_MODELS))
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    session.statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: session.statements.append(a[2]))
+    yield session
+    session.close()
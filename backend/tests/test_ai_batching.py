@@ -0,0 +1,94 @@
+"""
+Unit tests for multi-item prompt batching.
+Run with: python -m pytest tests/test_ai_batching.py -v
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.services.ai.ai_service import AIService
+from app.services.ai.batching import BatchStats, estimate_tokens, pack_batches, split_results
+
+
+def _item(i, note="x" * 200):
+    return {"id": i, "age": 60, "gender": "Female", "recent_note": note}
+
+
+def _completion(body, prompt_tokens=100, completion_tokens=50):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+GOOD = {"risk_score": 70, "risk_level": "High", "suggested_actions": []}
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Packing
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestPackBatches:
+    def test_respects_max_items(self):
+        batches = pack_batches([_item(i) for i in range(10)], input_budget=10_000, max_items=4)
+        assert [len(b) for b in batches] == [4, 4, 2]
+
+    def test_respects_token_budget(self):
+        items = [_item(i) for i in range(6)]
+        per_item = estimate_tokens(items[0])
+        batches = pack_batches(items, input_budget=per_item * 2, max_items=100)
+        assert all(len(b) <= 2 for b in batches)
+        assert sum(len(b) for b in batches) == 6
+
+    def test_oversized_item_gets_own_batch(self):
+        batches = pack_batches([_item(1, "y" * 10_000), _item(2)], input_budget=50, max_items=10)
+        assert [len(b) for b in batches] == [1, 1]
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Result matching / validation
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestSplitResults:
+    def test_matches_ids_including_string_ids(self):
+        response = {"results": [{"id": "1", **GOOD}, {"id": 2, **GOOD}]}
+        valid, retry = split_results("DETERIORATION", [_item(1), _item(2)], response)
+        assert set(valid) == {1, 2}
+        assert retry == []
+
+    def test_missing_and_invalid_entries_are_retried(self):
+        response = {"results": [{"id": 1, "risk_score": 250, "risk_level": "High"}]}
+        valid, retry = split_results("DETERIORATION", [_item(1), _item(2)], response)
+        assert valid == {}
+        assert [i["id"] for i in retry] == [1, 2]
+
+    def test_garbage_response(self):
+        valid, retry = split_results("STAFF", [_item(1)], "not a dict")
+        assert valid == {} and len(retry) == 1
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# AIService.run_hospital_agent_batch
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestRunHospitalAgentBatch:
+    def test_only_invalid_entries_retried_individually(self):
+        ai = AIService()
+        create = MagicMock(side_effect=[
+            _completion({"results": [{"id": 1, **GOOD}, {"id": 2, "risk_level": "Unknown"}, {"id": 3, **GOOD}]}),
+            _completion(GOOD),
+        ])
+        ai.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        stats = BatchStats()
+
+        results = asyncio.run(ai.run_hospital_agent_batch("DETERIORATION", [_item(1), _item(2), _item(3)], stats=stats))
+
+        assert set(results) == {1, 2, 3}
+        assert create.call_count == 2
+        assert stats.batches == 1
+        assert stats.individual_retries == 1
+        assert stats.total_tokens == 300
+        retry_payload = json.loads(create.call_args_list[1].kwargs["messages"][1]["content"])
+        assert "id" not in retry_payload
@@ -0,0 +1,79 @@
+"""
+Unit tests for the verified-token cache in the auth dependency.
+Run with: python -m pytest tests/test_auth_cache.py -v
+"""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.api import deps
+from app.core.auth_cache import Principal, TokenCache, token_cache
+from app.models import User
+
+DB_MODELS = [User]
+
+
+@pytest.fixture
+def db(db):
+    db.add(User(id=1, email="dr@example.org", firebase_uid="uid-1", role="DOCTOR", is_active=True))
+    db.commit()
+    token_cache.clear()
+    yield db
+    token_cache.clear()
+
+
+@pytest.fixture
+def firebase(monkeypatch):
+    calls = []
+
+    def verify_id_token(token, clock_skew_seconds=0):
+        calls.append(token)
+        uid = "uid-2" if token == "rotated" else "uid-1"
+        return {"email": "dr@example.org", "uid": uid, "exp": time.time() + 3600}
+
+    monkeypatch.setattr(deps.firebase, "verify_id_token", verify_id_token)
+    return calls
+
+
+def test_second_request_is_a_cache_hit_without_db(db, firebase):
+    first = deps.verify_token_and_get_user(db, "token")
+    assert isinstance(first, Principal) and first.id == 1 and first.role == "DOCTOR"
+
+    db.statements.clear()
+    again = deps.verify_token_and_get_user(db, "token")
+    assert again == first
+    assert firebase == ["token"]
+    assert db.statements == []
+    assert db.info["user_id"] == 1
+
+
+def test_writes_only_when_uid_changes(db, firebase):
+    commits = []
+    event.listen(db, "after_commit", lambda s: commits.append(1))
+
+    deps.verify_token_and_get_user(db, "token")
+    assert commits == []
+
+    principal = deps.verify_token_and_get_user(db, "rotated")
+    assert commits == [1]
+    assert principal.firebase_uid == "uid-2"
+
+
+def test_entries_expire_with_the_token_and_roles_are_enforced(db, firebase):
+    cache = TokenCache(max_ttl=300, maxsize=10)
+    principal = Principal(1, "dr@example.org", "uid-1", None, "DOCTOR", True)
+    cache.put("expired", principal, time.time() - 1)
+    cache.put("short", principal, time.time() + 0.05)
+    assert cache.get("expired") is None
+    assert cache.get("short") == principal
+    time.sleep(0.06)
+    assert cache.get("short") is None
+
+    check = deps.require_role(["SUPER_ADMIN"])
+    with pytest.raises(HTTPException) as exc:
+        check(user=principal)
+    assert exc.value.status_code == 403
+    assert deps.require_role(["doctor"])(user=principal) is principal
@@ -0,0 +1,188 @@
+"""
+Unit tests for bulk historical note import: parsing, insert and enrichment.
+Run with: python -m pytest tests/test_bulk_import.py -v
+"""
+
+import datetime
+import io
+
+import pytest
+
+from app.models import User, Patient, ClinicalNote, NoteImportJob, AuditLog
+from app.services.embedding_service import embedding_service
+from app.services.notes.bulk_import import BulkNoteImporter, enrichment_active, iter_rows, normalize_row, RowError, job_status
+from app.tasks import note_import_tasks
+
+
+PATIENTS = {"7": 7, "MRN-007": 7}
+
+DB_MODELS = [User, Patient, ClinicalNote, NoteImportJob, AuditLog]
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Parsing
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestIterRows:
+    def test_csv_rows(self):
+        data = b"title,raw_content,mrn\nVisit,Patient reports mild cough,MRN-007\n"
+        rows = list(iter_rows(io.BytesIO(data), "csv"))
+        assert rows == [{"title": "Visit", "raw_content": "Patient reports mild cough", "mrn": "MRN-007"}]
+
+    def test_ndjson_skips_blank_and_flags_bad_lines(self):
+        data = b'{"raw_content": "Follow-up visit, stable"}\n\nnot json\n'
+        rows = list(iter_rows(io.BytesIO(data), "ndjson"))
+        assert rows[0]["raw_content"] == "Follow-up visit, stable"
+        assert "__error__" in rows[1]
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            list(iter_rows(io.BytesIO(b""), "xml"))
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Row normalisation
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestNormalizeRow:
+    def test_maps_mrn_and_defaults(self):
+        row = normalize_row({"raw_content": "Chest pain resolved today", "mrn": "MRN-007"}, 1, 9, PATIENTS)
+        assert row["patient_id"] == 7
+        assert row["note_type"] == "SOAP"
+        assert row["import_job_id"] == 9
+        assert row["status"] == "finalized"
+
+    def test_parses_encounter_date(self):
+        row = normalize_row(
+            {"raw_content": "Chest pain resolved today", "encounter_date": "2019-04-02T10:00:00Z"}, 1, 9, PATIENTS
+        )
+        assert row["encounter_date"].year == 2019
+        assert row["encounter_date"].tzinfo is None
+
+    def test_rejects_short_content(self):
+        with pytest.raises(RowError):
+            normalize_row({"raw_content": "short"}, 1, 9, PATIENTS)
+
+    def test_rejects_unknown_patient(self):
+        with pytest.raises(RowError):
+            normalize_row({"raw_content": "Chest pain resolved today", "patient_id": "99"}, 1, 9, PATIENTS)
+
+    def test_rejects_bad_note_type(self):
+        with pytest.raises(RowError):
+            normalize_row({"raw_content": "Chest pain resolved today", "note_type": "LETTER"}, 1, 9, PATIENTS)
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Batch insert
+# ─────────────────────────────────────────────────────────────────────────
+
+def _csv(*lines):
+    return io.BytesIO(("title,raw_content,mrn,idempotency_key\n" + "\n".join(lines) + "\n").encode())
+
+
+class TestImporterRun:
+    def test_inserts_in_batches_and_skips_duplicate_keys(self, db):
+        db.add(User(id=1, email="dr@example.org"))
+        db.add(Patient(id=7, user_id=1, name="P7", mrn="MRN-007"))
+        db.add(ClinicalNote(user_id=1, title="Earlier", raw_content="Imported last week already", idempotency_key="k1"))
+        db.commit()
+        job = BulkNoteImporter.create_job(db, 1, "csv", source_name="notes.csv")
+
+        rows = iter_rows(_csv(
+            "Visit,Patient reports mild cough,MRN-007,k1",
+            "Visit,Follow-up visit; cough resolved,MRN-007,k2",
+            "Visit,short,MRN-007,k3",
+            "Visit,Repeat of the follow-up row,MRN-007,k2",
+            "Visit,Annual review without a key,,",
+        ), "csv")
+        BulkNoteImporter(db, job, batch_size=2).run(rows)
+
+        db.expire_all()
+        job = db.get(NoteImportJob, job.id)
+        assert (job.total_rows, job.inserted_rows, job.skipped_rows, job.invalid_rows) == (5, 2, 2, 1)
+        assert job.status == "enriching" and job.finished_at is None
+        assert job.insert_seconds is not None
+        assert job.error_summary == "row 3: raw_content must be at least 10 characters"
+
+        imported = db.query(ClinicalNote).filter(ClinicalNote.import_job_id == job.id).order_by(ClinicalNote.id).all()
+        assert [(n.idempotency_key, n.patient_id) for n in imported] == [("k2", 7), (None, None)]
+        assert all(n.structured_content is None for n in imported)
+        status = job_status(db, job)
+        assert (status["pending_structuring"], status["pending_embeddings"]) == (2, 2)
+
+    def test_nothing_new_completes_the_job(self, db):
+        db.add(User(id=1, email="dr@example.org"))
+        db.commit()
+        job = BulkNoteImporter.create_job(db, 1, "csv")
+        BulkNoteImporter(db, job).run(iter_rows(_csv("Visit,short,,"), "csv"))
+        assert (job.status, job.inserted_rows, job.invalid_rows) == ("completed", 0, 1)
+        assert job.finished_at is not None
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Enrichment completion
+# ─────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def tasks(session_factory, monkeypatch):
+    """Runs the enrichment tasks against the test database; queued tasks are recorded."""
+    queued = []
+    monkeypatch.setattr(note_import_tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(note_import_tasks.structure_imported_note, "delay", lambda nid: queued.append(("structure", nid)))
+    monkeypatch.setattr(note_import_tasks.embed_imported_note, "delay", lambda nid: queued.append(("embed", nid)))
+    monkeypatch.setattr(embedding_service, "generate_embedding", lambda text: None if "fails" in text else "[0.1]")
+    return queued
+
+
+def _enriching_job(db):
+    db.add(User(id=1, email="dr@example.org"))
+    db.add(NoteImportJob(id=1, user_id=1, source_format="csv", status="enriching", enrichment_failed=0))
+    db.add(ClinicalNote(id=1, user_id=1, import_job_id=1, title="Visit", raw_content="embeds fine",
+                        structured_content={"subjective": "ok"}))
+    db.add(ClinicalNote(id=2, user_id=1, import_job_id=1, title="Visit", raw_content="embedding fails",
+                        structured_content={"subjective": "ok"}))
+    db.commit()
+
+
+class TestEnrichmentCompletion:
+    def test_job_finishes_with_errors_once_the_last_task_gives_up(self, db, tasks):
+        _enriching_job(db)
+        assert note_import_tasks.embed_imported_note.apply(args=(1,)).result == {"status": "embedded"}
+        db.expire_all()
+        assert db.get(NoteImportJob, 1).status == "enriching"
+
+        assert note_import_tasks.embed_imported_note.apply(args=(2,), retries=3).result == {"status": "failed"}
+        db.expire_all()
+        job = db.get(NoteImportJob, 1)
+        assert (job.status, job.enrichment_failed) == ("completed_with_errors", 1)
+        assert job.finished_at is not None
+
+    def test_failure_with_work_outstanding_keeps_the_job_enriching(self, db, tasks):
+        _enriching_job(db)
+        note_import_tasks.embed_imported_note.apply(args=(2,), retries=3)
+        db.expire_all()
+        assert db.get(NoteImportJob, 1).status == "enriching"  # note 1 still has its embedding queued
+
+    def test_resume_requeues_failed_notes_and_resets_the_count(self, db, tasks):
+        _enriching_job(db)
+        note_import_tasks.embed_imported_note.apply(args=(1,))
+        note_import_tasks.embed_imported_note.apply(args=(2,), retries=3)
+
+        assert note_import_tasks.enqueue_note_enrichment(1) == {"queued": 1}
+        assert tasks == [("embed", 2)]
+        db.expire_all()
+        job = db.get(NoteImportJob, 1)
+        assert (job.status, job.enrichment_failed, job.finished_at) == ("enriching", 0, None)
+
+    def test_resume_is_refused_only_while_enrichment_is_progressing(self, db, tasks):
+        _enriching_job(db)
+        note_import_tasks.enqueue_note_enrichment(1)
+        db.expire_all()
+        job = db.get(NoteImportJob, 1)
+        assert enrichment_active(db, job)
+
+        later = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        assert not enrichment_active(db, job, now=later)  # queued work stalled: resume may re-queue it
+
+        job.status = "completed_with_errors"
+        assert not enrichment_active(db, job)
@@ -0,0 +1,119 @@
+"""
+Unit tests for the bulk chart export (paging, FHIR mapping, gzip, CLI resume).
+Run with: python -m pytest tests/test_chart_export.py -v
+"""
+
+import datetime
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+import export_charts
+from app.models import User, Patient, ClinicalNote, Medication, Allergy, AIEncounter, Prescription
+from app.services.export.chart_export import ChartExporter, GzipWriter, chart_to_fhir_bundle, gzip_stream
+
+DB_MODELS = [User, Patient, ClinicalNote, Medication, Allergy, AIEncounter, Prescription]
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    session = session_factory()
+    session.add(User(id=1, email="doc@example.com"))
+    for pid in range(1, 8):
+        session.add(Patient(id=pid, user_id=1, mrn=f"MRN-{pid}", name=f"Patient {pid}", gender="Female",
+                            date_of_birth=datetime.datetime(1980, 1, pid), is_deleted=pid == 4))
+        session.add(ClinicalNote(user_id=1, patient_id=pid, title="Visit", raw_content=f"note {pid}",
+                                 status="finalized"))
+        session.add(Medication(patient_id=pid, name="Metformin", dosage="500mg", frequency="BID", status="Active"))
+    session.add(Allergy(patient_id=2, allergen="Penicillin", reaction="Rash", severity="Moderate"))
+    session.add(AIEncounter(id=10, patient_id=2, created_by_id=1, encounter_date=datetime.datetime(2026, 10, 1),
+                            raw_note="x", chief_complaint="Cough"))
+    session.add(Prescription(patient_id=2, encounter_id=10, doctor_id=1, prescription_items=[
+        {"medicine_name": "Amoxicillin", "dosage": "500mg", "frequency": "TID", "duration": "5 days"},
+    ]))
+    session.commit()
+    session.close()
+    return session_factory
+
+
+def _records(data: bytes):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_pages_skip_deleted_patients_and_resume_after_an_id(session_factory):
+    db = session_factory()
+    exporter = ChartExporter(db, user_id=1, page_size=2)
+    pages = list(exporter.iter_pages())
+    assert [[r["patient"]["id"] for r in _records(p)] for p in pages] == [[1, 2], [3, 5], [6, 7]]
+    assert (exporter.last_patient_id, exporter.exported) == (7, 6)
+
+    resumed = ChartExporter(db, user_id=1, after_patient_id=5, page_size=2)
+    records = _records(b"".join(resumed.iter_lines()))
+    assert [r["patient"]["id"] for r in records[:-1]] == [6, 7]
+    assert records[-1] == {"type": "checkpoint", "last_patient_id": 7, "exported": 2, "complete": True}
+    assert records[0]["notes"][0]["raw_content"] == "note 6"
+    db.close()
+
+
+def test_fhir_bundle_maps_every_child_resource(session_factory):
+    db = session_factory()
+    [chart] = [c for c in ChartExporter(db, user_id=1).iter_charts() if c["patient"]["id"] == 2]
+    bundle = chart_to_fhir_bundle(chart)
+    resources = {e["resource"]["resourceType"]: e["resource"] for e in bundle["entry"]}
+    assert bundle["type"] == "collection" and bundle["id"] == "patient-2"
+    assert resources["Patient"]["gender"] == "female"
+    assert resources["Patient"]["birthDate"] == "1980-01-02"
+    assert resources["DocumentReference"]["docStatus"] == "final"
+    assert resources["MedicationStatement"]["dosage"] == [{"text": "500mg BID"}]
+    assert resources["AllergyIntolerance"]["reaction"][0]["severity"] == "moderate"
+    assert resources["Encounter"]["reasonCode"] == [{"text": "Cough"}]
+    request = resources["MedicationRequest"]
+    assert request["medicationCodeableConcept"] == {"text": "Amoxicillin"}
+    assert request["encounter"] == {"reference": "Encounter/encounter-10"}
+    db.close()
+
+
+def test_gzip_stream_is_one_member_and_decodable_at_every_sync_point():
+    chunks = [(f"line {i} " * 50 + "\n").encode() for i in range(200)]
+    data = b"".join(gzip_stream(iter(chunks), min_flush_bytes=4096))
+    member = zlib.decompressobj(31)
+    assert member.decompress(data) == b"".join(chunks)
+    assert member.eof and member.unused_data == b""
+
+    writer = GzipWriter()
+    out = writer.compress(chunks[0]) + writer.sync()
+    assert zlib.decompressobj(31).decompress(out) == chunks[0]
+
+
+def test_cli_resume_truncates_the_torn_tail_and_finishes_the_member(session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(export_charts, "SessionLocal", session_factory)
+    out = tmp_path / "charts.ndjson.gz"
+    args = SimpleNamespace(out=str(out), format="ndjson", user_id=1, page_size=2, resume=False)
+
+    real_charts_for_page = ChartExporter._charts_for_page
+
+    def crash_on_third_page(self, patients):
+        if patients[0]["id"] == 6:
+            raise RuntimeError("killed")
+        return real_charts_for_page(self, patients)
+
+    monkeypatch.setattr(ChartExporter, "_charts_for_page", crash_on_third_page)
+    with pytest.raises(RuntimeError):
+        export_charts.export_charts(args)
+    with open(out, "ab") as f:
+        f.write(b"\x00torn page")  # bytes written after the last checkpoint
+
+    checkpoint = json.loads((tmp_path / "charts.ndjson.gz.checkpoint").read_text())
+    assert (checkpoint["last_patient_id"], checkpoint["exported"]) == (5, 4)
+    assert checkpoint["offset"] < out.stat().st_size
+
+    monkeypatch.setattr(ChartExporter, "_charts_for_page", real_charts_for_page)
+    export_charts.export_charts(SimpleNamespace(**dict(vars(args), resume=True)))
+
+    member = zlib.decompressobj(31)
+    records = _records(member.decompress(out.read_bytes()))
+    assert member.eof and member.unused_data == b""
+    assert [r["patient"]["id"] for r in records[:-1]] == [1, 2, 3, 5, 6, 7]
+    assert records[-1]["complete"] is True and records[-1]["exported"] == 6
@@ -0,0 +1,85 @@
+"""
+Unit tests for the copilot suggestion loop (debounce, cancellation, prefix cache).
+Run with: python -m pytest tests/test_copilot.py -v
+"""
+
+import asyncio
+
+from app.core.cache import TTLCache
+from app.services.ai.copilot import CopilotSession, prefix_key
+
+
+class FakeAI:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.cancelled = 0
+
+    async def get_copilot_suggestion(self, text):
+        self.calls.append(text)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"suggestions": [f"for {text}"], "warnings": []}
+
+
+def _session(ai, sent, debounce=0.05):
+    async def send(payload):
+        sent.append(payload)
+    return CopilotSession(send, ai, cache=TTLCache(ttl=60, maxsize=10), debounce=debounce, min_chars=10)
+
+
+def test_prefix_key_normalises_case_spacing_and_partial_word():
+    assert prefix_key("Chest  pain radiating", "plan") == prefix_key("chest pain radi", "plan")
+    assert prefix_key("Chest pain ") != prefix_key("Chest pain radiating ")
+    assert prefix_key("Chest pain ", "plan") != prefix_key("Chest pain ", "assessment")
+
+
+def test_burst_is_debounced_to_the_latest_text():
+    async def run():
+        ai, sent = FakeAI(), []
+        session = _session(ai, sent)
+        for text in ("Patient has", "Patient has fever", "Patient has fever and cough"):
+            session.submit(text)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        assert ai.calls == ["Patient has fever and cough"]
+        assert [p["suggestions"] for p in sent] == [["for Patient has fever and cough"]]
+        assert sent[0]["latency_ms"] >= 50 and sent[0]["cached"] is False
+        assert "disclaimer" in sent[0]
+        await session.close()
+    asyncio.run(run())
+
+
+def test_newer_text_cancels_the_in_flight_call():
+    async def run():
+        ai, sent = FakeAI(delay=0.2), []
+        session = _session(ai, sent, debounce=0)
+        session.submit("Patient has fever")
+        await asyncio.sleep(0.05)
+        session.submit("Patient has fever and rigors")
+        await asyncio.sleep(0.3)
+        assert ai.cancelled == 1
+        assert [p["suggestions"] for p in sent] == [["for Patient has fever and rigors"]]
+        await session.close()
+    asyncio.run(run())
+
+
+def test_cached_prefix_is_answered_without_calling_the_model():
+    async def run():
+        ai, sent = FakeAI(), []
+        session = _session(ai, sent)
+        session.submit("Patient has fever ")
+        await asyncio.sleep(0.1)
+        session.submit("patient  has fever and")  # half-typed "and"
+        await asyncio.sleep(0.02)
+        assert len(ai.calls) == 1
+        assert sent[-1]["cached"] is True and sent[-1]["latency_ms"] < 50
+
+        session.submit("short")
+        await asyncio.sleep(0.1)
+        assert len(sent) == 2
+        await session.close()
+    asyncio.run(run())
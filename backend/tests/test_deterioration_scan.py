@@ -0,0 +1,143 @@
+"""
+Unit tests for the incremental deterioration scan engine.
+Run with: python -m pytest tests/test_deterioration_scan.py -v
+"""
+
+import asyncio
+import datetime
+import json
+import threading
+
+from app.models import User, Patient, ClinicalNote, HospitalPatientRisk
+from app.services.hos.deterioration_scan import DeteriorationScanEngine
+
+DB_MODELS = [User, Patient, ClinicalNote, HospitalPatientRisk]
+
+
+class FakeAI:
+    def __init__(self, fail_for=()):
+        self.calls = []
+        self.fail_for = set(fail_for)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run_hospital_agent(self, agent_type, context):
+        self.calls.append(context)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if context["recent_note"] in self.fail_for:
+            return {"error": "upstream"}
+        return {"risk_score": 80, "risk_level": "High", "suggested_actions": ["Recheck vitals"]}
+
+
+def _seed(db):
+    now = datetime.datetime.utcnow()
+    db.add(User(id=1, email="dr@example.org"))
+    for pid in (1, 2, 3, 4):
+        db.add(Patient(id=pid, user_id=1, name=f"P{pid}", mrn=f"M{pid}", status="Active",
+                       date_of_birth=datetime.datetime(1960, 1, 1)))
+    db.add(Patient(id=5, user_id=1, name="Closed", mrn="M5", status="Closed"))
+    # Patient 1: two notes, only the latest should be used
+    db.add(ClinicalNote(patient_id=1, user_id=1, title="a", raw_content="old note p1", created_at=now - datetime.timedelta(days=2)))
+    db.add(ClinicalNote(patient_id=1, user_id=1, title="b", raw_content="new note p1", created_at=now - datetime.timedelta(hours=1)))
+    # Patient 2: note older than last risk update -> unchanged
+    db.add(ClinicalNote(patient_id=2, user_id=1, title="c", raw_content="note p2", created_at=now - datetime.timedelta(days=3)))
+    db.add(HospitalPatientRisk(patient_id=2, risk_score=10, risk_level="Low", last_updated=now - datetime.timedelta(days=1),
+                               scanned_note_at=now - datetime.timedelta(days=3)))
+    # Patient 3: new note; Patient 4: no notes; Patient 5: closed
+    db.add(ClinicalNote(patient_id=3, user_id=1, title="d", raw_content="note p3", created_at=now))
+    db.add(ClinicalNote(patient_id=5, user_id=1, title="e", raw_content="note p5", created_at=now))
+    db.commit()
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Candidate selection
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestCandidateSelection:
+    def test_latest_note_per_active_patient(self, db):
+        _seed(db)
+        rows = {r["id"]: r for r in DeteriorationScanEngine(db, FakeAI()).fetch_latest_notes()}
+        assert set(rows) == {1, 2, 3}
+        assert rows[1]["recent_note"] == "new note p1"
+        assert not rows[2]["needs_scan"]
+        assert rows[2]["recent_note"] is None
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Scan run
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestScanRun:
+    def test_scores_only_changed_patients(self, db):
+        _seed(db)
+        ai = FakeAI()
+        progress = asyncio.run(DeteriorationScanEngine(db, ai, concurrency=2, chunk_size=1).run())
+
+        assert progress.candidates == 2
+        assert progress.skipped_unchanged == 1
+        assert progress.committed == 2
+        assert progress.percent_complete == 100.0
+        assert len(ai.calls) == 2
+        risk = db.query(HospitalPatientRisk).filter_by(patient_id=3).one()
+        assert risk.risk_level == "High"
+        assert json.loads(risk.suggested_actions) == ["Recheck vitals"]
+
+    def test_rescan_is_incremental(self, db):
+        _seed(db)
+        asyncio.run(DeteriorationScanEngine(db, FakeAI()).run())
+        ai = FakeAI()
+        progress = asyncio.run(DeteriorationScanEngine(db, ai).run())
+        assert progress.candidates == 0
+        assert ai.calls == []
+
+    def test_note_written_during_a_scan_is_picked_up_next_time(self, db):
+        _seed(db)
+        asyncio.run(DeteriorationScanEngine(db, FakeAI()).run())
+        risk = db.query(HospitalPatientRisk).filter_by(patient_id=3).one()
+        # Created while the scan was running: after the scored note, before the risk row was written
+        db.add(ClinicalNote(patient_id=3, user_id=1, title="f", raw_content="late note p3",
+                            created_at=risk.last_updated - datetime.timedelta(milliseconds=1)))
+        db.commit()
+
+        ai = FakeAI()
+        progress = asyncio.run(DeteriorationScanEngine(db, ai).run())
+        assert progress.candidates == 1
+        assert [c["recent_note"] for c in ai.calls] == ["late note p3"]
+
+    def test_failures_are_not_written(self, db):
+        _seed(db)
+        progress = asyncio.run(DeteriorationScanEngine(db, FakeAI(fail_for={"note p3"})).run())
+        assert progress.failed == 1
+        assert db.query(HospitalPatientRisk).filter_by(patient_id=3).first() is None
+
+    def test_concurrency_is_bounded(self, db):
+        _seed(db)
+        ai = FakeAI()
+        asyncio.run(DeteriorationScanEngine(db, ai, concurrency=1).run())
+        assert ai.max_in_flight == 1
+
+    def test_db_work_runs_off_the_event_loop(self, db, monkeypatch):
+        _seed(db)
+        threads = {}
+        real_fetch, real_write = DeteriorationScanEngine.fetch_latest_notes, DeteriorationScanEngine._write_chunk
+
+        def fetch(self):
+            threads["fetch"] = threading.get_ident()
+            return real_fetch(self)
+
+        def write(self, *args):
+            threads["write"] = threading.get_ident()
+            return real_write(self, *args)
+
+        monkeypatch.setattr(DeteriorationScanEngine, "fetch_latest_notes", fetch)
+        monkeypatch.setattr(DeteriorationScanEngine, "_write_chunk", write)
+
+        async def run():
+            threads["loop"] = threading.get_ident()
+            return await DeteriorationScanEngine(db, FakeAI()).run()
+
+        assert asyncio.run(run()).succeeded == 2
+        assert threads["fetch"] != threads["loop"] and threads["write"] != threads["loop"]
@@ -0,0 +1,62 @@
+"""
+Unit tests for stored encounter response snapshots.
+Run with: python -m pytest tests/test_encounter_snapshot.py -v
+"""
+
+import datetime
+import json
+
+from app.models import (
+    AIEncounter, AIGeneratedMedication, AIGeneratedDiagnosis, AIGeneratedProcedure,
+    AIGeneratedBilling, AITimelineEvent, AIFollowupRecommendation,
+)
+from app.services.clinical_intelligence import ENCOUNTER_SNAPSHOT_VERSION, encounter_snapshot
+
+DB_MODELS = [
+    AIEncounter, AIGeneratedMedication, AIGeneratedDiagnosis, AIGeneratedProcedure,
+    AIGeneratedBilling, AITimelineEvent, AIFollowupRecommendation,
+]
+
+
+def _seed(db):
+    db.add(AIEncounter(
+        id=1, patient_id=1, created_by_id=1, encounter_date=datetime.datetime(2026, 10, 1),
+        raw_note="cough", soap_note={"assessment": "CAP"}, risk_flags=["Hypoxia"], status="ready",
+    ))
+    db.add(AIGeneratedMedication(encounter_id=1, patient_id=1, name="Amoxicillin", fields_required=["route"]))
+    db.add(AIGeneratedDiagnosis(encounter_id=1, patient_id=1, condition_name="Pneumonia", icd10_code="J18.9"))
+    db.commit()
+    return db.get(AIEncounter, 1)
+
+
+def test_missing_snapshot_is_built_and_saved(db):
+    encounter = _seed(db)
+    body = json.loads(encounter_snapshot(db, encounter))
+
+    assert body["soap"] == {"assessment": "CAP"}
+    assert body["medications"][0]["fields_required"] == ["route"]
+    assert body["diagnoses"][0]["icd10_code"] == "J18.9"
+    db.expire_all()
+    assert db.get(AIEncounter, 1).snapshot_version == ENCOUNTER_SNAPSHOT_VERSION
+
+
+def test_current_snapshot_is_served_without_child_queries(db):
+    encounter = _seed(db)
+    encounter_snapshot(db, encounter)
+    db.expire_all()
+    encounter = db.get(AIEncounter, 1)
+    encounter.response_snapshot  # load the deferred column
+    db.statements.clear()
+
+    encounter_snapshot(db, encounter)
+    assert db.statements == []
+
+
+def test_stale_version_is_rebuilt(db):
+    encounter = _seed(db)
+    encounter.response_snapshot = '{"encounter_id": 1}'
+    encounter.snapshot_version = ENCOUNTER_SNAPSHOT_VERSION - 1
+    db.commit()
+
+    body = json.loads(encounter_snapshot(db, encounter))
+    assert body["medications"][0]["name"] == "Amoxicillin"
@@ -0,0 +1,86 @@
+"""
+Unit tests for fingerprint ETags and If-None-Match handling.
+Run with: python -m pytest tests/test_etag.py -v
+"""
+
+import pytest
+from starlette.requests import Request
+
+from app.core import etag as etags
+from app.models import (
+    User, Patient, ClinicalNote, ClinicalAIInsight, Admission, MedicalHistory, Allergy, Medication,
+    Procedure, Document, Task, BillingItem, PatientCommunication, SecureMessage, ShiftHandover, ReadmissionRisk,
+)
+from app.services.notes.note_service import NoteService
+from app.services.patient_service import PatientService
+
+DB_MODELS = [
+    User, Patient, ClinicalNote, ClinicalAIInsight, Admission, MedicalHistory, Allergy, Medication,
+    Procedure, Document, Task, BillingItem, PatientCommunication, SecureMessage, ShiftHandover, ReadmissionRisk,
+]
+
+
+@pytest.fixture
+def db(db):
+    db.add(User(id=1, email="dr@example.org"))
+    db.add(Patient(id=5, user_id=1, name="P5", mrn="M5"))
+    db.add(ClinicalNote(id=10, user_id=1, title="Review", raw_content="stable"))
+    db.commit()
+    return db
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_is_stable_until_the_chart_changes(db):
+    first = NoteService.note_etag(db, 10, 1)
+    assert first.startswith('W/"')
+    assert NoteService.note_etag(db, 10, 1) == first
+
+    db.add(ClinicalAIInsight(note_id=10, risk_score="High"))
+    db.commit()
+    assert NoteService.note_etag(db, 10, 1) != first
+
+
+def test_missing_or_foreign_rows_have_no_etag(db):
+    assert NoteService.note_etag(db, 10, 2) is None
+    assert NoteService.note_etag(db, 99, 1) is None
+
+
+def test_if_none_match_weak_comparison(db):
+    etag = NoteService.note_etag(db, 10, 1)
+    strong = etag[2:]
+    assert etags.matches(_request(etag), etag)
+    assert etags.matches(_request(f'"other", {strong}'), etag)
+    assert etags.matches(_request("*"), etag)
+    assert not etags.matches(_request('W/"other"'), etag)
+    assert not etags.matches(_request(), etag)
+    assert not etags.matches(_request("*"), None)
+
+    response = etags.not_modified(etag)
+    assert response.status_code == 304 and response.headers["etag"] == etag
+
+
+def test_chart_and_timeline_etags_follow_related_rows(db):
+    chart, timeline = PatientService.chart_etag(db, 5, 1), PatientService.timeline_etag(db, 5, 1)
+    assert chart and timeline and chart != timeline
+    assert PatientService.chart_etag(db, 5, 2) is None
+
+    medication = Medication(patient_id=5, name="Metformin", dosage="500mg", status="Active")
+    db.add(medication)
+    db.commit()
+    inserted = PatientService.chart_etag(db, 5, 1), PatientService.timeline_etag(db, 5, 1)
+    assert inserted[0] != chart and inserted[1] != timeline
+
+    medication.dosage = "1000mg"
+    db.commit()
+    updated = PatientService.chart_etag(db, 5, 1), PatientService.timeline_etag(db, 5, 1)
+    assert updated[0] != inserted[0] and updated[1] != inserted[1]
+
+    # Rows of another patient do not touch this chart
+    db.add(Patient(id=6, user_id=1, name="P6", mrn="M6"))
+    db.add(Medication(patient_id=6, name="Aspirin", status="Active"))
+    db.commit()
+    assert PatientService.chart_etag(db, 5, 1) == updated[0]
@@ -0,0 +1,148 @@
+"""
+Unit tests for the WebSocket event backplane.
+Run with: python -m pytest tests/test_events.py -v
+
+The cross-worker test runs two separate Python processes against a Redis
+pub/sub endpoint: TEST_REDIS_URL when set, otherwise a minimal in-test broker
+speaking the PSUBSCRIBE / PUBLISH subset of the Redis protocol.
+"""
+
+import asyncio
+import fnmatch
+import os
+import socketserver
+import subprocess
+import sys
+import threading
+
+from app.core.events import EventBus, MemoryBackplane, encounter_channel
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import asyncio, sys
+from app.core.events import EventBus, encounter_channel
+
+async def main(url, role):
+    bus = EventBus(url)
+    await bus.start()
+    if role == "subscriber":
+        received = asyncio.get_running_loop().create_future()
+        async def send(event):
+            received.set_result(event)
+        bus.subscribe(encounter_channel(7), send)
+        print("ready", flush=True)
+        event = await asyncio.wait_for(received, 10)
+        print(event["event"], event["encounter_id"], flush=True)
+    else:
+        await bus.publish(encounter_channel(7), {"event": "encounter_ready", "encounter_id": 7})
+    await bus.stop()
+
+asyncio.run(main(sys.argv[1], sys.argv[2]))
+"""
+
+
+def test_hub_fans_out_locally_and_drops_dead_sockets():
+    async def run():
+        bus = EventBus(None)
+        assert isinstance(bus.backplane, MemoryBackplane)
+        hub = bus.hub
+        received = []
+
+        async def good(event):
+            received.append(event)
+
+        async def dead(event):
+            raise RuntimeError("socket closed")
+
+        bus.subscribe(encounter_channel(1), good)
+        bus.subscribe(encounter_channel(1), dead)
+        bus.subscribe(encounter_channel(2), good)
+
+        await bus.publish(encounter_channel(1), {"event": "encounter_ready"})
+        assert received == [{"event": "encounter_ready"}]
+        assert hub.subscriber_count(encounter_channel(1)) == 1
+
+        bus.unsubscribe(encounter_channel(1), good)
+        await bus.publish(encounter_channel(1), {"event": "encounter_confirmed"})
+        assert len(received) == 1
+        assert hub.subscriber_count(encounter_channel(1)) == 0
+    asyncio.run(run())
+
+
+class _PubSubBroker(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _PubSubHandler)
+        self.lock = threading.Lock()
+        self.patterns = []  # (pattern, handler)
+
+
+class _PubSubHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def write(self, payload: bytes):
+        with self.server.lock:
+            self.wfile.write(payload)
+
+    @staticmethod
+    def bulk(value: bytes) -> bytes:
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if args is None:
+                break
+            command = args[0].upper()
+            if command == b"PSUBSCRIBE":
+                for i, pattern in enumerate(args[1:], 1):
+                    self.server.patterns.append((pattern, self))
+                    self.write(b"*3\r\n" + self.bulk(b"psubscribe") + self.bulk(pattern) + b":%d\r\n" % i)
+            elif command == b"PUBLISH":
+                channel, data = args[1], args[2]
+                targets = [(p, h) for p, h in self.server.patterns
+                           if fnmatch.fnmatchcase(channel.decode(), p.decode())]
+                for pattern, handler in targets:
+                    handler.write(b"*4\r\n" + self.bulk(b"pmessage") + self.bulk(pattern)
+                                  + self.bulk(channel) + self.bulk(data))
+                self.write(b":%d\r\n" % len(targets))
+            else:
+                self.write(b"+OK\r\n")
+        self.server.patterns = [(p, h) for p, h in self.server.patterns if h is not self]
+
+
+def test_events_reach_a_socket_on_another_worker_process():
+    broker = None
+    url = os.getenv("TEST_REDIS_URL")
+    if not url:
+        broker = _PubSubBroker()
+        threading.Thread(target=broker.serve_forever, daemon=True).start()
+        url = "redis://127.0.0.1:%d/0" % broker.server_address[1]
+
+    def worker(role):
+        return subprocess.Popen([sys.executable, "-c", WORKER, url, role], cwd=BACKEND_DIR,
+                                stdout=subprocess.PIPE, text=True)
+
+    try:
+        subscriber = worker("subscriber")
+        assert subscriber.stdout.readline().strip() == "ready"
+        publisher = worker("publisher")
+        assert publisher.wait(timeout=30) == 0
+        out, _ = subscriber.communicate(timeout=30)
+        assert out.strip() == "encounter_ready 7"
+        assert subscriber.returncode == 0
+    finally:
+        if broker is not None:
+            broker.shutdown()
+            broker.server_close()
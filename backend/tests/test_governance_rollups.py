@@ -0,0 +1,123 @@
+"""
+Unit tests for the mergeable quantile sketch and governance rollup summaries.
+Run with: python -m pytest tests/test_governance_rollups.py -v
+"""
+
+import datetime
+import random
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import AIGovernanceRollupHourly, AIGovernanceRollupDaily
+from app.services.analytics.quantile_sketch import QuantileSketch
+from app.services.analytics.governance_rollups import bucket_for, record_encounter, summarize
+
+
+def _exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Sketch accuracy / merging
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestQuantileSketch:
+    def test_relative_accuracy(self):
+        rng = random.Random(3)
+        values = [rng.lognormvariate(7, 0.8) for _ in range(5000)]
+        sketch = QuantileSketch(0.01)
+        sketch.extend(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = _exact_quantile(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+    def test_merge_equals_combined(self):
+        rng = random.Random(5)
+        a_vals = [rng.uniform(100, 900) for _ in range(1000)]
+        b_vals = [rng.uniform(2000, 9000) for _ in range(200)]
+        a, b, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        a.extend(a_vals)
+        b.extend(b_vals)
+        both.extend(a_vals + b_vals)
+        merged = QuantileSketch.from_dict(a.to_dict()).merge(QuantileSketch.from_dict(b.to_dict()))
+        assert merged.count == 1200
+        for q in (0.5, 0.95, 0.99):
+            assert merged.quantile(q) == both.quantile(q)
+
+    def test_zero_values_and_empty(self):
+        sketch = QuantileSketch()
+        assert sketch.quantile(0.5) is None
+        sketch.extend([0.0, 0.0, 0.0, 0.9])
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(0.9, rel=0.01)
+
+    def test_rejects_mismatched_accuracy(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Rollup buckets / summaries
+# ─────────────────────────────────────────────────────────────────────────
+
+def _row(model_version, risk_level, latencies, confidences, confirmed=0):
+    lat, conf = QuantileSketch(), QuantileSketch()
+    lat.extend(latencies)
+    conf.extend(confidences)
+    return SimpleNamespace(
+        model_version=model_version, risk_level=risk_level,
+        encounters=len(latencies), confirmed=confirmed, tokens_sum=100 * len(latencies),
+        latency_ms_sum=sum(latencies), latency_count=len(latencies),
+        confidence_sum=sum(confidences), compliance_sum=0.9 * len(confidences), quality_count=len(confidences),
+        edit_distance_sum=0.0, edit_distance_count=0,
+        latency_sketch=lat.to_dict(), confidence_sketch=conf.to_dict(),
+    )
+
+
+class TestRollups:
+    def test_bucket_truncation(self):
+        ts = datetime.datetime(2026, 3, 4, 15, 42, 10)
+        assert bucket_for(AIGovernanceRollupHourly, ts) == datetime.datetime(2026, 3, 4, 15)
+        assert bucket_for(AIGovernanceRollupDaily, ts) == datetime.datetime(2026, 3, 4)
+
+    def test_bucket_normalises_timezone(self):
+        ts = datetime.datetime(2026, 3, 4, 1, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=5)))
+        assert bucket_for(AIGovernanceRollupDaily, ts) == datetime.datetime(2026, 3, 3)
+
+    def test_summary_merges_rows_and_reports_tail(self):
+        rows = [
+            _row("m1", "LOW", [1000] * 98, [0.9] * 98, confirmed=49),
+            _row("m2", "HIGH", [20000, 30000], [0.4, 0.5], confirmed=1),
+        ]
+        summary = summarize(rows)
+        assert summary["total_encounters"] == 100
+        assert summary["acceptance_rate"] == 0.5
+        assert summary["latency_ms_percentiles"]["p50"] == pytest.approx(1000, rel=0.01)
+        assert summary["latency_ms_percentiles"]["p99"] >= 19000
+
+        by_model = summarize(rows, group_by="model_version")
+        assert set(by_model) == {"m1", "m2"}
+        assert by_model["m2"]["avg_confidence_score"] == 0.45
+
+    def test_record_encounter_is_one_upsert_per_rollup(self):
+        statements = []
+        db = SimpleNamespace(execute=statements.append)
+        record_encounter(
+            db, created_at=datetime.datetime(2026, 3, 4, 15, 42), model_version="m1", risk_level="low",
+            latency_ms=1200.0, tokens=300, confidence=0.8, compliance=0.9,
+        )
+        assert [s.table.name for s in statements] == [
+            AIGovernanceRollupHourly.__tablename__, AIGovernanceRollupDaily.__tablename__,
+        ]
+        sql = str(statements[0].compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE" not in sql
+        assert "ON CONFLICT (bucket_start, model_version, risk_level) DO UPDATE" in sql
+        assert "encounters = (ai_governance_rollups_hourly.encounters + excluded.encounters)" in sql
+        assert "latency_sketch = ai_sketch_merge(ai_governance_rollups_hourly.latency_sketch, excluded.latency_sketch)" in sql
+        assert "confirmed" not in sql.split("DO UPDATE")[1]
+        params = statements[0].compile(dialect=postgresql.dialect()).params
+        assert (params["risk_level"], params["encounters"], params["tokens_sum"]) == ("LOW", 1, 300)
+        assert QuantileSketch.from_dict(params["latency_sketch"]).count == 1
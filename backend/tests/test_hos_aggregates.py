@@ -0,0 +1,112 @@
+"""
+Unit tests for single-query HOS aggregates and the TTL snapshot cache.
+Run with: python -m pytest tests/test_hos_aggregates.py -v
+"""
+
+import datetime
+import threading
+import time
+import pytest
+
+from app.core.cache import TTLCache
+from app.models import (
+    User, Patient, ClinicalNote, Admission, Task,
+    HospitalPatientRisk, DoctorAIMetrics,
+)
+from app.services.hos.hos_service import HOSService
+
+DB_MODELS = [User, Patient, ClinicalNote, Admission, Task, HospitalPatientRisk, DoctorAIMetrics]
+
+
+def _seed(db):
+    now = datetime.datetime.utcnow()
+    db.add_all([
+        User(id=1, email="a@x.org", role="DOCTOR"),
+        User(id=2, email="b@x.org", role="doctor"),
+        User(id=3, email="c@x.org", role="NURSE"),
+        Patient(id=1, user_id=1, name="P1", mrn="1", status="Active"),
+        Patient(id=2, user_id=1, name="P2", mrn="2", status="Closed"),
+        Patient(id=3, user_id=2, name="P3", mrn="3", status="Active"),
+        ClinicalNote(user_id=1, raw_content="recent", created_at=now),
+        ClinicalNote(user_id=1, raw_content="old", created_at=now - datetime.timedelta(days=30)),
+        HospitalPatientRisk(patient_id=1, risk_level="Critical"),
+        HospitalPatientRisk(patient_id=3, risk_level="Low"),
+        Task(description="t", status="Pending"),
+        Task(description="t", status="Completed"),
+        Admission(patient_id=1, status="Active"),
+        DoctorAIMetrics(user_id=1, burnout_probability=0.4),
+    ])
+    db.commit()
+    db.statements.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# Aggregates
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestAggregates:
+    def test_command_center_counts_single_query(self, db):
+        _seed(db)
+        counts = HOSService(db, None)._command_center_counts()
+        assert counts["active_patients"] == 2
+        assert counts["high_risk"] == 1
+        assert counts["pending_tasks"] == 1
+        assert counts["active_admissions"] == 1
+        assert counts["avg_burnout"] == pytest.approx(0.4)
+        assert len(db.statements) == 1
+        # Predicates sit in WHERE, where an index can serve them
+        assert "FILTER" not in db.statements[0] and db.statements[0].count("WHERE") == 4
+
+    def test_staff_workload_matches_roles_case_insensitively(self, db):
+        _seed(db)
+        workload = HOSService(db, None)._staff_workload()
+        assert workload == {
+            1: {"active_patients": 1, "notes_last_week": 1},
+            2: {"active_patients": 1, "notes_last_week": 0},
+        }
+        assert len(db.statements) == 1
+
+
+# ─────────────────────────────────────────────────────────────────────────
+# TTL snapshot cache
+# ─────────────────────────────────────────────────────────────────────────
+
+class TestTTLCache:
+    def test_expiry(self):
+        cache = TTLCache(ttl=0.05)
+        cache.set("k", 1)
+        assert cache.get("k") == 1
+        time.sleep(0.06)
+        assert cache.get("k") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_get_or_load_is_single_flight(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return "snapshot"
+
+        threads = [threading.Thread(target=cache.get_or_load, args=("k", loader)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert cache.get("k") == "snapshot"
+
+    def test_loader_errors_are_not_cached(self):
+        cache = TTLCache(ttl=60)
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("k", lambda: (_ for _ in ()).throw(RuntimeError("db down")))
+        assert cache.get_or_load("k", lambda: 5) == 5
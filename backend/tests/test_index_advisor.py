@@ -0,0 +1,54 @@
+"""
+Unit tests for the workload-driven index advisor (plan parsing only, no database).
+Run with: python -m pytest tests/test_index_advisor.py -v
+"""
+from app.db.index_advisor import IndexProposal, compare, merge_proposals, propose_from_plan
+
+NOTES_PLAN = [{"Plan": {
+    "Node Type": "Limit", "Actual Rows": 20, "Actual Loops": 1,
+    "Plans": [{
+        "Node Type": "Sort", "Sort Key": ["clinical_notes.created_at DESC"], "Actual Rows": 20, "Actual Loops": 1,
+        "Plans": [{
+            "Node Type": "Seq Scan", "Relation Name": "clinical_notes", "Alias": "clinical_notes",
+            "Filter": "((NOT is_deleted) AND (patient_id = 7))",
+            "Actual Rows": 40, "Actual Loops": 1, "Rows Removed by Filter": 50000,
+        }],
+    }],
+}}]
+
+
+def test_wasteful_scan_proposes_partial_composite_index():
+    proposals = propose_from_plan(NOTES_PLAN, "patient_notes")
+    assert len(proposals) == 1
+    p = proposals[0]
+    assert (p.table, p.columns, p.where) == ("clinical_notes", ["patient_id", "created_at"], "is_deleted = false")
+    assert p.name == "ix_clinical_notes_patient_id_created_at_live"
+    assert p.ddl().startswith('CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_clinical_notes_patient_id_created_at_live"')
+    assert "patient_notes" in p.reasons[0]
+
+    # A selective scan is left alone
+    cheap = [{"Plan": dict(NOTES_PLAN[0]["Plan"]["Plans"][0]["Plans"][0], **{"Rows Removed by Filter": 3})}]
+    assert propose_from_plan(cheap) == []
+
+
+def test_merge_dedupes_and_skips_covered_proposals():
+    p = IndexProposal("clinical_notes", ["patient_id", "created_at"], "is_deleted = false", ["a"])
+    dup = IndexProposal("clinical_notes", ["patient_id", "created_at"], "is_deleted = false", ["b"])
+    tasks = IndexProposal("tasks", ["patient_id", "status"], None, ["c"])
+
+    merged = merge_proposals([p, dup, tasks], {})
+    assert len(merged) == 2 and merged[0].reasons == ["a", "b"]
+
+    existing = {"clinical_notes": [
+        "CREATE INDEX ix_clinical_notes_patient_live_created ON public.clinical_notes "
+        "USING btree (patient_id, created_at) WHERE (is_deleted = false)"
+    ]}
+    assert [m.table for m in merge_proposals([p, tasks], existing)] == ["tasks"]
+
+
+def test_compare_reports_speedup():
+    before = {"queries": [{"name": "patient_notes", "p50_ms": 12.0, "p95_ms": 20.0, "plan_root": "Seq Scan"}]}
+    after = {"queries": [{"name": "patient_notes", "p50_ms": 0.5, "p95_ms": 1.0, "plan_root": "Index Scan"}]}
+    [row] = compare(before, after)
+    assert row["speedup_p50"] == 24.0
+    assert row["plan"] == "Seq Scan -> Index Scan"
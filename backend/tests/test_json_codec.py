@@ -0,0 +1,40 @@
+"""
+Unit tests for the shared JSON codec and JSON document columns.
+Run with: python -m pytest tests/test_json_codec.py -v
+"""
+
+import datetime
+import decimal
+
+from app.core import json_codec
+from app.models import User, ClinicalNote
+
+DB_MODELS = [User, ClinicalNote]
+
+
+class TestCodec:
+    def test_round_trip_with_extended_types(self):
+        payload = {"when": datetime.datetime(2026, 1, 2, 3, 4, 5), "dose": decimal.Decimal("2.5"), "tags": {"a"}}
+        decoded = json_codec.loads(json_codec.dumps(payload))
+        assert decoded == {"when": "2026-01-02T03:04:05", "dose": 2.5, "tags": ["a"]}
+
+    def test_safe_loads_accepts_jsonb_and_legacy_text(self):
+        assert json_codec.safe_loads(["a"], []) == ["a"]
+        assert json_codec.safe_loads('{"plan": "rest"}', {}) == {"plan": "rest"}
+        assert json_codec.safe_loads("['python', 'repr']", []) == []
+        assert json_codec.safe_loads("", {}) == {}
+        assert json_codec.safe_loads(None, []) == []
+
+    def test_response_class_renders_non_str_keys(self):
+        body = json_codec.FastJSONResponse({1: "x", "ok": True}).body
+        assert json_codec.loads(body) == {"1": "x", "ok": True}
+
+
+def test_json_document_keeps_none_as_sql_null(db):
+    db.add_all([
+        ClinicalNote(id=1, raw_content="structured", structured_content={"plan": "rest"}),
+        ClinicalNote(id=2, raw_content="pending"),
+    ])
+    db.commit()
+    assert db.get(ClinicalNote, 1).structured_content == {"plan": "rest"}
+    assert db.query(ClinicalNote).filter(ClinicalNote.structured_content.is_(None)).count() == 1
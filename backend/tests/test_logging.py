@@ -0,0 +1,37 @@
+"""
+Unit tests for the queued structured logging pipeline.
+Run with: python -m pytest tests/test_logging.py -v
+"""
+
+import json
+import logging
+import queue
+
+from app.core.logging import ContextQueueHandler, StructuredFormatter, request_id_contextvar
+
+
+def _record(msg, *args):
+    return logging.LogRecord("clinical_assistant", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_context_is_captured_on_the_calling_thread():
+    q = queue.Queue()
+    handler = ContextQueueHandler(q)
+    token = request_id_contextvar.set("req-1")
+    try:
+        handler.emit(_record("hello %s", "world"))
+    finally:
+        request_id_contextvar.reset(token)
+
+    record = q.get_nowait()
+    # Formatted later (on the listener thread) without the contextvar set
+    line = json.loads(StructuredFormatter().format(record))
+    assert line["message"] == "hello world"
+    assert line["request_id"] == "req-1"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = ContextQueueHandler(queue.Queue(maxsize=1))
+    handler.emit(_record("one"))
+    handler.emit(_record("two"))
+    assert handler.dropped == 1
@@ -0,0 +1,115 @@
+"""
+Unit tests for the event-loop lag monitor.
+Run with: python -m pytest tests/test_loop_monitor.py -v
+"""
+
+import asyncio
+import contextlib
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import hos
+from app.core.loop_monitor import LagHistogram, LoopMonitor, loop_monitor
+from app.core.middleware import RequestContextMiddleware
+
+
+def test_histogram_is_cumulative():
+    histogram = LagHistogram()
+    for lag in (0.5, 3, 3, 40, 9000):
+        histogram.observe(lag)
+    snap = histogram.snapshot()
+    assert snap["buckets_ms"]["1"] == 1
+    assert snap["buckets_ms"]["5"] == 3
+    assert snap["buckets_ms"]["50"] == 4
+    assert snap["buckets_ms"]["5000"] == 4
+    assert snap["buckets_ms"]["+Inf"] == snap["count"] == 5
+    assert snap["max_ms"] == 9000
+
+
+def test_blocking_call_is_reported_with_stack_and_request():
+    def blocking_handler():
+        time.sleep(0.3)
+
+    async def run():
+        monitor = LoopMonitor(interval_ms=10, slow_ms=100, fail_ms=150)
+        await monitor.start()
+
+        async def request():
+            monitor.tag("req-123", "POST /api/v1/documents/upload")
+            blocking_handler()
+
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(request())
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.slow_count == 1
+    [violation] = monitor.violations
+    assert violation["lag_ms"] >= 150
+    assert violation["request_id"] == "req-123"
+    assert violation["route"] == "POST /api/v1/documents/upload"
+    assert "blocking_handler" in violation["stack"]
+    assert monitor.histogram.snapshot()["count"] > 5
+
+
+def test_non_blocking_work_is_not_reported():
+    async def run():
+        monitor = LoopMonitor(interval_ms=10, slow_ms=100, fail_ms=100)
+        await monitor.start()
+        await asyncio.gather(*(asyncio.sleep(0.01 * i) for i in range(10)))
+        await asyncio.to_thread(time.sleep, 0.2)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.slow_count == 0 and monitor.violations == []
+
+
+def test_app_handler_blocking_the_loop_is_attributed_to_its_request(monkeypatch):
+    app = FastAPI(on_startup=[loop_monitor.start], on_shutdown=[loop_monitor.stop])
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/sync-in-async")
+    async def sync_in_async():
+        time.sleep(0.25)
+        return {}
+
+    monkeypatch.setattr(loop_monitor, "fail_ms", 150)
+    try:
+        with TestClient(app) as client:
+            time.sleep(0.05)
+            client.get("/sync-in-async", headers={"X-Request-ID": "rid-42"})
+            time.sleep(0.05)
+        assert any(v["request_id"] == "rid-42" and v["route"] == "GET /sync-in-async"
+                   for v in loop_monitor.violations)
+    finally:
+        loop_monitor.violations.clear()
+
+
+def test_alerts_websocket_authenticates_off_the_loop(monkeypatch):
+    app = FastAPI(on_startup=[loop_monitor.start], on_shutdown=[loop_monitor.stop])
+    app.include_router(hos.router)
+
+    def slow_invalid_token(db, token):
+        time.sleep(0.25)  # token verification + user lookup
+        raise HTTPException(status_code=401)
+
+    monkeypatch.setattr(hos, "SessionLocal", contextlib.nullcontext)
+    monkeypatch.setattr(hos, "verify_token_and_get_user", slow_invalid_token)
+    monkeypatch.setattr(loop_monitor, "fail_ms", 150)
+    try:
+        with TestClient(app) as client:
+            time.sleep(0.05)
+            with pytest.raises(WebSocketDisconnect) as closed:
+                with client.websocket_connect("/ws/alerts?token=bad"):
+                    pass
+            time.sleep(0.05)
+        assert closed.value.code == 1008
+        assert loop_monitor.violations == []
+    finally:
+        loop_monitor.violations.clear()
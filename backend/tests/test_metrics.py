@@ -0,0 +1,115 @@
+"""
+Unit tests for the Prometheus metrics module.
+Run with: python -m pytest tests/test_metrics.py -v
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+from app.core.middleware import RequestContextMiddleware
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import sys
+from app.core import metrics
+metrics.observe_request("GET", "/api/v1/patients/{patient_id}", 200, 0.02)
+metrics.DB_POOL.labels("primary", "checked_out").set(int(sys.argv[1]))
+"""
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_llm_call_records_latency_tokens_and_errors():
+    before = _value("llm_request_duration_seconds_count", prompt_key="TEST_PROMPT")
+    response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+    with metrics.llm_call("TEST_PROMPT") as call:
+        call.record(response)
+    with pytest.raises(TimeoutError):
+        with metrics.llm_call("TEST_PROMPT"):
+            raise TimeoutError("upstream timed out")
+
+    assert _value("llm_request_duration_seconds_count", prompt_key="TEST_PROMPT") == before + 2
+    assert _value("llm_tokens_total", prompt_key="TEST_PROMPT", kind="prompt") >= 120
+    assert _value("llm_tokens_total", prompt_key="TEST_PROMPT", kind="completion") >= 30
+    assert _value("llm_errors_total", prompt_key="TEST_PROMPT", error="TimeoutError") >= 1
+
+
+def test_cancelled_llm_call_is_not_an_error():
+    before = _value("llm_request_duration_seconds_count", prompt_key="CANCELLED_PROMPT")
+    with pytest.raises(asyncio.CancelledError):
+        with metrics.llm_call("CANCELLED_PROMPT"):
+            raise asyncio.CancelledError()
+
+    assert _value("llm_cancelled_total", prompt_key="CANCELLED_PROMPT") == 1
+    assert _value("llm_errors_total", prompt_key="CANCELLED_PROMPT", error="CancelledError") == 0
+    assert _value("llm_request_duration_seconds_count", prompt_key="CANCELLED_PROMPT") == before
+
+
+def test_requests_are_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/no/such/path")
+
+    assert _value("http_requests_total", method="GET", route="/items/{item_id}", status="200") == 2
+    assert _value("http_request_duration_seconds_count", method="GET", route="/items/{item_id}") == 2
+    assert _value("http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert REGISTRY.get_sample_value("http_requests_total", {"method": "GET", "route": "/items/1", "status": "200"}) is None
+
+
+def test_sampler_sets_pool_and_queue_gauges(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=3)
+    conn = engine.connect()
+    sampler = metrics.Sampler(60, engines={"test": engine, "missing": None}, queues={"test_queue": lambda: 7})
+    sampler.sample()
+    assert _value("db_pool_connections", engine="test", state="checked_out") == 1
+    assert _value("db_pool_connections", engine="test", state="size") == 3
+    assert _value("background_queue_depth", queue="test_queue") == 7
+    conn.close()
+    engine.dispose()
+
+
+def test_multiprocess_mode_merges_worker_samples(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    pids = []
+    for checked_out in (2, 5):
+        worker = subprocess.Popen([sys.executable, "-c", WORKER, str(checked_out)], cwd=BACKEND_DIR, env=env)
+        assert worker.wait(timeout=60) == 0
+        pids.append(worker.pid)
+
+    def merged():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+        return registry
+
+    route = {"method": "GET", "route": "/api/v1/patients/{patient_id}"}
+    pool = {"engine": "primary", "state": "checked_out"}
+    assert merged().get_sample_value("http_requests_total", dict(route, status="200")) == 2
+    assert merged().get_sample_value("http_request_duration_seconds_count", route) == 2
+    assert merged().get_sample_value("db_pool_connections", pool) == 7
+
+    # gunicorn's child_exit hook: a dead worker's live gauges stop counting, its counters stay
+    multiprocess.mark_process_dead(pids[0], path=str(tmp_path))
+    assert merged().get_sample_value("db_pool_connections", pool) == 5
+    assert merged().get_sample_value("http_requests_total", dict(route, status="200")) == 2
@@ -0,0 +1,101 @@
+"""
+Unit tests for the pure ASGI request middleware.
+Run with: python -m pytest tests/test_middleware.py -v
+"""
+
+import pytest
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.core import middleware
+from app.core.logging import request_id_contextvar
+from app.core.ratelimit import RateLimitMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(middleware, "DEFAULT_UPLOAD_LIMIT", 1000)
+    app = FastAPI()
+    app.state.limiter = Limiter(key_func=get_remote_address, default_limits=["1000/minute"])
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(middleware.RequestContextMiddleware)
+    calls = []
+
+    @app.get("/health")
+    def health():
+        return {"request_id": request_id_contextvar.get()}
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        calls.append(1)
+        return {"size": len(await request.body())}
+
+    @app.get("/pdf")
+    def pdf():
+        return StreamingResponse((b"x" * 100 for _ in range(5)), media_type="application/pdf")
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_text("hello")
+        await websocket.close()
+
+    client = TestClient(app)
+    client.calls = calls
+    return client
+
+
+def test_request_id_and_security_headers(client):
+    r = client.get("/health", headers={"X-Request-ID": "abc"})
+    assert r.json() == {"request_id": "abc"}
+    assert r.headers["X-Request-ID"] == "abc"
+    assert r.headers["X-Content-Type-Options"] == "nosniff"
+    assert r.headers["X-Frame-Options"] == "DENY"
+
+    generated = client.get("/health").headers["X-Request-ID"]
+    assert len(generated) == 36
+
+
+def test_upload_limit_on_header_and_streamed_body(client):
+    assert client.post("/upload", content=b"x" * 500).json() == {"size": 500}
+
+    r = client.post("/upload", content=b"x" * 1500)
+    assert r.status_code == 413 and r.json() == {"detail": "Request too large"}
+    assert r.headers["X-Frame-Options"] == "DENY"
+    assert client.calls == [1]
+
+    # Chunked upload: no Content-Length, so only the streamed byte count catches it
+    r = client.post("/upload", content=(b"x" * 400 for _ in range(4)))
+    assert r.status_code == 413 and r.json() == {"detail": "Request too large"}
+
+
+def test_streaming_and_websocket_pass_through(client):
+    # Every chunk arrives after a single response start, through the rate limiter too
+    r = client.get("/pdf")
+    assert r.content == b"x" * 500
+    assert r.headers["X-Content-Type-Options"] == "nosniff"
+
+    with client.websocket_connect("/ws") as ws:
+        assert ws.receive_text() == "hello"
+
+
+def test_one_sampled_access_line_per_request(client, monkeypatch):
+    lines = []
+    monkeypatch.setattr(middleware.logger, "info", lambda msg, extra=None: lines.append(extra["metadata"]))
+    monkeypatch.setattr(middleware.settings, "ACCESS_LOG_ROUTE_SAMPLE_RATES", {"/health": 0.0})
+
+    client.get("/health")
+    assert lines == []
+
+    client.get("/pdf?token=secret")
+    [line] = lines
+    assert (line["method"], line["route"], line["status"]) == ("GET", "/pdf", 200)
+    assert "secret" not in str(line) and line["duration_ms"] >= 0
+
+    # Slow requests are logged whatever the sample rate
+    monkeypatch.setattr(middleware.settings, "ACCESS_LOG_SLOW_MS", 0.0)
+    client.get("/health")
+    assert lines[-1]["route"] == "/health"
@@ -0,0 +1,82 @@
+"""
+Unit tests for keyset cursor pagination.
+Run with: python -m pytest tests/test_pagination.py -v
+"""
+
+import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import json_codec
+from app.core.pagination import PageParams, decode_cursor, encode_cursor, list_response, page, paginate
+from app.models import User, ClinicalNote, Patient, Medication
+from app.schemas.clinical import MedicationResponse
+from app.services.clinical_service import ClinicalService
+
+DB_MODELS = [User, ClinicalNote, Patient, Medication]
+
+
+@pytest.fixture
+def db(db):
+    base = datetime.datetime(2026, 10, 1, 9, 0)
+    for i in range(1, 8):
+        # Notes 3-5 share a timestamp, so ids must break the tie
+        created = base + datetime.timedelta(minutes=3 if 3 <= i <= 5 else i)
+        db.add(ClinicalNote(id=i, user_id=1, title=f"n{i}", raw_content="x", created_at=created))
+    db.commit()
+    return db
+
+
+def test_cursor_round_trip():
+    ts = datetime.datetime(2026, 10, 19, 8, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_invalid_cursor_is_a_400():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_pages_cover_every_row_once_in_order(db):
+    seen, cursor = [], None
+    while True:
+        query = paginate(db.query(ClinicalNote.id, ClinicalNote.created_at), ClinicalNote.created_at, ClinicalNote.id, cursor, 3)
+        rows, cursor = page(query.all(), 3)
+        seen.extend(r.id for r in rows)
+        if cursor is None:
+            break
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def _medications(db, n=5):
+    for i in range(1, n + 1):
+        db.add(Medication(id=i, patient_id=1, name=f"Drug {i}", dosage="5mg", status="Active",
+                          created_at=datetime.datetime(2026, 10, i)))
+    db.commit()
+
+
+def test_sparse_fieldset_selects_only_requested_columns(db):
+    _medications(db)
+    params = PageParams(cursor=None, limit=2, fields="name,status")
+    rows, next_cursor, fields = ClinicalService.list_page(db, Medication, MedicationResponse, params, Medication.patient_id == 1)
+
+    assert fields == ["id", "name", "status"]
+    assert rows == [{"id": 5, "name": "Drug 5", "status": "Active"}, {"id": 4, "name": "Drug 4", "status": "Active"}]
+    response = list_response(rows, next_cursor, MedicationResponse, fields)
+    assert response.headers["x-next-cursor"] == next_cursor
+    assert json_codec.loads(response.body)[0] == {"id": 5, "name": "Drug 5", "status": "Active"}
+
+
+def test_full_rows_and_unknown_fields(db):
+    _medications(db, n=2)
+    rows, next_cursor, fields = ClinicalService.list_page(
+        db, Medication, MedicationResponse, PageParams(cursor=None, limit=10, fields=None), Medication.patient_id == 1
+    )
+    body = json_codec.loads(list_response(rows, next_cursor, MedicationResponse, fields).body)
+    assert next_cursor is None and [m["id"] for m in body] == [2, 1] and body[0]["dosage"] == "5mg"
+
+    with pytest.raises(HTTPException) as exc:
+        ClinicalService.list_page(db, Medication, MedicationResponse, PageParams(cursor=None, limit=10, fields="name,ssn"))
+    assert exc.value.status_code == 400
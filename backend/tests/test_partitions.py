@@ -0,0 +1,86 @@
+"""
+Unit tests for monthly partition naming, premaking and retention selection.
+Run with: python -m pytest tests/test_partitions.py -v
+"""
+
+import datetime
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from app.db import partitions
+
+
+def test_add_months_wraps_years():
+    assert partitions.add_months(datetime.date(2026, 11, 1), 3) == datetime.date(2027, 2, 1)
+    assert partitions.add_months(datetime.date(2026, 1, 1), -1) == datetime.date(2025, 12, 1)
+
+
+def test_create_partition_sql_bounds():
+    sql = partitions.create_partition_sql("audit_logs", datetime.date(2026, 12, 1))
+    assert '"audit_logs_y2026m12" PARTITION OF "audit_logs"' in sql
+    assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in sql
+
+
+def test_cold_partitions_respects_retention(monkeypatch):
+    existing = {
+        "audit_logs": ["audit_logs_default", "audit_logs_y2024m09", "audit_logs_y2024m10", "audit_logs_y2024m11"],
+        "ai_usage_metrics": ["ai_usage_metrics_y2026m10"],
+        "ai_quality_reports": [],
+    }
+    monkeypatch.setattr(partitions, "list_partitions", lambda conn, table: existing[table])
+
+    cold = partitions.cold_partitions(None, retention_months=24, today=datetime.date(2026, 10, 19))
+    # Cutoff is 2024-10-01: only months that ended on or before it are cold
+    assert cold == {"audit_logs": ["audit_logs_y2024m09"]}
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.engine.statements.append(sql)
+        if sql in self.engine.fail_on:
+            raise RuntimeError("boom")
+        stranded = sql.startswith("SELECT EXISTS") and any(f'"{d}"' in sql for d in self.engine.stranded)
+        return SimpleNamespace(scalar=lambda: stranded, rowcount=4)
+
+
+class FakeEngine:
+    def __init__(self, stranded=(), fail_on=()):
+        self.statements = []
+        self.stranded = stranded
+        self.fail_on = set(fail_on)
+        self.commits = 0
+
+    @contextmanager
+    def begin(self):
+        yield FakeConnection(self)
+        self.commits += 1
+
+
+def test_rows_in_default_are_moved_into_the_new_partition(monkeypatch):
+    monkeypatch.setattr(partitions, "list_partitions", lambda conn, table: [])
+    engine = FakeEngine(stranded=["audit_logs_default"])
+    created = partitions.ensure_partitions(engine, months_ahead=0, today=datetime.date(2026, 10, 19))
+
+    assert created == ["audit_logs_y2026m10", "ai_usage_metrics_y2026m10", "ai_quality_reports_y2026m10"]
+    audit = [s for s in engine.statements if "audit_logs" in s]
+    assert audit[1] == 'ALTER TABLE "audit_logs" DETACH PARTITION "audit_logs_default"'
+    assert audit[2].startswith('CREATE TABLE IF NOT EXISTS "audit_logs_y2026m10"')
+    assert audit[3].startswith('WITH moved AS (DELETE FROM "audit_logs_default" WHERE "timestamp" >= ')
+    assert audit[3].endswith('INSERT INTO "audit_logs_y2026m10" SELECT * FROM moved')
+    assert audit[4] == 'ALTER TABLE "audit_logs" ATTACH PARTITION "audit_logs_default" DEFAULT'
+    # Tables with nothing stranded in DEFAULT just create the partition
+    assert not any("DETACH" in s for s in engine.statements if "ai_usage_metrics" in s)
+
+
+def test_a_failing_table_does_not_abort_the_others(monkeypatch):
+    monkeypatch.setattr(partitions, "list_partitions", lambda conn, table: [])
+    failing = partitions.create_partition_sql("ai_usage_metrics", datetime.date(2026, 10, 1))
+    engine = FakeEngine(fail_on=[failing])
+    created = partitions.ensure_partitions(engine, months_ahead=0, today=datetime.date(2026, 10, 19))
+
+    assert created == ["audit_logs_y2026m10", "ai_quality_reports_y2026m10"]
+    assert engine.commits == 2
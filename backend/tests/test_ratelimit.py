@@ -0,0 +1,73 @@
+"""
+Unit tests for per-user, cost-weighted rate limiting.
+Run with: python -m pytest tests/test_ratelimit.py -v
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+from app.core import ratelimit
+from app.core.auth_cache import Principal, token_cache
+
+
+@pytest.fixture
+def client():
+    limiter = ratelimit.build_limiter("memory://")
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    def budget(kind):
+        return limiter.shared_limit("30/minute", scope="user_budget", cost=ratelimit.COSTS[kind])
+
+    @app.get("/note")
+    @limiter.limit("5/minute")
+    @budget("read")
+    def read_note(request: Request):
+        return {"ok": True}
+
+    @app.post("/encounter")
+    @budget("encounter")
+    def encounter(request: Request):
+        return {"ok": True}
+
+    for user_id, token in ((1, "token-a"), (2, "token-b")):
+        token_cache.put(token, Principal(user_id, f"u{user_id}@example.org", None, None, "DOCTOR", True), None)
+    yield TestClient(app)
+    token_cache.clear()
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_limits_are_per_user_not_per_ip(client):
+    # Same client IP (the load balancer) for both users
+    for _ in range(5):
+        assert client.get("/note", headers=_auth("token-a")).status_code == 200
+    assert client.get("/note", headers=_auth("token-a")).status_code == 429
+    assert client.get("/note", headers=_auth("token-b")).status_code == 200
+    # Unverified token / anonymous: keyed on IP
+    assert client.get("/note", headers=_auth("unknown")).status_code == 200
+
+
+def test_expensive_calls_draw_more_from_the_shared_budget(client):
+    # encounter costs 25 of the 30 units; a read (1) fits, a second encounter does not
+    assert client.post("/encounter", headers=_auth("token-a")).status_code == 200
+    assert client.get("/note", headers=_auth("token-a")).status_code == 200
+    assert client.post("/encounter", headers=_auth("token-a")).status_code == 429
+    assert client.post("/encounter", headers=_auth("token-b")).status_code == 200
+
+
+def test_rate_limit_key():
+    token_cache.put("token-c", Principal(3, "c@example.org", None, None, "NURSE", True), None)
+    try:
+        scope = {"type": "http", "headers": [(b"authorization", b"Bearer token-c")], "client": ("10.0.0.1", 1)}
+        assert ratelimit.rate_limit_key(Request(scope)) == "user:3"
+        scope["headers"] = []
+        assert ratelimit.rate_limit_key(Request(scope)) == "ip:10.0.0.1"
+    finally:
+        token_cache.clear()
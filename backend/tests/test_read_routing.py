@@ -0,0 +1,135 @@
+"""
+Unit tests for primary / read-replica session routing.
+Run with: python -m pytest tests/test_read_routing.py -v
+"""
+
+import math
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.routing import ReplicaRouter, RedisWriteMarkers, RoutingSession, replica_lag, track_writes
+from app.models import User
+
+
+@pytest.fixture
+def router(make_engine):
+    r = ReplicaRouter(make_engine(User), make_engine(User), max_lag=5.0, lag_check_interval=60.0, read_your_writes=10.0)
+    r._measure_lag = lambda: 0.0
+    return r
+
+
+def test_reads_go_to_replica_unless_unknown_user_or_lagging(router):
+    assert router.engine_for(1) is router.replica
+    assert router.engine_for(None) is router.primary
+
+    router._lag.clear()
+    router._measure_lag = lambda: 30.0
+    assert router.engine_for(1) is router.primary
+
+    # An unreachable replica is treated as infinitely behind
+    router._lag.clear()
+    router.replica = create_engine("postgresql+psycopg2://u:p@127.0.0.1:1/none", connect_args={"connect_timeout": 1})
+    del router._measure_lag
+    assert router.lag() == math.inf
+    assert router.engine_for(1) is router.primary
+
+    assert ReplicaRouter(router.primary, None).engine_for(1) is router.primary
+
+
+def test_user_reads_own_writes_from_primary(router):
+    Primary = sessionmaker(bind=router.primary)
+    track_writes(Primary, router)
+
+    db = Primary()
+    db.info["user_id"] = 7
+    db.add(User(id=7, email="dr@example.org"))
+    db.commit()
+    db.close()
+
+    assert router.engine_for(7) is router.primary
+    assert router.engine_for(8) is router.replica
+
+    # A read-only commit does not count as a write
+    db = Primary()
+    db.info["user_id"] = 8
+    db.query(User).all()
+    db.commit()
+    db.close()
+    assert router.engine_for(8) is router.replica
+
+
+def test_routing_session_reads_replica_and_flushes_to_primary(router):
+    with router.replica.begin() as conn:
+        conn.execute(User.__table__.insert(), {"id": 1, "email": "replica@example.org"})
+    Read = sessionmaker(class_=RoutingSession, info={"router": router})
+
+    db = Read()
+    db.info["auth"] = {"user_id": 1}
+    assert [u.email for u in db.query(User).all()] == ["replica@example.org"]
+    assert db.on_replica
+
+    db.add(User(id=2, email="new@example.org"))
+    db.commit()
+    db.close()
+    with router.primary.connect() as conn:
+        assert conn.execute(User.__table__.select()).all()[0].email == "new@example.org"
+
+
+class FakeRedis:
+    def __init__(self, data):
+        self.data = data
+        self.down = False
+
+    def set(self, key, value, ex=None):
+        if self.down:
+            raise ConnectionError("redis unavailable")
+        self.data[key] = value.encode()
+
+    def get(self, key):
+        if self.down:
+            raise ConnectionError("redis unavailable")
+        return self.data.get(key)
+
+
+def _shared_markers(data):
+    markers = RedisWriteMarkers("redis://localhost:6379/0", ttl=10)
+    markers._redis = FakeRedis(data)
+    return markers
+
+
+def test_write_on_one_worker_keeps_reads_on_primary_on_every_worker(router):
+    shared = {}
+    workers = [
+        ReplicaRouter(router.primary, router.replica, read_your_writes=10.0, writes=_shared_markers(shared))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker._measure_lag = lambda: 0.0
+
+    workers[0].note_write(7)
+    assert workers[1].engine_for(7) is router.primary
+    assert workers[1].engine_for(8) is router.replica
+
+    # Marker store unreachable: reads cannot prove they are safe on the replica
+    workers[1]._writes._redis.down = True
+    assert workers[1].engine_for(8) is router.primary
+    workers[1].note_write(8)   # logged, not raised
+
+
+def _lag_row(**overrides):
+    row = dict(receiver_pid=4242, receiver_status="streaming", caught_up=True, replay_age=900.0, receipt_age=2.0)
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+def test_replica_lag_requires_a_connected_wal_receiver():
+    assert replica_lag(_lag_row()) == 0.0                                # idle primary, replica current
+    assert replica_lag(_lag_row(caught_up=False, replay_age=3.5)) == 3.5
+    assert replica_lag(_lag_row(receiver_pid=None, receiver_status=None)) == math.inf   # receiver disconnected
+    assert replica_lag(_lag_row(receiver_status="waiting")) == math.inf
+    assert replica_lag(_lag_row(receipt_age=300.0)) == math.inf          # connected but silent
+    # Without pg_read_all_stats only the pid is visible
+    assert replica_lag(_lag_row(receiver_status=None, receipt_age=None)) == 0.0
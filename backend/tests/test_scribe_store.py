@@ -0,0 +1,121 @@
+"""
+Unit tests for the live scribe session stores.
+Run with: python -m pytest tests/test_scribe_store.py -v
+"""
+
+import asyncio
+import time
+
+from redis.exceptions import WatchError
+
+from app.services.ai.scribe_store import MemoryScribeStore, RedisScribeStore, build_scribe_store
+
+
+def test_chunks_accumulate_per_session():
+    async def run():
+        store = MemoryScribeStore(ttl=60, max_sessions=10, max_chars=1000)
+        assert await store.append("1:7:abc", "Patient reports") == "Patient reports"
+        assert await store.append("1:7:abc", "chest pain.") == "Patient reports chest pain."
+        assert await store.append("1:7:other", "New session") == "New session"
+        await store.clear("1:7:abc")
+        assert await store.get("1:7:abc") is None
+    asyncio.run(run())
+
+
+def test_sessions_expire_and_are_bounded():
+    async def run():
+        store = MemoryScribeStore(ttl=0.05, max_sessions=2, max_chars=20)
+        await store.append("a", "one")
+        time.sleep(0.06)
+        assert await store.get("a") is None
+        assert await store.append("a", "fresh") == "fresh"
+
+        # LRU eviction beyond max_sessions
+        await store.append("b", "two")
+        await store.append("c", "three")
+        assert await store.get("a") is None and await store.get("c") == "three"
+
+        # Oversized sessions keep their most recent text
+        text = await store.append("c", "x" * 30)
+        assert text == "x" * 20
+    asyncio.run(run())
+
+
+def test_memory_store_is_the_default():
+    assert isinstance(build_scribe_store(None), MemoryScribeStore)
+
+
+class FakePipeline:
+    """The WATCH / GET / MULTI / SET / EXEC subset of redis.asyncio's pipeline."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def watch(self, name):
+        self.watched = (name, self.redis.versions.get(name, 0))
+
+    async def get(self, name):
+        return self.redis.data.get(name)
+
+    def multi(self):
+        self.queued = []
+
+    def set(self, name, value, ex=None):
+        self.queued.append((name, value, ex))
+
+    async def execute(self):
+        if self.redis.interleave:
+            self.redis.write(self.watched[0], self.redis.interleave.pop(0), None)
+        name, version = self.watched
+        if self.redis.versions.get(name, 0) != version:
+            raise WatchError("watched key changed")
+        for args in self.queued:
+            self.redis.write(*args)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data, self.versions, self.ttls = {}, {}, {}
+        self.interleave = []  # values another worker writes just before our EXEC
+
+    def write(self, name, value, ex):
+        self.data[name] = value
+        self.versions[name] = self.versions.get(name, 0) + 1
+        self.ttls[name] = ex
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _redis_store(max_chars):
+    store = RedisScribeStore.__new__(RedisScribeStore)
+    store.ttl, store.max_chars, store.prefix = 60, max_chars, "scribe:"
+    store._redis = FakeRedis()
+    return store
+
+
+def test_redis_store_trims_by_characters_like_the_memory_store():
+    chunks = ["Patient reports", "fièvre à 39°C", "douleur thoracique — 2 jours"]
+
+    async def run(store):
+        return [await store.append("s1", chunk) for chunk in chunks]
+
+    redis_store = _redis_store(max_chars=30)
+    assert asyncio.run(run(redis_store)) == asyncio.run(run(MemoryScribeStore(60, 10, 30)))
+    stored = redis_store._redis.data["scribe:s1"]
+    assert len(stored) == 30 and stored.endswith("2 jours")
+    assert redis_store._redis.ttls["scribe:s1"] == 60
+
+
+def test_redis_store_retries_when_another_chunk_lands_first():
+    store = _redis_store(max_chars=1000)
+    store._redis.data["scribe:s1"] = " first"
+    store._redis.interleave = [" first second"]
+    assert asyncio.run(store.append("s1", "third")) == "first second third"
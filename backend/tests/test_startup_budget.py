@@ -0,0 +1,15 @@
+"""
+Startup budget for API workers: `import app.main` must stay fast and light.
+Run with: python -m pytest tests/test_startup_budget.py -v
+"""
+
+from app.core.config import settings
+from import_profile import measure
+
+
+def test_import_app_main_within_budget():
+    summary, _ = measure()
+    # Heavy dependencies are imported lazily at first use (app/core/lazy.py)
+    assert summary["heavy"] == []
+    assert summary["seconds"] <= settings.STARTUP_IMPORT_BUDGET_SECONDS, summary
+    assert summary["rss_mb"] <= settings.STARTUP_RSS_BUDGET_MB, summary
@@ -0,0 +1,172 @@
+"""
+Unit tests for the audit / telemetry write-behind queue.
+Run with: python -m pytest tests/test_write_behind.py -v
+"""
+
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.core import write_behind
+from app.core.write_behind import WriteBehindQueue, DEAD_LETTER_FILE
+from app.models import Base, User, AuditLog
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, AuditLog.__table__])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def writer(engine, tmp_path):
+    # Long interval: tests drive flush() explicitly
+    queue = WriteBehindQueue(str(tmp_path / "spool"), maxsize=100, batch_size=50, flush_interval=60)
+    queue.start(engine, Base.metadata)
+    yield queue
+    queue.stop()
+
+
+def _count(engine):
+    with engine.connect() as conn:
+        return conn.execute(func.count(AuditLog.id).select()).scalar()
+
+
+def _audit(db, writer, action="create"):
+    return write_behind.record(db, AuditLog, writer=writer, user_id=1, action=action, entity_type="Patient", entity_id=1)
+
+
+class TestWriteBehind:
+    def test_rows_are_queued_after_commit_and_flushed_in_batch(self, engine, writer):
+        db = sessionmaker(bind=engine)()
+        for _ in range(3):
+            assert _audit(db, writer) is None
+        assert writer.stats()["backlog"] == 0   # nothing before commit
+        db.commit()
+        assert writer.stats()["backlog"] == 3
+        assert _count(engine) == 0
+
+        assert writer.flush() == 3
+        assert _count(engine) == 3
+        stats = writer.stats()
+        assert stats["backlog"] == 0 and stats["flushes"] == 1 and stats["spool_bytes"] == 0
+
+    def test_rollback_discards_staged_rows(self, engine, writer):
+        db = sessionmaker(bind=engine)()
+        _audit(db, writer)
+        db.rollback()
+        db.commit()
+        assert writer.stats()["enqueued"] == 0
+
+    def test_sync_fallback_when_not_running(self, engine, tmp_path):
+        idle = WriteBehindQueue(str(tmp_path / "idle"))
+        db = sessionmaker(bind=engine)()
+        assert isinstance(_audit(db, idle), AuditLog)
+        db.commit()
+        assert _count(engine) == 1
+
+    def test_full_queue_writes_synchronously(self, engine, tmp_path):
+        queue = WriteBehindQueue(str(tmp_path / "small"), maxsize=1, flush_interval=60)
+        queue.start(engine, Base.metadata)
+        try:
+            db = sessionmaker(bind=engine)()
+            _audit(db, queue)
+            _audit(db, queue)
+            db.commit()
+            assert queue.stats()["backlog"] == 1
+            assert queue.stats()["overflow_sync_writes"] == 1
+            assert _count(engine) == 1
+        finally:
+            queue.stop()
+        assert _count(engine) == 2
+
+    def test_failed_overflow_write_goes_to_dead_letter(self, engine, tmp_path, monkeypatch):
+        queue = WriteBehindQueue(str(tmp_path / "small"), maxsize=1, flush_interval=60)
+        queue.start(engine, Base.metadata)
+
+        def database_down(table_name, values):
+            raise ConnectionError("database unavailable")
+
+        monkeypatch.setattr(queue, "write_now", database_down)
+        try:
+            db = sessionmaker(bind=engine)()
+            _audit(db, queue, action="queued")
+            _audit(db, queue, action="overflow")
+            db.commit()
+            assert queue.stats()["dead_lettered"] == 1
+            with open(os.path.join(queue.spool_dir, DEAD_LETTER_FILE)) as f:
+                assert json.loads(f.readline())["v"]["action"] == "overflow"
+        finally:
+            queue.stop()
+
+    def test_savepoint_release_does_not_enqueue(self, engine, writer):
+        db = sessionmaker(bind=engine)()
+        _audit(db, writer)
+        with db.begin_nested():
+            pass
+        assert writer.stats()["backlog"] == 0
+        db.commit()
+        assert writer.stats()["backlog"] == 1
+
+    def test_committed_rows_are_spooled_and_failed_commits_are_not_replayed(self, engine, tmp_path, monkeypatch):
+        spool = str(tmp_path / "spool")
+        queue = WriteBehindQueue(spool, flush_interval=60)
+        queue.start(engine, Base.metadata)
+        db = sessionmaker(bind=engine)()
+        _audit(db, queue, action="kept")
+        db.commit()
+        _audit(db, queue, action="aborted")
+        db.add(User(email=None))   # the COMMIT's flush fails after the rows were spooled
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+        assert queue.stats()["backlog"] == 1
+        spooled = "".join(open(os.path.join(spool, name)).read() for name in os.listdir(spool))
+        assert '"aborted"' in spooled and '"abort":' in spooled
+
+        # Crash: the process dies with the row still queued in memory
+        monkeypatch.setattr(queue, "flush", lambda: 0)
+        queue.stop()
+
+        recovered = WriteBehindQueue(spool, flush_interval=60)
+        recovered.start(engine, Base.metadata)
+        try:
+            assert recovered.stats()["replayed"] == 1
+            recovered.flush()
+        finally:
+            recovered.stop()
+        with engine.connect() as conn:
+            assert conn.execute(select(AuditLog.action)).scalars().all() == ["kept"]
+
+    def test_orphaned_spool_is_replayed(self, engine, tmp_path):
+        spool = tmp_path / "spool"
+        spool.mkdir()
+        # Segment of a dead process, with a torn final line
+        row = {"t": "audit_logs", "v": {"user_id": 1, "action": "crashed", "timestamp": {"$dt": "2026-01-01T10:00:00"}}}
+        (spool / "999999999-000001.jsonl").write_text(json.dumps(row) + "\n" + '{"t": "audit_lo')
+
+        queue = WriteBehindQueue(str(spool), flush_interval=60)
+        queue.start(engine, Base.metadata)
+        try:
+            assert queue.stats()["replayed"] == 1
+            queue.flush()
+        finally:
+            queue.stop()
+        assert _count(engine) == 1
+        assert os.listdir(spool) == []
+
+    def test_rejected_rows_go_to_dead_letter(self, engine, writer):
+        db = sessionmaker(bind=engine)()
+        _audit(db, writer, action="ok")
+        _audit(db, writer, action=None)   # violates NOT NULL
+        db.commit()
+        writer.flush()
+        assert _count(engine) == 1
+        assert writer.stats()["dead_lettered"] == 1
+        assert os.path.exists(os.path.join(writer.spool_dir, DEAD_LETTER_FILE))
@@ -9,6 +9,8 @@ import { useAuth } from '@/context/AuthContext';
 
 export default function DashboardPage() {
     const [notes, setNotes] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
     const [searchMode, setSearchMode] = useState('keyword');
@@ -27,6 +29,7 @@ export default function DashboardPage() {
             setLoading(true);
             const response = await notesApi.getAll(query, mode);
             setNotes(response.data);
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (err: any) {
             console.error(err);
             const detail = err.response?.data?.detail || err.message || "Unknown connectivity error";
@@ -36,6 +39,20 @@ export default function DashboardPage() {
         }
     };
 
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        try {
+            setLoadingMore(true);
+            const response = await notesApi.getAll(searchTerm, searchMode, nextCursor);
+            setNotes(prev => [...prev, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+        } catch (err: any) {
+            console.error(err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleDelete = async (e: React.MouseEvent, id: number) => {
         e.preventDefault();
         e.stopPropagation();
@@ -157,7 +174,7 @@ export default function DashboardPage() {
                                         ) : (
                                             <span className="text-[10px] uppercase tracking-widest font-bold bg-orange-100 text-orange-700 px-2 py-1 rounded">Draft</span>
                                         )}
-                                        {note.structured_content && (
+                                        {note.is_structured && (
                                             <span className="text-[10px] uppercase tracking-widest font-bold bg-green-100 text-green-700 px-2 py-1 rounded">Structured</span>
                                         )}
                                     </div>
@@ -172,6 +189,15 @@ export default function DashboardPage() {
                                 </div>
                             </Link>
                         ))}
+                        {nextCursor && (
+                            <button
+                                onClick={loadMore}
+                                disabled={loadingMore}
+                                className="py-3 text-sm font-bold text-teal-600 hover:text-teal-700 disabled:text-slate-400 transition-colors"
+                            >
+                                {loadingMore ? 'Loading...' : 'Load more notes'}
+                            </button>
+                        )}
                     </div>
                 )}
             </main>
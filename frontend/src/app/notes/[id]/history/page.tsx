@@ -72,7 +72,11 @@ export default function NoteHistoryPage() {
                                 </div>
 
                                 <div className="bg-slate-50 p-4 rounded-xl border border-slate-200 text-sm font-mono text-slate-700 overflow-x-auto">
-                                    <pre>{JSON.stringify(JSON.parse(version.structured_content || '{}'), null, 2)}</pre>
+                                    <pre>{JSON.stringify(
+                                        typeof version.structured_content === 'string'
+                                            ? JSON.parse(version.structured_content || '{}')
+                                            : (version.structured_content ?? {}),
+                                        null, 2)}</pre>
                                 </div>
                             </div>
                         ))
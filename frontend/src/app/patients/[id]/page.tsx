@@ -1802,7 +1802,7 @@ export default function PatientDetailPage() {
                                                     <div className="text-4xl font-black text-slate-900 mb-2">{report.risks[0].risk_score}%</div>
                                                     {report.risks[0].contributing_factors && (
                                                         <div className="text-xs text-slate-500 italic mt-2">
-                                                            Factors: {report.risks[0].contributing_factors}
+                                                            Factors: {Array.isArray(report.risks[0].contributing_factors) ? report.risks[0].contributing_factors.join(', ') : report.risks[0].contributing_factors}
                                                         </div>
                                                     )}
                                                 </div>
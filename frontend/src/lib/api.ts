@@ -29,6 +29,21 @@ api.interceptors.response.use(
     }
 );
 
+// Patient sub-resource lists are keyset-paginated (newest first, next page in
+// the X-Next-Cursor header). Chart tabs show every row, so follow the cursor to
+// the end and return the rows oldest first, as the tabs have always listed them.
+const getAllPages = async (url: string) => {
+    const rows: any[] = [];
+    let cursor: string | undefined;
+    let response;
+    do {
+        response = await api.get(url, { params: { limit: 500, cursor } });
+        rows.push(...response.data);
+        cursor = response.headers['x-next-cursor'] || undefined;
+    } while (cursor);
+    return { ...response, data: rows.reverse() };
+};
+
 export const getErrorMessage = (err: any): string => {
     const detail = err.response?.data?.detail;
     if (typeof detail === 'string') return detail;
@@ -42,7 +57,7 @@ export const getErrorMessage = (err: any): string => {
 };
 
 export const notesApi = {
-    getAll: (search?: string, mode: string = 'keyword') => api.get('/notes/', { params: { search, mode } }),
+    getAll: (search?: string, mode: string = 'keyword', cursor?: string) => api.get('/notes/', { params: { search, mode, cursor } }),
     getById: (id: string) => api.get(`/notes/${id}`),
     create: (data: { raw_content: string; title: string; note_type?: string; patient_id?: number; encounter_date?: string }) => api.post('/notes/structure', data),
     generateSoap: (id: string | number) => api.post(`/notes/${id}/generate`),
@@ -68,13 +83,13 @@ export const patientsApi = {
 
 export const clinicalApi = {
     // Medical History
-    getHistory: (patientId: string | number) => api.get(`/patients/${patientId}/history`),
+    getHistory: (patientId: string | number) => getAllPages(`/patients/${patientId}/history`),
     addHistory: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/history`, data),
     updateHistory: (id: string | number, data: any) => api.put(`/patients/history/${id}`, data),
     deleteHistory: (id: string | number) => api.delete(`/patients/history/${id}`),
 
     // Medications
-    getMedications: (patientId: string | number) => api.get(`/patients/${patientId}/medications`),
+    getMedications: (patientId: string | number) => getAllPages(`/patients/${patientId}/medications`),
     addMedication: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/medications`, data),
     updateMedication: (id: string | number, data: any) => api.put(`/patients/medications/${id}`, data),
     deleteMedication: (id: string | number) => api.delete(`/patients/medications/${id}`),
@@ -85,32 +100,32 @@ export const clinicalApi = {
     deleteAllergy: (id: string | number) => api.delete(`/patients/allergies/${id}`),
 
     // Admissions
-    getAdmissions: (patientId: string | number) => api.get(`/patients/${patientId}/admissions`),
+    getAdmissions: (patientId: string | number) => getAllPages(`/patients/${patientId}/admissions`),
     addAdmission: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/admissions`, data),
     updateAdmission: (id: string | number, data: any) => api.put(`/patients/admissions/${id}`, data),
     deleteAdmission: (id: string | number) => api.delete(`/patients/admissions/${id}`),
 
     // Procedures
-    getProcedures: (patientId: string | number) => api.get(`/patients/${patientId}/procedures`),
+    getProcedures: (patientId: string | number) => getAllPages(`/patients/${patientId}/procedures`),
     addProcedure: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/procedures`, data),
     updateProcedure: (id: string | number, data: any) => api.put(`/patients/procedures/${id}`, data),
     deleteProcedure: (id: string | number) => api.delete(`/patients/procedures/${id}`),
 
     // Documents
-    getDocuments: (patientId: string | number) => api.get(`/patients/${patientId}/documents`),
+    getDocuments: (patientId: string | number) => getAllPages(`/patients/${patientId}/documents`),
     uploadDocument: (patientId: string | number, formData: FormData) => api.post(`/patients/${patientId}/documents/upload`, formData, { headers: { 'Content-Type': 'multipart/form-data' } }),
     addDocument: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/documents`, data),
     updateDocument: (id: string | number, data: any) => api.put(`/patients/documents/${id}`, data),
     deleteDocument: (id: string | number) => api.delete(`/patients/documents/${id}`),
 
     // Tasks
-    getTasks: (patientId: string | number) => api.get(`/patients/${patientId}/tasks`),
+    getTasks: (patientId: string | number) => getAllPages(`/patients/${patientId}/tasks`),
     addTask: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/tasks`, data),
     updateTask: (id: string | number, data: any) => api.put(`/patients/tasks/${id}`, data),
     deleteTask: (id: string | number) => api.delete(`/patients/tasks/${id}`),
 
     // Billing
-    getBilling: (patientId: string | number) => api.get(`/patients/${patientId}/billing`),
+    getBilling: (patientId: string | number) => getAllPages(`/patients/${patientId}/billing`),
     addBilling: (patientId: string | number, data: any) => api.post(`/patients/${patientId}/billing`, data),
     updateBilling: (id: string | number, data: any) => api.put(`/patients/billing/${id}`, data),
     deleteBilling: (id: string | number) => api.delete(`/patients/billing/${id}`),